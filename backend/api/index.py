@@ -8,15 +8,25 @@ from gotrue.errors import AuthApiError
 from routers.auth_router import auth_router
 from routers.angel_router import router as angel_router
 from middlewares.auth import verify_auth_token  # if you actually use it
+from middlewares.tracing import TracingMiddleware
+from middlewares.metrics import MetricsMiddleware
+from middlewares.compression import CompressionMiddleware
+from utils.metrics import render_metrics
+from utils.llm_scheduler import LLMOverloaded
+from utils.circuit_breaker import CircuitOpen
+from utils.responses import FastJSONResponse
+from fastapi.responses import PlainTextResponse
 
 from exceptions import (
     global_exception_handler,
     validation_exception_handler,
     http_exception_handler,
     supabase_auth_exception_handler,
+    llm_overloaded_exception_handler,
+    circuit_open_exception_handler,
 )
 
-app = FastAPI(title="Founderport Angel Assistant")
+app = FastAPI(title="Founderport Angel Assistant", default_response_class=FastJSONResponse)
 # ✅ CORS Support
 # Enhanced CORS middleware
 origins = [
@@ -37,6 +47,10 @@ app.add_middleware(
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],  # or list explicit headers you send (Authorization, Content-Type, etc.)
 )
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
+# gzip/brotli for responses over RESPONSE_COMPRESSION_MIN_BYTES (outermost, so it sees the final body)
+app.add_middleware(CompressionMiddleware)
 # Manual OPTIONS handler for problematic preflight requests
 @app.options("/{full_path:path}")
 async def options_handler(request: Request, full_path: str):
@@ -64,11 +78,17 @@ async def root():
         "version": "1.0.0"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return render_metrics()
+
 
 app.include_router(auth_router, prefix="/auth")
 app.include_router(angel_router, prefix="/angel")
 
 app.add_exception_handler(AuthApiError, supabase_auth_exception_handler)
+app.add_exception_handler(LLMOverloaded, llm_overloaded_exception_handler)
+app.add_exception_handler(CircuitOpen, circuit_open_exception_handler)
 app.add_exception_handler(Exception, global_exception_handler)
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
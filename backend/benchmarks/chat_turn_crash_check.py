@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Crash-safety check for chat turn writes against the in-memory Supabase stand-in.
+
+A turn (user message, assistant message, session update) is flushed once for every point at
+which the process could die: before the first write, after each write (the save_chat_turn RPC,
+or the bulk insert and session update of the fallback used before the schema is migrated).
+The flush is abandoned there the way a kill would leave it - no exception handler, retry or
+later write runs - and the stored rows are checked. A restarted worker then replays the same
+turn, and the rows are checked again.
+
+- save_chat_turn: every kill point must leave all of the turn or none of it
+- fallback writes: a kill between the two writes may leave the messages without the session
+  update; the replay must complete the turn
+- both: no message is ever stored twice
+
+Usage: python benchmarks/chat_turn_crash_check.py
+Exits with status 1 when a check fails.
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_supabase
+
+SESSION_UPDATE = {"asked_q": "KYC.02", "answered_count": 1}
+
+
+class Killed(BaseException):
+    """Ends a flush at a kill point; BaseException so the app's `except Exception` handlers never see it"""
+
+
+class KillSwitch:
+    """Lets the first `after` writes through, then kills the flush"""
+
+    def __init__(self):
+        self.after = None
+        self.writes = 0
+
+    def arm(self, after):
+        self.after, self.writes = after, 0
+
+    def install(self):
+        query_execute = fake_supabase.FakeQuery.execute
+        rpc_execute = fake_supabase.FakeRPC.execute
+        switch = self
+
+        def guarded_query(query):
+            if query.operation == "select":
+                return query_execute(query)
+            return switch._write(lambda: query_execute(query))
+
+        def guarded_rpc(rpc):
+            return switch._write(lambda: rpc_execute(rpc))
+
+        fake_supabase.FakeQuery.execute = guarded_query
+        fake_supabase.FakeRPC.execute = guarded_rpc
+
+    def _write(self, execute):
+        if self.after is not None and self.writes >= self.after:
+            raise Killed()
+        self.writes += 1
+        try:
+            return execute()
+        finally:
+            if self.after is not None and self.writes >= self.after:
+                raise Killed()
+
+
+def new_session(client, user_id):
+    session = client.from_("chat_sessions").insert({"user_id": user_id, "title": "crash check"}).execute().data[0]
+    return session["id"]
+
+
+def make_turn(chat_service, session_id, user_id, number):
+    turn = chat_service.ChatTurn(session_id, user_id)
+    turn.add_message("user", f"answer {number}")
+    turn.add_message("assistant", f"reply {number}")
+    turn.update_session(SESSION_UPDATE)
+    return turn
+
+
+def stored_state(client, turn):
+    """(messages of the turn stored, copies of the most duplicated one, session update applied)"""
+
+    rows = [row for row in client.rows("chat_history") if row["session_id"] == turn.session_id]
+    ids = [row["id"] for row in rows]
+    session = next(row for row in client.rows("chat_sessions") if row["id"] == turn.session_id)
+    applied = all(session.get(key) == value for key, value in SESSION_UPDATE.items())
+    return len(set(ids)), max((ids.count(message_id) for message_id in set(ids)), default=0), applied
+
+
+def describe(stored, copies, applied, expected):
+    if stored == 0 and not applied:
+        return "nothing"
+    if stored == expected and applied and copies == 1:
+        return "complete"
+    if copies > 1:
+        return f"DUPLICATED x{copies}"
+    return f"partial ({stored}/{expected} messages, session {'updated' if applied else 'not updated'})"
+
+
+def run():
+    client = fake_supabase.install()
+    switch = KillSwitch()
+    switch.install()
+    from services import chat_service
+
+    failures = 0
+    for mode in ("save_chat_turn", "fallback writes"):
+        migrated = mode == "save_chat_turn"
+        if not migrated:
+            # Schema not migrated: the RPC is missing and the writer falls back to separate writes
+            client._rpc_save_chat_turn = None
+
+        user_id = f"crash-{'rpc' if migrated else 'fallback'}"
+        probe = make_turn(chat_service, new_session(client, user_id), user_id, 0)
+        switch.arm(None)
+        chat_service.ChatTurnWriter()._write(probe)
+        write_count = switch.writes
+
+        print(f"\n{mode}: {write_count} write(s) per turn")
+        print(f"{'killed after':>14}  {'after kill':<44} {'after replay':<14} result")
+        for kill_after in range(write_count + 1):
+            turn = make_turn(chat_service, new_session(client, user_id), user_id, kill_after)
+            switch.arm(kill_after)
+            try:
+                chat_service.ChatTurnWriter()._write(turn)
+            except Killed:
+                pass
+            killed = stored_state(client, turn)
+
+            # A restarted worker starts with a fresh writer and replays the turn as it was built
+            switch.arm(None)
+            chat_service.ChatTurnWriter()._write(turn)
+            replayed = stored_state(client, turn)
+
+            expected = len(turn.messages)
+            killed_text = describe(*killed, expected)
+            replayed_text = describe(*replayed, expected)
+            ok = replayed_text == "complete" and killed[1] <= 1
+            if migrated:
+                ok = ok and killed_text in ("nothing", "complete")
+            else:
+                ok = ok and (killed_text in ("nothing", "complete") or (killed[0] == expected and not killed[2]))
+            failures += not ok
+            print(f"{kill_after:>14}  {killed_text:<44} {replayed_text:<14} {'ok' if ok else 'FAIL'}")
+
+    print(f"\n{'All kill points safe' if not failures else f'{failures} unsafe kill point(s)'}")
+    return failures
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    sys.exit(1 if run() else 0)
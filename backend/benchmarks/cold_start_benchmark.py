@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: wall time for a fresh interpreter to import the app and
+serve its first request, the cost a new worker or serverless instance pays.
+
+Each run spawns a new interpreter against the fake Supabase client, so no
+database or OpenAI access is required. Reported per entry point:
+  import     `import main` (uvicorn) or `import api.index` (Vercel)
+  first      first request after import (GET /), including startup hooks
+
+The slowest modules by self time come from `python -X importtime`. With
+--budget-ms the script exits non-zero when the median import + first request
+exceeds the budget, so it can gate CI.
+
+Usage: python benchmarks/cold_start_benchmark.py [--runs 5] [--entry main] [--top 15] [--budget-ms 1000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS_DIR = os.path.join(BACKEND_DIR, "benchmarks")
+
+ENV = {
+    "SUPABASE_URL": "http://localhost:1",
+    "SUPABASE_KEY": "cold-start",
+    "SUPABASE_SERVICE_ROLE_KEY": "cold-start",
+    "OPENAI_API_KEY": "cold-start",
+    "LOG_LEVEL": "WARNING",
+    # The background warm-up would otherwise compete with the first request
+    "LAZY_ROUTERS_WARM": "false"
+}
+
+PROBE = """
+import json, sys, time
+sys.path[:0] = [{backend!r}, {benchmarks!r}]
+import fake_supabase
+fake_supabase.install()
+started = time.perf_counter()
+import {entry} as entry_module
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(entry_module.app) as client:
+    client.get("/")
+served = time.perf_counter()
+print(json.dumps({{"import_ms": (imported - started) * 1000, "first_ms": (served - imported) * 1000}}))
+"""
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    for key, value in ENV.items():
+        env.setdefault(key, value)
+    return env
+
+
+def measure(entry: str) -> dict:
+    code = PROBE.format(backend=BACKEND_DIR, benchmarks=BENCHMARKS_DIR, entry=entry)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=child_env(), cwd=BACKEND_DIR)
+    if result.returncode != 0:
+        sys.exit(f"{entry} failed to start:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(entry: str, top: int):
+    code = f"import sys; sys.path[:0] = [{BACKEND_DIR!r}, {BENCHMARKS_DIR!r}]; import fake_supabase; fake_supabase.install(); import {entry}"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=child_env(), cwd=BACKEND_DIR)
+    # "import time: self [us] | cumulative | imported package"
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(self_us), int(cumulative_us), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per entry point")
+    parser.add_argument("--entry", action="append", help="module exposing `app` (default: main and api.index)")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list, 0 to skip")
+    parser.add_argument("--budget-ms", type=float, help="fail when median import + first request exceeds this")
+    args = parser.parse_args()
+
+    entries = args.entry or ["main", "api.index"]
+    over_budget = []
+
+    print(f"{'entry':<14}{'import ms':>11}{'first ms':>10}{'total ms':>10}{'min total':>11}")
+    for entry in entries:
+        samples = [measure(entry) for _ in range(args.runs)]
+        totals = [sample["import_ms"] + sample["first_ms"] for sample in samples]
+        import_ms = statistics.median(sample["import_ms"] for sample in samples)
+        first_ms = statistics.median(sample["first_ms"] for sample in samples)
+        total_ms = statistics.median(totals)
+        print(f"{entry:<14}{import_ms:>11.0f}{first_ms:>10.0f}{total_ms:>10.0f}{min(totals):>11.0f}")
+        if args.budget_ms is not None and total_ms > args.budget_ms:
+            over_budget.append(f"{entry} {total_ms:.0f}ms")
+
+    if args.top:
+        for entry in entries:
+            print(f"\nSlowest imports for {entry} (self ms, cumulative ms):")
+            for self_us, cumulative_us, name in slowest_imports(entry, args.top):
+                print(f"  {self_us / 1000:>7.1f}{cumulative_us / 1000:>9.1f}  {name}")
+
+    if over_budget:
+        sys.exit(f"\nCold start over the {args.budget_ms:.0f}ms budget: {', '.join(over_budget)}")
+
+
+if __name__ == "__main__":
+    main()
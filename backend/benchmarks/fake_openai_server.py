@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat completions API, for load tests.
+
+Latency is time-to-first-token (lognormal around --ttft-ms) plus completion
+tokens at --tokens-per-sec; completion length is lognormal around
+--completion-tokens. Replies are canned: when the newest user message carries
+a load-test marker "(ref PHASE.NN)" (or is "Accept" following one), the reply
+asks the next question and ends with the matching [[Q:PHASE.NN+1]] tag so the
+app advances like it would with the real model. Requests with a json_schema
+response_format (structured question turns) get the same step as a JSON object:
+question_tag is the next tag when the schema allows it, otherwise the turn stays
+on the answered question and reports section_complete. Other calls (summaries,
+roadmaps, research) get filler text.
+Requests with "stream": true get the same reply as server-sent chunks paced at --tokens-per-sec.
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+
+Usage: python benchmarks/fake_openai_server.py [--port 8919] [--ttft-ms 600]
+       [--jitter 0.35] [--tokens-per-sec 80] [--completion-tokens 220] [--seed 7]
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import re
+import time
+import json
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+# Load-test answers end with the marker; prompts that quote earlier answers do not
+MARKER_PATTERN = re.compile(r"\(ref ([A-Z_]+)\.(\d+)\)\s*$")
+FILLER = [
+    "Based on what you've shared, this is a solid direction.",
+    "Founders in your space often start small and validate demand with a handful of customers.",
+    "Reinvesting early revenue keeps you flexible while the business finds its footing.",
+    "Check your local licensing requirements and budget for insurance early.",
+    "A simple monthly cash flow forecast will catch problems before they become urgent.",
+    "Document each decision so your plan stays consistent as it grows."
+]
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _filler_text(tokens: int, rng: random.Random) -> str:
+    sentences = []
+    used = 0
+    while used < tokens:
+        sentence = rng.choice(FILLER)
+        sentences.append(sentence)
+        used += _estimate_tokens(sentence)
+    return " ".join(sentences)
+
+
+def _answered_tag(messages):
+    """PHASE.NN the newest user message answers, if it carries a load-test marker"""
+
+    for message in reversed(messages):
+        if message.get("role") != "user":
+            continue
+        content = message.get("content") if isinstance(message.get("content"), str) else ""
+        # Accepting a section summary moves on from the last answered question
+        if content.strip().lower() == "accept":
+            continue
+        match = MARKER_PATTERN.search(content)
+        return (match.group(1), int(match.group(2))) if match else None
+    return None
+
+
+def _next_question(messages, tokens: int, rng: random.Random):
+    """Tagged reply for the question after the one the newest user message answers"""
+
+    answered = _answered_tag(messages)
+    if answered is None:
+        return None
+    phase, number = answered
+    return (
+        f"That's a thoughtful answer.\n\n{_filler_text(tokens, rng)}\n\n"
+        "What would you like to share about this next part of your plan?\n\n"
+        f"[[Q:{phase}.{number + 1:02d}]]"
+    )
+
+
+def _question_turn(messages, schema: dict, tokens: int, rng: random.Random) -> str:
+    """Structured question turn moving to the next question when the schema's tag enum allows it"""
+
+    allowed = schema.get("properties", {}).get("question_tag", {}).get("enum") or [""]
+    answered = _answered_tag(messages)
+    next_tag = f"{answered[0]}.{answered[1] + 1:02d}" if answered else None
+    # Only the answered question is allowed while a section summary is due
+    section_complete = answered is not None and next_tag not in allowed
+    return json.dumps({
+        "acknowledgment": f"That's a thoughtful answer. {_filler_text(tokens, rng)}",
+        "question_tag": next_tag if next_tag in allowed else allowed[0],
+        "question_text": "" if section_complete else "What would you like to share about this next part of your plan?",
+        "show_buttons": False,
+        "section_complete": section_complete
+    })
+
+
+async def _stream_chunks(completion_id: str, model: str, content: str, ttft: float, duration: float, usage: dict):
+    def chunk(delta: dict, finish_reason=None, chunk_usage=None) -> str:
+        return "data: " + json.dumps({
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if chunk_usage is None else [],
+            "usage": chunk_usage
+        }) + "\n\n"
+
+    await asyncio.sleep(ttft)
+    yield chunk({"role": "assistant", "content": ""})
+    words = re.findall(r"\S+\s*", content)
+    for word in words:
+        await asyncio.sleep(duration / max(len(words), 1))
+        yield chunk({"content": word})
+    yield chunk({}, "stop")
+    yield chunk({}, chunk_usage=usage)
+    yield "data: [DONE]\n\n"
+
+
+def create_app(ttft_ms: float = 600, jitter: float = 0.35, tokens_per_sec: float = 80,
+               completion_tokens: int = 220, seed: int = 7) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+    rng = random.Random(seed)
+    stats = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "by_model": {}}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        model = body.get("model", "gpt-4o")
+
+        tokens = max(5, int(rng.lognormvariate(math.log(completion_tokens), 0.5)))
+        if body.get("max_tokens"):
+            tokens = min(tokens, int(body["max_tokens"]))
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            content = _question_turn(messages, response_format["json_schema"].get("schema", {}), tokens, rng)
+        else:
+            content = _next_question(messages, tokens, rng) or _filler_text(tokens, rng)
+        prompt_tokens = sum(_estimate_tokens(str(message.get("content") or "")) for message in messages)
+
+        ttft = rng.lognormvariate(math.log(ttft_ms / 1000), jitter)
+
+        stats["calls"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += tokens
+        stats["by_model"][model] = stats["by_model"].get(model, 0) + 1
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": tokens,
+            "total_tokens": prompt_tokens + tokens
+        }
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream_chunks(completion_id, model, content, ttft, tokens / tokens_per_sec, usage),
+                media_type="text/event-stream"
+            )
+
+        await asyncio.sleep(ttft + tokens / tokens_per_sec)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        stats.update({"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "by_model": {}})
+        return stats
+
+    return app
+
+
+def serve(port: int = 8919, **options):
+    import uvicorn
+    uvicorn.run(create_app(**options), host="127.0.0.1", port=port, log_level="warning")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat completions server")
+    parser.add_argument("--port", type=int, default=8919)
+    parser.add_argument("--ttft-ms", type=float, default=600, help="median time to first token")
+    parser.add_argument("--jitter", type=float, default=0.35, help="lognormal sigma of time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=80)
+    parser.add_argument("--completion-tokens", type=int, default=220, help="median completion length")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"🤖 Fake OpenAI listening on http://127.0.0.1:{args.port}/v1")
+    serve(args.port, ttft_ms=args.ttft_ms, jitter=args.jitter, tokens_per_sec=args.tokens_per_sec,
+          completion_tokens=args.completion_tokens, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
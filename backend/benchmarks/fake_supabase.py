@@ -0,0 +1,473 @@
+"""
+In-memory stand-in for the supabase-py client used by the data layer, for
+load tests: query builders over dict rows (chat_sessions, chat_history and any
+other table), the save_chat_turn and try_acquire_chat_turn_lock RPCs, and an auth API that accepts
+"loadtest-<name>" bearer tokens.
+
+Calls are synchronous like the real client. An optional per-call latency is
+spent with time.sleep so the harness sees the same event-loop blocking a real
+round trip causes.
+
+Install it before the app is imported:
+
+    import fake_supabase
+    fake_supabase.install(latency_ms=5)
+    from main import app
+"""
+
+import copy
+import sys
+import threading
+import time
+import types
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# Column defaults from supabase_schema_setup.sql
+TABLE_DEFAULTS = {
+    "chat_sessions": {
+        "title": "Untitled",
+        "current_phase": "KYC",
+        "asked_q": "KYC.01",
+        "answered_count": 0,
+        "business_context": {},
+        "roadmap_data": None,
+        "implementation_data": None,
+        "progress": None
+    },
+    "chat_history": {"phase": None, "metadata": {}}
+}
+# Primary keys other than id
+PRIMARY_KEYS = {"roadmap_versions": ("roadmap_id", "version"), "chat_turn_locks": ("session_id",)}
+# Tables whose rows carry updated_at
+TIMESTAMPED_TABLES = {"chat_sessions", "roadmaps", "implementation_tasks", "user_preferences"}
+
+
+class FakeAPIError(Exception):
+    """Mirrors postgrest.exceptions.APIError closely enough for the app's handlers"""
+
+    def __init__(self, message: str, code: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+        # Some callers still check the legacy .error attribute
+        self.error = None
+
+
+_OPERATORS = {
+    "eq": lambda field, value: field == value,
+    "neq": lambda field, value: field != value,
+    "gt": lambda field, value: field is not None and field > value,
+    "gte": lambda field, value: field is not None and field >= value,
+    "lt": lambda field, value: field is not None and field < value,
+    "lte": lambda field, value: field is not None and field <= value
+}
+
+
+def _split_top_level(expression: str) -> List[str]:
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in expression:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    return parts + [current]
+
+
+def _parse_logic(expression: str, combine):
+    """Row predicate for a PostgREST or=/and= filter list (comparison operators only)"""
+
+    predicates = []
+    for part in _split_top_level(expression):
+        for name, nested in (("and(", all), ("or(", any)):
+            if part.startswith(name) and part.endswith(")"):
+                predicates.append(_parse_logic(part[len(name):-1], nested))
+                break
+        else:
+            column, op, value = part.split(".", 2)
+            value = value[1:-1] if value.startswith('"') and value.endswith('"') else value
+            predicates.append(lambda row, column=column, op=op, value=value: _OPERATORS[op](row.get(column), value))
+    return lambda row: combine(predicate(row) for predicate in predicates)
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeSupabase", table: str):
+        self.client = client
+        self.table = table
+        self.operation = "select"
+        self.columns: Optional[List[str]] = None
+        self.payload: Any = None
+        self.on_conflict = "id"
+        self.ignore_duplicates = False
+        self.filters = []
+        self.orders = []
+        self.bounds = (0, None)
+        self.single_row = False
+        self.maybe_single_row = False
+        self.count_mode = None
+
+    # Operations
+    def select(self, columns: str = "*", count: Optional[str] = None):
+        self.columns = None if columns.strip() == "*" else [column.strip() for column in columns.split(",")]
+        self.count_mode = count
+        return self
+
+    def insert(self, rows):
+        self.operation, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict: str = "id", ignore_duplicates: bool = False):
+        self.operation, self.payload = "upsert", rows
+        self.on_conflict, self.ignore_duplicates = on_conflict, ignore_duplicates
+        return self
+
+    def update(self, values: Dict[str, Any]):
+        self.operation, self.payload = "update", values
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    # Filters
+    def _filter(self, column, predicate):
+        self.filters.append((column, predicate))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, lambda field: field == value)
+
+    def neq(self, column, value):
+        return self._filter(column, lambda field: field != value)
+
+    def gt(self, column, value):
+        return self._filter(column, lambda field: field is not None and field > value)
+
+    def gte(self, column, value):
+        return self._filter(column, lambda field: field is not None and field >= value)
+
+    def lt(self, column, value):
+        return self._filter(column, lambda field: field is not None and field < value)
+
+    def lte(self, column, value):
+        return self._filter(column, lambda field: field is not None and field <= value)
+
+    def in_(self, column, values):
+        values = list(values)
+        return self._filter(column, lambda field: field in values)
+
+    def is_(self, column, value):
+        expected = None if value in (None, "null") else value
+        return self._filter(column, lambda field: field is expected or field == expected)
+
+    def ilike(self, column, pattern):
+        needle = pattern.strip("%").lower()
+        return self._filter(column, lambda field: field is not None and needle in str(field).lower())
+
+    def or_(self, filters: str):
+        """PostgREST logic tree, e.g. 'a.gt."x",and(a.eq."x",id.gt.y)'"""
+        predicate = _parse_logic(filters, any)
+        self.filters.append((None, predicate))
+        return self
+
+    # Modifiers
+    def order(self, column, desc: bool = False, **_):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count: int):
+        self.bounds = (self.bounds[0], self.bounds[0] + count)
+        return self
+
+    def range(self, start: int, end: int):
+        self.bounds = (start, end + 1)
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    def maybe_single(self):
+        self.maybe_single_row = True
+        return self
+
+    def execute(self) -> FakeResponse:
+        self.client._pay_latency()
+        with self.client.lock:
+            return getattr(self, f"_execute_{self.operation}")()
+
+    # Execution
+    def _matches(self, row) -> bool:
+        return all(predicate(row if column is None else row.get(column)) for column, predicate in self.filters)
+
+    def _project(self, row):
+        if self.columns is None:
+            return copy.deepcopy(row)
+        return {column: copy.deepcopy(row.get(column)) for column in self.columns}
+
+    def _execute_select(self) -> FakeResponse:
+        rows = [row for row in self.client.rows(self.table) if self._matches(row)]
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        total = len(rows)
+        start, end = self.bounds
+        rows = [self._project(row) for row in rows[start:end]]
+
+        if self.single_row or self.maybe_single_row:
+            if len(rows) == 1:
+                return FakeResponse(rows[0], total if self.count_mode else None)
+            if self.maybe_single_row and not rows:
+                return FakeResponse(None)
+            raise FakeAPIError("JSON object requested, multiple (or no) rows returned", "PGRST116")
+        return FakeResponse(rows, total if self.count_mode else None)
+
+    def _new_row(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        row = copy.deepcopy(TABLE_DEFAULTS.get(self.table, {}))
+        row.update(copy.deepcopy(values))
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", _now())
+        if self.table in TIMESTAMPED_TABLES:
+            row.setdefault("updated_at", row["created_at"])
+        return row
+
+    def _execute_insert(self) -> FakeResponse:
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        table = self.client.rows(self.table)
+        key = PRIMARY_KEYS.get(self.table, ("id",))
+        inserted = []
+        for values in rows:
+            row = self._new_row(values)
+            if any(all(existing.get(column) == row.get(column) for column in key) for existing in table):
+                raise FakeAPIError(f'duplicate key value violates unique constraint "{self.table}_pkey"', "23505")
+            table.append(row)
+            inserted.append(copy.deepcopy(row))
+        return FakeResponse(inserted)
+
+    def _execute_upsert(self) -> FakeResponse:
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        keys = [key.strip() for key in self.on_conflict.split(",")]
+        table = self.client.rows(self.table)
+        written = []
+        for values in rows:
+            existing = next(
+                (row for row in table if all(row.get(key) == values.get(key) for key in keys)),
+                None
+            ) if all(key in values for key in keys) else None
+            if existing is None:
+                row = self._new_row(values)
+                table.append(row)
+                written.append(copy.deepcopy(row))
+            elif not self.ignore_duplicates:
+                existing.update(copy.deepcopy(values))
+                written.append(copy.deepcopy(existing))
+        return FakeResponse(written)
+
+    def _execute_update(self) -> FakeResponse:
+        updated = []
+        for row in self.client.rows(self.table):
+            if self._matches(row):
+                row.update(copy.deepcopy(self.payload))
+                if self.table in TIMESTAMPED_TABLES:
+                    row["updated_at"] = _now()
+                updated.append(copy.deepcopy(row))
+        return FakeResponse(updated)
+
+    def _execute_delete(self) -> FakeResponse:
+        table = self.client.rows(self.table)
+        deleted = [row for row in table if self._matches(row)]
+        table[:] = [row for row in table if not self._matches(row)]
+        return FakeResponse(deleted)
+
+
+class FakeRPC:
+    def __init__(self, client: "FakeSupabase", name: str, params: Dict[str, Any]):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self) -> FakeResponse:
+        handler = getattr(self.client, f"_rpc_{self.name}", None)
+        if handler is None:
+            raise FakeAPIError(f"Could not find the function public.{self.name} in the schema cache", "PGRST202")
+        self.client._pay_latency()
+        with self.client.lock:
+            return FakeResponse(handler(**self.params))
+
+
+class FakeAuth:
+    """supabase.auth surface used by middlewares/auth.py and services/auth_service.py"""
+
+    def __init__(self):
+        self.users: Dict[str, types.SimpleNamespace] = {}
+
+    def user_for_token(self, token: str) -> Optional[types.SimpleNamespace]:
+        if not token or not token.startswith("loadtest-"):
+            return None
+        name = token[len("loadtest-"):]
+        if name not in self.users:
+            self.users[name] = types.SimpleNamespace(
+                id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"loadtest/{name}")),
+                email=f"{name}@loadtest.local"
+            )
+        return self.users[name]
+
+    def _session(self, user):
+        token = f"loadtest-{user.email.split('@')[0]}"
+        return types.SimpleNamespace(
+            user=user,
+            session=types.SimpleNamespace(access_token=token, refresh_token=token, expires_in=3600)
+        )
+
+    def get_user(self, token: str):
+        user = self.user_for_token(token)
+        return types.SimpleNamespace(user=user) if user else None
+
+    def sign_up(self, credentials: Dict[str, str]):
+        return self._session(self.user_for_token(f"loadtest-{credentials['email'].split('@')[0]}"))
+
+    sign_in_with_password = sign_up
+
+    def refresh_session(self, refresh_token: str):
+        user = self.user_for_token(refresh_token)
+        if user is None:
+            raise FakeAPIError("Invalid Refresh Token")
+        return self._session(user)
+
+    def reset_password_for_email(self, email: str):
+        return None
+
+
+class FakeSupabase:
+    def __init__(self, latency_ms: float = 0):
+        self.latency = latency_ms / 1000
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.auth = FakeAuth()
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        view = getattr(self, f"_view_{table}", None)
+        if view:
+            return view()
+        return self.tables.setdefault(table, [])
+
+    def _view_chat_session_summaries(self) -> List[Dict[str, Any]]:
+        """Same rows as the chat_session_summaries view in supabase_schema_setup.sql"""
+
+        messages: Dict[str, List[str]] = {}
+        for row in self.rows("chat_history"):
+            messages.setdefault(row["session_id"], []).append(row["created_at"])
+        summaries = []
+        for session in self.rows("chat_sessions"):
+            context = session.get("business_context") or {}
+            created = messages.get(session["id"], [])
+            summaries.append({
+                **{key: session.get(key) for key in (
+                    "id", "user_id", "title", "current_phase", "asked_q", "answered_count", "created_at", "updated_at"
+                )},
+                "business_name": context.get("business_name"),
+                "industry": context.get("industry"),
+                "location": context.get("location"),
+                "message_count": len(created),
+                "last_message_at": max(created) if created else None
+            })
+        return summaries
+
+    def from_(self, table: str) -> FakeQuery:
+        return FakeQuery(self, table)
+
+    table = from_
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> FakeRPC:
+        return FakeRPC(self, name, params or {})
+
+    def _pay_latency(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _rpc_save_chat_turn(self, p_session_id, p_messages=None, p_session_updates=None):
+        """Same effect as the plpgsql save_chat_turn: insert messages once, then apply session updates"""
+
+        history = self.rows("chat_history")
+        known = {row["id"] for row in history}
+        for message in p_messages or []:
+            if message.get("id") in known:
+                continue
+            history.append({**TABLE_DEFAULTS["chat_history"], **copy.deepcopy(message), "session_id": p_session_id})
+            known.add(message.get("id"))
+
+        if p_session_updates:
+            for row in self.rows("chat_sessions"):
+                if row["id"] == p_session_id:
+                    row.update(copy.deepcopy(p_session_updates))
+                    row["updated_at"] = _now()
+        return None
+
+    def _rpc_try_acquire_chat_turn_lock(self, p_session_id, p_owner, p_ttl_seconds):
+        """Same lease semantics as the plpgsql try_acquire_chat_turn_lock"""
+
+        now = datetime.now(timezone.utc)
+        expires_at = (now + timedelta(seconds=p_ttl_seconds)).isoformat()
+        locks = self.rows("chat_turn_locks")
+        current = next((row for row in locks if row["session_id"] == p_session_id), None)
+        if current is None:
+            locks.append({"session_id": p_session_id, "owner": p_owner, "expires_at": expires_at})
+            return True
+        if current["expires_at"] < now.isoformat() or current["owner"] == p_owner:
+            current.update({"owner": p_owner, "expires_at": expires_at})
+            return True
+        return False
+
+    def _rpc_save_roadmap_version(self, p_session_id, p_expected_version, p_roadmap, p_version):
+        """Same effect as the plpgsql save_roadmap_version: advance the roadmap and record the version, or neither"""
+
+        roadmaps = self.rows("roadmaps")
+        current = next((row for row in roadmaps if row["session_id"] == p_session_id), None)
+        fields = {key: copy.deepcopy(p_roadmap[key]) for key in ("user_id", "content", "phases", "tasks")}
+        if p_expected_version == 0 and current is None:
+            current = {**TABLE_DEFAULTS.get("roadmaps", {}), "id": str(uuid.uuid4()), "session_id": p_session_id,
+                       "created_at": _now(), "updated_at": _now(), **fields, "version": 1}
+            roadmaps.append(current)
+        elif current is not None and current["version"] == p_expected_version:
+            current.update({**fields, "version": p_expected_version + 1, "updated_at": _now()})
+        else:
+            raise FakeAPIError(f"roadmap for session {p_session_id} is no longer at version {p_expected_version}", "40001")
+
+        versions = self.rows("roadmap_versions")
+        versions[:] = [row for row in versions if (row["roadmap_id"], row["version"]) != (current["id"], current["version"])]
+        versions.append({**copy.deepcopy(p_version), "roadmap_id": current["id"], "version": current["version"], "created_at": _now()})
+        return [copy.deepcopy(current)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "rows": {table: len(rows) for table, rows in self.tables.items()}}
+
+
+def install(latency_ms: float = 0) -> FakeSupabase:
+    """Register the stand-in as db.supabase so every `from db.supabase import supabase` gets it"""
+
+    client = FakeSupabase(latency_ms)
+    module = types.ModuleType("db.supabase")
+    module.supabase = client
+    module.SUPABASE_URL = "http://fake-supabase.local"
+    module.SUPABASE_KEY = "loadtest"
+    sys.modules["db.supabase"] = module
+    return client
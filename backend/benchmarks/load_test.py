@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Offline load test: N simulated founders replay the full KYC -> BUSINESS_PLAN ->
+ROADMAP -> IMPLEMENTATION journey against main:app in-process, with OpenAI
+served by benchmarks/fake_openai_server.py (separate process) and Supabase
+replaced by the in-memory benchmarks/fake_supabase.py. No network access or
+credentials are needed.
+
+Reports p50/p95/p99 latency per endpoint, event-loop lag over the run, and CPU
+time per request. Per-request CPU is exact at --users 1; with more users
+concurrent requests interleave on the loop, so use the per-turn average.
+
+Usage: python benchmarks/load_test.py [--users 10] [--ramp 5] [--tasks 3]
+       [--draft-rate 0.1] [--think-ms 0] [--db-latency-ms 0] [--ttft-ms 600]
+       [--jitter 0.35] [--tokens-per-sec 80] [--completion-tokens 220] [--json report.json]
+
+Hedging A/B: run twice with a heavy latency tail, e.g. --jitter 1.0, once with
+OPENAI_HEDGING=true in the environment, and compare the chat endpoint's p99.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import fake_openai_server
+import fake_supabase
+
+# A full journey asks 19 KYC and 46 business plan questions; anything far beyond that is stuck
+MAX_CHAT_TURNS = 3 * (19 + 46)
+LOOP_LAG_INTERVAL = 0.02
+
+# Answers avoid the skip/command phrases validate_question_answer rejects
+KYC_ANSWERS = [
+    "My name is Jordan and I live in Austin, Texas",
+    "I have worked in restaurants for eight years, mostly as a shift manager",
+    "I want to open a specialty coffee shop with a small roastery",
+    "Yes, I have a business idea already",
+    "I am comfortable with budgeting but new to marketing",
+    "Mostly brick-and-mortar with some online sales",
+    "I work full-time and plan to leave my job within a year",
+    "I want to build something of my own and serve my neighborhood"
+]
+BUSINESS_PLAN_ANSWERS = [
+    "We will sell single-origin coffee, pastries and roasted beans by the bag",
+    "Our customers are young professionals and students within two miles of the shop",
+    "Startup costs are about 120000 dollars funded by savings and an SBA loan",
+    "We will price drinks between four and six dollars with a loyalty program",
+    "Marketing will focus on Instagram, local events and partnerships with offices",
+    "We plan to register an LLC and get food service permits from the city",
+    "The main competitors are two chain cafes and one independent shop close by",
+    "In three years we want a second location and wholesale accounts"
+]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an unsorted list"""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+class Recorder:
+    def __init__(self):
+        self.latency = defaultdict(list)
+        self.cpu = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.journeys = []
+        self.stuck = 0
+        self.loop_lag = []
+
+    def record(self, endpoint, seconds, cpu_seconds, ok):
+        self.latency[endpoint].append(seconds)
+        self.cpu[endpoint].append(cpu_seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+
+class SimulatedUser:
+    def __init__(self, index, http, recorder, args):
+        self.index = index
+        self.http = http
+        self.recorder = recorder
+        self.args = args
+        self.rng = random.Random(args.seed + index)
+        self.headers = {"Authorization": f"Bearer loadtest-user{index}"}
+
+    async def call(self, method, endpoint, path, **kwargs):
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        response = await self.http.request(method, path, headers=self.headers, **kwargs)
+        ok = response.status_code < 400
+        self.recorder.record(endpoint, time.perf_counter() - started, time.process_time() - cpu_started, ok)
+        if self.args.think_ms:
+            await asyncio.sleep(self.rng.expovariate(1000 / self.args.think_ms))
+        return response.json() if ok else None
+
+    async def chat(self, session_id, content):
+        return await self.call("POST", "POST /angel/sessions/{id}/chat", f"/angel/sessions/{session_id}/chat", json={"content": content})
+
+    def answer(self, phase, number):
+        answers = KYC_ANSWERS if phase == "KYC" else BUSINESS_PLAN_ANSWERS
+        # The marker tells the fake OpenAI server which question was answered
+        return f"{self.rng.choice(answers)} (ref {phase}.{number:02d})"
+
+    async def run_journey(self):
+        started = time.perf_counter()
+        created = await self.call("POST", "POST /angel/sessions", "/angel/sessions", json={"title": f"Load test {self.index}"})
+        if not created:
+            return
+        session_id = created["result"]["id"]
+        await self.call("GET", "GET /angel/sessions/{id}/history", f"/angel/sessions/{session_id}/history")
+
+        # KYC and business plan questionnaires
+        phase, number = "KYC", 0
+        content = "hi"
+        response = await self.chat(session_id, content)
+        for _ in range(MAX_CHAT_TURNS):
+            result = (response or {}).get("result", {})
+            transition = result.get("transition_phase")
+            if transition == "PLAN_TO_ROADMAP":
+                break
+            if transition == "KYC_TO_BUSINESS_PLAN":
+                phase, number = "BUSINESS_PLAN", 0
+                content = "Yes, I'm ready to start planning (ref BUSINESS_PLAN.00)"
+            elif content == "Draft":
+                # Answer in their own words after reading the draft
+                content = self.answer(phase, number)
+            elif phase == "BUSINESS_PLAN" and number and not result.get("question_number"):
+                # Section summaries carry no question tag and wait for Accept
+                content = "Accept"
+            else:
+                number = result.get("question_number") or number
+                phase = (result.get("progress") or {}).get("phase", phase)
+                if phase == "BUSINESS_PLAN" and self.rng.random() < self.args.draft_rate:
+                    content = "Draft"
+                else:
+                    content = self.answer(phase, number)
+            response = await self.chat(session_id, content)
+        else:
+            self.recorder.stuck += 1
+            print(f"⚠️ User {self.index} stuck at {phase}.{number:02d}", file=sys.stderr)
+            return
+
+        # Roadmap
+        await self.call(
+            "POST", "POST /angel/sessions/{id}/transition-decision",
+            f"/angel/sessions/{session_id}/transition-decision", json={"decision": "approve"}
+        )
+
+        # Implementation
+        await self.call("POST", "POST /angel/sessions/{id}/start-implementation", f"/angel/sessions/{session_id}/start-implementation")
+        tasks_path = f"/implementation/sessions/{session_id}/implementation"
+        for _ in range(self.args.tasks):
+            current = await self.call("GET", "GET /implementation/.../tasks", f"{tasks_path}/tasks")
+            task = (current or {}).get("current_task")
+            if not task:
+                break
+            await self.call(
+                "POST", "POST /implementation/.../tasks/{id}/complete", f"{tasks_path}/tasks/{task['id']}/complete",
+                json={"decisions": ["Chose a local provider"], "actions": ["Filed the paperwork"], "documents": [], "notes": "Done"}
+            )
+        await self.call("GET", "GET /implementation/.../progress", f"{tasks_path}/progress")
+
+        self.recorder.journeys.append(time.perf_counter() - started)
+
+
+async def sample_loop_lag(recorder):
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        recorder.loop_lag.append(max(0.0, time.perf_counter() - started - LOOP_LAG_INTERVAL))
+
+
+async def wait_for_server(url, timeout=20):
+    import httpx
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(f"{url}/stats")
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Fake OpenAI server did not start at {url}")
+                await asyncio.sleep(0.1)
+
+
+async def fetch_openai_stats(url):
+    import httpx
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"{url}/stats")).json()
+
+
+async def run(args, recorder):
+    import httpx
+    from main import app
+
+    openai_url = f"http://127.0.0.1:{args.openai_port}"
+    await wait_for_server(openai_url)
+
+    lag_sampler = asyncio.create_task(sample_loop_lag(recorder))
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=None) as http:
+        async def start_user(index):
+            await asyncio.sleep(args.ramp * index / max(1, args.users))
+            try:
+                await SimulatedUser(index, http, recorder, args).run_journey()
+            except Exception as e:
+                recorder.errors["journey"] += 1
+                print(f"❌ User {index} failed: {e}", file=sys.stderr)
+
+        await asyncio.gather(*(start_user(index) for index in range(args.users)))
+
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    lag_sampler.cancel()
+
+    # Let write-behind chat turns land before the run is summarised
+    from services.chat_service import chat_turn_writer
+    await chat_turn_writer.drain()
+
+    from utils.hedging import openai_hedger
+    return {
+        "wall_seconds": wall, "cpu_seconds": cpu, "openai": await fetch_openai_stats(openai_url),
+        "hedging": openai_hedger.get_stats()
+    }
+
+
+def build_report(args, recorder, totals, database):
+    endpoints = {}
+    for endpoint, samples in sorted(recorder.latency.items()):
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "errors": recorder.errors.get(endpoint, 0),
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+            "max_ms": round(max(samples) * 1000, 1),
+            "cpu_ms_mean": round(statistics.mean(recorder.cpu[endpoint]) * 1000, 2)
+        }
+
+    requests = sum(len(samples) for samples in recorder.latency.values())
+    chat_turns = len(recorder.latency.get("POST /angel/sessions/{id}/chat", []))
+    return {
+        "config": {key: value for key, value in vars(args).items() if key != "json"},
+        "wall_seconds": round(totals["wall_seconds"], 2),
+        "journeys_completed": len(recorder.journeys),
+        "journeys_stuck": recorder.stuck,
+        "journey_failures": recorder.errors.get("journey", 0),
+        "journey_p50_s": round(percentile(recorder.journeys, 0.50), 2),
+        "journey_p95_s": round(percentile(recorder.journeys, 0.95), 2),
+        "throughput_rps": round(requests / totals["wall_seconds"], 2) if totals["wall_seconds"] else 0,
+        "cpu_seconds": round(totals["cpu_seconds"], 2),
+        "cpu_ms_per_request": round(totals["cpu_seconds"] * 1000 / requests, 2) if requests else 0,
+        "cpu_ms_per_chat_turn": round(totals["cpu_seconds"] * 1000 / chat_turns, 2) if chat_turns else 0,
+        "event_loop_lag_ms": {
+            "p50": round(percentile(recorder.loop_lag, 0.50) * 1000, 2),
+            "p99": round(percentile(recorder.loop_lag, 0.99) * 1000, 2),
+            "max": round(max(recorder.loop_lag, default=0) * 1000, 2)
+        },
+        "openai": totals["openai"],
+        "hedging": totals["hedging"],
+        "supabase": database.get_stats(),
+        "endpoints": endpoints
+    }
+
+
+def print_report(report):
+    print(f"\n📊 Load test: {report['config']['users']} users, {report['wall_seconds']}s wall")
+    print(f"   Journeys completed {report['journeys_completed']}, stuck {report['journeys_stuck']}, failed {report['journey_failures']}")
+    print(f"   Journey p50 {report['journey_p50_s']}s  p95 {report['journey_p95_s']}s  throughput {report['throughput_rps']} req/s")
+    print(f"   CPU {report['cpu_seconds']}s  ({report['cpu_ms_per_request']} ms/request, {report['cpu_ms_per_chat_turn']} ms/chat turn)")
+    lag = report["event_loop_lag_ms"]
+    print(f"   Event-loop lag p50 {lag['p50']}ms  p99 {lag['p99']}ms  max {lag['max']}ms")
+    print(f"   OpenAI calls {report['openai']['calls']}  Supabase calls {report['supabase']['calls']}")
+    hedging = report["hedging"]
+    if hedging["enabled"]:
+        print(f"   Hedged {hedging['hedged']} of {hedging['calls']} calls ({hedging['extra_call_ratio']:.1%} extra), backup won {hedging['hedge_won']}")
+    print()
+
+    print(f"{'endpoint':<52}{'n':>6}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'cpu':>8}")
+    for endpoint, stats in report["endpoints"].items():
+        print(
+            f"{endpoint:<52}{stats['requests']:>6}{stats['errors']:>5}"
+            f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['cpu_ms_mean']:>8.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test of the founder journey")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which users start")
+    parser.add_argument("--tasks", type=int, default=3, help="implementation tasks completed per journey")
+    parser.add_argument("--draft-rate", type=float, default=0.1, help="share of business plan questions preceded by Draft")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a user's requests")
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="blocking latency per Supabase call")
+    parser.add_argument("--openai-port", type=int, default=8919)
+    parser.add_argument("--ttft-ms", type=float, default=600)
+    parser.add_argument("--jitter", type=float, default=0.35, help="lognormal sigma of time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=80)
+    parser.add_argument("--completion-tokens", type=int, default=220)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="keep the app's stdout output")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    server = multiprocessing.get_context("spawn").Process(
+        target=fake_openai_server.serve,
+        kwargs={
+            "port": args.openai_port, "ttft_ms": args.ttft_ms, "jitter": args.jitter, "tokens_per_sec": args.tokens_per_sec,
+            "completion_tokens": args.completion_tokens, "seed": args.seed
+        },
+        daemon=True
+    )
+    server.start()
+
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.openai_port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "loadtest")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    database = fake_supabase.install(args.db_latency_ms)
+
+    stdout = sys.stdout
+    if not args.verbose:
+        sys.stdout = open(os.devnull, "w")
+    recorder = Recorder()
+    try:
+        totals = asyncio.run(run(args, recorder))
+    finally:
+        sys.stdout = stdout
+        server.terminate()
+
+    report = build_report(args, recorder, totals, database)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
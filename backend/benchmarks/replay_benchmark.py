@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Python-side overhead of get_angel_reply, handle_draft_command and
+the artifact generators without LLM noise, by replaying recorded OpenAI
+responses from a cassette (utils/openai_cassette.py). Supabase is the
+in-memory stand-in from benchmarks/fake_supabase.py.
+
+1. Record once against the real API (or the fake server via OPENAI_BASE_URL):
+     python benchmarks/replay_benchmark.py record
+2. Replay offline, as often as needed:
+     python benchmarks/replay_benchmark.py replay [--iterations 50] [--json run.json]
+3. Gate a change against a saved run:
+     python benchmarks/replay_benchmark.py replay --compare run.json [--tolerance 0.15]
+
+Options: --cassette PATH, --only SCENARIO, --latency MS|recorded, --warmup N
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import fake_supabase
+
+DEFAULT_CASSETTE = os.path.join(BENCHMARKS_DIR, "cassettes", "replay_benchmark.jsonl.gz")
+KYC_ANSWERS = 19
+PLAN_ANSWERS = 10
+SESSION = {
+    "id": "00000000-0000-4000-8000-000000000001",
+    "user_id": "00000000-0000-4000-8000-000000000002",
+    "current_phase": "BUSINESS_PLAN",
+    "asked_q": f"BUSINESS_PLAN.{PLAN_ANSWERS + 1:02d}",
+    "answered_count": KYC_ANSWERS + PLAN_ANSWERS,
+    "user_name": "Jordan",
+    "industry": "Food & Beverage",
+    "location": "Austin, Texas",
+    "business_type": "Specialty coffee shop"
+}
+ANSWERS = [
+    "We will sell single-origin coffee, pastries and roasted beans by the bag",
+    "Our customers are young professionals and students within two miles of the shop",
+    "Startup costs are about 120000 dollars funded by savings and an SBA loan",
+    "We will price drinks between four and six dollars with a loyalty program",
+    "Marketing will focus on Instagram, local events and partnerships with offices"
+]
+
+
+def build_history():
+    """Deterministic conversation: the full KYC plus the first business plan answers"""
+
+    history = []
+    for phase, count in (("KYC", KYC_ANSWERS), ("BUSINESS_PLAN", PLAN_ANSWERS)):
+        for number in range(1, count + 1):
+            history.append({"role": "assistant", "content": f"Thanks, Jordan!\n\nPlease tell me more about this part of your plan.\n\n[[Q:{phase}.{number:02d}]]"})
+            history.append({"role": "user", "content": ANSWERS[number % len(ANSWERS)]})
+    history.append({"role": "assistant", "content": f"Great.\n\nWho are your main competitors?\n\n[[Q:BUSINESS_PLAN.{PLAN_ANSWERS + 1:02d}]]"})
+    return history
+
+
+def build_scenarios():
+    from services.angel_service import get_angel_reply, handle_draft_command
+    from services.generate_plan_service import (
+        generate_full_business_plan, generate_full_roadmap_plan, generate_comprehensive_business_plan_summary
+    )
+
+    history = build_history()
+    answer = {"role": "user", "content": "Two chain cafes and one independent shop close by"}
+    return {
+        "get_angel_reply": lambda: get_angel_reply(dict(answer), list(history), dict(SESSION)),
+        "handle_draft_command": lambda: handle_draft_command("", list(history), dict(SESSION)),
+        "generate_full_business_plan": lambda: generate_full_business_plan(list(history)),
+        "generate_full_roadmap_plan": lambda: generate_full_roadmap_plan(list(history)),
+        "generate_comprehensive_business_plan_summary": lambda: generate_comprehensive_business_plan_summary(list(history))
+    }
+
+
+def reset_state():
+    """Pin the state that decides which OpenAI calls a scenario makes"""
+
+    import services.angel_service as angel_service
+    angel_service.web_search_count = 0
+    random.seed(0)
+
+
+async def run_scenario(factory, iterations):
+    from utils.openai_cassette import openai_cassette
+
+    wall, cpu, calls = [], [], []
+    for _ in range(iterations):
+        reset_state()
+        hits = openai_cassette.stats["hits"] + openai_cassette.stats["recorded"]
+        cpu_started = time.process_time()
+        started = time.perf_counter_ns()
+        await factory()
+        wall.append((time.perf_counter_ns() - started) / 1000)
+        cpu.append((time.process_time() - cpu_started) * 1_000_000)
+        calls.append(openai_cassette.stats["hits"] + openai_cassette.stats["recorded"] - hits)
+    return wall, cpu, calls
+
+
+async def run(args):
+    from utils.openai_cassette import openai_cassette
+
+    if args.mode == "record" and not args.append and os.path.exists(args.cassette):
+        os.remove(args.cassette)
+    openai_cassette.configure(args.mode, args.cassette, args.latency)
+
+    scenarios = build_scenarios()
+    if args.only:
+        scenarios = {name: factory for name, factory in scenarios.items() if name == args.only}
+
+    results = {}
+    for name, factory in scenarios.items():
+        if args.mode == "record":
+            await run_scenario(factory, 1)
+            continue
+        await run_scenario(factory, args.warmup)
+        wall, cpu, calls = await run_scenario(factory, args.iterations)
+        ordered = sorted(wall)
+        results[name] = {
+            "iterations": args.iterations,
+            "median_us": round(statistics.median(wall), 1),
+            "p95_us": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+            "min_us": round(ordered[0], 1),
+            "mean_us": round(statistics.mean(wall), 1),
+            "cpu_median_us": round(statistics.median(cpu), 1),
+            "openai_calls": round(statistics.mean(calls), 2)
+        }
+    return results, openai_cassette.get_stats()
+
+
+def compare(results, baseline_path, tolerance):
+    """Print median deltas against a saved run; True when every scenario is within tolerance"""
+
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)["scenarios"]
+
+    passed = True
+    print(f"\n{'scenario':<46}{'baseline':>12}{'current':>12}{'delta':>9}")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median_us"], current["median_us"]
+        delta = (after - before) / before if before else 0
+        regressed = delta > tolerance
+        passed = passed and not regressed
+        print(f"{name:<46}{before:>12.1f}{after:>12.1f}{delta:>+8.1%}{'  ❌' if regressed else ''}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cassette-replay benchmark of Angel orchestration overhead")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE)
+    parser.add_argument("--append", action="store_true", help="record into an existing cassette")
+    parser.add_argument("--only", help="run a single scenario")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--latency", default="0", help="replay delay in ms, or 'recorded'")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results file to check against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed median slowdown for --compare")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("OPENAI_API_KEY", "replay")
+    fake_supabase.install()
+
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        results, cassette = asyncio.run(run(args))
+    finally:
+        sys.stdout = stdout
+
+    if args.mode == "record":
+        print(f"📼 Recorded {cassette['recorded']} OpenAI interactions to {cassette['path']}")
+        return
+
+    print(f"📼 Replayed {cassette['hits']} OpenAI calls from {cassette['path']} ({cassette['misses']} misses)\n")
+    print(f"{'scenario':<46}{'median µs':>12}{'p95 µs':>12}{'cpu µs':>12}{'calls':>7}")
+    for name, stats in results.items():
+        print(f"{name:<46}{stats['median_us']:>12.1f}{stats['p95_us']:>12.1f}{stats['cpu_median_us']:>12.1f}{stats['openai_calls']:>7}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump({"cassette": cassette, "scenarios": results}, output, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        print(f"\n❌ Median slowdown above {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the research retrieval index: recall@k and query latency
+over a synthetic corpus, no database or OpenAI access required.
+
+Usage: python benchmarks/retrieval_benchmark.py [documents] [queries]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.retrieval import BM25Index
+
+TOPICS = [
+    "llc formation", "sales tax permit", "business insurance", "trademark registration",
+    "small business loan", "payroll setup", "bookkeeping software", "commercial lease",
+    "food handler license", "ein application", "sba grant", "marketing budget",
+    "customer acquisition", "pricing strategy", "supplier contract", "zoning approval"
+]
+SOURCES = ["sba.gov", "irs.gov", "score.org", "uspto.gov", "nolo.com", "forbes.com"]
+FILLER = (
+    "entrepreneurs should review requirements carefully plan ahead compare options consult "
+    "advisors document decisions track deadlines budget costs understand obligations local "
+    "state federal agencies provide guidance resources checklists templates"
+).split()
+
+
+def build_corpus(documents: int, rng: random.Random):
+    """Generate documents that each cover one topic for one source"""
+
+    corpus = []
+    for doc_id in range(documents):
+        topic = rng.choice(TOPICS)
+        source = rng.choice(SOURCES)
+        words = [rng.choice(FILLER) for _ in range(rng.randint(120, 400))]
+        for _ in range(4):
+            words.insert(rng.randrange(len(words)), topic)
+        corpus.append({"id": doc_id, "topic": topic, "source": source, "text": " ".join(words)})
+    return corpus
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(documents: int = 2000, queries: int = 500, k: int = 3):
+    rng = random.Random(42)
+    corpus = build_corpus(documents, rng)
+
+    started = time.perf_counter()
+    index = BM25Index()
+    for doc in corpus:
+        index.add(doc["text"], {"source": doc["source"], "topic": doc["topic"]}, key=str(doc["id"]))
+    build_ms = (time.perf_counter() - started) * 1000
+
+    latencies = []
+    hits = 0
+    for _ in range(queries):
+        topic = rng.choice(TOPICS)
+        source = rng.choice(SOURCES)
+        query = f"how to handle {topic} for a new business"
+
+        started = time.perf_counter()
+        results = index.search(query, k=k, filters={"source": source})
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        if results and all(result["metadata"]["topic"] == topic for result in results):
+            hits += 1
+
+    print(f"📚 Indexed {documents} documents into {len(index)} chunks in {build_ms:.1f}ms")
+    print(f"🎯 recall@{k}: {hits / queries:.3f} over {queries} queries")
+    print(f"⏱️ latency p50={percentile(latencies, 50):.3f}ms p95={percentile(latencies, 95):.3f}ms p99={percentile(latencies, 99):.3f}ms")
+    print("   (a live site: search through conduct_web_search is bounded by its 10s timeout)")
+
+
+if __name__ == "__main__":
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    run(documents, queries)
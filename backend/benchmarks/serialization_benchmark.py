@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for response serialization and compression: time to encode
+artifact-sized payloads and their size on the wire, no database or OpenAI
+access required.
+
+Serialization paths compared per payload:
+  stdlib     jsonable_encoder + json.dumps (FastAPI's JSONResponse)
+  default    jsonable_encoder + orjson (FastJSONResponse for routes returning dicts)
+  artifact   orjson directly (utils.responses.artifact_response)
+
+Sizes are reported identity, gzip and, when the brotli package is installed, br,
+at the levels CompressionMiddleware uses.
+
+Usage: python benchmarks/serialization_benchmark.py [--plan-kb 300] [--messages 200] [--repeats 50]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from middlewares.compression import _Compressor, brotli
+from utils.responses import dumps
+
+WORDS = (
+    "market customers revenue pricing competitors location licensing insurance funding "
+    "suppliers marketing operations staffing milestones cash flow forecast strategy launch "
+    "growth retention channels partnerships compliance permits budget timeline research"
+).split()
+
+
+@dataclass
+class Indicator:
+    """Stands in for the dataclasses get_comprehensive_ux_data nests in its payload"""
+
+    name: str
+    percent: float
+    completed: List[str] = field(default_factory=list)
+    updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def markdown(kb: int, rng: random.Random) -> str:
+    lines, size = [], 0
+    while size < kb * 1024:
+        if rng.random() < 0.08:
+            line = f"## Phase {len(lines) // 40 + 1}: {' '.join(rng.choices(WORDS, k=3)).title()}"
+        else:
+            line = "- " + " ".join(rng.choices(WORDS, k=rng.randint(8, 24))) + "."
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def build_payloads(plan_kb: int, messages: int, rng: random.Random):
+    plan = markdown(plan_kb, rng)
+    history = [
+        {
+            "id": f"00000000-0000-4000-8000-{index:012d}",
+            "role": "user" if index % 2 == 0 else "assistant",
+            "content": markdown(2, rng) if index % 2 else " ".join(rng.choices(WORDS, k=20)),
+            "phase": "BUSINESS_PLAN",
+            "created_at": f"2026-01-01T00:{index // 60:02d}:{index % 60:02d}+00:00"
+        }
+        for index in range(messages)
+    ]
+    ux_data = {
+        "progress": [Indicator(f"section_{index}", rng.random() * 100, rng.choices(WORDS, k=5)) for index in range(40)],
+        "prompts": [{"id": index, "text": markdown(1, rng), "tags": set(rng.choices(WORDS, k=4))} for index in range(30)],
+        "navigation": {f"item_{index}": {"label": word, "children": rng.choices(WORDS, k=6)} for index, word in enumerate(WORDS)},
+        "resources": [{"title": " ".join(rng.choices(WORDS, k=5)), "summary": markdown(1, rng)} for _ in range(25)]
+    }
+    return {
+        "business_plan_summary": {"success": True, "result": {"summary": plan, "generated_at": datetime.now(timezone.utc)}},
+        "history_page": {"success": True, "data": history, "next_cursor": None},
+        "ux_data": {"success": True, "data": ux_data}
+    }
+
+
+def time_ms(func, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization and compression benchmark")
+    parser.add_argument("--plan-kb", type=int, default=300, help="size of the business plan markdown")
+    parser.add_argument("--messages", type=int, default=200, help="messages in the history page")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    payloads = build_payloads(args.plan_kb, args.messages, random.Random(args.seed))
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+
+    print(f"{'payload':<22}{'stdlib ms':>10}{'default ms':>11}{'artifact ms':>12}{'identity KB':>13}"
+          + "".join(f"{encoding + ' KB':>10}{encoding + ' ms':>9}" for encoding in encodings))
+    for name, payload in payloads.items():
+        stdlib = time_ms(lambda: json.dumps(jsonable_encoder(payload), ensure_ascii=False).encode("utf-8"), args.repeats)
+        default = time_ms(lambda: dumps(jsonable_encoder(payload)), args.repeats)
+        artifact = time_ms(lambda: dumps(payload), args.repeats)
+        body = dumps(payload)
+        row = f"{name:<22}{stdlib:>10.2f}{default:>11.2f}{artifact:>12.2f}{len(body) / 1024:>13.1f}"
+        for encoding in encodings:
+            compressed = _Compressor(encoding).whole(body)
+            compress_ms = time_ms(lambda: _Compressor(encoding).whole(body), max(1, args.repeats // 5))
+            row += f"{len(compressed) / 1024:>10.1f}{compress_ms:>9.2f}"
+        print(row)
+
+    if brotli is None:
+        print("\nbrotli is not installed - br sizes skipped (pip install brotli)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Convert traces written with TRACE_EXPORT_FILE into collapsed stacks
+("root;child;leaf <microseconds>") for flamegraph.pl or speedscope.
+
+Usage: python benchmarks/trace_flamegraph.py traces.jsonl [route-filter] > traces.folded
+"""
+
+import json
+import sys
+from collections import defaultdict
+
+
+def collapse(trace, stacks):
+    spans = {span["spanId"]: span for span in trace["spans"]}
+    child_time = defaultdict(int)
+    for span in trace["spans"]:
+        if span.get("parentSpanId") and span.get("endTimeUnixNano"):
+            child_time[span["parentSpanId"]] += span["endTimeUnixNano"] - span["startTimeUnixNano"]
+
+    for span in trace["spans"]:
+        if not span.get("endTimeUnixNano"):
+            continue
+        path = []
+        current = span
+        while current:
+            path.append(current["name"].replace(";", ":").replace(" ", "_"))
+            current = spans.get(current.get("parentSpanId"))
+        exclusive = span["endTimeUnixNano"] - span["startTimeUnixNano"] - child_time[span["spanId"]]
+        if exclusive > 0:
+            stacks[";".join(reversed(path))] += exclusive // 1000
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    route_filter = sys.argv[2] if len(sys.argv) > 2 else None
+    stacks = defaultdict(int)
+    with open(sys.argv[1], encoding="utf-8") as traces:
+        for line in traces:
+            trace = json.loads(line)
+            root = next((span for span in trace["spans"] if not span.get("parentSpanId")), None)
+            if route_filter and (not root or route_filter not in root["name"]):
+                continue
+            collapse(trace, stacks)
+
+    for stack, micros in sorted(stacks.items()):
+        print(f"{stack} {micros}")
+
+
+if __name__ == "__main__":
+    main()
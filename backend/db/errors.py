@@ -0,0 +1,40 @@
+import re
+
+# PostgREST "function not in schema cache" and Postgres undefined_function: the schema is not migrated yet
+MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+MISSING_FUNCTION = re.compile(r"function \S+ does not exist|Could not find the function")
+# PostgREST "table not in schema cache" and Postgres undefined_table
+MISSING_TABLE_CODES = ("PGRST205", "42P01")
+MISSING_TABLE = re.compile(r"relation \S+ does not exist|Could not find the table")
+UNIQUE_VIOLATION = "23505"
+SERIALIZATION_FAILURE = "40001"
+
+
+def error_code(error: BaseException) -> str:
+    """PostgREST error code or Postgres SQLSTATE of a failed query, '' when the error carries none"""
+
+    return str(getattr(error, "code", None) or "")
+
+
+def is_missing_function(error: BaseException) -> bool:
+    """True when an RPC failed because its Postgres function is not deployed"""
+
+    if error_code(error) in MISSING_FUNCTION_CODES:
+        return True
+    return bool(MISSING_FUNCTION.search(str(getattr(error, "message", None) or error)))
+
+
+def is_missing_table(error: BaseException) -> bool:
+    """True when a query failed because its table is not deployed"""
+
+    if error_code(error) in MISSING_TABLE_CODES:
+        return True
+    return bool(MISSING_TABLE.search(str(getattr(error, "message", None) or error)))
+
+
+def is_unique_violation(error: BaseException) -> bool:
+    return error_code(error) == UNIQUE_VIOLATION or "duplicate key" in str(getattr(error, "message", None) or error)
+
+
+def is_serialization_failure(error: BaseException) -> bool:
+    return error_code(error) == SERIALIZATION_FAILURE
@@ -3,14 +3,17 @@ from fastapi.responses import JSONResponse
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR, HTTP_400_BAD_REQUEST
 from pydantic import ValidationError
 from gotrue.errors import AuthApiError  
-import traceback
+from utils.logger import get_logger
+from utils.llm_scheduler import LLMOverloaded
+from utils.circuit_breaker import CircuitOpen
+
+logger = get_logger(__name__)
 
 async def global_exception_handler(request: Request, exc: Exception):
-    print("⚠️ Global Exception Caught")
-    print(f"🔗 Path: {request.url.path}")
-    print(f"🧵 Exception Type: {type(exc).__name__}")
-    print(f"📝 Exception Message: {str(exc)}")
-    traceback.print_exc()
+    logger.error(
+        "Unhandled %s: %s", type(exc).__name__, exc,
+        exc_info=exc, extra={"path": request.url.path, "status_code": HTTP_500_INTERNAL_SERVER_ERROR}
+    )
     return JSONResponse(
         status_code=HTTP_500_INTERNAL_SERVER_ERROR,
         content={
@@ -21,10 +24,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 async def http_exception_handler(request: Request, exc: HTTPException):
-    print("🚨 HTTPException Caught")
-    print(f"🔗 Path: {request.url.path}")
-    print(f"📦 Status Code: {exc.status_code}")
-    print(f"📝 Detail: {exc.detail}")
+    logger.info("HTTP exception: %s", exc.detail, extra={"path": request.url.path, "status_code": exc.status_code})
 
     return JSONResponse(
         status_code=exc.status_code,
@@ -36,9 +36,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     )
 
 async def validation_exception_handler(request: Request, exc: ValidationError):
-    print("📛 Validation Error Caught")
-    print(f"🔗 Path: {request.url.path}")
-    print(f"📝 Errors: {exc.errors()}")
+    logger.info("Validation error: %s", exc.errors(), extra={"path": request.url.path, "status_code": 422})
 
     return JSONResponse(
         status_code=422,
@@ -50,9 +48,7 @@ async def validation_exception_handler(request: Request, exc: ValidationError):
     )
 
 async def supabase_auth_exception_handler(request: Request, exc: AuthApiError):
-    print("🔐 Supabase Auth Error Caught")
-    print(f"🔗 Path: {request.url.path}")
-    print(f"📝 Error Message: {exc.message}")
+    logger.warning("Supabase auth error: %s", exc.message, extra={"path": request.url.path, "status_code": HTTP_400_BAD_REQUEST})
     
     return JSONResponse(
         status_code=HTTP_400_BAD_REQUEST,
@@ -62,3 +58,29 @@ async def supabase_auth_exception_handler(request: Request, exc: AuthApiError):
             "message": exc.message,
         },
     )
+
+async def llm_overloaded_exception_handler(request: Request, exc: LLMOverloaded):
+    logger.warning("Request shed: %s", exc, extra={"path": request.url.path, "status_code": 503})
+
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "success": False,
+            "error": "Service Busy",
+            "message": "Angel is handling a lot of requests right now. Please try again shortly.",
+        },
+    )
+
+async def circuit_open_exception_handler(request: Request, exc: CircuitOpen):
+    logger.warning("Failing fast: %s", exc, extra={"path": request.url.path, "status_code": 503})
+
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "success": False,
+            "error": "Service Unavailable",
+            "message": "A service Angel depends on is having trouble. Please try again shortly.",
+        },
+    )
@@ -1,7 +1,9 @@
 # import logging
 # logging.basicConfig(level=logging.DEBUG)
+import asyncio
 import os
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -10,17 +12,20 @@ from gotrue.errors import AuthApiError
 # Routers
 from routers.auth_router import auth_router
 from routers.angel_router import router as angel_router
-from routers.implementation_router import router as implementation_router
 from routers.roadmap_edit_router import router as roadmap_edit_router
-from routers.roadmap_to_implementation_router import router as roadmap_to_implementation_router
-from routers.provider_router import router as provider_router
-from routers.specialized_agents_router import router as specialized_agents_router
-from routers.implementation_router import router as implementation_router
-from routers.appendices_router import router as appendices_router
-from routers.upload_plan_router import router as upload_plan_router
+from routers.session_channel_router import router as session_channel_router
 
 # Middlewares
 from middlewares.auth import verify_auth_token
+from middlewares.tracing import TracingMiddleware
+from middlewares.metrics import MetricsMiddleware
+from middlewares.compression import CompressionMiddleware
+from middlewares.lazy_routers import LazyRouters, LazyRouterMiddleware, LAZY_ROUTERS_WARM
+from utils.metrics import render_metrics, monitor_event_loop_lag
+from utils.llm_scheduler import LLMOverloaded
+from utils.loop_watchdog import loop_watchdog
+from utils.circuit_breaker import CircuitOpen
+from utils.responses import FastJSONResponse
 
 # Exceptions
 from exceptions import (
@@ -28,9 +33,11 @@ from exceptions import (
     validation_exception_handler,
     http_exception_handler,
     supabase_auth_exception_handler,
+    llm_overloaded_exception_handler,
+    circuit_open_exception_handler,
 )
 
-app = FastAPI(title="Founderport Angel Assistant")
+app = FastAPI(title="Founderport Angel Assistant", default_response_class=FastJSONResponse)
 
 # ✅ Root route for health check
 @app.get("/")
@@ -41,6 +48,19 @@ async def root():
         "version": "1.0.0"
     }
 
+# ✅ Prometheus metrics (per worker process)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return render_metrics()
+
+@app.on_event("startup")
+async def start_event_loop_monitor():
+    app.state.loop_lag_monitor = asyncio.create_task(monitor_event_loop_lag())
+    # Captures the stack behind any stall over LOOP_STALL_THRESHOLD_MS
+    await loop_watchdog.start()
+    if LAZY_ROUTERS_WARM:
+        app.state.router_warmup = asyncio.create_task(lazy_routers.warm(modules=("openai",)))
+
 # ✅ CORS Support
 origins = [
     "https://angle-ai-zsdt.vercel.app",
@@ -59,19 +79,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ✅ Routers outside the chat path are imported on first use (innermost, so the load shows up in tracing)
+lazy_routers = LazyRouters(app)
+app.add_middleware(LazyRouterMiddleware, routers=lazy_routers)
+
+# ✅ Request tracing (Server-Timing header, optional TRACE_EXPORT_FILE)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
+# ✅ gzip/brotli for responses over RESPONSE_COMPRESSION_MIN_BYTES (outermost, so it sees the final body)
+app.add_middleware(CompressionMiddleware)
+
 # ✅ Routers
 app.include_router(auth_router, prefix="/auth")
 app.include_router(angel_router, prefix="/angel")
-app.include_router(implementation_router, prefix="/implementation")
+app.include_router(session_channel_router, prefix="/angel")
 app.include_router(roadmap_edit_router, prefix="/roadmap")
-app.include_router(roadmap_to_implementation_router, prefix="/roadmap-to-implementation")
-app.include_router(provider_router, prefix="/providers")
-app.include_router(specialized_agents_router, prefix="/specialized-agents")
-app.include_router(appendices_router, prefix="/appendices")
-app.include_router(upload_plan_router, prefix="/upload-plan")
+lazy_routers.add("routers.implementation_router", prefix="/implementation")
+lazy_routers.add("routers.roadmap_to_implementation_router", prefix="/roadmap-to-implementation")
+lazy_routers.add("routers.provider_router", prefix="/providers")
+lazy_routers.add("routers.specialized_agents_router", prefix="/specialized-agents")
+lazy_routers.add("routers.appendices_router", prefix="/appendices")
+lazy_routers.add("routers.upload_plan_router", prefix="/upload-plan")
+lazy_routers.add("routers.debug_router", prefix="/debug")
+
+# ✅ Flush chat turns still queued by write-behind mode
+@app.on_event("shutdown")
+async def flush_pending_chat_turns():
+    from services.chat_service import chat_turn_writer
+    await chat_turn_writer.drain()
+    loop_watchdog.stop()
 
 # ✅ Global Exception Handlers
 app.add_exception_handler(AuthApiError, supabase_auth_exception_handler)
+app.add_exception_handler(LLMOverloaded, llm_overloaded_exception_handler)
+app.add_exception_handler(CircuitOpen, circuit_open_exception_handler)
 app.add_exception_handler(Exception, global_exception_handler)
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
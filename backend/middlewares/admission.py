@@ -0,0 +1,18 @@
+from fastapi import Request, Depends
+from middlewares.auth import verify_auth_token
+from utils.llm_scheduler import llm_scheduler, bind_llm_context, INTERACTIVE, BACKGROUND
+
+
+def admit_llm_work(priority: int = INTERACTIVE):
+    """Route dependency: tag the request's LLM calls with a priority class and user, shedding it when saturated"""
+
+    # verify_auth_token is cached per request, so routers that already depend on it do not verify twice
+    async def dependency(request: Request, _auth=Depends(verify_auth_token)):
+        bind_llm_context(priority, request.state.user["id"])
+        llm_scheduler.check_admission(priority)
+
+    return dependency
+
+
+admit_interactive = admit_llm_work(INTERACTIVE)
+admit_background = admit_llm_work(BACKGROUND)
@@ -1,9 +1,9 @@
 from fastapi import Request, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from db.supabase import supabase
-import logging
+from utils.logger import get_logger
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 oauth_scheme = HTTPBearer()
 
 async def verify_auth_token(
@@ -11,18 +11,17 @@ async def verify_auth_token(
     credentials: HTTPAuthorizationCredentials = Depends(oauth_scheme)
 ):
     token = credentials.credentials
-    print(f"🔐 Verifying token for path: {request.url.path}")
     
     try:
         # Use Supabase's built-in token verification
         user_response = supabase.auth.get_user(token)
         
         if not user_response or not user_response.user:
-            print("❌ Invalid user from token")
+            logger.warning("Invalid user from token", extra={"path": request.url.path})
             raise HTTPException(status_code=401, detail="Invalid token")
         
         user = user_response.user
-        print(f"✅ Token validated successfully for user: {user.email}")
+        logger.debug("Token validated", extra={"path": request.url.path, "user_id": user.id})
         
         request.state.user = {
             "id": user.id, 
@@ -30,6 +29,6 @@ async def verify_auth_token(
         }
         
     except Exception as e:
-        print(f"❌ Token verification failed: {str(e)}")
+        logger.warning("Token verification failed: %s", e, extra={"path": request.url.path})
         raise HTTPException(status_code=401, detail="Invalid token")
 
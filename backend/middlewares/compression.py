@@ -0,0 +1,180 @@
+import asyncio
+import gzip
+import os
+import zlib
+from typing import List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.metrics import RESPONSE_BYTES
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent as-is; compressing them costs more than it saves
+COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "5"))
+# Larger bodies are compressed in a worker thread (zlib and brotli release the GIL) instead of stalling the loop
+COMPRESSION_THREAD_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_THREAD_MIN_BYTES", "65536"))
+
+# Already compressed or streamed to the client as it is produced
+SKIPPED_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/pdf")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred supported coding from Accept-Encoding: br when Brotli is installed, then gzip"""
+
+    offered = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if offered.get(encoding, offered.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self.stream = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self.stream = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def whole(self, body: bytes) -> bytes:
+        if self.encoding == "br":
+            return brotli.compress(body, quality=BROTLI_QUALITY)
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+    def chunk(self, body: bytes, last: bool) -> bytes:
+        # Flush every chunk so a streamed response reaches the client as it is produced
+        if self.encoding == "br":
+            return self.stream.process(body) + (self.stream.finish() if last else self.stream.flush())
+        return self.stream.compress(body) + self.stream.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli response compression above a size threshold
+
+    Brotli is used when the optional `brotli` package is installed and the client accepts it.
+    Responses that already carry a Content-Encoding, event streams and media pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _CompressedResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start: Optional[Message] = None
+        self.buffered: List[bytes] = []
+        self.buffered_size = 0
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Held back until enough body has arrived to decide whether compressing is worth it
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or any(content_type.startswith(skipped) for skipped in SKIPPED_CONTENT_TYPES)
+            )
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is None:
+            if self.compressor is None:
+                await self.send(message)
+            else:
+                await self._send_body(await self._compress(self.compressor.chunk, body, not more_body), more_body, len(body))
+            return
+
+        if self.passthrough:
+            await self._send_start()
+            await self.send(message)
+            return
+
+        # Middleware above the routes re-sends every body as a stream, so small bodies arrive in pieces too
+        self.buffered.append(body)
+        self.buffered_size += len(body)
+        if more_body and self.buffered_size < self.minimum_size:
+            return
+        body, self.buffered = b"".join(self.buffered), []
+
+        if not more_body and len(body) < self.minimum_size:
+            await self._send_start()
+            await self.send({"type": "http.response.body", "body": body, "more_body": False})
+            return
+
+        self.compressor = _Compressor(self.encoding)
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # The bytes on the wire differ per coding, so a strong validator no longer applies
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        if more_body:
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            compressed = await self._compress(self.compressor.chunk, body, False)
+        else:
+            compressed = await self._compress(self.compressor.whole, body)
+            headers["Content-Length"] = str(len(compressed))
+        await self._send_start()
+        await self._send_body(compressed, more_body, len(body))
+
+    async def _compress(self, compress, body: bytes, *args) -> bytes:
+        if len(body) >= COMPRESSION_THREAD_MIN_BYTES:
+            return await asyncio.to_thread(compress, body, *args)
+        return compress(body, *args)
+
+    async def _send_start(self):
+        start, self.start = self.start, None
+        await self.send(start)
+
+    async def _send_body(self, compressed: bytes, more_body: bool, identity_size: int):
+        RESPONSE_BYTES.inc(identity_size, encoding=self.encoding, stage="identity")
+        RESPONSE_BYTES.inc(len(compressed), encoding=self.encoding, stage="compressed")
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
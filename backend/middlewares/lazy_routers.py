@@ -0,0 +1,105 @@
+import asyncio
+import importlib
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Include routers on the first request under their prefix instead of at import; "false" includes them eagerly
+LAZY_ROUTERS = os.getenv("LAZY_ROUTERS", "true").lower() == "true"
+# Long-running workers load the remaining routers (and the OpenAI SDK) in the background right after startup
+LAZY_ROUTERS_WARM = os.getenv("LAZY_ROUTERS_WARM", "true").lower() == "true"
+
+
+class LazyRouters:
+    """Routers registered by module path and included into the app when first needed
+
+    Importing a router module registers its routes and imports its services, which is most of the
+    app's cold start for routers the first requests never touch. Until a request arrives under a
+    router's prefix, only its module path is known. The import and route registration run in a worker
+    thread so other requests keep being served; /openapi.json loads everything so the docs stay complete.
+    """
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        self.pending: Dict[str, str] = {}
+        self.load_ms: Dict[str, float] = {}
+        # Loads happen in worker threads and from /openapi.json; each router is included exactly once
+        self.lock = threading.Lock()
+
+        default_openapi = app.openapi
+
+        def openapi() -> Dict[str, Any]:
+            self.load_all()
+            return default_openapi()
+
+        app.openapi = openapi
+
+    def add(self, module_path: str, prefix: str):
+        """Register "package.module:attribute" (attribute defaults to router) under a URL prefix"""
+
+        self.pending[prefix] = module_path
+        if not LAZY_ROUTERS:
+            self._load(prefix)
+
+    def _match(self, path: str) -> Optional[str]:
+        # Snapshot: a worker thread may be removing a loaded prefix
+        for prefix in tuple(self.pending):
+            if path == prefix or path.startswith(prefix + "/"):
+                return prefix
+        return None
+
+    def _load(self, prefix: str):
+        with self.lock:
+            module_path = self.pending.get(prefix)
+            if module_path is None:
+                return
+            started = time.perf_counter()
+            module_name, _, attribute = module_path.partition(":")
+            router = getattr(importlib.import_module(module_name), attribute or "router")
+            self.app.include_router(router, prefix=prefix)
+            # Regenerate the cached schema with the new routes
+            self.app.openapi_schema = None
+            del self.pending[prefix]
+            self.load_ms[prefix] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info("Loaded router %s in %.0fms", module_name, self.load_ms[prefix])
+
+    async def ensure(self, path: str):
+        """Include the router serving this path if it has not been loaded yet"""
+
+        prefix = self._match(path)
+        if prefix is not None:
+            await asyncio.to_thread(self._load, prefix)
+
+    def load_all(self):
+        for prefix in list(self.pending):
+            self._load(prefix)
+
+    async def warm(self, modules: tuple = ()):
+        """Load every pending router, and import the given heavy modules, in the background after startup"""
+
+        for prefix in list(self.pending):
+            await self.ensure(prefix)
+        for module_name in modules:
+            await asyncio.to_thread(importlib.import_module, module_name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"enabled": LAZY_ROUTERS, "pending": sorted(self.pending), "load_ms": self.load_ms}
+
+
+class LazyRouterMiddleware:
+    """Loads a lazily registered router before the request reaches routing"""
+
+    def __init__(self, app: ASGIApp, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] in ("http", "websocket") and self.routers.pending:
+            await self.routers.ensure(scope["path"])
+        await self.app(scope, receive, send)
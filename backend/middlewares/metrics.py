@@ -0,0 +1,26 @@
+import time
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from utils.metrics import REQUEST_LATENCY
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Observe request latency by route template, method, status and chat phase"""
+
+    async def dispatch(self, request: Request, call_next):
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - started,
+                route=route.path if route is not None else "unmatched",
+                method=request.method,
+                status=str(status_code),
+                # Handlers that know the session phase set request.state.phase
+                phase=getattr(request.state, "phase", "") or ""
+            )
@@ -0,0 +1,44 @@
+import json
+import os
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+from utils.tracing import start_trace, end_trace
+
+# Allow clients to request the timing breakdown in the JSON body with ?debug_timing=1
+TRACE_DEBUG_FIELD = os.getenv("TRACE_DEBUG_FIELD", "false").lower() == "true"
+
+
+class TracingMiddleware(BaseHTTPMiddleware):
+    """Trace each request and report the per-span breakdown as Server-Timing"""
+
+    async def dispatch(self, request: Request, call_next):
+        trace = start_trace(f"{request.method} {request.url.path}", **{"http.method": request.method, "http.target": request.url.path})
+        try:
+            response = await call_next(request)
+            trace.root["attributes"]["http.status_code"] = response.status_code
+        finally:
+            end_trace(trace)
+
+        response.headers["Server-Timing"] = trace.server_timing()
+
+        wants_debug = TRACE_DEBUG_FIELD and request.query_params.get("debug_timing") == "1"
+        if not wants_debug or not response.headers.get("content-type", "").startswith("application/json"):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return Response(body, status_code=response.status_code, headers=dict(response.headers))
+
+        if isinstance(payload, dict):
+            payload["debug_timing"] = {
+                "trace_id": trace.trace_id,
+                "total_ms": trace.duration_ms(),
+                "spans": trace.breakdown()
+            }
+            body = json.dumps(payload).encode()
+
+        headers = {key: value for key, value in response.headers.items() if key.lower() != "content-length"}
+        return Response(body, status_code=response.status_code, headers=headers, media_type="application/json")
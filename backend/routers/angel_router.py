@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Request, Depends, UploadFile, File
+from fastapi import APIRouter, Request, Depends, UploadFile, File, HTTPException
 from schemas.angel_schemas import ChatRequestSchema, CreateSessionSchema
-from services.session_service import create_session, list_sessions, get_session, patch_session
-from services.chat_service import fetch_chat_history, save_chat_message, fetch_phase_chat_history
+from services.session_service import create_session, list_sessions, get_session, get_session_summary, patch_session
+from services.chat_service import fetch_chat_history, fetch_chat_history_page, save_chat_message, fetch_phase_chat_history, ChatTurn, HISTORY_PAGE_SIZE
+from services.chat_turn_guard import chat_turn_guard, ChatTurnBusy
+from services.roadmap_prefetch_service import roadmap_prefetcher
+from services.roadmap_store import roadmap_store
+from services.session_channel import session_channels, bind_session_channel
+from services.angel_service import ROADMAP_PLACEHOLDER
 from services.generate_plan_service import generate_full_business_plan, generate_full_roadmap_plan, generate_comprehensive_business_plan_summary, generate_implementation_insights, generate_service_provider_preview, generate_motivational_quote
-from services.angel_service import get_angel_reply, handle_roadmap_generation, handle_roadmap_to_implementation_transition
-from utils.progress import parse_tag, TOTALS_BY_PHASE, calculate_phase_progress, calculate_combined_progress, smart_trim_history
+from services.angel_service import get_angel_reply, handle_roadmap_to_implementation_transition
+from utils.progress import parse_tag, TOTALS_BY_PHASE, progress_update, progress_from_session, chat_progress, smart_trim_history
 from middlewares.auth import verify_auth_token
+from middlewares.admission import admit_interactive, admit_background
 from fastapi.middleware.cors import CORSMiddleware
+from utils.logger import get_logger
+from utils.responses import artifact_response
 import re
 import os
+import time
 import uuid
 from datetime import datetime
+from typing import Optional
+
+logger = get_logger(__name__)
 
 router = APIRouter(
     tags=["Angel"],
@@ -25,28 +37,74 @@ async def post_session(request: Request, payload: CreateSessionSchema):
 
 
 @router.get("/sessions")
-async def get_sessions(request: Request):
+async def get_sessions(request: Request, limit: Optional[int] = None, cursor: Optional[str] = None):
     user_id = request.state.user["id"]
-    sessions = await list_sessions(user_id)
-    return {"success": True, "message": "Chat sessions fetched", "result": sessions}
+    try:
+        listing = await list_sessions(user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "message": "Chat sessions fetched", "result": listing["sessions"], "next_cursor": listing["next_cursor"]}
 
-@router.get("/sessions/{session_id}/history")
-async def chat_history(request: Request, session_id: str):
+@router.get("/sessions/{session_id}/summary")
+async def get_session_summary_view(request: Request, session_id: str):
+    summary = await get_session_summary(session_id, request.state.user["id"])
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"success": True, "message": "Session summary fetched", "result": summary}
 
-    history = await fetch_chat_history(session_id)
-    return {"success": True, "message": "Chat history fetched", "data": history}
+@router.get("/sessions/{session_id}/history")
+async def chat_history(request: Request, session_id: str, limit: int = HISTORY_PAGE_SIZE, before: Optional[str] = None):
+    """Latest messages; pass next_cursor back as `before` to load older ones"""
+    try:
+        history = await fetch_chat_history_page(session_id, limit, before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return artifact_response(request, {
+        "success": True,
+        "message": "Chat history fetched",
+        "data": history["messages"],
+        "next_cursor": history["next_cursor"],
+        "has_more": history["next_cursor"] is not None
+    })
 
-@router.post("/sessions/{session_id}/chat")
+@router.post("/sessions/{session_id}/chat", dependencies=[Depends(admit_interactive)])
 async def post_chat(session_id: str, request: Request, payload: ChatRequestSchema):
+    # One turn per session at a time; a retried or double-clicked submit gets the first turn's response
+    try:
+        return await chat_turn_guard.run(
+            request.state.user["id"],
+            session_id,
+            payload.content,
+            request.headers.get("Idempotency-Key"),
+            lambda: process_chat_turn(session_id, request, payload)
+        )
+    except ChatTurnBusy:
+        raise HTTPException(
+            status_code=409,
+            detail="Another message for this session is still being processed",
+            headers={"Retry-After": "5"}
+        )
+
+async def process_chat_turn(session_id: str, request: Request, payload: ChatRequestSchema):
+    turn_started = time.perf_counter()
     user_id = request.state.user["id"]
+    # Research progress and streamed tokens from this turn go to the session's WebSocket clients
+    bind_session_channel(session_id)
     session = await get_session(session_id, user_id)
     history = await fetch_chat_history(session_id)
+    previous_phase = session.get("current_phase")
 
-    # Save user message
-    await save_chat_message(session_id, user_id, "user", payload.content)
+    # Collect this turn's writes and persist them together once the reply is ready
+    turn = ChatTurn(session_id, user_id)
+    turn.add_message("user", payload.content)
 
     # Get AI reply
-    angel_response = await get_angel_reply({"role": "user", "content": payload.content}, history, session)
+    try:
+        angel_response = await get_angel_reply({"role": "user", "content": payload.content}, history, session)
+    except Exception:
+        # No reply, but the user's message is kept, as when it was saved before generating one
+        await turn.commit()
+        raise
     
     # Handle new return format
     if isinstance(angel_response, dict):
@@ -67,23 +125,27 @@ async def post_chat(session_id: str, request: Request, payload: ChatRequestSchem
         session_update = None
         show_accept_modify = False
 
-    # Save assistant reply
-    await save_chat_message(session_id, user_id, "assistant", assistant_reply)
+    turn.add_message("assistant", assistant_reply)
 
     # Handle session updates (e.g., from Accept responses)
     if session_update:
         session.update(session_update)
-        await patch_session(session_id, session_update)
+        turn.update_session(session_update)
 
     # Handle transition phases
     if transition_phase == "KYC_TO_BUSINESS_PLAN":
         # Update session to transition phase
         session["current_phase"] = "BUSINESS_PLAN"
-        await patch_session(session_id, {
+        session["asked_q"] = "BUSINESS_PLAN.01"
+        session["answered_count"] = 0
+        turn.update_session({
             "current_phase": "BUSINESS_PLAN",
             "asked_q": "BUSINESS_PLAN.01",
-            "answered_count": 0
+            "answered_count": 0,
+            **progress_update(session)
         })
+        await turn.commit()
+        session_channels.publish_phase(session_id, previous_phase, "BUSINESS_PLAN", transition_phase)
         
         # Return transition response
         return {
@@ -112,9 +174,15 @@ async def post_chat(session_id: str, request: Request, payload: ChatRequestSchem
             "business_plan_summary": business_plan_summary,
             "transition_type": "PLAN_TO_ROADMAP"
         }
-        await patch_session(session_id, {
-            "current_phase": session["current_phase"]
+        turn.update_session({
+            "current_phase": session["current_phase"],
+            **progress_update(session)
         })
+        await turn.commit()
+        session_channels.publish_phase(session_id, previous_phase, session["current_phase"], transition_phase)
+
+        # Start the roadmap while the user reviews the plan; approving it then serves the result
+        roadmap_prefetcher.prefetch(session_id, user_id, session, history + [{"role": "user", "content": payload.content}])
         
         # Return transition response without normal tag processing
         return {
@@ -154,7 +222,7 @@ async def post_chat(session_id: str, request: Request, payload: ChatRequestSchem
     is_command_response = any(indicator in assistant_reply for indicator in command_indicators)
     
     if is_command_response:
-        print(f"🔧 Command response detected - skipping tag processing to prevent question skipping")
+        logger.debug("Command response detected - skipping tag processing", extra={"session_id": session_id})
         # Don't process tags for command responses - stay on current question
         tag = None
     else:
@@ -162,12 +230,11 @@ async def post_chat(session_id: str, request: Request, payload: ChatRequestSchem
         last_tag = session.get("asked_q")
         tag = parse_tag(assistant_reply)
 
-    print(f"🏷️ Tag Analysis:")
-    print(f"  - Last tag: {session.get('asked_q')}")
-    print(f"  - Current tag: {tag}")
-    print(f"  - Is command response: {is_command_response}")
-    print(f"  - Current answered_count: {session.get('answered_count', 0)}")
-    print(f"  - Assistant reply preview: {assistant_reply[:100]}...")
+    logger.debug(
+        "Tag analysis: last=%s command=%s answered_count=%s",
+        session.get("asked_q"), is_command_response, session.get("answered_count", 0),
+        extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag}
+    )
 
     # Only increment answered_count when moving to a genuinely new tagged question
     # Follow-up questions or clarifications should NOT increment the count
@@ -178,23 +245,19 @@ async def post_chat(session_id: str, request: Request, payload: ChatRequestSchem
         last_phase, last_num = last_tag.split(".")
         current_phase, current_num = tag.split(".")
         
-        print(f"🔄 Tag Comparison:")
-        print(f"  - Last phase: {last_phase}, Last num: {last_num}")
-        print(f"  - Current phase: {current_phase}, Current num: {current_num}")
-        
         # Only increment if moving to next sequential question
         if (current_phase == last_phase and int(current_num) == int(last_num) + 1) or \
            (current_phase != last_phase and current_num == "01"):
             session["answered_count"] += 1
-            print(f"✅ Incremented answered_count to {session['answered_count']}")
+            logger.debug("Incremented answered_count to %s", session["answered_count"], extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag})
         else:
-            print(f"❌ No increment - not a sequential question progression")
+            logger.debug("No increment - not a sequential question progression", extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag})
     elif not is_command_response and not last_tag and tag:
         # First question with a tag - this should increment
         session["answered_count"] += 1
-        print(f"✅ First question with tag - incremented answered_count to {session['answered_count']}")
+        logger.debug("First question with tag - incremented answered_count to %s", session["answered_count"], extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag})
     elif not is_command_response and not tag:
-        print(f"⚠️ No tag found in assistant reply")
+        logger.info("No tag found in assistant reply", extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag})
         # Fallback: If no tag but we have a conversation, increment conservatively
         if len(history) > 0:
             # Only increment by 1 if we haven't incremented recently
@@ -202,15 +265,12 @@ async def post_chat(session_id: str, request: Request, payload: ChatRequestSchem
             # Only increment if we have at least 2 messages (1 Q&A pair) and haven't incremented yet
             if len(history) >= 2 and current_count == 0:
                 session["answered_count"] = 1
-                print(f"🔄 Fallback: Incremented answered_count to 1 (first question without tag)")
+                logger.debug("Fallback: incremented answered_count to 1", extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag})
             elif len(history) >= 4 and current_count == 1:
                 session["answered_count"] = 2
-                print(f"🔄 Fallback: Incremented answered_count to 2 (second question without tag)")
-    else:
-        if is_command_response:
-            print(f"🔧 Command response - skipping answered_count increment")
-        else:
-            print(f"⚠️ No tag change or missing tags")
+                logger.debug("Fallback: incremented answered_count to 2", extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag})
+    elif not is_command_response:
+        logger.debug("No tag change or missing tags", extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag})
 
     if tag and not is_command_response:
         # Validate tag format and detect backwards progression
@@ -228,34 +288,24 @@ async def post_chat(session_id: str, request: Request, payload: ChatRequestSchem
                 if question_num_match:
                     message_question_num = int(question_num_match.group(1))
                     if message_question_num != current_num:
-                        print(f"⚠️ WARNING: Tag mismatch detected!")
-                        print(f"  Message says: 'Question {message_question_num}'")
-                        print(f"  Tag says: {tag} (question {current_num})")
-                        print(f"  Using message question number as source of truth")
                         # Use the message question number
                         corrected_tag = f"{current_phase}.{message_question_num:02d}"
-                        print(f"🔧 Correcting tag from {tag} to {corrected_tag}")
+                        logger.warning("Tag mismatch: message says question %s, correcting to %s", message_question_num, corrected_tag, extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag})
                         tag = corrected_tag
                         current_num = message_question_num
                 
                 # Check for backwards progression
                 if prev_phase == current_phase and current_num < prev_num:
-                    print(f"⚠️ WARNING: Backwards question progression detected!")
-                    print(f"  Previous: {previous_tag} (question {prev_num})")
-                    print(f"  Current: {tag} (question {current_num})")
-                    print(f"  This may indicate an AI model error in tag generation")
-                    
                     # Fix backwards progression by incrementing the question number
                     corrected_num = prev_num + 1
                     corrected_tag = f"{current_phase}.{corrected_num:02d}"
-                    print(f"🔧 Correcting tag from {tag} to {corrected_tag}")
+                    logger.warning("Backwards question progression from %s, correcting to %s", previous_tag, corrected_tag, extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag})
                     tag = corrected_tag
             except (ValueError, IndexError) as e:
-                print(f"⚠️ Error parsing tag format: {e}")
+                logger.warning("Error parsing tag format: %s", e, extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag})
         
         session["asked_q"] = tag
         session["current_phase"] = tag.split(".")[0]
-        print(f"📝 Updated session: asked_q={tag}, current_phase={tag.split('.')[0]}")
         
         # Auto-transition to roadmap after business plan completion
         # Only transition when we've completed all business plan questions (46 total)
@@ -265,55 +315,38 @@ async def post_chat(session_id: str, request: Request, payload: ChatRequestSchem
                 if question_num > 46:
                     session["asked_q"] = "ROADMAP.01"
                     session["current_phase"] = "ROADMAP"
-                    print(f"🔄 Auto-transitioned to ROADMAP after completing BUSINESS_PLAN question {question_num}")
+                    logger.info("Auto-transitioned to ROADMAP after BUSINESS_PLAN question %s", question_num, extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag})
             except (ValueError, IndexError):
-                print(f"⚠️ Error parsing question number from tag: {tag}")
+                logger.warning("Error parsing question number from tag", extra={"session_id": session_id, "phase": session.get("current_phase"), "tag": tag})
                 # Don't transition if we can't parse the question number
     else:
         # If no tag found or command response, try to maintain current phase or set default
         if not session.get("current_phase"):
             session["current_phase"] = "KYC"
-            print(f"📝 Set default phase to KYC")
-        
-        if is_command_response:
-            print(f"🔧 Command response - maintaining current session state without tag updates")
 
-    # Calculate progress based on current phase and CURRENT TAG (not answered_count)
-    # CRITICAL: Use asked_q as the source of truth for what question we're on
+    # Advance the stored progress record to the current question (asked_q is the source of truth)
     current_phase = session["current_phase"]
-    answered_count = session["answered_count"]
+    request.state.phase = current_phase
     current_tag = session.get("asked_q")
-    
-    print(f"📈 Progress Calculation Input:")
-    print(f"  - current_phase: {current_phase}")
-    print(f"  - answered_count: {answered_count}")
-    print(f"  - current_tag (asked_q): {current_tag}")
-    print(f"  - Parsed tag from reply: {tag}")
-    print(f"  - session data: {session}")
-    
-    # Calculate phase-specific progress for phase indicator
-    phase_progress = calculate_phase_progress(current_phase, answered_count, current_tag)
-    print(f"📊 Phase Progress Output: {phase_progress}")
-    
-    # For KYC and Business Plan phases, also calculate combined progress (Overall Progress)
-    if current_phase in ["KYC", "BUSINESS_PLAN"]:
-        combined_progress = calculate_combined_progress(current_phase, answered_count, current_tag)
-        print(f"📊 Combined Progress Output (for Overall Progress): {combined_progress}")
-        # Add combined progress info to phase_progress for frontend
-        phase_progress["overall_progress"] = {
-            "answered": combined_progress["answered"],
-            "total": combined_progress["total"],
-            "percent": combined_progress["percent"]
+    progress_updates = progress_update(session)
+
+    logger.info(
+        "Chat turn processed", extra={
+            "session_id": session_id,
+            "phase": current_phase,
+            "tag": current_tag,
+            "latency_ms": round((time.perf_counter() - turn_started) * 1000, 1)
         }
+    )
     
-    print(f"📊 Final Progress Data Sent to Frontend: {phase_progress}")
-    
-    # Update session in DB (without phase_progress since it's calculated on the fly)
-    await patch_session(session_id, {
+    turn.update_session({
         "asked_q": session["asked_q"],
         "answered_count": session["answered_count"],
-        "current_phase": session["current_phase"]
+        "current_phase": session["current_phase"],
+        **progress_updates
     })
+    await turn.commit()
+    session_channels.publish_phase(session_id, previous_phase, current_phase)
 
     # Extract question number from tag before removing it
     question_number = None
@@ -339,8 +372,8 @@ async def post_chat(session_id: str, request: Request, payload: ChatRequestSchem
         # Final cleanup - ensure no more than 2 consecutive newlines anywhere
         display_reply = re.sub(r'\n{3,}', '\n\n', display_reply)
 
-    # Return progress information
-    progress_info = phase_progress
+    # Phase indicator and KYC + business plan total, read from the record
+    progress_info = chat_progress(session["progress"])
 
     return {
         "success": True,
@@ -423,7 +456,7 @@ async def patch_session_context_from_response(session_id, response_content, tag,
         await patch_session(session_id, updates)
         session.update(updates)
 
-@router.post("/sessions/{session_id}/command")
+@router.post("/sessions/{session_id}/command", dependencies=[Depends(admit_interactive)])
 async def handle_command(session_id: str, request: Request, payload: dict):
     """Handle Accept/Modify commands for Draft and Scrapping responses"""
     
@@ -435,7 +468,8 @@ async def handle_command(session_id: str, request: Request, payload: dict):
 
     if command == "accept":
         # Save the draft as the user's answer
-        await save_chat_message(session_id, user_id, "user", draft_content)
+        turn = ChatTurn(session_id, user_id)
+        turn.add_message("user", draft_content)
         
         # Move to next question
         current_tag = session.get("asked_q")
@@ -448,10 +482,12 @@ async def handle_command(session_id: str, request: Request, payload: dict):
             session["asked_q"] = next_tag
             session["answered_count"] += 1
             
-            await patch_session(session_id, {
+            turn.update_session({
                 "asked_q": session["asked_q"],
-                "answered_count": session["answered_count"]
+                "answered_count": session["answered_count"],
+                **progress_update(session)
             })
+        await turn.commit()
         
         return {
             "success": True,
@@ -489,7 +525,7 @@ async def handle_command(session_id: str, request: Request, payload: dict):
             }
         }
 
-@router.post("/sessions/{session_id}/go-back")
+@router.post("/sessions/{session_id}/go-back", dependencies=[Depends(admit_interactive)])
 async def go_back_to_previous_question(session_id: str, request: Request):
     """Handle going back to the previous question"""
     
@@ -532,9 +568,12 @@ async def go_back_to_previous_question(session_id: str, request: Request):
                 # This happens on frontend - backend just needs to update state
                 
                 # Update session to previous question
+                session["asked_q"] = previous_tag
+                session["answered_count"] = max(0, answered_count - 1)
                 await patch_session(session_id, {
                     "asked_q": previous_tag,
-                    "answered_count": max(0, answered_count - 1)
+                    "answered_count": session["answered_count"],
+                    **progress_update(session)
                 })
                 
                 # Re-fetch updated session
@@ -542,10 +581,10 @@ async def go_back_to_previous_question(session_id: str, request: Request):
                 
                 # Generate the previous question
                 from utils.constant import ANGEL_SYSTEM_PROMPT
-                from openai import AsyncOpenAI
+                from utils.openai_client import get_openai_client
                 import os
                 
-                client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+                client = get_openai_client()
                 
                 question_prompt = f"""
                 The user wants to go back to the previous question.
@@ -565,23 +604,12 @@ async def go_back_to_previous_question(session_id: str, request: Request):
                 
                 reply = response.choices[0].message.content
                 
-                # Calculate progress
-                current_phase = updated_session.get("current_phase", "KYC")
-                answered_count = updated_session.get("answered_count", 0)
-                current_tag = updated_session.get("asked_q", "")
-                
-                phase_progress = calculate_phase_progress(current_phase, answered_count, current_tag)
-                combined_progress = calculate_combined_progress(current_phase, answered_count, current_tag)
-                
                 return {
                     "success": True,
                     "message": "Returned to previous question",
                     "result": {
                         "reply": reply,
-                        "progress": {
-                            **phase_progress,
-                            "overall_progress": combined_progress
-                        }
+                        "progress": chat_progress(progress_from_session(updated_session))
                     }
                 }
                 
@@ -605,18 +633,18 @@ async def get_artifact(session_id: str, artifact_type: str, request: Request):
         if not artifact:
             return {"success": False, "message": "Artifact not found"}
             
-        return {
+        return artifact_response(request, {
             "success": True,
             "result": {
                 "content": artifact["content"],
                 "created_at": artifact["created_at"],
                 "type": artifact_type
             }
-        }
+        })
     except Exception as e:
         return {"success": False, "message": f"Error retrieving artifact: {str(e)}"}
 
-@router.post("/sessions/{session_id}/navigate")
+@router.post("/sessions/{session_id}/navigate", dependencies=[Depends(admit_interactive)])
 async def navigate_to_question(session_id: str, request: Request, payload: dict):
     """Allow navigation back to previous questions for modifications"""
     
@@ -637,7 +665,8 @@ async def navigate_to_question(session_id: str, request: Request, payload: dict)
     
     await patch_session(session_id, {
         "asked_q": session["asked_q"],
-        "current_phase": session["current_phase"]
+        "current_phase": session["current_phase"],
+        **progress_update(session)
     })
     
     # Get the question text for the target tag
@@ -681,13 +710,15 @@ async def save_artifact(session_id: str, artifact_type: str, content: str):
 
 async def fetch_artifact(session_id: str, artifact_type: str):
     """Fetch artifact from database"""
-    # Implementation depends on your database structure
-    # This is a placeholder for the database operation
-    pass
+    if artifact_type == "roadmap":
+        roadmap = await roadmap_store.get_current(session_id)
+        if roadmap:
+            return {"content": roadmap["content"], "created_at": roadmap["updated_at"]}
+    return None
 
 # TOTALS_BY_PHASE is now defined in utils/progress.py
 
-@router.post("/sessions/{session_id}/generate-plan")
+@router.post("/sessions/{session_id}/generate-plan", dependencies=[Depends(admit_background)])
 async def generate_business_plan(request: Request, session_id: str):
     history = await fetch_chat_history(session_id)
     history_trimmed = smart_trim_history(history)  
@@ -698,7 +729,7 @@ async def generate_business_plan(request: Request, session_id: str):
         "result": result,
     }
 
-@router.get("/sessions/{session_id}/business-plan-summary")
+@router.get("/sessions/{session_id}/business-plan-summary", dependencies=[Depends(admit_background)])
 async def get_business_plan_summary(request: Request, session_id: str):
     """Generate comprehensive business plan summary for Plan to Roadmap Transition"""
     user_id = request.state.user["id"]
@@ -709,18 +740,18 @@ async def get_business_plan_summary(request: Request, session_id: str):
     
     try:
         result = await generate_comprehensive_business_plan_summary(history_trimmed)
-        return {
+        return artifact_response(request, {
             "success": True,
             "message": "Business plan summary generated successfully",
             "result": result
-        }
+        }, etag=False)  # Regenerated on every request, so a validator would never match
     except Exception as e:
         return {
             "success": False,
             "message": f"Error generating business plan summary: {str(e)}"
     }
 
-@router.get("/sessions/{session_id}/roadmap-plan")
+@router.get("/sessions/{session_id}/roadmap-plan", dependencies=[Depends(admit_background)])
 async def generate_roadmap_plan(session_id: str, request: Request):
     history = await fetch_chat_history(session_id)
     history_trimmed = smart_trim_history(history)
@@ -730,7 +761,7 @@ async def generate_roadmap_plan(session_id: str, request: Request):
         "result": roadmap
     }
 
-@router.get("/sessions/{session_id}/enhanced-roadmap")
+@router.get("/sessions/{session_id}/enhanced-roadmap", dependencies=[Depends(admit_background)])
 async def generate_enhanced_roadmap(session_id: str, request: Request):
     """Generate enhanced roadmap with comprehensive summary, execution advice, and motivational elements"""
     user_id = request.state.user["id"]
@@ -763,18 +794,18 @@ async def generate_enhanced_roadmap(session_id: str, request: Request):
             }
         }
         
-        return {
+        return artifact_response(request, {
             "success": True,
             "message": "Enhanced roadmap generated successfully with comprehensive features",
             "result": enhanced_result
-        }
+        }, etag=False)  # Regenerated on every request, so a validator would never match
     except Exception as e:
         return {
             "success": False,
             "message": f"Error generating enhanced roadmap: {str(e)}"
         }
 
-@router.post("/sessions/{session_id}/modify-roadmap")
+@router.post("/sessions/{session_id}/modify-roadmap", dependencies=[Depends(admit_interactive)])
 async def modify_roadmap(session_id: str, request: Request):
     """Modify the roadmap content with user edits"""
     user_id = request.state.user["id"]
@@ -790,15 +821,14 @@ async def modify_roadmap(session_id: str, request: Request):
                 "message": "No modified content provided"
             }
         
-        # Store the modified roadmap in the session
-        session["modified_roadmap"] = modified_content
-        session["roadmap_modified_at"] = datetime.now().isoformat()
-        await patch_session(session_id, session)
+        # Store the modified roadmap as a new version
+        roadmap = await roadmap_store.save(session_id, user_id, modified_content, reason="edit")
         
         return {
             "success": True,
             "message": "Roadmap modified successfully",
-            "modified_at": session["roadmap_modified_at"]
+            "modified_at": roadmap.get("updated_at") or datetime.now().isoformat(),
+            "version": roadmap["version"]
         }
     except Exception as e:
         return {
@@ -806,7 +836,7 @@ async def modify_roadmap(session_id: str, request: Request):
             "message": f"Error modifying roadmap: {str(e)}"
         }
 
-@router.get("/sessions/{session_id}/implementation-insights")
+@router.get("/sessions/{session_id}/implementation-insights", dependencies=[Depends(admit_background)])
 async def get_implementation_insights(session_id: str, request: Request):
     """Generate RAG-powered implementation insights for the transition phase"""
     user_id = request.state.user["id"]
@@ -832,7 +862,7 @@ async def get_implementation_insights(session_id: str, request: Request):
             "message": f"Error generating implementation insights: {str(e)}"
         }
 
-@router.get("/sessions/{session_id}/service-provider-preview")
+@router.get("/sessions/{session_id}/service-provider-preview", dependencies=[Depends(admit_background)])
 async def get_service_provider_preview(session_id: str, request: Request):
     """Generate RAG-powered service provider preview for the transition phase"""
     user_id = request.state.user["id"]
@@ -858,7 +888,7 @@ async def get_service_provider_preview(session_id: str, request: Request):
             "message": f"Error generating service provider preview: {str(e)}"
         }
 
-@router.get("/sessions/{session_id}/motivational-quote")
+@router.get("/sessions/{session_id}/motivational-quote", dependencies=[Depends(admit_background)])
 async def get_motivational_quote(session_id: str, request: Request):
     """Get a motivational quote for the transition phase"""
     try:
@@ -881,19 +911,23 @@ async def get_phase_chat_history(
     request: Request,
     phase: str,
     limit: int = 15,
+    after: Optional[str] = None,
     offset: int = 0
 ):
-    user_id = request.state.user["id"]
-
-    messages = await fetch_phase_chat_history(session_id, phase, offset, limit)
+    """Pass next_cursor back as `after` for the following page; offset paging is kept for older clients"""
+    try:
+        history = await fetch_phase_chat_history(session_id, phase, limit, after, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
         "success": True,
-        "result": messages,
-        "has_more": len(messages) == limit
+        "result": history["messages"],
+        "next_cursor": history["next_cursor"],
+        "has_more": history["next_cursor"] is not None
     }
 
-@router.post("/sessions/{session_id}/transition-decision")
+@router.post("/sessions/{session_id}/transition-decision", dependencies=[Depends(admit_background)])
 async def handle_transition_decision(session_id: str, request: Request, payload: dict):
     """Handle Approve/Revisit decisions for Plan to Roadmap transition"""
     
@@ -901,6 +935,8 @@ async def handle_transition_decision(session_id: str, request: Request, payload:
     session = await get_session(session_id, user_id)
     decision = payload.get("decision")  # "approve" or "revisit"
     
+    previous_phase = session.get("current_phase")
+
     if decision == "approve":
         # Transition to Roadmap phase
         session["current_phase"] = "ROADMAP"
@@ -910,12 +946,21 @@ async def handle_transition_decision(session_id: str, request: Request, payload:
         await patch_session(session_id, {
             "current_phase": session["current_phase"],
             "asked_q": session["asked_q"],
-            "answered_count": session["answered_count"]
+            "answered_count": session["answered_count"],
+            **progress_update(session)
         })
+        session_channels.publish_phase(session_id, previous_phase, "ROADMAP", "PLAN_TO_ROADMAP")
         
-        # Generate roadmap
+        # Generate roadmap, or take the one prefetched when the plan completed if the answers are unchanged
         history = await fetch_chat_history(session_id)
-        roadmap_response = await handle_roadmap_generation(session, history)
+        roadmap_response = await roadmap_prefetcher.get_roadmap(session_id, session, history)
+
+        if roadmap_response["roadmap_content"] != ROADMAP_PLACEHOLDER:
+            try:
+                await roadmap_store.save(session_id, user_id, roadmap_response["roadmap_content"], reason="generated")
+            except Exception as e:
+                # The roadmap is still returned; only its stored copy is missing
+                logger.warning("Could not store generated roadmap: %s", e, extra={"session_id": session_id})
         
         return {
             "success": True,
@@ -934,6 +979,9 @@ async def handle_transition_decision(session_id: str, request: Request, payload:
         }
     
     elif decision == "revisit":
+        # The answers are about to change, so the prefetched roadmap will not be used
+        roadmap_prefetcher.discard(session_id)
+
         # Return to Business Plan phase for modifications
         session["current_phase"] = "BUSINESS_PLAN"
         # Keep the current progress instead of resetting to 01
@@ -952,12 +1000,15 @@ async def handle_transition_decision(session_id: str, request: Request, payload:
         
         # Sync answered_count with the tag to fix any discrepancies
         session["answered_count"] = answered_from_tag
+        session["asked_q"] = current_asked_q
         
         await patch_session(session_id, {
             "current_phase": session["current_phase"],
             "asked_q": current_asked_q,
-            "answered_count": answered_from_tag  # Sync this!
+            "answered_count": answered_from_tag,  # Sync this!
+            **progress_update(session)
         })
+        session_channels.publish_phase(session_id, previous_phase, "BUSINESS_PLAN")
         
         return {
             "success": True,
@@ -979,7 +1030,7 @@ async def handle_transition_decision(session_id: str, request: Request, payload:
             "message": "Invalid decision. Please choose 'approve' or 'revisit'"
         }
 
-@router.post("/sessions/{session_id}/revisit-plan-with-areas")
+@router.post("/sessions/{session_id}/revisit-plan-with-areas", dependencies=[Depends(admit_interactive)])
 async def revisit_plan_with_areas(session_id: str, request: Request, payload: dict):
     """Handle revisit with specific modification areas"""
     
@@ -992,6 +1043,8 @@ async def revisit_plan_with_areas(session_id: str, request: Request, payload: di
             "success": False,
             "message": "No modification areas specified"
         }
+
+    roadmap_prefetcher.discard(session_id)
     
     # Store modification areas in session for guidance
     session["modification_areas"] = modification_areas
@@ -1017,10 +1070,12 @@ async def revisit_plan_with_areas(session_id: str, request: Request, payload: di
     else:
         session["asked_q"] = "BUSINESS_PLAN.01"
     
-    await patch_session(session_id, {
+    turn = ChatTurn(session_id, user_id)
+    turn.update_session({
         "current_phase": session["current_phase"],
         "asked_q": session["asked_q"],
-        "modification_areas": modification_areas
+        "modification_areas": modification_areas,
+        **progress_update(session)
     })
     
     # Generate guidance message for modifications
@@ -1030,8 +1085,9 @@ async def revisit_plan_with_areas(session_id: str, request: Request, payload: di
 
 Let's start with the first area that needs attention. I'll provide specific guidance and questions to help you refine each section."""
     
-    # Save guidance message to chat
-    await save_chat_message(session_id, user_id, "assistant", modification_guidance)
+    # Save guidance message to chat together with the session update
+    turn.add_message("assistant", modification_guidance)
+    await turn.commit()
     
     return {
         "success": True,
@@ -1049,22 +1105,25 @@ Let's start with the first area that needs attention. I'll provide specific guid
         }
         }
 
-@router.post("/sessions/{session_id}/start-implementation")
+@router.post("/sessions/{session_id}/start-implementation", dependencies=[Depends(admit_background)])
 async def start_implementation(session_id: str, request: Request):
     """Handle transition from Roadmap to Implementation phase"""
     
     user_id = request.state.user["id"]
     session = await get_session(session_id, user_id)
+    previous_phase = session.get("current_phase")
     
     # Transition to Implementation phase
     session["current_phase"] = "IMPLEMENTATION"
     session["asked_q"] = "IMPLEMENTATION.01"
     session["answered_count"] = 0
     
-    await patch_session(session_id, {
+    turn = ChatTurn(session_id, user_id)
+    turn.update_session({
         "current_phase": session["current_phase"],
         "asked_q": session["asked_q"],
-        "answered_count": session["answered_count"]
+        "answered_count": session["answered_count"],
+        **progress_update(session)
     })
     
     # Get the first implementation task
@@ -1089,8 +1148,10 @@ async def start_implementation(session_id: str, request: Request):
     # Extract the reply content from the response object
     reply_content = implementation_response.get("reply", implementation_response) if isinstance(implementation_response, dict) else implementation_response
     
-    # Save the implementation transition message
-    await save_chat_message(session_id, user_id, "assistant", reply_content)
+    # Save the implementation transition message with the phase change
+    turn.add_message("assistant", reply_content)
+    await turn.commit()
+    session_channels.publish_phase(session_id, previous_phase, "IMPLEMENTATION", "ROADMAP_TO_IMPLEMENTATION")
     
     return {
         "success": True,
@@ -1108,7 +1169,7 @@ async def start_implementation(session_id: str, request: Request):
         }
     }
 
-@router.post("/sessions/{session_id}/roadmap-to-implementation-transition")
+@router.post("/sessions/{session_id}/roadmap-to-implementation-transition", dependencies=[Depends(admit_background)])
 async def roadmap_to_implementation_transition(session_id: str, request: Request):
     """Handle transition from Roadmap to Implementation phase"""
     
@@ -1135,7 +1196,7 @@ async def roadmap_to_implementation_transition(session_id: str, request: Request
         }
     }
 
-@router.post("/sessions/{session_id}/upload-business-plan")
+@router.post("/sessions/{session_id}/upload-business-plan", dependencies=[Depends(admit_background)])
 async def upload_business_plan(
     session_id: str,
     request: Request,
@@ -1193,3 +1254,11 @@ async def upload_business_plan(
             "success": False,
             "error": f"Failed to upload file: {str(e)}"
         }
+
+@router.get("/roadmap-prefetch-stats")
+async def get_roadmap_prefetch_stats(request: Request):
+    """Get hit/waste metrics for roadmap prefetching during the plan-to-roadmap transition"""
+    return {
+        "success": True,
+        "result": roadmap_prefetcher.get_stats()
+    }
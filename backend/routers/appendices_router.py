@@ -13,7 +13,10 @@ from services.appendices_integration_service import (
 )
 from services.credible_resources_service import credible_resources_manager, get_credible_resources_for_query
 from services.deep_research_training_service import deep_research_training_manager, conduct_agent_deep_research, AgentType
+from services.session_service import get_session_progress
 from middlewares.auth import verify_auth_token
+from middlewares.admission import admit_interactive, admit_background
+from utils.responses import artifact_response
 from datetime import datetime
 import json
 
@@ -22,7 +25,7 @@ router = APIRouter(
     dependencies=[Depends(verify_auth_token)]
 )
 
-@router.get("/sessions/{session_id}/ux-data")
+@router.get("/sessions/{session_id}/ux-data", dependencies=[Depends(admit_background)])
 async def get_comprehensive_ux_data_endpoint(session_id: str, request: Request):
     """Get comprehensive UX data integrating all appendices"""
     
@@ -41,13 +44,14 @@ async def get_comprehensive_ux_data_endpoint(session_id: str, request: Request):
         current_task = "business_structure_selection"
         
         # Get comprehensive UX data
-        ux_data = await get_comprehensive_ux_data(session_id, business_context, current_task)
+        progress = await get_session_progress(session_id, user_id)
+        ux_data = await get_comprehensive_ux_data(session_id, business_context, current_task, progress)
         
-        return {
+        return artifact_response(request, {
             "success": True,
             "message": "Comprehensive UX data retrieved successfully",
             "data": ux_data
-        }
+        }, volatile_keys=("generated_at", "component_latency_ms", "last_updated"))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get UX data: {str(e)}")
@@ -66,7 +70,12 @@ async def get_progress_indicators(session_id: str, request: Request):
             "business_type": "Startup"
         }
         
-        progress_indicators = await appendices_integration_service.get_comprehensive_progress_indicators(session_id, business_context)
+        # Rendered from the session's stored progress record
+        progress = await get_session_progress(session_id, user_id)
+        if progress is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        
+        progress_indicators = await appendices_integration_service.get_comprehensive_progress_indicators(session_id, business_context, progress)
         
         return {
             "success": True,
@@ -86,6 +95,8 @@ async def get_progress_indicators(session_id: str, request: Request):
             ]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get progress indicators: {str(e)}")
 
@@ -103,7 +114,8 @@ async def get_dynamic_prompts(session_id: str, request: Request, current_task: O
             "business_type": "Startup"
         }
         
-        prompts = await generate_dynamic_prompts(session_id, business_context, current_task)
+        progress = await get_session_progress(session_id, user_id)
+        prompts = await generate_dynamic_prompts(session_id, business_context, current_task, progress)
         
         return {
             "success": True,
@@ -269,7 +281,7 @@ async def get_credible_resources(request: Request, category: Optional[str] = Non
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get credible resources: {str(e)}")
 
-@router.post("/credible-resources/research")
+@router.post("/credible-resources/research", dependencies=[Depends(admit_interactive)])
 async def conduct_credible_research(request: Request, research_request: Dict[str, Any]):
     """Conduct research using credible resources"""
     
@@ -325,7 +337,7 @@ async def get_agent_training_data(agent_type: str, request: Request):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get agent training data: {str(e)}")
 
-@router.post("/agent-deep-research")
+@router.post("/agent-deep-research", dependencies=[Depends(admit_interactive)])
 async def conduct_agent_deep_research_endpoint(request: Request, research_request: Dict[str, Any]):
     """Conduct deep research using agent training data"""
     
@@ -357,7 +369,7 @@ async def conduct_agent_deep_research_endpoint(request: Request, research_reques
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to conduct agent deep research: {str(e)}")
 
-@router.post("/sessions/{session_id}/execute-command")
+@router.post("/sessions/{session_id}/execute-command", dependencies=[Depends(admit_interactive)])
 async def execute_interactive_command(session_id: str, request: Request, command_data: Dict[str, Any]):
     """Execute an interactive command"""
     
@@ -409,8 +421,8 @@ async def execute_interactive_command(session_id: str, request: Request, command
             
         elif command == "draft":
             # Generate documents
-            from openai import AsyncOpenAI
-            client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            from utils.openai_client import get_openai_client
+            client = get_openai_client()
             
             response = await client.chat.completions.create(
                 model="gpt-4o",
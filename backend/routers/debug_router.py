@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Request, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from utils.loop_watchdog import loop_watchdog, sampling_profiler, PROFILER_ENABLED
+
+LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+
+async def require_local_profiler(request: Request):
+    """Profiling endpoints exist only when PROFILER_ENABLED is set, and only for direct loopback clients"""
+
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    # A forwarded request came through a proxy, so the loopback peer is not the real client
+    if request.client is None or request.client.host not in LOOPBACK_HOSTS or "x-forwarded-for" in request.headers:
+        raise HTTPException(status_code=403, detail="Profiling is only available from localhost")
+
+
+router = APIRouter(
+    tags=["Debug"],
+    dependencies=[Depends(require_local_profiler)]
+)
+
+@router.get("/stalls")
+async def get_loop_stalls():
+    """Recent event-loop stalls with the stack that was running when each was detected"""
+    return {
+        "success": True,
+        "result": {
+            **loop_watchdog.get_stats(),
+            "stalls": loop_watchdog.get_stalls()
+        }
+    }
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(seconds: float = Query(10, gt=0), interval_ms: float = Query(5, ge=1), all_threads: bool = False):
+    """Sample stacks for a time window and return them collapsed (flamegraph.pl / speedscope input)"""
+    if sampling_profiler.busy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return await sampling_profiler.profile(seconds, interval_ms / 1000, loop_only=not all_threads)
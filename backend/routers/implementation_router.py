@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, UploadFile, File
 from typing import Dict, List, Any, Optional
 from services.implementation_task_manager import ImplementationTaskManager
+from services.implementation_prefetch_service import ImplementationTaskPrefetcher
 from services.specialized_agents_service import agents_manager
 from services.rag_service import conduct_rag_research, validate_with_rag
-from services.service_provider_tables_service import generate_provider_table, get_task_providers
-from services.session_service import get_session
+from services.service_provider_tables_service import generate_provider_table
+from services.session_service import get_session, get_session_progress, patch_session
 from services.chat_service import fetch_chat_history
 from middlewares.auth import verify_auth_token
+from middlewares.admission import admit_interactive, admit_background
+from utils.metrics import record_cache
+from utils.progress import progress_from_session, progress_update, implementation_progress
 import json
 import os
 import uuid
@@ -19,7 +23,7 @@ router = APIRouter(
 )
 
 # Missing endpoints that are causing 404 errors
-@router.get("/sessions/{session_id}/service-provider-preview")
+@router.get("/sessions/{session_id}/service-provider-preview", dependencies=[Depends(admit_background)])
 async def get_service_provider_preview(session_id: str, request: Request):
     """Get service provider preview for implementation transition"""
     try:
@@ -51,7 +55,7 @@ async def get_service_provider_preview(session_id: str, request: Request):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/sessions/{session_id}/implementation-insights")
+@router.get("/sessions/{session_id}/implementation-insights", dependencies=[Depends(admit_background)])
 async def get_implementation_insights(session_id: str, request: Request):
     """Get implementation insights for the user"""
     try:
@@ -114,12 +118,83 @@ async def get_motivational_quote(session_id: str, request: Request):
 
 # Global instance
 task_manager = ImplementationTaskManager()
+task_prefetcher = ImplementationTaskPrefetcher(task_manager)
 
 # Cache for implementation tasks to prevent repeated processing
 task_cache = {}
 CACHE_TTL = 300  # 5 minutes cache
 
-@router.get("/sessions/{session_id}/implementation/tasks")
+async def build_business_context(session_id: str, session: Dict[str, Any]) -> Dict[str, Any]:
+    """Business context of a session for task generation and prefetching, with defaults for missing fields"""
+    
+    # Extract business context from session data (if available)
+    session_data = {
+        "business_name": session.get("business_name"),
+        "industry": session.get("industry"),
+        "location": session.get("location"),
+        "business_type": session.get("business_type")
+    }
+    
+    # If session data doesn't have business context, extract from chat history
+    if not session_data.get("business_name") or not session_data.get("industry"):
+        print(f"📊 Session data missing business context - extracting from chat history")
+        history = await fetch_chat_history(session_id)
+        
+        # Simple extraction from chat history
+        for msg in history:
+            if msg.get('role') == 'user':
+                content = msg.get('content', '')
+                content_lower = content.lower()
+                
+                # Extract domain business name
+                if ('.com' in content or '.net' in content or '.org' in content) and len(content) < 100:
+                    session_data["business_name"] = content.strip()
+                
+                # Extract location (common city names)
+                cities = ['karachi', 'lahore', 'islamabad', 'san francisco', 'new york', 'london', 'dubai']
+                for city in cities:
+                    if city in content_lower:
+                        session_data["location"] = city.title()
+                        break
+                
+                # Extract business structure
+                structures = ['llc', 'corporation', 'partnership', 'private limited']
+                for structure in structures:
+                    if structure in content_lower:
+                        session_data["business_type"] = structure.upper()
+                        break
+                
+                # Extract industry
+                industries = {'beverage': ['beverage', 'drink', 'coke', 'soda'], 
+                            'food': ['food', 'restaurant', 'cafe'],
+                            'technology': ['tech', 'software', 'app', 'platform'],
+                            'retail': ['retail', 'store', 'shop', 'marketplace']}
+                for industry, keywords in industries.items():
+                    if any(keyword in content_lower for keyword in keywords):
+                        session_data["industry"] = industry.title()
+                        break
+    
+    # Apply defaults if still missing
+    session_data["business_name"] = session_data.get("business_name") or "Your Business"
+    session_data["industry"] = session_data.get("industry") or "General Business"
+    session_data["location"] = session_data.get("location") or "United States"
+    session_data["business_type"] = session_data.get("business_type") or "Startup"
+    return session_data
+
+async def session_business_context(session_id: str, user_id: str) -> Dict[str, Any]:
+    """Business context for a session, reusing the one cached with its current task"""
+    
+    cached_result = task_cache.get(f"{session_id}_{user_id}")
+    if cached_result and (datetime.now() - cached_result['timestamp']).seconds < CACHE_TTL:
+        cached_task = cached_result['data'].get("current_task")
+        if cached_task:
+            return cached_task["business_context"]
+    session = await get_session(session_id, user_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return await build_business_context(session_id, session)
+
+@router.get("/sessions/{session_id}/implementation/tasks", dependencies=[Depends(admit_background)])
 async def get_current_implementation_task(session_id: str, request: Request):
     """Get the current implementation task for a session"""
     
@@ -132,70 +207,24 @@ async def get_current_implementation_task(session_id: str, request: Request):
             cached_result = task_cache[cache_key]
             if (datetime.now() - cached_result['timestamp']).seconds < CACHE_TTL:
                 print(f"📋 Using cached implementation task for session: {session_id}")
+                cached_task = cached_result['data'].get("current_task")
+                if cached_task:
+                    task_prefetcher.prefetch_next_task(session_id, user_id, cached_task["id"], cached_task["business_context"])
+                record_cache("implementation_task", True)
                 return cached_result['data']
+        record_cache("implementation_task", False)
         
         # Fetch real session data from database
         session = await get_session(session_id, user_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
-        
-        # Extract business context from session data (if available)
-        session_data = {
-            "business_name": session.get("business_name"),
-            "industry": session.get("industry"),
-            "location": session.get("location"),
-            "business_type": session.get("business_type")
-        }
-        
-        # If session data doesn't have business context, extract from chat history
-        if not session_data.get("business_name") or not session_data.get("industry"):
-            print(f"📊 Session data missing business context - extracting from chat history")
-            history = await fetch_chat_history(session_id)
-            
-            # Simple extraction from chat history
-            for msg in history:
-                if msg.get('role') == 'user':
-                    content = msg.get('content', '')
-                    content_lower = content.lower()
-                    
-                    # Extract domain business name
-                    if ('.com' in content or '.net' in content or '.org' in content) and len(content) < 100:
-                        session_data["business_name"] = content.strip()
-                    
-                    # Extract location (common city names)
-                    cities = ['karachi', 'lahore', 'islamabad', 'san francisco', 'new york', 'london', 'dubai']
-                    for city in cities:
-                        if city in content_lower:
-                            session_data["location"] = city.title()
-                            break
-                    
-                    # Extract business structure
-                    structures = ['llc', 'corporation', 'partnership', 'private limited']
-                    for structure in structures:
-                        if structure in content_lower:
-                            session_data["business_type"] = structure.upper()
-                            break
-                    
-                    # Extract industry
-                    industries = {'beverage': ['beverage', 'drink', 'coke', 'soda'], 
-                                'food': ['food', 'restaurant', 'cafe'],
-                                'technology': ['tech', 'software', 'app', 'platform'],
-                                'retail': ['retail', 'store', 'shop', 'marketplace']}
-                    for industry, keywords in industries.items():
-                        if any(keyword in content_lower for keyword in keywords):
-                            session_data["industry"] = industry.title()
-                            break
-        
-        # Apply defaults if still missing
-        session_data["business_name"] = session_data.get("business_name") or "Your Business"
-        session_data["industry"] = session_data.get("industry") or "General Business"
-        session_data["location"] = session_data.get("location") or "United States"
-        session_data["business_type"] = session_data.get("business_type") or "Startup"
+        session_data = await build_business_context(session_id, session)
         
         print(f"📊 Implementation task - final business context: {session_data}")
         
-        # Get completed tasks (you'll need to implement this based on your session service)
-        completed_tasks = []
+        # Completed tasks come from the session's progress record
+        progress = progress_from_session(session)
+        completed_tasks = progress["completed_tasks"]
         
         # Get next task
         task_result = await task_manager.get_next_implementation_task(session_data, completed_tasks)
@@ -205,12 +234,7 @@ async def get_current_implementation_task(session_id: str, request: Request):
                 "success": True,
                 "message": "All implementation tasks completed",
                 "current_task": None,
-                "progress": {
-                    "completed": 25,
-                    "total": 25,
-                    "percent": 100,
-                    "phases_completed": 5
-                }
+                "progress": implementation_progress(progress)
             }
         else:
             response_data = {
@@ -228,14 +252,13 @@ async def get_current_implementation_task(session_id: str, request: Request):
                     "phase_name": task_result["phase"],
                     "business_context": session_data
                 },
-                "progress": {
-                    "completed": len(completed_tasks),
-                    "total": 25,
-                    "percent": int((len(completed_tasks) / 25) * 100),
-                    "phases_completed": 0
-                }
+                "progress": implementation_progress(progress)
             }
         
+        # Warm the next task while the user works on this one
+        if response_data["current_task"]:
+            task_prefetcher.prefetch_next_task(session_id, user_id, task_result["task_id"], session_data)
+        
         # Cache the response
         task_cache[cache_key] = {
             'data': response_data,
@@ -247,7 +270,7 @@ async def get_current_implementation_task(session_id: str, request: Request):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get implementation task: {str(e)}")
 
-@router.post("/sessions/{session_id}/implementation/tasks/{task_id}/complete")
+@router.post("/sessions/{session_id}/implementation/tasks/{task_id}/complete", dependencies=[Depends(admit_interactive)])
 async def complete_implementation_task(
     session_id: str,
     task_id: str,
@@ -258,14 +281,11 @@ async def complete_implementation_task(
     
     user_id = request.state.user["id"]
     
+    session_data = await session_business_context(session_id, user_id)
+    
     try:
-        # Get session data
-        session_data = {
-            "business_name": "Your Business",
-            "industry": "Technology",
-            "location": "San Francisco, CA",
-            "business_type": "Startup"
-        }
+        # The user moves on to the following task next - make sure it is warming
+        task_prefetcher.prefetch_next_task(session_id, user_id, task_id, session_data)
         
         # Validate completion using RAG
         validation_result = await validate_with_rag(
@@ -292,8 +312,8 @@ async def complete_implementation_task(
         Format as constructive feedback to help the user succeed.
         """
         
-        from openai import AsyncOpenAI
-        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        from utils.openai_client import get_openai_client
+        client = get_openai_client()
         
         response = await client.chat.completions.create(
             model="gpt-4o",
@@ -304,26 +324,26 @@ async def complete_implementation_task(
         
         feedback = response.choices[0].message.content
         
-        # Update progress (you'll need to implement this based on your session service)
-        updated_progress = {
-            "completed": 1,  # Increment based on your logic
-            "total": 25,
-            "percent": 4,  # Calculate based on your logic
-            "phases_completed": 0
-        }
+        # Record the completion on the session's progress record
+        session = await get_session(session_id, user_id)
+        updates = progress_update(session, completed_task=task_id)
+        if updates:
+            await patch_session(session_id, updates)
+        # The cached current task is the one just completed
+        task_cache.pop(f"{session_id}_{user_id}", None)
         
         return {
             "success": True,
             "message": "Task completed successfully",
             "feedback": feedback,
             "validation_results": validation_result,
-            "progress": updated_progress
+            "progress": implementation_progress(session["progress"])
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to complete task: {str(e)}")
 
-@router.post("/sessions/{session_id}/implementation/help")
+@router.post("/sessions/{session_id}/implementation/help", dependencies=[Depends(admit_interactive)])
 async def get_implementation_help(
     session_id: str,
     request: Request,
@@ -377,8 +397,8 @@ async def get_implementation_help(
         Format as clear, actionable guidance that helps the user succeed.
         """
         
-        from openai import AsyncOpenAI
-        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        from utils.openai_client import get_openai_client
+        client = get_openai_client()
         
         response = await client.chat.completions.create(
             model="gpt-4o",
@@ -400,67 +420,20 @@ async def get_implementation_help(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get help content: {str(e)}")
 
-@router.post("/sessions/{session_id}/implementation/tasks/{task_id}/kickstart")
+@router.post("/sessions/{session_id}/implementation/tasks/{task_id}/kickstart", dependencies=[Depends(admit_interactive)])
 async def get_implementation_kickstart(session_id: str, task_id: str, request: Request):
     """Get kickstart plan for implementation task"""
     
     user_id = request.state.user["id"]
     
+    session_data = await session_business_context(session_id, user_id)
+    
     try:
-        # Get session data
-        session_data = {
-            "business_name": "Your Business",
-            "industry": "Technology",
-            "location": "San Francisco, CA",
-            "business_type": "Startup"
-        }
-        
-        # Get task-specific providers
-        providers = await get_task_providers(task_id, f"implementation task {task_id}", session_data)
-        
-        # Generate kickstart plan using agents
-        kickstart_guidance = await agents_manager.get_multi_agent_guidance(
-            f"Create a detailed kickstart plan for implementation task: {task_id}",
-            session_data,
-            []
-        )
-        
-        # Generate sub-steps with Angel actions
-        kickstart_prompt = f"""
-        Create a detailed kickstart plan for implementation task: {task_id}
-        
-        Business Context: {session_data}
-        Agent Guidance: {kickstart_guidance}
-        
-        Generate a comprehensive kickstart plan including:
-        1. Overview: What this kickstart plan will accomplish
-        2. Sub-steps: Detailed breakdown of actions
-        3. Angel Actions: Specific actions Angel can perform for each sub-step
-        4. Timeline: Estimated timeline for completion
-        5. Resources: Required resources and tools
-        6. Success Metrics: How to measure progress
-        
-        For each sub-step, specify what Angel can do:
-        - Draft documents
-        - Research requirements
-        - Create templates
-        - Connect with providers
-        - Analyze options
-        
-        Format as structured plan with clear action items.
-        """
-        
-        from openai import AsyncOpenAI
-        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
-        response = await client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": kickstart_prompt}],
-            temperature=0.3,
-            max_tokens=2000
-        )
-        
-        kickstart_plan = response.choices[0].message.content
+        # Reuse guidance, providers and plan prefetched while the previous task was shown
+        kickstart = await task_prefetcher.get_kickstart_bundle(session_id, user_id, task_id, session_data)
+        providers = kickstart["providers"]
+        kickstart_guidance = kickstart["agent_guidance"]
+        kickstart_plan = kickstart["plan"]
         
         return {
             "success": True,
@@ -531,7 +504,7 @@ async def get_implementation_service_providers(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get service providers: {str(e)}")
 
-@router.post("/sessions/{session_id}/implementation/tasks/{task_id}/complete")
+@router.post("/sessions/{session_id}/implementation/tasks/{task_id}/complete", dependencies=[Depends(admit_interactive)])
 async def complete_implementation_task(
     session_id: str,
     task_id: str,
@@ -615,6 +588,14 @@ async def upload_implementation_document(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload document: {str(e)}")
 
+@router.get("/prefetch-stats")
+async def get_prefetch_stats(request: Request):
+    """Get hit/waste metrics for implementation task prefetching"""
+    return {
+        "success": True,
+        "result": task_prefetcher.get_stats()
+    }
+
 @router.get("/sessions/{session_id}/implementation/progress")
 async def get_implementation_progress(session_id: str, request: Request):
     """Get implementation progress for a session"""
@@ -622,15 +603,18 @@ async def get_implementation_progress(session_id: str, request: Request):
     user_id = request.state.user["id"]
     
     try:
-        # Get progress data (you'll need to implement this based on your session service)
+        record = await get_session_progress(session_id, user_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        
+        progress = implementation_progress(record)
         progress_data = {
-            "completed_tasks": 5,
-            "total_tasks": 25,
-            "percent_complete": 20,
-            "phases_completed": 1,
-            "current_phase": "legal_formation",
-            "next_task": "business_registration",
-            "estimated_completion": "8-12 weeks"
+            "completed_tasks": progress["completed"],
+            "total_tasks": progress["total"],
+            "percent_complete": progress["percent"],
+            "phases_completed": progress["phases_completed"],
+            "current_phase": progress["current_phase"],
+            "next_task": progress["next_task"]
         }
         
         return {
@@ -639,5 +623,7 @@ async def get_implementation_progress(session_id: str, request: Request):
             "progress": progress_data
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get implementation progress: {str(e)}")
\ No newline at end of file
@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
 from services.provider_service import get_provider_recommendations, generate_provider_table
 from middlewares.auth import verify_auth_token
+from middlewares.admission import admit_background
 import json
 
 router = APIRouter()
 
-@router.get("/sessions/{session_id}/providers/{task_id}")
+@router.get("/sessions/{session_id}/providers/{task_id}", dependencies=[Depends(admit_background)])
 async def get_providers_for_task(
     session_id: str,
     task_id: str,
@@ -37,7 +38,7 @@ async def get_providers_for_task(
         print(f"Error getting providers: {e}")
         raise HTTPException(status_code=500, detail="Failed to get provider recommendations")
 
-@router.post("/sessions/{session_id}/providers/generate")
+@router.post("/sessions/{session_id}/providers/generate", dependencies=[Depends(admit_background)])
 async def generate_custom_provider_table(
     session_id: str,
     request: Request,
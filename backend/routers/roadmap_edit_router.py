@@ -1,17 +1,19 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
-from typing import Dict
-from datetime import datetime
-from services.angel_service import client, ANGEL_SYSTEM_PROMPT
+from typing import Dict, Optional
 from services.session_service import get_session
 from services.chat_service import save_chat_message
+from services.roadmap_store import roadmap_store, RoadmapNotFound, RoadmapVersionConflict
+from services.roadmap_section_service import regenerate_sections, regenerate_section_body, build_context_digest
 from middlewares.auth import verify_auth_token
+from middlewares.admission import admit_background
+from utils.responses import artifact_response
 
 router = APIRouter(
     tags=["Roadmap Edit"],
     dependencies=[Depends(verify_auth_token)]
 )
 
-@router.post("/sessions/{session_id}/regenerate-roadmap-section")
+@router.post("/sessions/{session_id}/regenerate-roadmap-section", dependencies=[Depends(admit_background)])
 async def regenerate_roadmap_section(session_id: str, request: Request, payload: Dict):
     """Regenerate a specific section of the roadmap"""
     
@@ -21,62 +23,110 @@ async def regenerate_roadmap_section(session_id: str, request: Request, payload:
     section_id = payload.get("section_id")
     section_title = payload.get("section_title")
     current_content = payload.get("current_content")
+    instructions = payload.get("instructions")
     
-    if not all([section_id, section_title, current_content]):
+    if not section_id:
         raise HTTPException(status_code=400, detail="Missing required fields")
     
     try:
-        # Generate regeneration prompt
-        regeneration_prompt = f"""
-        Regenerate the roadmap section: "{section_title}"
-        
-        Current content:
-        {current_content}
-        
-        Business context:
-        - Business Name: {session.get('business_name', 'Your Business')}
-        - Industry: {session.get('industry', 'general business')}
-        - Location: {session.get('location', 'United States')}
-        - Business Type: {session.get('business_type', 'startup')}
-        
-        Please regenerate this section with:
-        1. More detailed and actionable steps
-        2. Specific timelines and deadlines
-        3. Clear task ownership (Angel vs User)
-        4. Industry-specific considerations
-        5. Local resources and requirements
-        6. Success metrics and milestones
-        
-        Make it comprehensive, actionable, and tailored to their specific business context.
-        """
-        
-        response = await client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": ANGEL_SYSTEM_PROMPT},
-                {"role": "user", "content": regeneration_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=2000
-        )
-        
-        regenerated_content = response.choices[0].message.content
-        
-        # Save regeneration message to chat
-        regeneration_message = f"🔄 **Section Regenerated: {section_title}**\n\n{regenerated_content}"
-        await save_chat_message(session_id, "assistant", regeneration_message)
+        try:
+            result = await regenerate_sections(session, user_id, [section_id], instructions)
+        except RoadmapNotFound:
+            if section_title and await roadmap_store.get_current(session_id):
+                # Clients that only know the heading
+                result = await regenerate_sections(session, user_id, [section_title], instructions)
+            elif section_title and current_content:
+                # Roadmaps from before the roadmap store: regenerate the client's copy without saving it
+                regenerated_content = await regenerate_section_body(
+                    section_title, current_content, build_context_digest(session, [], section_id), instructions
+                )
+                return {
+                    "success": True,
+                    "regenerated_content": regenerated_content,
+                    "section_id": section_id,
+                    "section_title": section_title
+                }
+            else:
+                raise
+        
+        if not result["sections"]:
+            raise HTTPException(status_code=502, detail=f"Failed to regenerate section: {result['failed']}")
+        section = result["sections"][0]
+        
+        # The section is spliced into the stored roadmap; the chat only notes the change
+        regeneration_message = f"🔄 **Section Regenerated: {section['title']}**\n\nYour roadmap has been updated (version {result['version']})."
+        await save_chat_message(session_id, user_id, "assistant", regeneration_message)
         
         return {
             "success": True,
-            "regenerated_content": regenerated_content,
-            "section_id": section_id,
-            "section_title": section_title
+            "regenerated_content": section["content"],
+            "section_id": section["id"],
+            "section_title": section["title"],
+            "section": section,
+            "version": result["version"]
         }
         
+    except HTTPException:
+        raise
+    except RoadmapNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RoadmapVersionConflict:
+        raise HTTPException(status_code=409, detail="The roadmap was changed by another request - reload and try again")
     except Exception as e:
         print(f"Error regenerating roadmap section: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to regenerate section: {str(e)}")
 
+@router.post("/sessions/{session_id}/regenerate-roadmap-sections", dependencies=[Depends(admit_background)])
+async def regenerate_roadmap_sections(session_id: str, request: Request, payload: Dict):
+    """Regenerate several roadmap sections concurrently and save them as one version"""
+    
+    user_id = request.state.user["id"]
+    session = await get_session(session_id, user_id)
+    
+    section_ids = payload.get("section_ids") or []
+    if not isinstance(section_ids, list) or not section_ids:
+        raise HTTPException(status_code=400, detail="Missing section_ids")
+    
+    try:
+        result = await regenerate_sections(session, user_id, section_ids, payload.get("instructions"))
+        
+        if result["sections"]:
+            titles = ", ".join(section["title"] for section in result["sections"])
+            regeneration_message = f"🔄 **Sections Regenerated: {titles}**\n\nYour roadmap has been updated (version {result['version']})."
+            await save_chat_message(session_id, user_id, "assistant", regeneration_message)
+        
+        return {
+            "success": bool(result["sections"]),
+            "version": result["version"],
+            "sections": result["sections"],
+            "failed": result["failed"]
+        }
+        
+    except RoadmapNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RoadmapVersionConflict:
+        raise HTTPException(status_code=409, detail="The roadmap was changed by another request - reload and try again")
+    except Exception as e:
+        print(f"Error regenerating roadmap sections: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to regenerate sections: {str(e)}")
+
+@router.get("/sessions/{session_id}/roadmap")
+async def get_roadmap(session_id: str, request: Request, known: Optional[str] = None):
+    """Get the current roadmap; sections whose hash is in `known` (comma-separated) are sent without content"""
+    
+    user_id = request.state.user["id"]
+    await get_session(session_id, user_id)
+    
+    roadmap = await roadmap_store.get_current(session_id)
+    if not roadmap:
+        raise HTTPException(status_code=404, detail="Roadmap not found")
+    
+    known_hashes = [value for value in (known or "").split(",") if value]
+    return artifact_response(request, {
+        "success": True,
+        "result": roadmap_store.for_client(roadmap, known_hashes)
+    })
+
 @router.post("/sessions/{session_id}/update-roadmap")
 async def update_roadmap(session_id: str, request: Request, payload: Dict):
     """Update the entire roadmap with edited content"""
@@ -90,12 +140,12 @@ async def update_roadmap(session_id: str, request: Request, payload: Dict):
         raise HTTPException(status_code=400, detail="Missing updated content")
     
     try:
-        # Save updated roadmap as a chat message instead of trying to update non-existent columns
+        roadmap = await roadmap_store.save(session_id, user_id, updated_content, reason="edit")
+        
+        # The roadmap itself lives in the roadmap store; the chat only notes the change
         update_message = f"""📝 **Roadmap Updated** 📝
 
-Your roadmap has been successfully updated with your customizations. Here's your modified roadmap:
-
-{updated_content}
+Your roadmap has been successfully updated with your customizations (version {roadmap["version"]}).
 
 ---
 **Note**: Your changes have been saved and will be reflected in your implementation phase."""
@@ -105,9 +155,12 @@ Your roadmap has been successfully updated with your customizations. Here's your
         return {
             "success": True,
             "message": "Roadmap updated successfully",
-            "updated_content": updated_content
+            "updated_content": updated_content,
+            "version": roadmap["version"]
         }
         
+    except RoadmapVersionConflict:
+        raise HTTPException(status_code=409, detail="The roadmap was changed by another request - reload and try again")
     except Exception as e:
         print(f"Error updating roadmap: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to update roadmap: {str(e)}")
@@ -120,15 +173,14 @@ async def get_roadmap_history(session_id: str, request: Request):
     session = await get_session(session_id, user_id)
     
     try:
-        # Get roadmap history from session
-        roadmap_history = session.get("roadmap_history", [])
+        history = await roadmap_store.get_history(session_id)
         
         return {
             "success": True,
-            "history": roadmap_history,
-            "current_version": session.get("roadmap_content", ""),
-            "last_modified": session.get("roadmap_last_modified"),
-            "is_modified": session.get("roadmap_modified", False)
+            "history": history["versions"],
+            "current_version": history["current_version"],
+            "last_modified": history.get("last_modified"),
+            "is_modified": len(history["versions"]) > 1
         }
         
     except Exception as e:
@@ -142,43 +194,31 @@ async def revert_roadmap(session_id: str, request: Request, payload: Dict):
     user_id = request.state.user["id"]
     session = await get_session(session_id, user_id)
     
-    version_id = payload.get("version_id")
+    version = payload.get("version", payload.get("version_id"))
     
-    if not version_id:
+    try:
+        version = int(version)
+    except (TypeError, ValueError):
         raise HTTPException(status_code=400, detail="Missing version ID")
     
     try:
-        # Get roadmap history
-        roadmap_history = session.get("roadmap_history", [])
-        
-        # Find the version to revert to
-        target_version = None
-        for version in roadmap_history:
-            if version.get("id") == version_id:
-                target_version = version
-                break
-        
-        if not target_version:
-            raise HTTPException(status_code=404, detail="Version not found")
-        
-        # Revert to the target version
-        from services.session_service import patch_session
-        await patch_session(session_id, {
-            "roadmap_content": target_version["content"],
-            "roadmap_modified": True,
-            "roadmap_last_modified": datetime.now().isoformat()
-        })
+        roadmap = await roadmap_store.revert(session_id, user_id, version)
         
         # Save revert message to chat
-        revert_message = f"↩️ **Roadmap Reverted**\n\nYour roadmap has been reverted to version from {target_version.get('timestamp', 'unknown date')}."
-        await save_chat_message(session_id, "assistant", revert_message)
+        revert_message = f"↩️ **Roadmap Reverted**\n\nYour roadmap has been reverted to version {version}."
+        await save_chat_message(session_id, user_id, "assistant", revert_message)
         
         return {
             "success": True,
             "message": "Roadmap reverted successfully",
-            "reverted_content": target_version["content"]
+            "reverted_content": roadmap["content"],
+            "version": roadmap["version"]
         }
         
+    except RoadmapNotFound:
+        raise HTTPException(status_code=404, detail="Version not found")
+    except RoadmapVersionConflict:
+        raise HTTPException(status_code=409, detail="The roadmap was changed by another request - reload and try again")
     except Exception as e:
         print(f"Error reverting roadmap: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to revert roadmap: {str(e)}")
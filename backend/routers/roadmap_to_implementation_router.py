@@ -6,12 +6,14 @@ from services.roadmap_to_implementation_service import (
     get_service_provider_preview,
     generate_implementation_insights
 )
+from services.roadmap_store import roadmap_store
 from middlewares.auth import verify_auth_token
+from middlewares.admission import admit_background
 import json
 
 router = APIRouter()
 
-@router.post("/sessions/{session_id}/roadmap-to-implementation-transition")
+@router.post("/sessions/{session_id}/roadmap-to-implementation-transition", dependencies=[Depends(admit_background)])
 async def create_roadmap_to_implementation_transition(
     session_id: str,
     request: Request,
@@ -30,8 +32,11 @@ async def create_roadmap_to_implementation_transition(
             "business_type": body.get("business_type", "startup")
         }
         
-        # Get roadmap content (this would typically come from your roadmap storage)
-        roadmap_content = body.get("roadmap_content", "Roadmap content not available")
+        # Get roadmap content from the request, or the session's stored roadmap
+        roadmap_content = body.get("roadmap_content")
+        if not roadmap_content:
+            roadmap = await roadmap_store.get_current(session_id, request.state.user["id"])
+            roadmap_content = roadmap["content"] if roadmap else "Roadmap content not available"
         
         # Prepare the transition
         transition_data = await prepare_implementation_transition(session_data, roadmap_content)
@@ -56,7 +61,7 @@ async def create_roadmap_to_implementation_transition(
         print(f"Error in roadmap to implementation transition: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/sessions/{session_id}/service-provider-preview")
+@router.get("/sessions/{session_id}/service-provider-preview", dependencies=[Depends(admit_background)])
 async def get_service_provider_preview_endpoint(
     session_id: str,
     current_user: dict = Depends(verify_auth_token)
@@ -83,7 +88,7 @@ async def get_service_provider_preview_endpoint(
         print(f"Error getting service provider preview: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/sessions/{session_id}/implementation-insights")
+@router.get("/sessions/{session_id}/implementation-insights", dependencies=[Depends(admit_background)])
 async def get_implementation_insights_endpoint(
     session_id: str,
     current_user: dict = Depends(verify_auth_token)
@@ -135,7 +140,7 @@ async def get_motivational_quote_endpoint(
         print(f"Error getting motivational quote: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/sessions/{session_id}/start-implementation")
+@router.post("/sessions/{session_id}/start-implementation", dependencies=[Depends(admit_background)])
 async def start_implementation_phase(
     session_id: str,
     request: Request,
@@ -0,0 +1,159 @@
+import asyncio
+from typing import Optional, Set, Tuple
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+from fastapi.encoders import jsonable_encoder
+from db.supabase import supabase
+from schemas.angel_schemas import ChatRequestSchema
+from services.session_service import get_session
+from services.chat_service import fetch_messages_since
+from services.chat_turn_guard import chat_turn_guard, ChatTurnBusy
+from services.session_channel import session_channels, ChannelSubscriber
+from middlewares.auth import verify_auth_token
+from routers.angel_router import process_chat_turn
+from utils.llm_scheduler import llm_scheduler, bind_llm_context, LLMOverloaded, INTERACTIVE
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Close codes in the 4000 range mirror the HTTP status the REST endpoints would return
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+# Browsers cannot set headers on a WebSocket; they send the token as `new WebSocket(url, ["bearer", token])`
+BEARER_PROTOCOL = "bearer"
+
+# No router-level auth dependency: HTTPBearer cannot read a WebSocket handshake, so the socket authenticates itself
+router = APIRouter(tags=["Angel"])
+
+
+def _handshake_token(websocket: WebSocket) -> Tuple[Optional[str], Optional[str]]:
+    """(token, subprotocol to echo on accept) from the Authorization header or the bearer subprotocol
+
+    Never from the query string: URLs end up in access logs.
+    """
+
+    authorization = websocket.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        return authorization[7:].strip(), None
+    protocols = [protocol.strip() for protocol in websocket.headers.get("sec-websocket-protocol", "").split(",")]
+    if len(protocols) == 2 and protocols[0] == BEARER_PROTOCOL and protocols[1]:
+        return protocols[1], BEARER_PROTOCOL
+    return None, None
+
+
+async def _authenticate(token: Optional[str], websocket: WebSocket) -> Optional[dict]:
+    if not token:
+        return None
+    try:
+        user_response = await asyncio.to_thread(supabase.auth.get_user, token)
+    except Exception as e:
+        logger.warning("WebSocket token verification failed: %s", e, extra={"path": websocket.url.path})
+        return None
+    if not user_response or not user_response.user:
+        return None
+    return {"id": user_response.user.id, "email": user_response.user.email}
+
+
+async def _forward(websocket: WebSocket, subscriber: ChannelSubscriber):
+    """Drain the connection's queue onto the socket"""
+
+    while True:
+        message = await subscriber.queue.get()
+        await websocket.send_json(jsonable_encoder(message))
+
+
+async def _run_chat_turn(websocket: WebSocket, subscriber: ChannelSubscriber, content: str, idempotency_key: Optional[str]):
+    """A chat message sent over the socket: same guard and admission as POST /sessions/{id}/chat"""
+
+    session_id, user_id = subscriber.session_id, subscriber.user_id
+    try:
+        bind_llm_context(INTERACTIVE, user_id)
+        llm_scheduler.check_admission(INTERACTIVE)
+        result = await chat_turn_guard.run(
+            user_id,
+            session_id,
+            content,
+            idempotency_key,
+            lambda: process_chat_turn(session_id, websocket, ChatRequestSchema(content=content))
+        )
+        session_channels.publish(session_id, "turn_completed", {"idempotency_key": idempotency_key, "response": result})
+    except ChatTurnBusy:
+        session_channels.send(subscriber, "error", {
+            "idempotency_key": idempotency_key,
+            "status": 409,
+            "detail": "Another message for this session is still being processed",
+            "retry_after": 5
+        })
+    except LLMOverloaded as e:
+        session_channels.send(subscriber, "error", {
+            "idempotency_key": idempotency_key,
+            "status": 503,
+            "detail": str(e),
+            "retry_after": e.retry_after
+        })
+    except Exception as e:
+        logger.error("WebSocket chat turn failed: %s", e, extra={"session_id": session_id})
+        session_channels.send(subscriber, "error", {"idempotency_key": idempotency_key, "status": 500, "detail": "Chat turn failed"})
+
+
+@router.websocket("/sessions/{session_id}/ws")
+async def session_channel(websocket: WebSocket, session_id: str, since: Optional[str] = None):
+    """Persistent channel for one session
+
+    Pushes streamed reply tokens, saved messages, research started/finished and phase transitions, and
+    accepts chat messages, so clients no longer poll the history endpoints while a turn is running.
+    """
+
+    token, subprotocol = _handshake_token(websocket)
+    # Accept before any close: closing during the handshake turns into a plain HTTP 403 and the client
+    # never sees the 44xx code
+    await websocket.accept(subprotocol=subprotocol)
+    user = await _authenticate(token, websocket)
+    if user is None:
+        await websocket.close(code=CLOSE_UNAUTHORIZED)
+        return
+    try:
+        session = await get_session(session_id, user["id"])
+    except Exception:
+        await websocket.close(code=CLOSE_NOT_FOUND)
+        return
+
+    websocket.state.user = user
+    subscriber = session_channels.subscribe(session_id, user["id"])
+    sender = asyncio.create_task(_forward(websocket, subscriber))
+    # Turns keep running if the socket drops, so their writes still commit
+    turns: Set[asyncio.Task] = set()
+
+    try:
+        connected = {"phase": session.get("current_phase"), "asked_q": session.get("asked_q")}
+        if since:
+            # Catch up on messages saved while the client was disconnected
+            connected["missed_messages"] = await fetch_messages_since(session_id, since)
+        session_channels.send(subscriber, "connected", connected)
+
+        while True:
+            message = await websocket.receive_json()
+            kind = message.get("type") if isinstance(message, dict) else None
+            if kind == "ping":
+                session_channels.send(subscriber, "pong")
+            elif kind == "chat" and message.get("content"):
+                turn = asyncio.create_task(_run_chat_turn(
+                    websocket, subscriber, message["content"], message.get("idempotency_key")
+                ))
+                turns.add(turn)
+                turn.add_done_callback(turns.discard)
+            else:
+                session_channels.send(subscriber, "error", {"status": 400, "detail": f"Unsupported message type: {kind}"})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.warning("Session channel closed: %s", e, extra={"session_id": session_id})
+    finally:
+        session_channels.unsubscribe(subscriber)
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+
+
+@router.get("/session-channel-stats", dependencies=[Depends(verify_auth_token)])
+async def get_session_channel_stats():
+    """Open WebSocket connections and event counts on this worker"""
+    return {"success": True, "result": session_channels.get_stats()}
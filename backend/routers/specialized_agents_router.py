@@ -4,6 +4,7 @@ from services.specialized_agents_service import agents_manager, get_comprehensiv
 from services.rag_service import conduct_rag_research, validate_with_rag, generate_rag_insights, research_service_providers_rag
 from services.service_provider_tables_service import generate_provider_table, get_task_providers
 from middlewares.auth import verify_auth_token
+from middlewares.admission import admit_interactive, admit_background
 from schemas.angel_schemas import ChatRequestSchema
 import json
 
@@ -12,7 +13,7 @@ router = APIRouter(
     dependencies=[Depends(verify_auth_token)]
 )
 
-@router.post("/agent-guidance")
+@router.post("/agent-guidance", dependencies=[Depends(admit_interactive)])
 async def get_agent_guidance(
     request: Request,
     payload: Dict[str, Any]
@@ -43,7 +44,7 @@ async def get_agent_guidance(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get agent guidance: {str(e)}")
 
-@router.post("/provider-table")
+@router.post("/provider-table", dependencies=[Depends(admit_background)])
 async def get_provider_table(
     request: Request,
     payload: Dict[str, Any]
@@ -105,7 +106,7 @@ async def get_agents(request: Request):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get agent info: {str(e)}")
 
-@router.post("/rag-research")
+@router.post("/rag-research", dependencies=[Depends(admit_interactive)])
 async def conduct_rag_research_simple(
     request: Request,
     payload: Dict[str, Any]
@@ -130,7 +131,7 @@ async def conduct_rag_research_simple(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to conduct RAG research: {str(e)}")
 
-@router.post("/interactive-command")
+@router.post("/interactive-command", dependencies=[Depends(admit_interactive)])
 async def handle_interactive_command_simple(
     request: Request,
     payload: Dict[str, Any]
@@ -192,7 +193,7 @@ async def get_available_agents(session_id: str, request: Request):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get agent info: {str(e)}")
 
-@router.post("/sessions/{session_id}/rag-research")
+@router.post("/sessions/{session_id}/rag-research", dependencies=[Depends(admit_interactive)])
 async def conduct_rag_research_endpoint(
     session_id: str,
     request: Request,
@@ -219,7 +220,7 @@ async def conduct_rag_research_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to conduct RAG research: {str(e)}")
 
-@router.post("/sessions/{session_id}/rag-validation")
+@router.post("/sessions/{session_id}/rag-validation", dependencies=[Depends(admit_interactive)])
 async def validate_user_input_rag(
     session_id: str,
     request: Request,
@@ -246,7 +247,7 @@ async def validate_user_input_rag(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to validate input: {str(e)}")
 
-@router.post("/sessions/{session_id}/rag-insights")
+@router.post("/sessions/{session_id}/rag-insights", dependencies=[Depends(admit_interactive)])
 async def generate_educational_insights_rag(
     session_id: str,
     request: Request,
@@ -276,7 +277,7 @@ async def generate_educational_insights_rag(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate insights: {str(e)}")
 
-@router.post("/sessions/{session_id}/service-providers")
+@router.post("/sessions/{session_id}/service-providers", dependencies=[Depends(admit_background)])
 async def get_service_providers(
     session_id: str,
     request: Request,
@@ -303,7 +304,7 @@ async def get_service_providers(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get service providers: {str(e)}")
 
-@router.post("/sessions/{session_id}/provider-table")
+@router.post("/sessions/{session_id}/provider-table", dependencies=[Depends(admit_background)])
 async def generate_service_provider_table_endpoint(
     session_id: str,
     request: Request,
@@ -330,7 +331,7 @@ async def generate_service_provider_table_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate provider table: {str(e)}")
 
-@router.post("/sessions/{session_id}/task-providers")
+@router.post("/sessions/{session_id}/task-providers", dependencies=[Depends(admit_background)])
 async def get_task_specific_providers(
     session_id: str,
     request: Request,
@@ -358,7 +359,7 @@ async def get_task_specific_providers(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get task providers: {str(e)}")
 
-@router.post("/sessions/{session_id}/comprehensive-support")
+@router.post("/sessions/{session_id}/comprehensive-support", dependencies=[Depends(admit_interactive)])
 async def get_comprehensive_support(
     session_id: str,
     request: Request,
@@ -412,11 +413,13 @@ async def get_research_sources(session_id: str, request: Request):
     
     try:
         from services.rag_service import rag_engine
+        from services.retrieval_service import research_retriever
         
         research_sources = {
             "authoritative_sources": rag_engine.authoritative_sources,
             "total_categories": len(rag_engine.authoritative_sources),
-            "total_sources": sum(len(sources) for sources in rag_engine.authoritative_sources.values())
+            "total_sources": sum(len(sources) for sources in rag_engine.authoritative_sources.values()),
+            "retrieval_index": research_retriever.get_stats()
         }
         
         return {
@@ -427,7 +430,7 @@ async def get_research_sources(session_id: str, request: Request):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get research sources: {str(e)}")
 
-@router.post("/sessions/{session_id}/interactive-command")
+@router.post("/sessions/{session_id}/interactive-command", dependencies=[Depends(admit_interactive)])
 async def handle_interactive_command(
     session_id: str,
     request: Request,
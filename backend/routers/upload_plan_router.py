@@ -1,6 +1,7 @@
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
 from middlewares.auth import verify_auth_token
+from middlewares.admission import admit_background
 from services.upload_plan_service import process_uploaded_plan, extract_business_info_from_plan
 import os
 import uuid
@@ -8,7 +9,7 @@ import tempfile
 
 router = APIRouter()
 
-@router.post("/")
+@router.post("/", dependencies=[Depends(admit_background)])
 async def upload_business_plan(
     request: Request,
     file: UploadFile = File(...),
@@ -1,11 +1,20 @@
-from openai import AsyncOpenAI
+from utils.openai_client import get_openai_client
 import os
 import json
 import re
 from datetime import datetime
 from utils.constant import ANGEL_SYSTEM_PROMPT
-
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from utils.conversation_memory import conversation_memory
+from utils.logger import get_logger
+from utils.metrics import WEB_SEARCH_THROTTLED
+from utils.tracing import traced
+from services.session_channel import session_channels
+from utils.question_catalog import QUESTION_CATALOG, QUESTIONNAIRE_PHASES, allowed_question_tags
+
+logger = get_logger(__name__)
+client = get_openai_client()
+# KYC and business plan turns come back as JSON validated against the question catalog instead of free text with an inline tag
+STRUCTURED_QUESTION_TURNS = os.getenv("STRUCTURED_QUESTION_TURNS", "true").lower() == "true"
 # pkpalstan
 # Web search throttling
 web_search_count = 0
@@ -22,6 +31,7 @@ def should_conduct_web_search():
     
     # Allow maximum 2 web searches per 10 seconds for better performance
     if web_search_count >= 2:
+        WEB_SEARCH_THROTTLED.inc()
         return False
     
     web_search_count += 1
@@ -135,6 +145,7 @@ def is_moving_to_next_question(response_text: str) -> bool:
     # It's moving to next question if has transition AND question at end
     return has_transition and has_question_at_end
 
+@traced()
 async def should_show_accept_modify_buttons(ai_response: str, user_last_input: str = "", session_data: dict = None) -> dict:
     """Determine if Accept/Modify buttons should be shown"""
     user_input_lower = user_last_input.lower().strip()
@@ -219,24 +230,18 @@ async def should_show_accept_modify_buttons(ai_response: str, user_last_input: s
     else:
         reason = "Standard response"
     
-    print(f"🔍 Button Detection:")
-    print(f"  - User input: '{user_last_input[:50]}...'")
-    print(f"  - Is command request: {is_command_request}")
-    print(f"  - Is draft response: {is_draft_response}")
-    print(f"  - Is next question: {is_next_question}")
-    print(f"  - Is user answer (BP): {is_user_answer}")
-    print(f"  - Has acknowledgment: {has_acknowledgment}")
-    print(f"  - Has question tag: {has_question_tag}")
-    print(f"  - Has accept/modify tag: {has_accept_modify_tag}")
-    print(f"  - Is phase completion: {is_phase_completion}")
-    print(f"  - Reason: {reason}")
-    print(f"  - Should show buttons: {should_show}")
+    logger.debug(
+        "Button detection: show=%s reason=%s command=%s draft=%s answer=%s ack=%s tag=%s",
+        should_show, reason, is_command_request, is_draft_response, is_user_answer, has_acknowledgment, has_question_tag,
+        extra={"phase": session_data.get("current_phase") if session_data else None, "session_id": session_data.get("id") if session_data else None}
+    )
     
     return {
         "show_buttons": should_show,
         "content_length": len(ai_response)
     }
 
+@traced()
 async def conduct_web_search(query):
     """Conduct aggressive web search with citations from authoritative sources"""
     try:
@@ -245,6 +250,7 @@ async def conduct_web_search(query):
         # Limit query length reasonably
         if len(query) > 150:
             query = query[:150] + "..."
+        session_channels.emit("research_started", kind="web_search", query=query)
         
         # Enhanced search prompt with source citations
         search_prompt = f"""Search reputable websites including industry publications, government websites (.gov), 
@@ -272,20 +278,19 @@ Format your response with clear sections and citations."""
         # Extract search results from response
         search_results = response.choices[0].message.content
         print(f"✅ Web search completed for: {query[:50]}... (length: {len(search_results)} chars)")
+        session_channels.emit("research_finished", kind="web_search", query=query, success=True)
         return search_results
     
     except Exception as e:
         print(f"❌ Web search error: {e}")
+        session_channels.emit("research_finished", kind="web_search", query=query, success=False)
         return None
 
-def trim_conversation_history(history, max_messages=10):
-    """Trim conversation history to prevent context from growing too large"""
-    if len(history) <= max_messages:
-        return history
-    
-    # Keep the most recent messages
-    return history[-max_messages:]
+def trim_conversation_history(history, budget="chat", session_id=None):
+    """Fit conversation history into a token budget: recent turns verbatim, earlier answers summarized"""
+    return conversation_memory.build_messages(history, budget, session_id)
 
+@traced()
 def format_response_structure(reply):
     """Format AI responses to use proper structured format instead of paragraph form"""
     
@@ -374,6 +379,7 @@ def format_response_structure(reply):
     
     return formatted_reply
 
+@traced()
 def ensure_question_separation(reply, session_data=None):
     """Ensure questions are properly separated and not combined"""
     
@@ -392,6 +398,7 @@ def ensure_question_separation(reply, session_data=None):
     
     return reply
 
+@traced()
 def validate_business_plan_sequence(reply, session_data=None):
     """Ensure business plan questions follow proper sequence"""
     
@@ -402,38 +409,18 @@ def validate_business_plan_sequence(reply, session_data=None):
             current_q_num = int(tag_match.group(1))
             asked_q = session_data.get("asked_q", "BUSINESS_PLAN.01")
             
-            # Check if we're jumping ahead or backwards
+            # Runs before asked_q is updated: the reply may re-ask the question on screen or ask the next one
             if "BUSINESS_PLAN." in asked_q:
                 last_q_num = int(asked_q.split(".")[1])
                 
-                print(f"🔍 DEBUG - Question sequence check: last_q={last_q_num}, current_q={current_q_num}")
-                
-                # Handle jumping ahead (skipping questions)
-                if current_q_num > last_q_num + 1:
-                    print(f"⚠️ WARNING: Jumping ahead from question {last_q_num} to {current_q_num}")
-                    # Force back to next sequential question
-                    next_q = f"BUSINESS_PLAN.{last_q_num + 1:02d}"
-                    reply = re.sub(r'\[\[Q:BUSINESS_PLAN\.\d+\]\]', f'[[Q:{next_q}]]', reply)
-                    print(f"🔧 Corrected to: {next_q}")
+                logger.debug("Question sequence check: last_q=%s, current_q=%s", last_q_num, current_q_num)
                 
-                # Handle jumping backwards (going to previous questions)
-                elif current_q_num < last_q_num:
-                    print(f"⚠️ WARNING: Jumping backwards from question {last_q_num} to {current_q_num}")
-                    # Force to next sequential question (don't go backwards)
+                # Handle jumping ahead (skipping questions) or backwards (going to previous questions)
+                if current_q_num > last_q_num + 1 or current_q_num < last_q_num:
+                    # Force to next sequential question
                     next_q = f"BUSINESS_PLAN.{last_q_num + 1:02d}"
                     reply = re.sub(r'\[\[Q:BUSINESS_PLAN\.\d+\]\]', f'[[Q:{next_q}]]', reply)
-                    print(f"🔧 Corrected backwards jump to: {next_q}")
-                
-                # Log normal progression
-                elif current_q_num == last_q_num + 1:
-                    print(f"✅ Normal progression: {last_q_num} → {current_q_num}")
-                
-                # Same question number is VALID because session updates before validation
-                # This happens when: user answers Q35 → session updates to Q36 → AI generates Q36
-                # The validation sees Q36 == Q36, which is correct!
-                elif current_q_num == last_q_num:
-                    print(f"✅ Correct question sequence: {current_q_num} (session already updated)")
-                    # DO NOT force progression - this is correct behavior!
+                    logger.warning("Business plan reply jumped from question %s to %s - corrected to %s", last_q_num, current_q_num, next_q)
 
     return reply
 
@@ -473,6 +460,7 @@ def fix_verification_flow(reply, session_data=None):
     
     return reply
 
+@traced()
 def prevent_ai_molding(reply, session_data=None):
     """Prevent AI from molding user answers into mission, vision, USP without verification"""
     
@@ -505,6 +493,7 @@ def prevent_ai_molding(reply, session_data=None):
     
     return reply
 
+@traced()
 def suggest_draft_if_relevant(reply, session_data, user_input, history):
     """Suggest using Draft if user has already provided relevant information"""
     
@@ -572,6 +561,7 @@ def suggest_draft_if_relevant(reply, session_data, user_input, history):
     
     return reply
 
+@traced()
 def check_for_section_summary(current_tag, session_data, history):
     """Check if we need to provide a section summary based on the current question tag
     
@@ -603,7 +593,7 @@ def check_for_section_summary(current_tag, session_data, history):
     
     # Check if we're at a section boundary
     if question_num in section_boundaries:
-        print(f"✅ SECTION SUMMARY TRIGGERED: User just answered Q{question_num}, showing {get_section_name(question_num)} section summary")
+        logger.debug("Section summary due: user answered Q%s, showing the %s section summary", question_num, get_section_name(question_num))
         return {
             "trigger_question": question_num,
             "summary_type": section_boundaries[question_num],
@@ -627,6 +617,7 @@ def get_section_name(question_num):
     }
     return section_names.get(question_num, "Unknown Section")
 
+@traced()
 def add_critiquing_insights(reply, session_data=None, user_input=None):
     """Add critiquing insights and coaching based on user's business field (50/50 approach)"""
     
@@ -726,6 +717,7 @@ def identify_support_areas(session_data, history):
     
     return support_areas
 
+@traced()
 def add_proactive_support_guidance(reply, session_data, history):
     """Add proactive support guidance based on identified areas needing help"""
     
@@ -770,6 +762,7 @@ def add_proactive_support_guidance(reply, session_data, history):
     
     return reply
 
+@traced()
 def ensure_proper_question_formatting(reply, session_data=None):
     """Ensure questions are properly formatted with line breaks and structure"""
     
@@ -792,6 +785,7 @@ def ensure_proper_question_formatting(reply, session_data=None):
     
     return reply
 
+@traced()
 def inject_missing_tag(reply, session_data=None):
     """Inject a tag if the AI forgot to include one"""
     # Check if reply already has a tag
@@ -849,6 +843,7 @@ def inject_missing_tag(reply, session_data=None):
     
     return reply
 
+@traced()
 async def handle_kyc_completion(session_data, history):
     """
     Handle the transition from KYC completion to Business Planning Exercise
@@ -972,6 +967,7 @@ async def generate_kyc_summary(session_data, history):
     
     return summary
 
+@traced()
 async def handle_business_plan_completion(session_data, history):
     """Handle the transition from Business Plan completion to Roadmap phase"""
     
@@ -1117,6 +1113,7 @@ def provide_critiquing_feedback(user_msg, session_data, history):
     
     return None
 
+@traced()
 def validate_question_answer(user_msg, session_data, history):
     """
     Enhanced validation with critiquing behaviors - challenge superficial answers
@@ -1294,6 +1291,7 @@ Please provide a more detailed response to continue.""",
     
     return None
 
+@traced()
 def validate_session_state(session_data, history):
     """Validate session state integrity to prevent question skipping"""
     if not session_data:
@@ -1372,6 +1370,259 @@ Let's continue with the current business planning question.""",
     
     return None
 
+QUESTION_TURN_FIELDS = ("acknowledgment", "question_tag", "question_text", "show_buttons", "section_complete")
+JSON_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def uses_structured_question_turn(session_data):
+    """KYC and business plan turns whose current question is in the catalog are asked as structured output"""
+
+    if not STRUCTURED_QUESTION_TURNS or not session_data:
+        return False
+    asked_q = session_data.get("asked_q") or ""
+    return session_data.get("current_phase") in QUESTIONNAIRE_PHASES and asked_q in QUESTION_CATALOG and asked_q.startswith(session_data["current_phase"] + ".")
+
+
+def question_turn_format(allowed_tags):
+    """Strict JSON schema for a question turn; question_tag can only name a tag this turn may end on"""
+
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "question_turn",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "acknowledgment": {"type": "string"},
+                    "question_tag": {"type": "string", "enum": allowed_tags},
+                    "question_text": {"type": "string"},
+                    "show_buttons": {"type": "boolean"},
+                    "section_complete": {"type": "boolean"}
+                },
+                "required": list(QUESTION_TURN_FIELDS),
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+def section_summary_instruction(section_name, structured=False):
+    """Instruction for the summary shown after the last question of a business plan section"""
+
+    if structured:
+        delivery = """Put the whole summary in acknowledgment, set section_complete to true, leave question_text empty
+and keep question_tag on the question the user just answered. The Accept/Modify buttons are shown for you."""
+        closing = ""
+    else:
+        delivery = """End your response with [[ACCEPT_MODIFY_BUTTONS]] to trigger the Accept/Modify buttons.
+Do NOT include any question tags like [[Q:BUSINESS_PLAN.XX]] in this response."""
+        closing = "\n\n[[ACCEPT_MODIFY_BUTTONS]]"
+
+    return f"""
+IMPORTANT: You have just completed {section_name} section. 
+You MUST provide a comprehensive section summary that includes:
+
+1. **Summary**: Recap the key information provided in this section
+2. **Educational Insights**: Provide valuable insights about this business area
+3. **Critical Considerations**: Highlight important watchouts and considerations for this business type
+4. **Verification Request**: Ask user to verify the information before proceeding
+
+Use this EXACT format:
+"🎯 **{section_name} Section Complete**
+
+**Summary of Your Information:**
+[Recap key points from this section]
+
+**Educational Insights:**
+[Provide valuable business insights related to this section]
+
+**Critical Considerations:**
+[Highlight important watchouts and things to consider]
+
+**Ready to Continue?**
+Please confirm that this information is accurate before we move to the next section. You can either accept this summary and continue, or let me know what you'd like to modify.{closing}"
+
+CRITICAL: 
+- {delivery}
+- Do NOT ask the next question immediately
+"""
+
+
+def question_turn_instruction(asked_q, allowed_tags, section_summary_info=None):
+    """How the model fills in each field of the question turn"""
+
+    choices = "\n".join(f"- {tag}: {QUESTION_CATALOG[tag]}" for tag in allowed_tags)
+    instruction = f"""
+RESPONSE FORMAT - reply with the question_turn JSON object only:
+- acknowledgment: your response to the user's message (acknowledgment, coaching, answers to their questions), without the next question
+- question_tag: the question this turn ends on, one of:
+{choices}
+  Use {asked_q} while the user still needs to answer, clarify or confirm it; move to the next tag only once it is answered.
+- question_text: the question to ask for question_tag, worded naturally, or "" when you are only acknowledging an answer to {asked_q}. Never include tags, question numbers or option lists.
+- show_buttons: true when you restate or draft the user's answer to {asked_q} and need them to Accept or Modify it before moving on
+- section_complete: false unless told below that a section summary is due
+"""
+    if section_summary_info:
+        instruction += section_summary_instruction(section_summary_info["section_name"], structured=True)
+    return instruction
+
+
+def parse_question_turn(content, asked_q, allowed_tags, section_due=False):
+    """Validate a structured turn against the catalog; None when it cannot be used"""
+
+    try:
+        turn = json.loads(content or "")
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(turn, dict) or turn.get("question_tag") not in allowed_tags:
+        return None
+
+    def clean(value):
+        text = value if isinstance(value, str) else ""
+        return re.sub(r"\[\[(?:Q:[A-Z_]+\.\d+|ACCEPT_MODIFY_BUTTONS)\]\]", "", text).strip()
+
+    tag = turn["question_tag"]
+    acknowledgment = clean(turn.get("acknowledgment"))
+    text = clean(turn.get("question_text"))
+    section_complete = bool(turn.get("section_complete")) and section_due
+    if section_complete:
+        # The next section starts only after the user accepts the summary
+        tag, text = asked_q, ""
+    elif tag != asked_q and not text:
+        text = QUESTION_CATALOG[tag]
+    if not acknowledgment and not text:
+        return None
+
+    return {
+        "acknowledgment": acknowledgment,
+        "question_tag": tag,
+        "question_text": text,
+        # Accept/Modify confirms an answer to the question on screen, and only the business plan records drafts
+        "show_buttons": section_complete or (bool(turn.get("show_buttons")) and tag == asked_q and asked_q.startswith("BUSINESS_PLAN.")),
+        "section_complete": section_complete
+    }
+
+
+def render_question_turn(turn):
+    """Reply text for a turn: the acknowledgment, then the tagged question when one is asked"""
+
+    parts = [turn["acknowledgment"]] if turn["acknowledgment"] else []
+    if turn["question_text"]:
+        parts.append(f"[[Q:{turn['question_tag']}]] {turn['question_text']}")
+    return "\n\n".join(parts)
+
+
+class QuestionTurnStream:
+    """Forwards the prose of a streamed question turn to a token sink
+
+    The turn arrives as JSON. Clients watching the session should see the acknowledgment and
+    question as they are written, not the JSON around them, so only those two string values are
+    decoded and forwarded.
+    """
+
+    STREAMED_FIELDS = ("acknowledgment", "question_text")
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.in_string = False
+        self.in_key = False
+        self.expect_key = True
+        self.key = ""
+        self.field = None
+        # "" right after a backslash, then the collected "uXXXX" of a unicode escape
+        self.escape = None
+        self.high_surrogate = None
+        self.streamed = False
+        self.question_started = False
+
+    def _decode(self, char):
+        """Text for one character inside a string; "" while an escape is incomplete or when the string closes"""
+
+        if self.escape is None:
+            if char == "\\":
+                self.escape = ""
+                return ""
+            if char == '"':
+                self.in_string = False
+                return ""
+            return char
+        if not self.escape and char != "u":
+            self.escape = None
+            return JSON_ESCAPES.get(char, char)
+        self.escape += char
+        if len(self.escape) < 5:
+            return ""
+        code, self.escape = int(self.escape[1:], 16), None
+        if 0xD800 <= code < 0xDC00:
+            self.high_surrogate = code
+            return ""
+        if 0xDC00 <= code < 0xE000 and self.high_surrogate is not None:
+            code = 0x10000 + ((self.high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+        self.high_surrogate = None
+        return chr(code)
+
+    async def feed(self, delta: str):
+        text = []
+        for char in delta:
+            if not self.in_string:
+                if char == '"':
+                    self.in_string, self.in_key = True, self.expect_key
+                    if self.in_key:
+                        self.key = ""
+                elif char in "{,":
+                    self.expect_key = True
+                elif char == ":":
+                    self.expect_key = False
+                continue
+
+            decoded = self._decode(char)
+            if not self.in_string and self.in_key:
+                self.field = self.key
+            if not decoded:
+                continue
+            if self.in_key:
+                self.key += decoded
+            elif self.field in self.STREAMED_FIELDS:
+                if self.field == "question_text" and not self.question_started:
+                    self.question_started = True
+                    if self.streamed:
+                        text.append("\n\n")
+                self.streamed = True
+                text.append(decoded)
+
+        if text:
+            await self.sink("".join(text))
+
+
+@traced()
+async def generate_question_turn(msgs, session_data, section_summary_info=None):
+    """Ask the questionnaire's next step as structured output; None falls back to a free-text reply"""
+
+    asked_q = session_data["asked_q"]
+    # A due section summary keeps the turn on the answered question until the user accepts it
+    allowed_tags = [asked_q] if section_summary_info else allowed_question_tags(asked_q)
+    sink = session_channels.token_sink()
+
+    response = await client.chat.completions.create(
+        model="gpt-4o",
+        messages=msgs + [{"role": "system", "content": question_turn_instruction(asked_q, allowed_tags, section_summary_info)}],
+        temperature=0.7,
+        max_tokens=1500 if section_summary_info else 1000,
+        response_format=question_turn_format(allowed_tags),
+        stream=False,
+        hedge=True,  # Race a backup when unusually slow (only when no WebSocket is streaming tokens)
+        on_delta=QuestionTurnStream(sink).feed if sink else None
+    )
+
+    message = response.choices[0].message
+    turn = parse_question_turn(message.content, asked_q, allowed_tags, section_due=bool(section_summary_info))
+    if turn is None:
+        logger.warning("Unusable structured question turn for %s: %.200s", asked_q, message.content or getattr(message, "refusal", None))
+    return turn
+
+
+@traced()
 async def get_angel_reply(user_msg, history, session_data=None):
     import time
     start_time = time.time()
@@ -1388,12 +1639,11 @@ async def get_angel_reply(user_msg, history, session_data=None):
     
     # Debug logging for session state
     if session_data:
-        print(f"🔍 DEBUG - Session State: phase={session_data.get('current_phase')}, asked_q={session_data.get('asked_q')}, answered_count={session_data.get('answered_count')}")
+        logger.debug("Session state: phase=%s, asked_q=%s, answered_count=%s", session_data.get('current_phase'), session_data.get('asked_q'), session_data.get('answered_count'))
     
     # Validate session state integrity
     session_validation = validate_session_state(session_data, history)
     if session_validation:
-        print(f"🔍 DEBUG - Session validation triggered: {session_validation.get('reply', '')[:100]}...")
         return session_validation
     
     # DISABLED: Critiquing feedback was too aggressive and causing false positives
@@ -1518,7 +1768,7 @@ Do NOT include question numbers, progress percentages, or step counts in your re
         user_msg["content"] = "hi"
 
     user_content = user_msg["content"].strip()
-    print(f"🚀 Starting Angel reply generation for: {user_content[:50]}...")
+    logger.debug("Starting Angel reply generation for: %.50s", user_content)
     
     # Check if user just answered the final KYC question BEFORE generating AI response
     if session_data and session_data.get("current_phase") == "KYC":
@@ -1531,7 +1781,7 @@ Do NOT include question numbers, progress percentages, or step counts in your re
                     not current_tag.endswith("_ACK") and
                     len(user_content.strip()) > 0):
                     
-                    print(f"🎯 User answered final KYC question ({question_num}) - triggering completion immediately BEFORE AI response")
+                    logger.info("User answered final KYC question (%s) - triggering completion before the AI response", question_num)
                     # Trigger completion immediately after acknowledgment
                     return await handle_kyc_completion(session_data, history)
             except (ValueError, IndexError):
@@ -1548,7 +1798,7 @@ Do NOT include question numbers, progress percentages, or step counts in your re
                     not current_tag.endswith("_ACK") and
                     len(user_content.strip()) > 0):
                     
-                    print(f"🎯 User answered final Business Plan question ({question_num}) - triggering roadmap transition immediately")
+                    logger.info("User answered final Business Plan question (%s) - triggering roadmap transition", question_num)
                     # Trigger roadmap transition immediately
                     return await handle_business_plan_completion(session_data, history)
             except (ValueError, IndexError):
@@ -1568,7 +1818,7 @@ Do NOT include question numbers, progress percentages, or step counts in your re
     if "WEBSEARCH_QUERY:" in user_content:
         needs_web_search = True
         web_search_query = user_content.split("WEBSEARCH_QUERY:")[1].strip()
-        print(f"🔍 Web search triggered by scrapping command: {web_search_query}")
+        logger.debug("Web search triggered by scrapping command: %s", web_search_query)
     
     elif session_data and session_data.get("current_phase") == "BUSINESS_PLAN":
         # Look for competitive analysis, market research, or vendor recommendation needs
@@ -1626,7 +1876,7 @@ Do NOT include question numbers, progress percentages, or step counts in your re
                 search_start = time.time()
                 search_results = await conduct_web_search(web_search_query)
                 search_time = time.time() - search_start
-                print(f"🔍 Web search completed in {search_time:.2f} seconds")
+                logger.debug("Web search completed in %.2f seconds", search_time)
                 
                 if search_results and "unable to conduct web research" not in search_results:
                     search_results = f"\n\nResearch Results:\n{search_results}"
@@ -1635,7 +1885,7 @@ Do NOT include question numbers, progress percentages, or step counts in your re
             search_start = time.time()
             search_results = await conduct_web_search(web_search_query)
             search_time = time.time() - search_start
-            print(f"🔍 Web search completed in {search_time:.2f} seconds")
+            logger.debug("Web search completed in %.2f seconds", search_time)
             
             if search_results and "unable to conduct web research" not in search_results:
                 search_results = f"\n\nResearch Results:\n{search_results}"
@@ -1654,14 +1904,14 @@ Do NOT include question numbers, progress percentages, or step counts in your re
     
     # Handle Accept command - treat as a regular answer to move to next question
     if is_accept_command and session_data and session_data.get("current_phase") == "BUSINESS_PLAN":
-        print(f"✅ Accept command detected - treating as answer to move to next question")
+        logger.debug("Accept command detected - treating as answer to move to next question")
         # Let it pass through to normal AI processing which will move to the next question
         # Don't bypass AI generation - we want to get the next question
         pass
     
     # For commands, bypass AI generation and provide direct responses
     elif is_command_response and session_data and session_data.get("current_phase") == "BUSINESS_PLAN":
-        print(f"🔧 Command detected: {user_content.lower()} - bypassing AI generation to prevent question skipping")
+        logger.debug("Command detected: %s - bypassing AI generation to prevent question skipping", user_content.lower())
         
         # Generate direct command response without AI
         if user_content.lower() == "draft":
@@ -1696,12 +1946,16 @@ Do NOT include question numbers, progress percentages, or step counts in your re
             "show_accept_modify": True  # Always show buttons for Draft/Support/Scrapping
         }
     
+    # Questionnaire turns carry their tag in a JSON field, so the inline tag rules only apply to free text
+    structured_turn = uses_structured_question_turn(session_data)
+    
     # Build messages for OpenAI - optimized for speed
     msgs = [
         {"role": "system", "content": ANGEL_SYSTEM_PROMPT},
-        {"role": "system", "content": TAG_PROMPT},
         {"role": "system", "content": FORMATTING_INSTRUCTION}
     ]
+    if not structured_turn:
+        msgs.insert(1, {"role": "system", "content": TAG_PROMPT})
     
     # Only add web search prompt if web search was conducted
     if search_results:
@@ -1741,6 +1995,7 @@ Do NOT include question numbers, progress percentages, or step counts in your re
             except (ValueError, IndexError):
                 pass
         
+        tag_rule = "Put the question's tag in question_tag, never in the text" if structured_turn else f"Use the proper tag format: [[Q:{current_phase}.{next_question_num}]]"
         session_context = f"""
 CURRENT SESSION STATE:
 - Current Phase: {current_phase}
@@ -1753,7 +2008,7 @@ CRITICAL INSTRUCTIONS:
 2. Do NOT restart the phase or go back to earlier questions
 3. The next question should be {current_phase}.{next_question_num}
 4. Only ask ONE question at a time
-5. Use the proper tag format: [[Q:{current_phase}.{next_question_num}]]
+5. {tag_rule}
 6. NEVER include "Question X" text in your response - the UI displays it automatically
 7. Do NOT ask about business plan drafting or other phases - stay in {current_phase} phase
 8. Continue with the next sequential question in the {current_phase} phase
@@ -1768,22 +2023,71 @@ CRITICAL INSTRUCTIONS:
         msgs.append({"role": "system", "content": session_context})
     
     # Add conversation history (trimmed for performance) and current message
-    trimmed_history = trim_conversation_history(history, max_messages=10)
+    trimmed_history = trim_conversation_history(history, session_id=session_data.get("id") if session_data else None)
     msgs.extend(trimmed_history)
     msgs.append({"role": "user", "content": user_content})
 
-    response = await client.chat.completions.create(
-        model="gpt-4o",
-        messages=msgs,
-        temperature=0.7,
-        max_tokens=1000,  # Limit response length for faster processing
-        stream=False  # Ensure non-streaming for consistent response times
-    )
-
-    reply_content = response.choices[0].message.content
+    # Check if we need to provide a section summary BEFORE updating asked_q
+    # (Check based on the PREVIOUS question that was just answered, not the next question)
+    current_tag_before_update = session_data.get("asked_q") if session_data else None
+    section_summary_info = None
+    
+    # Only show section summary if user just answered a section-ending question
+    # Don't show if user clicked Accept (they want to proceed from summary)
+    if not is_accept_command and not is_command_response:
+        section_summary_info = check_for_section_summary(current_tag_before_update, session_data, history)
     
-    # Clean up extra newlines (keep "Question X of 46" format for Business Plan)
-    reply_content = re.sub(r'\n{3,}', '\n\n', reply_content)  # Clean up 3+ newlines to 2
+    # Questionnaire turns: one structured call returns the reply, its tag and the summary when one is due
+    question_turn = await generate_question_turn(msgs, session_data, section_summary_info) if structured_turn else None
+    
+    if question_turn:
+        reply_content = render_question_turn(question_turn)
+        summary_shown = question_turn["section_complete"]
+    else:
+        if structured_turn:
+            msgs.insert(1, {"role": "system", "content": TAG_PROMPT})
+        if section_summary_info:
+            msgs.append({"role": "system", "content": section_summary_instruction(section_summary_info["section_name"])})
+        
+        response = await client.chat.completions.create(
+            model="gpt-4o",
+            messages=msgs,
+            temperature=0.7,
+            max_tokens=1500 if section_summary_info else 1000,  # Limit response length for faster processing
+            stream=False,  # Ensure non-streaming for consistent response times
+            # Main interactive completion: race a backup when this one is unusually slow. Not after an
+            # unusable structured turn, so that case costs exactly one more request
+            hedge=not structured_turn,
+            on_delta=session_channels.token_sink()  # Stream raw tokens when a WebSocket is watching the session
+        )
+        
+        reply_content = response.choices[0].message.content
+        
+        # Clean up extra newlines (keep "Question X of 46" format for Business Plan)
+        reply_content = re.sub(r'\n{3,}', '\n\n', reply_content)  # Clean up 3+ newlines to 2
+        
+        # Free text carries its tag inline; inject it when the AI forgot one
+        if not section_summary_info:
+            reply_content = inject_missing_tag(reply_content, session_data)
+        
+        # Check if AI response contains WEBSEARCH_QUERY (from scrapping command)
+        if "WEBSEARCH_QUERY:" in reply_content:
+            needs_web_search = True
+            web_search_query = reply_content.split("WEBSEARCH_QUERY:")[1].strip()
+            logger.debug("Web search triggered by AI response: %s", web_search_query)
+            # Remove the WEBSEARCH_QUERY from the response
+            reply_content = reply_content.split("WEBSEARCH_QUERY:")[0].strip()
+        
+        # Format response structure to use proper list format instead of paragraph
+        reply_content = format_response_structure(reply_content)
+        
+        # Ensure questions are properly separated
+        reply_content = ensure_question_separation(reply_content, session_data)
+        
+        summary_shown = section_summary_info is not None
+        if summary_shown:
+            # IMPORTANT: Clear any question tags from the summary response to prevent asked_q from updating
+            reply_content = re.sub(r'\[\[Q:[A-Z_]+\.\d+\]\]', '', reply_content)
     
     # Handle remaining commands (kickstart, contact) that weren't processed earlier
     current_phase = session_data.get("current_phase", "") if session_data else ""
@@ -1795,138 +2099,49 @@ CRITICAL INSTRUCTIONS:
         elif user_content.lower() == "who do i contact?":
             reply_content = handle_contact_command(reply_content, history, session_data)
     
-    # Inject missing tag if AI forgot to include one
-    reply_content = inject_missing_tag(reply_content, session_data)
-    
-    # Check if AI response contains WEBSEARCH_QUERY (from scrapping command)
-    if "WEBSEARCH_QUERY:" in reply_content:
-        needs_web_search = True
-        web_search_query = reply_content.split("WEBSEARCH_QUERY:")[1].strip()
-        print(f"🔍 Web search triggered by AI response: {web_search_query}")
-        # Remove the WEBSEARCH_QUERY from the response
-        reply_content = reply_content.split("WEBSEARCH_QUERY:")[0].strip()
-    
-    # Format response structure to use proper list format instead of paragraph
-    reply_content = format_response_structure(reply_content)
-    
-    # Ensure questions are properly separated
-    reply_content = ensure_question_separation(reply_content, session_data)
-    
-    # Check if we need to provide a section summary BEFORE updating asked_q
-    # (Check based on the PREVIOUS question that was just answered, not the next question)
-    current_tag_before_update = session_data.get("asked_q") if session_data else None
-    section_summary_info = None
-    
-    # RE-ENABLED: Section summaries with proper timing to prevent question skipping
-    # Only show section summary if user just answered a section-ending question
-    # Don't show if user clicked Accept (they want to proceed from summary)
-    if not is_accept_command and not is_command_response:
-        # Check if we just completed a section-ending question
-        section_summary_info = check_for_section_summary(current_tag_before_update, session_data, history)
+    if not question_turn and not summary_shown:
+        # Structured tags are limited to the catalog; free-text tags are pulled back into sequence
+        reply_content = validate_business_plan_sequence(reply_content, session_data)
     
-    # Extract question tag from reply and update session data BEFORE sequence validation
+    # Extract question tag from reply and update session data
     # IMPORTANT: Don't update asked_q if we're showing a section summary
     patch_session = {}
     tag_match = re.search(r'\[\[Q:([A-Z_]+\.\d+)\]\]', reply_content)
-    if tag_match and session_data and not section_summary_info:
+    if tag_match and session_data and not summary_shown:
         new_question_tag = tag_match.group(1)
         current_asked_q = session_data.get("asked_q", "")
         
         # Only update if this is a new question (not the same as current)
         if new_question_tag != current_asked_q:
-            # Update session data immediately for sequence validation
             session_data["asked_q"] = new_question_tag
             patch_session["asked_q"] = new_question_tag
-            print(f"🔧 Updating session asked_q: {current_asked_q} → {new_question_tag}")
-    elif section_summary_info:
-        print(f"🔒 Section summary active - NOT updating asked_q (staying at {current_tag_before_update})")
-    
-    # Validate business plan question sequence (now with updated session data)
-    reply_content = validate_business_plan_sequence(reply_content, session_data)
-    
-    # Fix verification flow to separate verification from next question
-    # reply_content = fix_verification_flow(reply_content, session_data)
-    
-    # Prevent AI from molding user answers without verification
-    reply_content = prevent_ai_molding(reply_content, session_data)
-    
-    # Add critiquing insights based on user's business field
-    reply_content = add_critiquing_insights(reply_content, session_data, user_content)
-    
-    # Suggest using Draft if user has already provided relevant information
-    reply_content = suggest_draft_if_relevant(reply_content, session_data, user_content, history)
+            logger.debug("Updating session asked_q: %s -> %s", current_asked_q, new_question_tag)
+    elif summary_shown:
+        logger.debug("Section summary for %s - keeping asked_q at %s until user accepts", section_summary_info['section_name'], current_tag_before_update)
     
-    # Add proactive support guidance based on identified areas needing help
-    reply_content = add_proactive_support_guidance(reply_content, session_data, history)
-    
-    if section_summary_info:
-        print(f"🎯 SECTION SUMMARY TRIGGERED for {section_summary_info['section_name']} at question {current_tag_before_update}")
+    if not summary_shown:
+        # Prevent AI from molding user answers without verification
+        reply_content = prevent_ai_molding(reply_content, session_data)
         
-        # CRITICAL: Don't let the question number increment during section summary
-        # The summary shows AFTER answering the last question of a section
-        # We stay on the same question number until user accepts the summary
+        # Add critiquing insights based on user's business field
+        reply_content = add_critiquing_insights(reply_content, session_data, user_content)
         
-        # Add section summary requirements to the system prompt
-        summary_instruction = f"""
-IMPORTANT: You have just completed {section_summary_info['section_name']} section. 
-You MUST provide a comprehensive section summary that includes:
-
-1. **Summary**: Recap the key information provided in this section
-2. **Educational Insights**: Provide valuable insights about this business area
-3. **Critical Considerations**: Highlight important watchouts and considerations for this business type
-4. **Verification Request**: Ask user to verify the information before proceeding
-
-Use this EXACT format:
-"🎯 **{section_summary_info['section_name']} Section Complete**
-
-**Summary of Your Information:**
-[Recap key points from this section]
-
-**Educational Insights:**
-[Provide valuable business insights related to this section]
-
-**Critical Considerations:**
-[Highlight important watchouts and things to consider]
-
-**Ready to Continue?**
-Please confirm that this information is accurate before we move to the next section. You can either accept this summary and continue, or let me know what you'd like to modify.
-
-[[ACCEPT_MODIFY_BUTTONS]]"
-
-CRITICAL: 
-- End your response with [[ACCEPT_MODIFY_BUTTONS]] to trigger the Accept/Modify buttons
-- Do NOT ask the next question immediately
-- Do NOT include any question tags like [[Q:BUSINESS_PLAN.XX]] in this response
-"""
-        # Add this instruction to the messages
-        msgs.append({"role": "system", "content": summary_instruction})
+        # Suggest using Draft if user has already provided relevant information
+        reply_content = suggest_draft_if_relevant(reply_content, session_data, user_content, history)
         
-        # Regenerate the response with section summary
-        response = await client.chat.completions.create(
-            model="gpt-4o",
-            messages=msgs,
-            temperature=0.7,
-            max_tokens=1000,
-            stream=False
-        )
-        reply_content = response.choices[0].message.content
-        
-        # IMPORTANT: Clear any question tags from the summary response to prevent asked_q from updating
-        reply_content = re.sub(r'\[\[Q:[A-Z_]+\.\d+\]\]', '', reply_content)
-        print(f"🔒 Section summary generated - keeping asked_q at {current_tag_before_update} until user accepts")
+        # Add proactive support guidance based on identified areas needing help
+        reply_content = add_proactive_support_guidance(reply_content, session_data, history)
     
-    # Ensure proper question formatting with line breaks and structure
-    reply_content = ensure_proper_question_formatting(reply_content, session_data)
+    if not question_turn:
+        # Ensure proper question formatting with line breaks and structure
+        reply_content = ensure_proper_question_formatting(reply_content, session_data)
 
     end_time = time.time()
     response_time = end_time - start_time
-    print(f"⏱️ Angel reply generated in {response_time:.2f} seconds")
+    logger.info("Angel reply generated in %.2f seconds", response_time)
     
-    # Check if user just answered the final KYC question OR if AI generated a completion message
-    if session_data and session_data.get("current_phase") == "KYC":
-        current_tag = session_data.get("asked_q", "")
-        
-        # Check if the AI's reply contains a completion message (fallback detection)
+    if not question_turn and session_data and session_data.get("current_phase") == "KYC":
+        # A free-text reply may wrap up KYC on its own; hand over to the proper completion handler
         completion_indicators = [
             "we've completed your entrepreneurial profile",
             "fantastic! we've completed your entrepreneurial",
@@ -1934,42 +2149,35 @@ CRITICAL:
             "ready to dive into your business planning",
             "moving into the exciting business planning phase"
         ]
-        
         if any(indicator in reply_content.lower() for indicator in completion_indicators):
-            print(f"🎯 AI generated completion message detected - triggering proper completion handler")
+            logger.info("AI generated a KYC completion message - triggering the completion handler")
             return await handle_kyc_completion(session_data, history)
-        
-        # Original detection: Check if on question 19 and user answered
-        if current_tag and current_tag.startswith("KYC."):
-            try:
-                question_num = int(current_tag.split(".")[1])
-                # Check if user just answered the final question (19)
-                if (question_num == 19 and 
-                    not current_tag.endswith("_ACK") and
-                    ("proactive" in user_content.lower() or 
-                     user_content.lower().strip() in ["yes", "y", "yeah", "yep", "sure", "ok", "okay", "absolutely", "definitely", "no", "n", "nope", "NO", "NOPE" , "proactive" , "Proactive" , "excellent" , "Excellent" , "fantastic" , "Fantastic" , "congratulations" , "Congratulations"] or
-                     "yes" in user_content.lower() or
-                     "no" in user_content.lower())):
-                    
-                    print(f"🎯 User answered final KYC question (19) - triggering completion immediately")
-                    # Trigger completion immediately after acknowledgment
-                    return await handle_kyc_completion(session_data, history)
-            except (ValueError, IndexError):
-                pass
-    
     
-    # Clean up internal tags before sending to user
-    # Remove [[ACCEPT_MODIFY_BUTTONS]] tag - it's only for backend detection, not display
-    reply_content = reply_content.replace("[[ACCEPT_MODIFY_BUTTONS]]", "").strip()
+    if question_turn:
+        # The structured turn already says whether the answer needs confirming
+        show_accept_modify = question_turn["show_buttons"]
+    else:
+        # Check if we should show Accept/Modify buttons (reads [[ACCEPT_MODIFY_BUTTONS]] before it is stripped)
+        button_detection = await should_show_accept_modify_buttons(
+            user_last_input=user_content,
+            ai_response=reply_content,
+            session_data=session_data
+        )
+        show_accept_modify = button_detection.get("show_buttons", False)
+        
+        # Clean up internal tags before sending to user
+        # Remove [[ACCEPT_MODIFY_BUTTONS]] tag - it's only for backend detection, not display
+        reply_content = reply_content.replace("[[ACCEPT_MODIFY_BUTTONS]]", "").strip()
     
     return {
         "reply": reply_content,
         "web_search_status": web_search_status,
         "immediate_response": immediate_response,
         "patch_session": patch_session if patch_session else None,
-        "show_accept_modify": button_detection.get("show_buttons", False)
+        "show_accept_modify": show_accept_modify
     }
 
+@traced()
 async def handle_draft_command(reply, history, session_data=None):
     """Handle the Draft command with research-backed comprehensive response generation"""
     # Extract context from conversation history
@@ -2093,9 +2301,8 @@ async def generate_draft_content(history, business_context, current_question="",
     """Generate research-backed draft content based on conversation history"""
     # Extract recent messages (both user and assistant) to understand context
     recent_messages = []
-    for msg in history[-8:]:  # Look at last 8 messages (4 exchanges)
-        if msg.get('content'):
-            recent_messages.append(msg['content'])
+    for msg in conversation_memory.recent_messages(history, "draft"):
+        recent_messages.append(msg['content'])
     
     # Debug logging
     print(f"🔍 DEBUG - Recent messages for draft context: {recent_messages}")
@@ -2122,13 +2329,7 @@ async def generate_draft_content(history, business_context, current_question="",
     location = business_context.get("location", "your location")
     
     # Extract previous answers from history for better context
-    previous_answers = []
-    for msg in history[-10:]:
-        if msg.get('role') == 'user' and len(msg.get('content', '')) > 20:
-            content = msg.get('content', '')
-            # Skip command words
-            if content.lower() not in ['support', 'draft', 'scrapping', 'scraping', 'accept', 'modify']:
-                previous_answers.append(content[:200])
+    previous_answers = conversation_memory.previous_answers(history)
     
     # Use AI to generate a comprehensive, personalized, research-backed draft
     research_section = ""
@@ -2397,6 +2598,7 @@ Focus on validating your concept before full development through market research
     else:
         return "Based on our conversation, here's a comprehensive draft response that addresses your current question with detailed insights and actionable recommendations tailored to your business context and goals. Consider breaking down complex questions into smaller parts and thinking through each aspect systematically."
 
+@traced()
 async def handle_scrapping_command(reply, notes, history, session_data=None):
     """Handle the Scrapping command with actual web search research"""
     print(f"🔍 DEBUG - Scrapping command called with notes: '{notes}'")
@@ -2575,13 +2777,7 @@ async def generate_scrapping_content(history, business_context, notes, current_q
     location = business_context.get("location", "your location")
     
     # Extract previous answers from history for better context
-    previous_answers = []
-    for msg in history[-10:]:
-        if msg.get('role') == 'user' and len(msg.get('content', '')) > 20:
-            content = msg.get('content', '')
-            # Skip command words
-            if content.lower() not in ['support', 'draft', 'scrapping', 'scraping', 'accept', 'modify']:
-                previous_answers.append(content[:200])
+    previous_answers = conversation_memory.previous_answers(history)
     
     # Use AI to generate comprehensive scrapping analysis
     scrapping_prompt = f"""
@@ -2673,6 +2869,7 @@ async def generate_scrapping_content(history, business_context, notes, current_q
 • Identify key success metrics
 • Create actionable development timeline"""
 
+@traced()
 async def handle_support_command(reply, history, session_data=None):
     """Handle the Support command with aggressive web search research"""
     # Extract business context for verification
@@ -2706,9 +2903,8 @@ async def generate_support_content(history, business_context, current_question="
     """Generate support content with research-backed insights and citations"""
     # Extract recent messages (both user and assistant) to understand context
     recent_messages = []
-    for msg in history[-8:]:  # Look at last 8 messages (4 exchanges)
-        if msg.get('content'):
-            recent_messages.append(msg['content'])
+    for msg in conversation_memory.recent_messages(history, "draft"):
+        recent_messages.append(msg['content'])
     
     # Debug logging
     print(f"🔍 DEBUG - Recent messages for support context: {recent_messages}")
@@ -2735,13 +2931,7 @@ async def generate_support_content(history, business_context, current_question="
     location = business_context.get("location", "your location")
     
     # Extract previous answers from history for better context
-    previous_answers = []
-    for msg in history[-10:]:
-        if msg.get('role') == 'user' and len(msg.get('content', '')) > 20:
-            content = msg.get('content', '')
-            # Skip command words
-            if content.lower() not in ['support', 'draft', 'scrapping', 'scraping', 'accept', 'modify']:
-                previous_answers.append(content[:200])
+    previous_answers = conversation_memory.previous_answers(history)
     
     # Generate dynamic support using AI model with research results and citations
     research_section = ""
@@ -2840,6 +3030,7 @@ Let me help you apply this to your specific situation in {location}. Consider ho
     
     
 
+@traced()
 async def handle_draft_more_command(reply, history, session_data=None):
     """Handle the Draft More command to create additional content"""
     # Extract business context for verification
@@ -2864,13 +3055,7 @@ async def generate_additional_draft_content(history, business_context, current_q
     location = business_context.get("location", "your location")
     
     # Extract previous answers from history for better context
-    previous_answers = []
-    for msg in history[-10:]:
-        if msg.get('role') == 'user' and len(msg.get('content', '')) > 20:
-            content = msg.get('content', '')
-            # Skip command words
-            if content.lower() not in ['support', 'draft', 'scrapping', 'scraping', 'accept', 'modify', 'draft more']:
-                previous_answers.append(content[:200])
+    previous_answers = conversation_memory.previous_answers(history)
     
     # Use AI to generate enhanced additional content
     draft_more_prompt = f"""
@@ -3020,6 +3205,7 @@ def extract_conversation_context(history):
     
     return " | ".join(context)
 
+@traced()
 def extract_business_context_from_history(history):
     """Extract business context information from conversation history with weighted priority"""
     business_context = {
@@ -3041,7 +3227,7 @@ def extract_business_context_from_history(history):
         "business_idea": 0
     }
     
-    print(f"🔍 DEBUG - Extracting business context from {len(history)} messages with weighted priority")
+    logger.debug("Extracting business context from %s messages with weighted priority", len(history))
     
     # NO MORE HARDCODED OVERRIDES - Let AI naturally detect business type from conversation
     # Removed plumbing-specific override logic - system now works for ALL business types dynamically
@@ -3053,13 +3239,13 @@ def extract_business_context_from_history(history):
             content = msg["content"]
             if "[[Q:KYC.11]]" in content:  # Industry question
                 kyc_question_indices["industry"] = i
-                print(f"🔍 DEBUG - Found KYC.11 (industry question) at index {i}")
+                logger.debug("Found KYC.11 (industry question) at index %s", i)
             elif "[[Q:KYC.16]]" in content:  # Business structure question
                 kyc_question_indices["business_type"] = i
-                print(f"🔍 DEBUG - Found KYC.16 (business type question) at index {i}")
+                logger.debug("Found KYC.16 (business type question) at index %s", i)
             elif "[[Q:KYC.10]]" in content:  # Location question
                 kyc_question_indices["location"] = i
-                print(f"🔍 DEBUG - Found KYC.10 (location question) at index {i}")
+                logger.debug("Found KYC.10 (location question) at index %s", i)
     
     # Extract from all messages (not just recent ones)
     for i, msg in enumerate(history):
@@ -3067,7 +3253,7 @@ def extract_business_context_from_history(history):
             content = msg["content"]
             content_lower = content.lower()
             
-            print(f"🔍 DEBUG - Message {i}: {content[:100]}...")
+            logger.debug("Message %s: %.100s", i, content)
             
             # Check if this is a response to a KYC question (HIGHEST PRIORITY - weight 100)
             is_kyc_industry_answer = "industry" in kyc_question_indices and i == kyc_question_indices["industry"] + 1
@@ -3080,21 +3266,21 @@ def extract_business_context_from_history(history):
                 industry_answer = content.strip()
                 business_context["industry"] = industry_answer
                 context_weights["industry"] = 100
-                print(f"🔍 DEBUG - ⭐ HIGHEST PRIORITY: KYC.11 industry answer (EXACT): '{industry_answer}' (weight 100)")
+                logger.debug("HIGHEST PRIORITY: KYC.11 industry answer (EXACT): '%s' (weight 100)", industry_answer)
             
             # Extract business type from KYC.16 answer (HIGHEST PRIORITY)
             if is_kyc_business_type_answer and len(content.strip()) > 2:
                 business_type_answer = content.strip()
                 business_context["business_type"] = business_type_answer
                 context_weights["business_type"] = 100
-                print(f"🔍 DEBUG - ⭐ HIGHEST PRIORITY: KYC.16 business type answer: '{business_type_answer}' (weight 100)")
+                logger.debug("HIGHEST PRIORITY: KYC.16 business type answer: '%s' (weight 100)", business_type_answer)
             
             # Extract location from KYC.10 answer (HIGHEST PRIORITY)
             if is_kyc_location_answer and len(content.strip()) > 2:
                 location_answer = content.strip()
                 business_context["location"] = location_answer
                 context_weights["location"] = 100
-                print(f"🔍 DEBUG - ⭐ HIGHEST PRIORITY: KYC.10 location answer: '{location_answer}' (weight 100)")
+                logger.debug("HIGHEST PRIORITY: KYC.10 location answer: '%s' (weight 100)", location_answer)
             
             # Extract business name - prioritize domain names and longer names over short responses
             # First check for domain-like names (highest priority - weight 80)
@@ -3106,7 +3292,7 @@ def extract_business_context_from_history(history):
                     if context_weights["business_name"] < 80:
                         business_context["business_name"] = potential_name
                         context_weights["business_name"] = 80
-                        print(f"🔍 DEBUG - Found domain business name: {potential_name} (weight 80)")
+                        logger.debug("Found domain business name: %s (weight 80)", potential_name)
             
             # Then look for patterns like "my business is", "company name", etc. (weight 70)
             elif context_weights["business_name"] < 70 and any(phrase in content_lower for phrase in ["my business is", "company name", "startup name", "business name", "what is your business name"]):
@@ -3119,7 +3305,7 @@ def extract_business_context_from_history(history):
                             if len(potential_name) > 2:
                                 business_context["business_name"] = potential_name
                                 context_weights["business_name"] = 70
-                                print(f"🔍 DEBUG - Found business name: {potential_name} (weight 70)")
+                                logger.debug("Found business name: %s (weight 70)", potential_name)
                                 break
             
             # Finally look for direct business name responses (weight 50)
@@ -3134,7 +3320,7 @@ def extract_business_context_from_history(history):
                     if any(c.isalpha() for c in potential_name) and not potential_name.lower() in ["small business", "corporation", "llc", "inc"]:
                             business_context["business_name"] = potential_name
                             context_weights["business_name"] = 50
-                            print(f"🔍 DEBUG - Found direct business name: {potential_name} (weight 50)")
+                            logger.debug("Found direct business name: %s (weight 50)", potential_name)
             
             # Extract industry from natural conversation - use exact user words, no keyword lists
             # Only as fallback if KYC answer not available (weight < 100)
@@ -3146,7 +3332,7 @@ def extract_business_context_from_history(history):
                         # Use user's exact words as industry descriptor
                         business_context["industry"] = content.strip()
                         context_weights["industry"] = 20
-                        print(f"🔍 DEBUG - Using user's exact description as industry: '{content.strip()[:50]}' (weight 20)")
+                        logger.debug("Using user's exact description as industry: '%.50s' (weight 20)", content.strip())
             
             # Extract location information - Only if not from KYC (weight < 100)
             if context_weights["location"] < 100:
@@ -3159,7 +3345,7 @@ def extract_business_context_from_history(history):
                             if context_weights["location"] < 50:
                                 business_context["location"] = location.title()
                                 context_weights["location"] = 50
-                                print(f"🔍 DEBUG - Found location: {location} (weight 50)")
+                                logger.debug("Found location: %s (weight 50)", location)
                             break
                     # If no specific city found, look for "located in" pattern
                     if context_weights["location"] < 50 and "located in" in content_lower:
@@ -3169,7 +3355,7 @@ def extract_business_context_from_history(history):
                             if len(potential_location) > 2:
                                 business_context["location"] = potential_location.title()
                                 context_weights["location"] = 50
-                                print(f"🔍 DEBUG - Found location from pattern: {potential_location} (weight 50)")
+                                logger.debug("Found location from pattern: %s (weight 50)", potential_location)
             
             # Extract business type - Only if not from KYC (weight < 100)
             if context_weights["business_type"] < 100:
@@ -3181,7 +3367,7 @@ def extract_business_context_from_history(history):
                             if context_weights["business_type"] < 50:
                                 business_context["business_type"] = biz_type
                                 context_weights["business_type"] = 50
-                                print(f"🔍 DEBUG - Found business type: {biz_type} (weight 50)")
+                                logger.debug("Found business type: %s (weight 50)", biz_type)
                             break
             
             # Extract business idea - look for longer descriptive responses
@@ -3191,7 +3377,7 @@ def extract_business_context_from_history(history):
                     # For tea-related descriptions, capture the full content
                     if any(phrase in content_lower for phrase in ["tea good", "on tap"]):
                         business_context["business_idea"] = content.strip()
-                        print(f"🔍 DEBUG - Found tea business idea: {content}")
+                        logger.debug("Found tea business idea: %s", content)
                     else:
                         # Extract a reasonable portion of the business idea
                         for phrase in ["business idea", "my idea", "startup idea", "venture", "business concept"]:
@@ -3201,18 +3387,19 @@ def extract_business_context_from_history(history):
                                     idea_text = parts[1].strip()[:100]  # First 100 characters
                                     if len(idea_text) > 10:
                                         business_context["business_idea"] = idea_text
-                                        print(f"🔍 DEBUG - Found business idea: {idea_text}")
+                                        logger.debug("Found business idea: %s", idea_text)
                                         break
                 # Also capture longer responses that might be business ideas (but exclude preference responses)
                 elif len(content.strip()) > 30 and not any(word in content_lower for word in ["yes", "no", "maybe", "support", "draft", "scrapping", "hands-on", "decide", "personal savings", "subscriptions", "online only"]):
                     business_context["business_idea"] = content.strip()
-                    print(f"🔍 DEBUG - Found business idea (long response): {content[:50]}...")
+                    logger.debug("Found business idea (long response): %.50s...", content)
     
-    print(f"🔍 DEBUG - Final business context: {business_context}")
-    print(f"🔍 DEBUG - Context weights: {context_weights}")
-    print(f"⭐ PRIORITY SUMMARY - Industry: '{business_context.get('industry', 'N/A')}' (weight: {context_weights['industry']}), Business Type: '{business_context.get('business_type', 'N/A')}' (weight: {context_weights['business_type']})")
+    logger.debug("Final business context: %s", business_context)
+    logger.debug("Context weights: %s", context_weights)
+    logger.debug("PRIORITY SUMMARY - Industry: '%s' (weight: %s), Business Type: '%s' (weight: %s)", business_context.get('industry', 'N/A'), context_weights['industry'], business_context.get('business_type', 'N/A'), context_weights['business_type'])
     return business_context
 
+@traced()
 async def handle_competitor_research_request(user_input, business_context, history):
     """Handle specific requests for competitor research"""
     
@@ -3240,6 +3427,7 @@ async def handle_competitor_research_request(user_input, business_context, histo
     
     # Conduct web search for competitor research
     competitor_research_results = []
+    session_channels.emit("research_started", kind="competitor_research", queries=research_queries[:3])
     
     for query in research_queries[:3]:  # Limit to 3 queries for efficiency
         try:
@@ -3251,6 +3439,7 @@ async def handle_competitor_research_request(user_input, business_context, histo
                 })
         except Exception as e:
             print(f"Error conducting competitor research for query '{query}': {e}")
+    session_channels.emit("research_finished", kind="competitor_research", sources=len(competitor_research_results))
     
     # Generate comprehensive competitor analysis
     if competitor_research_results:
@@ -3333,7 +3522,7 @@ async def generate_business_plan_artifact(session_data, conversation_history):
     Industry Trends: {industry_trends}
     Financial Benchmarks: {financial_benchmarks}
     
-    Conversation History: {json.dumps(conversation_history[-20:], indent=2)}
+    Conversation History: {json.dumps(conversation_memory.build_messages(conversation_history, "artifact"), indent=2)}
     
     Create a professional business plan that is in-depth, holistic, and highly detailed. This should blend the user's direct answers with research-driven insights to fill in gaps and provide comprehensive coverage of:
     
@@ -3561,6 +3750,9 @@ When you're ready, we'll show you the first real-world action to take — and we
         "awaiting_confirmation": True  # Signal that we need user to confirm before starting implementation tasks
     }
 
+# Returned instead of a roadmap when generation fails
+ROADMAP_PLACEHOLDER = "Roadmap generation in progress..."
+
 async def generate_detailed_roadmap(session_data, history):
     """Generate detailed roadmap with RAG-powered research"""
     
@@ -3661,7 +3853,7 @@ async def generate_detailed_roadmap(session_data, history):
         return roadmap_content.strip()
     except Exception as e:
         print(f"Error generating detailed roadmap: {e}")
-        return "Roadmap generation in progress..."
+        return ROADMAP_PLACEHOLDER
 
 async def generate_next_question(question_tag: str, session_data: dict) -> str:
     """Generate the next business planning question based on the question tag"""
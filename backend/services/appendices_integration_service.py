@@ -10,9 +10,14 @@ from services.credible_resources_service import credible_resources_manager, Cred
 from services.deep_research_training_service import deep_research_training_manager, AgentType, AgentTrainingData
 from services.specialized_agents_service import agents_manager
 from services.rag_service import conduct_rag_research, validate_with_rag, generate_rag_insights
+from utils.fan_in import fan_in, Component
+from utils.progress import PROGRESS_SECTIONS, progress_from_session
 
 logger = logging.getLogger(__name__)
 
+# Seconds the UX bundle waits for its slowest builder; late builders are returned empty
+UX_DATA_DEADLINE = float(os.getenv("UX_DATA_DEADLINE", "10"))
+
 class ProgressType(Enum):
     OVERALL = "overall"
     SECTION = "section"
@@ -94,59 +99,54 @@ class AppendicesIntegrationService:
         self.session_navigation = {}
         self.completion_declarations = {}
     
-    async def get_comprehensive_progress_indicators(self, session_id: str, business_context: Dict[str, Any]) -> List[ProgressIndicator]:
-        """Get comprehensive progress indicators for a session"""
+    async def get_comprehensive_progress_indicators(self, session_id: str, business_context: Dict[str, Any], progress: Optional[Dict[str, Any]] = None) -> List[ProgressIndicator]:
+        """Get comprehensive progress indicators for a session
+        
+        `progress` is the session's stored progress record (session_service.get_session_progress);
+        without one the indicators start from the beginning of the workflow.
+        """
+        
+        progress = progress or progress_from_session({})
         
         # Get overall progress
-        overall_progress = await self._calculate_overall_progress(session_id)
+        overall_progress = self._calculate_overall_progress(progress)
         
         # Get section-specific progress
-        section_progress = await self._calculate_section_progress(session_id, business_context)
+        section_progress = self._calculate_section_progress(progress)
         
         # Get task-specific progress
         task_progress = await self._calculate_task_progress(session_id, business_context)
         
         return [overall_progress] + section_progress + task_progress
     
-    async def _calculate_overall_progress(self, session_id: str) -> ProgressIndicator:
-        """Calculate overall workflow progress"""
-        
-        # This would typically query your database for actual progress
-        # For now, we'll simulate progress calculation
-        phases_completed = 2  # KYC, Business Plan
-        total_phases = 4  # KYC, Business Plan, Roadmap, Implementation
-        
-        progress_percent = int((phases_completed / total_phases) * 100)
+    def _calculate_overall_progress(self, progress: Dict[str, Any]) -> ProgressIndicator:
+        """Overall workflow progress from the stored progress record"""
         
         return ProgressIndicator(
             id="overall_progress",
             label="Overall Workflow Progress",
-            progress=progress_percent,
+            progress=progress["percent"],
             type=ProgressType.OVERALL,
-            status="in_progress",
-            last_updated=datetime.now()
+            status="completed" if progress["percent"] >= 100 else "in_progress",
+            phase=progress["phase"],
+            last_updated=datetime.fromisoformat(progress["updated_at"])
         )
     
-    async def _calculate_section_progress(self, session_id: str, business_context: Dict[str, Any]) -> List[ProgressIndicator]:
-        """Calculate section-specific progress"""
-        
-        sections = [
-            ("kyc_section", "KYC Intake Questionnaire", 100, "completed"),
-            ("planning_section", "Business Plan Development", 100, "completed"),
-            ("roadmap_section", "Launch Roadmap Creation", 75, "in_progress"),
-            ("implementation_section", "Implementation Execution", 0, "pending")
-        ]
+    def _calculate_section_progress(self, progress: Dict[str, Any]) -> List[ProgressIndicator]:
+        """Per-section progress from the stored progress record"""
         
+        last_updated = datetime.fromisoformat(progress["updated_at"])
         indicators = []
-        for section_id, label, progress, status in sections:
+        for section, section_id, label in PROGRESS_SECTIONS:
+            section_progress = progress["sections"][section]
             indicators.append(ProgressIndicator(
                 id=section_id,
                 label=label,
-                progress=progress,
+                progress=section_progress["percent"],
                 type=ProgressType.SECTION,
-                status=status,
+                status=section_progress["status"],
                 section=section_id,
-                last_updated=datetime.now()
+                last_updated=last_updated
             ))
         
         return indicators
@@ -188,13 +188,13 @@ class AppendicesIntegrationService:
         
         return indicators
     
-    async def generate_dynamic_prompts(self, session_id: str, business_context: Dict[str, Any], current_task: Optional[str] = None) -> List[DynamicPrompt]:
+    async def generate_dynamic_prompts(self, session_id: str, business_context: Dict[str, Any], current_task: Optional[str] = None, progress: Optional[Dict[str, Any]] = None) -> List[DynamicPrompt]:
         """Generate dynamic prompts based on current state and progress"""
         
         prompts = []
         
         # Progress-based prompts
-        progress_indicators = await self.get_comprehensive_progress_indicators(session_id, business_context)
+        progress_indicators = await self.get_comprehensive_progress_indicators(session_id, business_context, progress)
         overall_progress = next((p for p in progress_indicators if p.type == ProgressType.OVERALL), None)
         
         if overall_progress:
@@ -538,30 +538,40 @@ class AppendicesIntegrationService:
         # For now, we'll simulate based on session data
         return "ROADMAP"  # or "IMPLEMENTATION", "PLANNING", etc.
     
-    async def get_comprehensive_ux_data(self, session_id: str, business_context: Dict[str, Any], current_task: Optional[str] = None) -> Dict[str, Any]:
+    async def get_comprehensive_ux_data(self, session_id: str, business_context: Dict[str, Any], current_task: Optional[str] = None, progress: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get comprehensive UX data integrating all appendices"""
         
-        # Get all UX components
-        progress_indicators = await self.get_comprehensive_progress_indicators(session_id, business_context)
-        dynamic_prompts = await self.generate_dynamic_prompts(session_id, business_context, current_task)
-        interactive_commands = await self.get_interactive_commands(session_id, business_context, current_task)
-        navigation_items = await self.get_flexible_navigation(session_id, business_context)
-        
-        # Get credible resources for current context
-        credible_resources = await credible_resources_manager.get_comprehensive_research_sources(
-            current_task or "business development",
-            business_context
-        )
+        # Get all UX components concurrently; a builder that fails or is late comes back empty
+        parts = await fan_in("comprehensive_ux_data", {
+            "progress_indicators": Component(
+                lambda: self.get_comprehensive_progress_indicators(session_id, business_context, progress), fallback=list
+            ),
+            "dynamic_prompts": Component(
+                lambda: self.generate_dynamic_prompts(session_id, business_context, current_task, progress), fallback=list
+            ),
+            "interactive_commands": Component(
+                lambda: self.get_interactive_commands(session_id, business_context, current_task), fallback=list
+            ),
+            "navigation_items": Component(
+                lambda: self.get_flexible_navigation(session_id, business_context), fallback=list
+            ),
+            # Get credible resources for current context
+            "credible_resources": Component(
+                lambda: credible_resources_manager.get_comprehensive_research_sources(
+                    current_task or "business development",
+                    business_context
+                ),
+                fallback=dict
+            ),
+            "agent_training_data": Component(self._get_agent_training_summary, fallback=dict)
+        }, deadline=UX_DATA_DEADLINE)
         
-        # Get agent training data
-        agent_training_data = {}
-        for agent_type in AgentType:
-            training_data = await deep_research_training_manager.get_agent_training_data(agent_type)
-            agent_training_data[agent_type.value] = {
-                "expertise_areas": training_data.expertise_areas,
-                "knowledge_domains": training_data.knowledge_domains,
-                "credible_sources": training_data.credible_sources
-            }
+        progress_indicators = parts["progress_indicators"]
+        dynamic_prompts = parts["dynamic_prompts"]
+        interactive_commands = parts["interactive_commands"]
+        navigation_items = parts["navigation_items"]
+        credible_resources = parts["credible_resources"]
+        agent_training_data = parts["agent_training_data"]
         
         return {
             "session_id": session_id,
@@ -617,21 +627,36 @@ class AppendicesIntegrationService:
             ],
             "credible_resources": credible_resources,
             "agent_training_data": agent_training_data,
+            "component_latency_ms": parts.latency_ms,
+            "degraded_components": list(parts.degraded),
             "generated_at": datetime.now().isoformat()
         }
+    
+    async def _get_agent_training_summary(self) -> Dict[str, Any]:
+        """Expertise, domains and sources of every agent"""
+        
+        agent_training_data = {}
+        for agent_type in AgentType:
+            training_data = await deep_research_training_manager.get_agent_training_data(agent_type)
+            agent_training_data[agent_type.value] = {
+                "expertise_areas": training_data.expertise_areas,
+                "knowledge_domains": training_data.knowledge_domains,
+                "credible_sources": training_data.credible_sources
+            }
+        return agent_training_data
 
 # Global instance
 appendices_integration_service = AppendicesIntegrationService()
 
 # Convenience functions
-async def get_comprehensive_ux_data(session_id: str, business_context: Dict[str, Any], current_task: Optional[str] = None) -> Dict[str, Any]:
+async def get_comprehensive_ux_data(session_id: str, business_context: Dict[str, Any], current_task: Optional[str] = None, progress: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Get comprehensive UX data"""
-    return await appendices_integration_service.get_comprehensive_ux_data(session_id, business_context, current_task)
+    return await appendices_integration_service.get_comprehensive_ux_data(session_id, business_context, current_task, progress)
 
 async def process_completion_declaration(session_id: str, declaration: CompletionDeclaration, business_context: Dict[str, Any]) -> Dict[str, Any]:
     """Process completion declaration"""
     return await appendices_integration_service.process_completion_declaration(session_id, declaration, business_context)
 
-async def generate_dynamic_prompts(session_id: str, business_context: Dict[str, Any], current_task: Optional[str] = None) -> List[DynamicPrompt]:
+async def generate_dynamic_prompts(session_id: str, business_context: Dict[str, Any], current_task: Optional[str] = None, progress: Optional[Dict[str, Any]] = None) -> List[DynamicPrompt]:
     """Generate dynamic prompts"""
-    return await appendices_integration_service.generate_dynamic_prompts(session_id, business_context, current_task)
+    return await appendices_integration_service.generate_dynamic_prompts(session_id, business_context, current_task, progress)
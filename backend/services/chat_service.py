@@ -1,26 +1,215 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional
 from db.supabase import supabase
+from db.errors import is_missing_function
+from utils.metrics import SUPABASE_LATENCY
+from utils.tracing import traced
+from utils.circuit_breaker import guarded, supabase_breaker
+from utils.pagination import seek, page
+from services.session_channel import session_channels
 
+# Return the HTTP response before a turn is persisted (per-worker read-your-writes only)
+WRITE_BEHIND = os.getenv("CHAT_WRITE_BEHIND", "false").lower() == "true"
+FLUSH_RETRIES = int(os.getenv("CHAT_FLUSH_RETRIES", "3"))
+# Messages per history page when the client does not ask for a size, and the most it may ask for
+HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "50"))
+HISTORY_PAGE_MAX = int(os.getenv("CHAT_HISTORY_PAGE_MAX", "200"))
+# Columns the history endpoints return; id and created_at are needed for the next cursor
+HISTORY_COLUMNS = "id, role, content, phase, created_at"
+
+@traced(histogram=SUPABASE_LATENCY)
+@guarded(supabase_breaker)
 async def fetch_chat_history(session_id: str):
-    response = supabase.from_("chat_history").select("role, content").eq("session_id", session_id).order("created_at").execute()
+    await chat_turn_writer.wait_for_session(session_id)
+    response = supabase.from_("chat_history").select("role, content").eq("session_id", session_id).order("created_at").order("id").execute()
     return response.data
 
+@traced(histogram=SUPABASE_LATENCY)
+@guarded(supabase_breaker)
 async def save_chat_message(session_id: str, user_id: str, role: str, content: str):
     supabase.from_("chat_history").insert({"session_id": session_id, "user_id": user_id, "role": role, "content": content}).execute()
 
-async def fetch_phase_chat_history(session_id: str, phase: str, offset: int = 0, limit: int = 15):
+@traced(histogram=SUPABASE_LATENCY)
+@guarded(supabase_breaker)
+async def fetch_messages_since(session_id: str, since: str):
+    """Messages saved after `since` (ISO timestamp), for clients reconnecting to the session channel"""
+    await chat_turn_writer.wait_for_session(session_id)
     response = (
         supabase
         .table("chat_history")
-        .select("role, content, phase, created_at")
+        .select("id, role, content, phase, created_at")
         .eq("session_id", session_id)
-        .eq("phase", phase)
-        .order("created_at", desc=False)
-        .range(offset, offset + limit - 1)
+        .gt("created_at", since)
+        .order("created_at")
         .execute()
     )
+    return response.data
+
+@traced(histogram=SUPABASE_LATENCY)
+@guarded(supabase_breaker)
+async def fetch_chat_history_page(session_id: str, limit: int = HISTORY_PAGE_SIZE, before: Optional[str] = None) -> Dict[str, Any]:
+    """Newest messages first: the latest page, or the page older than the `before` cursor, in chronological order"""
+    await chat_turn_writer.wait_for_session(session_id)
+    limit = max(1, min(limit, HISTORY_PAGE_MAX))
+    query = supabase.table("chat_history").select(HISTORY_COLUMNS).eq("session_id", session_id)
+    rows = (
+        seek(query, before, forward=False)
+        .order("created_at", desc=True)
+        .order("id", desc=True)
+        .limit(limit + 1)
+        .execute()
+    ).data
+    messages, next_cursor = page(rows, limit)
+    return {"messages": list(reversed(messages)), "next_cursor": next_cursor}
 
-    if response.error:
-        raise Exception(f"Supabase error: {response.error.message}")
+@traced(histogram=SUPABASE_LATENCY)
+@guarded(supabase_breaker)
+async def fetch_phase_chat_history(session_id: str, phase: str, limit: int = 15, after: Optional[str] = None,
+                                   offset: int = 0) -> Dict[str, Any]:
+    """One phase's messages oldest first, continuing after the `after` cursor
+
+    `offset` is still honoured for clients that page by position, but it scans every skipped row.
+    """
+    limit = max(1, min(limit, HISTORY_PAGE_MAX))
+    query = (
+        seek(supabase.table("chat_history").select(HISTORY_COLUMNS), after)
+        .eq("session_id", session_id)
+        .eq("phase", phase)
+        .order("created_at")
+        .order("id")
+    )
+    query = query.range(offset, offset + limit) if offset and not after else query.limit(limit + 1)
+    messages, next_cursor = page(query.execute().data, limit)
+    return {"messages": messages, "next_cursor": next_cursor}
+
+
+class ChatTurn:
+    """Collects the messages and session updates of one turn so they are written together"""
+
+    def __init__(self, session_id: str, user_id: str):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.messages: List[Dict[str, Any]] = []
+        self.session_updates: Dict[str, Any] = {}
+        self.committed = False
+
+    def add_message(self, role: str, content: str, phase: Optional[str] = None):
+        # Ids and timestamps are fixed here so retries are idempotent and order survives a bulk insert
+        self.messages.append({
+            "id": str(uuid.uuid4()),
+            "session_id": self.session_id,
+            "user_id": self.user_id,
+            "role": role,
+            "content": content,
+            "phase": phase,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        })
+
+    def update_session(self, updates: Dict[str, Any]):
+        # Later updates win, matching the order the separate patches used to run in
+        self.session_updates.update(updates)
+
+    async def commit(self, write_behind: Optional[bool] = None):
+        if self.committed or (not self.messages and not self.session_updates):
+            return
+        self.committed = True
+        await chat_turn_writer.submit(self, WRITE_BEHIND if write_behind is None else write_behind)
+        # Connected clients get the turn's messages pushed instead of polling the history endpoints
+        for message in self.messages:
+            session_channels.publish(self.session_id, "message", {
+                key: message[key] for key in ("id", "role", "content", "phase", "created_at")
+            })
+
+
+class ChatTurnWriter:
+    """Flushes chat turns as one transaction, optionally in the background"""
+
+    def __init__(self):
+        self.pending: Dict[str, asyncio.Task] = {}
+        self.rpc_available = True
+        self.stats = {"flushed": 0, "retried": 0, "failed": 0, "write_behind": 0}
+
+    async def submit(self, turn: ChatTurn, write_behind: bool):
+        previous = self.pending.get(turn.session_id)
+        if not write_behind:
+            if previous:
+                await asyncio.shield(previous)
+            await self._flush(turn)
+            return
+
+        # Chain behind the session's previous flush so turns land in order
+        self.stats["write_behind"] += 1
+        job = asyncio.create_task(self._flush_after(previous, turn))
+        self.pending[turn.session_id] = job
+        job.add_done_callback(lambda done: self._clear(turn.session_id, done))
+
+    async def wait_for_session(self, session_id: str):
+        """Block until every submitted turn for the session is persisted"""
+        job = self.pending.get(session_id)
+        if job:
+            await asyncio.shield(job)
+
+    async def drain(self):
+        """Persist all queued turns, used on shutdown"""
+        jobs = list(self.pending.values())
+        if jobs:
+            print(f"💾 Flushing {len(jobs)} pending chat turns before shutdown")
+            await asyncio.gather(*jobs, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending_sessions": len(self.pending), "write_behind_enabled": WRITE_BEHIND}
+
+    async def _flush_after(self, previous: Optional[asyncio.Task], turn: ChatTurn):
+        if previous:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            await self._flush(turn)
+        except Exception as e:
+            print(f"❌ Chat turn for session {turn.session_id} could not be persisted: {e}")
+
+    @traced("save_chat_turn", histogram=SUPABASE_LATENCY)
+    async def _flush(self, turn: ChatTurn):
+        for attempt in range(FLUSH_RETRIES):
+            try:
+                self._write(turn)
+                self.stats["flushed"] += 1
+                return
+            except Exception as e:
+                if attempt == FLUSH_RETRIES - 1:
+                    self.stats["failed"] += 1
+                    raise
+                self.stats["retried"] += 1
+                print(f"⚠️ Chat turn flush failed (attempt {attempt + 1}), retrying: {e}")
+                await asyncio.sleep(0.2 * 2 ** attempt)
+
+    @guarded(supabase_breaker)
+    def _write(self, turn: ChatTurn):
+        if self.rpc_available:
+            try:
+                supabase.rpc("save_chat_turn", {
+                    "p_session_id": turn.session_id,
+                    "p_messages": turn.messages,
+                    "p_session_updates": turn.session_updates
+                }).execute()
+                return
+            except Exception as e:
+                if not is_missing_function(e):
+                    raise
+                # Schema not migrated yet - fall back to one bulk insert plus one update
+                print("⚠️ save_chat_turn RPC not available - using bulk insert + update")
+                self.rpc_available = False
+
+        if turn.messages:
+            supabase.from_("chat_history").upsert(turn.messages, on_conflict="id", ignore_duplicates=True).execute()
+        if turn.session_updates:
+            supabase.from_("chat_sessions").update(turn.session_updates).eq("id", turn.session_id).execute()
+
+    def _clear(self, session_id: str, job: asyncio.Task):
+        if self.pending.get(session_id) is job:
+            del self.pending[session_id]
 
-    return response.data
 
+chat_turn_writer = ChatTurnWriter()
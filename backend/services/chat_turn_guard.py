@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from db.errors import is_missing_function, is_missing_table
+from db.supabase import supabase
+from utils.logger import get_logger
+from utils.metrics import CHAT_DUPLICATES, CHAT_LOCK_WAIT
+
+logger = get_logger(__name__)
+
+# Cross-worker lease on a session's turn; longer than the slowest turn so it rarely expires mid-turn
+LOCK_TTL_SECONDS = int(os.getenv("CHAT_TURN_LOCK_TTL", "180"))
+# How long a request waits for the session's current turn before giving up with 409
+LOCK_WAIT_SECONDS = float(os.getenv("CHAT_TURN_LOCK_WAIT", "90"))
+# How long a client-supplied Idempotency-Key replays its stored result
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("CHAT_IDEMPOTENCY_TTL", "600"))
+# How often each worker deletes chat_turn_results rows no key can replay any more
+RESULT_CLEANUP_INTERVAL = int(os.getenv("CHAT_RESULT_CLEANUP_INTERVAL", "300"))
+
+
+class ChatTurnBusy(Exception):
+    """Another turn for the session held the lock for longer than LOCK_WAIT_SECONDS"""
+
+
+class ChatTurnGuard:
+    """Runs one chat turn per session at a time across workers and answers duplicate submits with the first result"""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        # session_id -> [lock, number of requests holding or waiting for it]
+        self.local_locks: Dict[str, list] = {}
+        self.inflight: Dict[str, asyncio.Future] = {}
+        # Idempotency key -> (finished_at, result) for this worker's recent keyed turns
+        self.recent: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self.lease_available = True
+        self.results_available = True
+        self.cleanup_task: Optional[asyncio.Task] = None
+        self.stats = {"turns": 0, "duplicates": 0, "lock_waits": 0, "busy": 0}
+
+    def make_key(self, user_id: str, session_id: str, content: str, idempotency_key: Optional[str]) -> str:
+        """Client key when sent, otherwise the message content"""
+
+        if idempotency_key:
+            return f"{user_id}:{session_id}:key:{idempotency_key[:128]}"
+        digest = hashlib.sha1(content.strip().encode("utf-8")).hexdigest()
+        return f"{user_id}:{session_id}:content:{digest}"
+
+    async def run(self, user_id: str, session_id: str, content: str, idempotency_key: Optional[str],
+                  compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        key = self.make_key(user_id, session_id, content, idempotency_key)
+        arrived_at = datetime.now(timezone.utc)
+        # A keyed retry replays for IDEMPOTENCY_TTL_SECONDS. Without a key, the same text only counts as a
+        # double submit while the first is still running - "Accept" twice in a row is two real turns.
+        replay_after = arrived_at - timedelta(seconds=IDEMPOTENCY_TTL_SECONDS) if idempotency_key else arrived_at
+
+        self._start_cleanup()
+
+        # Same worker, first submit still running: share its result
+        inflight = self.inflight.get(key)
+        if inflight is not None:
+            self._duplicate("inflight", session_id)
+            return await asyncio.shield(inflight)
+
+        cached = self._recent_result(key) if idempotency_key else None
+        if cached is not None:
+            self._duplicate("recent", session_id)
+            return cached
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            async with self.session_lock(session_id):
+                # The first submit may have finished on another worker while this one waited
+                stored = await asyncio.to_thread(self._load_result, session_id, key, replay_after)
+                if stored is not None:
+                    self._duplicate("stored", session_id)
+                    result = stored
+                else:
+                    self.stats["turns"] += 1
+                    result = await compute()
+                    await asyncio.to_thread(self._store_result, session_id, key, result)
+            if idempotency_key:
+                self.recent[key] = (time.monotonic(), result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # The first submit's client went away mid-turn; its duplicates get a 409 to retry, not a 500
+            future.set_exception(ChatTurnBusy(session_id))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Only awaited by duplicates; mark retrieved so a lone failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            self.inflight.pop(key, None)
+            self._prune_recent()
+
+    @asynccontextmanager
+    async def session_lock(self, session_id: str):
+        """Per-worker asyncio lock plus a cross-worker lease row, held for one turn"""
+
+        entry = self.local_locks.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        lock = entry[0]
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(lock.acquire(), LOCK_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            self.stats["busy"] += 1
+            self._unref_lock(session_id, entry)
+            raise ChatTurnBusy(session_id)
+        except BaseException:
+            self._unref_lock(session_id, entry)
+            raise
+
+        owner = None
+        try:
+            owner = await self._acquire_lease(session_id, started)
+            waited = time.perf_counter() - started
+            CHAT_LOCK_WAIT.observe(waited)
+            if waited > 0.05:
+                self.stats["lock_waits"] += 1
+            yield
+        finally:
+            if owner:
+                await asyncio.to_thread(self._release_lease, session_id, owner)
+            lock.release()
+            self._unref_lock(session_id, entry)
+
+    def _unref_lock(self, session_id: str, entry: list):
+        entry[1] -= 1
+        if entry[1] == 0 and self.local_locks.get(session_id) is entry:
+            del self.local_locks[session_id]
+
+    async def _acquire_lease(self, session_id: str, started: float) -> Optional[str]:
+        if not self.lease_available:
+            return None
+
+        owner = f"{self.worker_id}:{uuid.uuid4().hex[:8]}"
+        delay = 0.05
+        while True:
+            try:
+                acquired = (await asyncio.to_thread(supabase.rpc("try_acquire_chat_turn_lock", {
+                    "p_session_id": session_id,
+                    "p_owner": owner,
+                    "p_ttl_seconds": LOCK_TTL_SECONDS
+                }).execute)).data
+            except Exception as e:
+                if is_missing_function(e):
+                    # Schema not migrated yet - fall back to per-worker locking
+                    logger.warning("try_acquire_chat_turn_lock RPC not available - chat turns are serialized per worker only")
+                    self.lease_available = False
+                    return None
+                raise
+
+            if acquired:
+                return owner
+            if time.perf_counter() - started > LOCK_WAIT_SECONDS:
+                self.stats["busy"] += 1
+                raise ChatTurnBusy(session_id)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+    def _release_lease(self, session_id: str, owner: str):
+        try:
+            supabase.from_("chat_turn_locks").delete().eq("session_id", session_id).eq("owner", owner).execute()
+        except Exception as e:
+            # The lease expires on its own after LOCK_TTL_SECONDS
+            logger.warning("Could not release chat turn lock: %s", e, extra={"session_id": session_id})
+
+    def _load_result(self, session_id: str, key: str, finished_after: datetime) -> Optional[Dict[str, Any]]:
+        if not self.results_available:
+            return None
+        try:
+            response = supabase.from_("chat_turn_results") \
+                .select("response") \
+                .eq("session_id", session_id) \
+                .eq("idempotency_key", key) \
+                .gte("created_at", finished_after.isoformat()) \
+                .limit(1) \
+                .execute()
+        except Exception as e:
+            self._results_unavailable(e)
+            return None
+        return response.data[0]["response"] if response.data else None
+
+    def _store_result(self, session_id: str, key: str, result: Dict[str, Any]):
+        if not self.results_available:
+            return
+        try:
+            supabase.from_("chat_turn_results").upsert({
+                "session_id": session_id,
+                "idempotency_key": key,
+                "response": result,
+                "created_at": datetime.now(timezone.utc).isoformat()
+            }, on_conflict="session_id,idempotency_key").execute()
+        except Exception as e:
+            self._results_unavailable(e)
+
+    def _start_cleanup(self):
+        if self.cleanup_task is None or self.cleanup_task.done():
+            self.cleanup_task = asyncio.get_running_loop().create_task(self._cleanup_results())
+
+    async def _cleanup_results(self):
+        """Keep chat_turn_results small: one delete of every expired row per interval, off the turn path"""
+
+        while self.results_available:
+            await asyncio.sleep(RESULT_CLEANUP_INTERVAL)
+            expired = (datetime.now(timezone.utc) - timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)).isoformat()
+            try:
+                await asyncio.to_thread(supabase.from_("chat_turn_results").delete().lt("created_at", expired).execute)
+            except Exception as e:
+                self._results_unavailable(e)
+
+    def _results_unavailable(self, error: Exception):
+        if is_missing_table(error):
+            logger.warning("chat_turn_results table not available - duplicate submits are suppressed per worker only")
+            self.results_available = False
+        else:
+            logger.warning("Chat turn result store failed: %s", error)
+
+    def _recent_result(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.recent.get(key)
+        if entry is None:
+            return None
+        finished_at, result = entry
+        if time.monotonic() - finished_at > IDEMPOTENCY_TTL_SECONDS:
+            del self.recent[key]
+            return None
+        return result
+
+    def _prune_recent(self):
+        now = time.monotonic()
+        for key in [key for key, (finished_at, _) in self.recent.items() if now - finished_at > IDEMPOTENCY_TTL_SECONDS]:
+            del self.recent[key]
+
+    def _duplicate(self, source: str, session_id: str):
+        self.stats["duplicates"] += 1
+        CHAT_DUPLICATES.inc(source=source)
+        logger.info("Duplicate chat submit answered from %s result", source, extra={"session_id": session_id})
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "inflight": len(self.inflight),
+            "locked_sessions": len(self.local_locks),
+            "lease_available": self.lease_available,
+            "results_available": self.results_available
+        }
+
+
+# Global instance
+chat_turn_guard = ChatTurnGuard()
@@ -3,10 +3,11 @@ import json
 import asyncio
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-import aiohttp
+from functools import cached_property
 from dataclasses import dataclass
 from enum import Enum
 import logging
+from utils.metrics import record_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -43,9 +44,13 @@ class CredibleResourcesManager:
     """Manages credible resources and data sources for RAG research"""
     
     def __init__(self):
-        self.resources = self._initialize_resources()
         self.resource_cache = {}
         self.cache_expiry = timedelta(hours=24)
+
+    @cached_property
+    def resources(self) -> Dict[str, CredibleResource]:
+        # Built on first use so importing the module stays cheap
+        return self._initialize_resources()
     
     def _initialize_resources(self) -> Dict[str, CredibleResource]:
         """Initialize comprehensive list of credible resources"""
@@ -308,6 +313,7 @@ class CredibleResourcesManager:
     async def validate_resource_accessibility(self, resource: CredibleResource) -> bool:
         """Validate if a resource is accessible and up-to-date"""
         try:
+            import aiohttp
             async with aiohttp.ClientSession() as session:
                 async with session.get(resource.url, timeout=10) as response:
                     if response.status == 200:
@@ -326,7 +332,9 @@ class CredibleResourcesManager:
         if cache_key in self.resource_cache:
             cached_data, timestamp = self.resource_cache[cache_key]
             if datetime.now() - timestamp < self.cache_expiry:
+                record_cache("credible_resources", True)
                 return cached_data
+        record_cache("credible_resources", False)
         
         try:
             # Simulate API call (in real implementation, you'd make actual API calls)
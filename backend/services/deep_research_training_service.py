@@ -4,6 +4,7 @@ import asyncio
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
+from functools import cached_property
 from enum import Enum
 import logging
 from services.credible_resources_service import credible_resources_manager, CredibleResource, ResourceType, CredibilityLevel
@@ -31,9 +32,13 @@ class DeepResearchTrainingManager:
     """Manages deep research training data for specialized agents"""
     
     def __init__(self):
-        self.agent_training_data = self._initialize_agent_training_data()
         self.research_cache = {}
         self.training_queries_cache = {}
+
+    @cached_property
+    def agent_training_data(self) -> Dict[AgentType, AgentTrainingData]:
+        # Built on first use so importing the module stays cheap
+        return self._initialize_agent_training_data()
     
     def _initialize_agent_training_data(self) -> Dict[AgentType, AgentTrainingData]:
         """Initialize comprehensive training data for each specialized agent"""
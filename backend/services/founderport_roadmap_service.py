@@ -1,8 +1,8 @@
-from openai import AsyncOpenAI
-import os
+from utils.openai_client import get_openai_client
+from utils.circuit_breaker import openai_breaker
 from datetime import datetime
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_openai_client()
 
 async def generate_founderport_style_roadmap(session_data, history):
     """
@@ -28,6 +28,11 @@ async def generate_founderport_style_roadmap(session_data, history):
     # Extract state from location if possible
     state = extract_state_from_location(location)
     
+    # OpenAI is failing right now - serve the template roadmap instead of waiting for a timeout
+    if openai_breaker("gpt-4o").is_open:
+        print("⚡ OpenAI circuit open - using fallback roadmap")
+        return generate_fallback_roadmap(business_name, founder_name, location, legal_structure, state)
+    
     # Extract all business plan answers for context
     user_responses = [msg.get('content', '') for msg in history if msg.get('role') == 'user']
     conversation_text = ' '.join(user_responses[-50:])  # Last 50 responses
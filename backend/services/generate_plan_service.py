@@ -1,10 +1,9 @@
-from openai import AsyncOpenAI
-import os
+from utils.openai_client import get_openai_client
 import json
 from datetime import datetime
 from services.angel_service import generate_business_plan_artifact, conduct_web_search
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_openai_client()
 
 async def generate_full_business_plan(history):
     """Generate comprehensive business plan with deep research"""
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Any, Optional, Set, Tuple
+from utils.metrics import record_cache
+from utils.llm_scheduler import llm_priority, SPECULATIVE
+
+# Prefetched results are kept for 10 minutes before they count as wasted
+PREFETCH_TTL = int(os.getenv("IMPLEMENTATION_PREFETCH_TTL", "600"))
+# Maximum number of speculative jobs a single user may have in flight
+MAX_PREFETCH_PER_USER = int(os.getenv("IMPLEMENTATION_PREFETCH_PER_USER", "3"))
+PREFETCH_ENABLED = os.getenv("IMPLEMENTATION_PREFETCH_ENABLED", "true").lower() == "true"
+
+PREFETCH_KINDS = ("guidance", "providers", "kickstart")
+
+
+def _context_key(session_data: Dict[str, Any]) -> str:
+    """Identity of the business context a job was generated for"""
+
+    return json.dumps(session_data, sort_keys=True, default=str)
+
+
+class ImplementationTaskPrefetcher:
+    """Speculatively warms kickstart data for the next implementation task"""
+
+    def __init__(self, task_manager):
+        self.task_manager = task_manager
+        # (session_id, task_id, kind) -> entry dict
+        self.entries: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.stats = {
+            "scheduled": 0,
+            "hits": 0,
+            "misses": 0,
+            "wasted": 0,
+            "cancelled": 0,
+            "skipped_budget": 0,
+            "failed": 0
+        }
+
+    def prefetch_next_task(self, session_id: str, user_id: str, current_task_id: str, session_data: Dict[str, Any]) -> Optional[str]:
+        """Start warming the task after current_task_id and drop stale speculation for the session"""
+
+        next_task_id = self.task_manager.get_following_task(current_task_id)
+
+        # The user navigated: anything not for the current or next task will not be used
+        self.cancel_session(session_id, keep_task_ids={current_task_id, next_task_id})
+        self._evict_expired()
+
+        if not PREFETCH_ENABLED or not next_task_id:
+            return None
+
+        context = _context_key(session_data)
+        for kind in PREFETCH_KINDS:
+            key = (session_id, next_task_id, kind)
+            entry = self.entries.get(key)
+            if entry and entry["context"] == context:
+                continue
+            if entry:
+                self._discard(key)
+            if self._inflight_for_user(user_id) >= MAX_PREFETCH_PER_USER:
+                self.stats["skipped_budget"] += 1
+                print(f"⏸️ Prefetch budget reached for user {user_id} - skipping {kind} for {next_task_id}")
+                continue
+            self._start(key, user_id, session_data, speculative=True)
+            self.stats["scheduled"] += 1
+
+        print(f"🔮 Prefetching implementation task {next_task_id} for session {session_id}")
+        return next_task_id
+
+    async def get_kickstart_bundle(self, session_id: str, user_id: str, task_id: str, session_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Get providers, agent guidance and kickstart plan for a task, reusing prefetched work"""
+
+        providers_job = self._claim((session_id, task_id, "providers"), user_id, session_data)
+        guidance_job = self._claim((session_id, task_id, "guidance"), user_id, session_data)
+        plan_job = self._claim((session_id, task_id, "kickstart"), user_id, session_data)
+
+        providers, guidance, plan = await asyncio.gather(
+            asyncio.shield(providers_job),
+            asyncio.shield(guidance_job),
+            asyncio.shield(plan_job)
+        )
+
+        return {
+            "providers": providers,
+            "agent_guidance": guidance,
+            "plan": plan
+        }
+
+    def cancel_session(self, session_id: str, keep_task_ids: Optional[Set[str]] = None):
+        """Cancel speculative work for a session, except for the given task ids"""
+
+        keep_task_ids = keep_task_ids or set()
+        for key in list(self.entries.keys()):
+            if key[0] == session_id and key[1] not in keep_task_ids:
+                self._discard(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/waste counters for the prefetcher"""
+
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "in_flight": sum(1 for entry in self.entries.values() if not entry["job"].done()),
+            "cached": len(self.entries),
+            "enabled": PREFETCH_ENABLED
+        }
+
+    def _claim(self, key: Tuple[str, str, str], user_id: str, session_data: Dict[str, Any]) -> asyncio.Task:
+        """Return the job for key, starting it on a miss, and mark it as used"""
+
+        entry = self.entries.get(key)
+        # An entry warmed for a business context that has changed since is not reused
+        if entry and entry["context"] == _context_key(session_data) and self._is_usable(entry):
+            if entry["speculative"] and not entry["consumed"]:
+                self.stats["hits"] += 1
+                record_cache("implementation_prefetch", True)
+                print(f"🎯 Prefetch hit: {key[2]} for {key[1]}")
+            entry["consumed"] = True
+            return entry["job"]
+
+        if entry:
+            self._discard(key)
+
+        self.stats["misses"] += 1
+        record_cache("implementation_prefetch", False)
+        return self._start(key, user_id, session_data, speculative=False)["job"]
+
+    def _start(self, key: Tuple[str, str, str], user_id: str, session_data: Dict[str, Any], speculative: bool) -> Dict[str, Any]:
+        """Create the background job for a (session, task, kind) key"""
+
+        entry = {
+            "job": asyncio.create_task(self._generate(key, user_id, session_data, speculative)),
+            "user_id": user_id,
+            "context": _context_key(session_data),
+            "created_at": time.monotonic(),
+            "speculative": speculative,
+            "consumed": not speculative
+        }
+        self.entries[key] = entry
+        return entry
+
+    async def _generate(self, key: Tuple[str, str, str], user_id: str, session_data: Dict[str, Any], speculative: bool) -> Any:
+        """Run the generator behind a prefetch kind"""
+
+        if speculative:
+            # Lowest LLM priority: shed first when capacity is short, and a miss regenerates on demand
+            with llm_priority(SPECULATIVE, user_id):
+                return await self._run_generator(key, session_data)
+        return await self._run_generator(key, session_data)
+
+    async def _run_generator(self, key: Tuple[str, str, str], session_data: Dict[str, Any]) -> Any:
+        session_id, task_id, kind = key
+        try:
+            if kind == "guidance":
+                return await self.task_manager.get_kickstart_guidance(task_id, session_data)
+            if kind == "providers":
+                return await self.task_manager.get_kickstart_providers(task_id, session_data)
+
+            guidance_entry = self.entries.get((session_id, task_id, "guidance"))
+            if guidance_entry and self._is_usable(guidance_entry):
+                guidance = await asyncio.shield(guidance_entry["job"])
+            else:
+                guidance = await self.task_manager.get_kickstart_guidance(task_id, session_data)
+            return await self.task_manager.generate_kickstart_plan(task_id, session_data, guidance)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"❌ Prefetch {kind} for {task_id} failed: {e}")
+            raise
+
+    def _is_usable(self, entry: Dict[str, Any]) -> bool:
+        """Check that an entry is fresh and did not fail"""
+
+        if time.monotonic() - entry["created_at"] > PREFETCH_TTL:
+            return False
+        job = entry["job"]
+        return not (job.done() and (job.cancelled() or job.exception() is not None))
+
+    def _discard(self, key: Tuple[str, str, str]):
+        """Drop an entry, cancelling it if still running and recording waste"""
+
+        entry = self.entries.pop(key, None)
+        if not entry:
+            return
+        if entry["consumed"]:
+            # A request is awaiting this job - let it finish
+            return
+        if entry["speculative"]:
+            self.stats["wasted"] += 1
+        if not entry["job"].done():
+            entry["job"].cancel()
+            self.stats["cancelled"] += 1
+
+    def _evict_expired(self):
+        """Remove entries older than the prefetch TTL"""
+
+        now = time.monotonic()
+        for key, entry in list(self.entries.items()):
+            if now - entry["created_at"] > PREFETCH_TTL:
+                self._discard(key)
+
+    def _inflight_for_user(self, user_id: str) -> int:
+        """Count speculative jobs still running for a user"""
+
+        return sum(
+            1 for entry in self.entries.values()
+            if entry["user_id"] == user_id and entry["speculative"] and not entry["job"].done()
+        )
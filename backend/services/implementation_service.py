@@ -1,12 +1,11 @@
-from openai import AsyncOpenAI
-import os
+from utils.openai_client import get_openai_client
 import json
 import re
 from datetime import datetime
 from typing import Dict, List, Optional
 from utils.constant import ANGEL_SYSTEM_PROMPT
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_openai_client()
 
 # Implementation task structure
 IMPLEMENTATION_TASKS = {
@@ -1,70 +1,20 @@
-from openai import AsyncOpenAI
-import os
+from utils.openai_client import get_openai_client
 import json
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from services.specialized_agents_service import agents_manager
 from services.rag_service import conduct_rag_research, validate_with_rag, generate_rag_insights
 from services.service_provider_tables_service import generate_provider_table, get_task_providers
+from services.provider_directory_service import provider_directory
+from utils.progress import IMPLEMENTATION_TASK_PHASES
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_openai_client()
 
 class ImplementationTaskManager:
     """Manages implementation tasks with RAG-powered guidance and service providers"""
     
     def __init__(self):
-        self.task_phases = {
-            "legal_formation": {
-                "name": "Legal Formation & Compliance",
-                "tasks": [
-                    "business_structure_selection",
-                    "business_registration",
-                    "tax_id_application",
-                    "permits_licenses",
-                    "insurance_requirements"
-                ]
-            },
-            "financial_setup": {
-                "name": "Financial Planning & Setup",
-                "tasks": [
-                    "business_bank_account",
-                    "accounting_system",
-                    "budget_planning",
-                    "funding_strategy",
-                    "financial_tracking"
-                ]
-            },
-            "operations_development": {
-                "name": "Product & Operations Development",
-                "tasks": [
-                    "supply_chain_setup",
-                    "equipment_procurement",
-                    "operational_processes",
-                    "quality_control",
-                    "inventory_management"
-                ]
-            },
-            "marketing_sales": {
-                "name": "Marketing & Sales Strategy",
-                "tasks": [
-                    "brand_development",
-                    "marketing_strategy",
-                    "sales_process",
-                    "customer_acquisition",
-                    "digital_presence"
-                ]
-            },
-            "launch_scaling": {
-                "name": "Full Launch & Scaling",
-                "tasks": [
-                    "go_to_market",
-                    "team_building",
-                    "performance_monitoring",
-                    "growth_strategies",
-                    "customer_feedback"
-                ]
-            }
-        }
+        self.task_phases = IMPLEMENTATION_TASK_PHASES
     
     async def get_next_implementation_task(self, session_data: Dict[str, Any], completed_tasks: List[str]) -> Dict[str, Any]:
         """Get the next implementation task based on progress"""
@@ -104,7 +54,67 @@ class ImplementationTaskManager:
                     return phase_key, task_id
         
         return None, None
-    
+
+    def get_following_task(self, task_id: str) -> Optional[str]:
+        """Get the task that comes after task_id in the fixed task order"""
+
+        ordered_tasks = [task for phase_data in self.task_phases.values() for task in phase_data["tasks"]]
+        if task_id not in ordered_tasks:
+            return None
+
+        index = ordered_tasks.index(task_id)
+        return ordered_tasks[index + 1] if index + 1 < len(ordered_tasks) else None
+
+    async def get_kickstart_guidance(self, task_id: str, session_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Get multi-agent guidance used to build a task's kickstart plan"""
+
+        return await agents_manager.get_multi_agent_guidance(
+            f"Create a detailed kickstart plan for implementation task: {task_id}",
+            session_data,
+            []
+        )
+
+    async def get_kickstart_providers(self, task_id: str, session_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the task-specific provider table shown with a kickstart plan"""
+
+        return await get_task_providers(task_id, f"implementation task {task_id}", session_data)
+
+    async def generate_kickstart_plan(self, task_id: str, session_data: Dict[str, Any], kickstart_guidance: Dict[str, Any]) -> str:
+        """Generate the kickstart plan text for a task from agent guidance"""
+
+        kickstart_prompt = f"""
+        Create a detailed kickstart plan for implementation task: {task_id}
+
+        Business Context: {session_data}
+        Agent Guidance: {kickstart_guidance}
+
+        Generate a comprehensive kickstart plan including:
+        1. Overview: What this kickstart plan will accomplish
+        2. Sub-steps: Detailed breakdown of actions
+        3. Angel Actions: Specific actions Angel can perform for each sub-step
+        4. Timeline: Estimated timeline for completion
+        5. Resources: Required resources and tools
+        6. Success Metrics: How to measure progress
+
+        For each sub-step, specify what Angel can do:
+        - Draft documents
+        - Research requirements
+        - Create templates
+        - Connect with providers
+        - Analyze options
+
+        Format as structured plan with clear action items.
+        """
+
+        response = await client.chat.completions.create(
+            model="gpt-4o",
+            messages=[{"role": "user", "content": kickstart_prompt}],
+            temperature=0.3,
+            max_tokens=2000
+        )
+
+        return response.choices[0].message.content
+
     async def _generate_task_details(self, task_id: str, session_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate detailed task information using RAG research"""
         
@@ -292,97 +302,9 @@ class ImplementationTaskManager:
     def _get_predefined_service_providers(self, task_id: str, session_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Get predefined service providers for faster response"""
         
-        providers_map = {
-            "business_structure_selection": [
-                {
-                    "name": "Local Business Attorney",
-                    "type": "Legal Professional",
-                    "local": True,
-                    "description": "Local attorney specializing in business formation and legal structure selection",
-                    "estimated_cost": "$200-500/hour",
-                    "contact_method": "Phone or email consultation",
-                    "specialties": "Business formation, legal structure, compliance"
-                },
-                {
-                    "name": "Online Legal Services",
-                    "type": "Legal Service Provider",
-                    "local": False,
-                    "description": "Online legal services for business formation and structure selection",
-                    "estimated_cost": "$100-300",
-                    "contact_method": "Online platform",
-                    "specialties": "Business formation, legal documents, compliance"
-                },
-                {
-                    "name": "Business Formation Service",
-                    "type": "Business Services",
-                    "local": True,
-                    "description": "Local business formation service for startups and small businesses",
-                    "estimated_cost": "$150-400",
-                    "contact_method": "Phone or in-person consultation",
-                    "specialties": "Business formation, registration, compliance"
-                }
-            ],
-            "business_registration": [
-                {
-                    "name": "State Business Registration Service",
-                    "type": "Government Service",
-                    "local": False,
-                    "description": "Official state business registration service",
-                    "estimated_cost": "$50-200 (filing fees)",
-                    "contact_method": "Online or mail",
-                    "specialties": "Business registration, state compliance"
-                },
-                {
-                    "name": "Local Business Consultant",
-                    "type": "Business Consultant",
-                    "local": True,
-                    "description": "Local consultant specializing in business registration and setup",
-                    "estimated_cost": "$100-300/hour",
-                    "contact_method": "Phone or in-person consultation",
-                    "specialties": "Business registration, compliance, setup"
-                },
-                {
-                    "name": "Online Business Formation Platform",
-                    "type": "Online Service",
-                    "local": False,
-                    "description": "Online platform for business registration and formation",
-                    "estimated_cost": "$100-500",
-                    "contact_method": "Online platform",
-                    "specialties": "Business registration, formation, compliance"
-                }
-            ],
-            "tax_id_application": [
-                {
-                    "name": "IRS EIN Application",
-                    "type": "Government Service",
-                    "local": False,
-                    "description": "Free online EIN application through IRS website",
-                    "estimated_cost": "Free",
-                    "contact_method": "Online application",
-                    "specialties": "EIN application, tax ID, business registration"
-                },
-                {
-                    "name": "Local Tax Professional",
-                    "type": "Tax Professional",
-                    "local": True,
-                    "description": "Local tax professional for EIN application and tax setup",
-                    "estimated_cost": "$100-250",
-                    "contact_method": "Phone or in-person consultation",
-                    "specialties": "EIN application, tax setup, compliance"
-                },
-                {
-                    "name": "Business Tax Service",
-                    "type": "Tax Service",
-                    "local": True,
-                    "description": "Local business tax service for startups and small businesses",
-                    "estimated_cost": "$150-300",
-                    "contact_method": "Phone or in-person consultation",
-                    "specialties": "Tax setup, EIN application, compliance"
-                }
-            ]
-        }
+        task_providers = provider_directory.lookup(task_id, location=session_data.get("location"))
         
-        return providers_map.get(task_id, [
+        return task_providers or [
             {
                 "name": "Local Business Professional",
                 "type": "Business Services",
@@ -410,4 +332,4 @@ class ImplementationTaskManager:
                 "contact_method": "Phone or in-person consultation",
                 "specialties": "Business strategy, setup, compliance"
             }
-        ])
\ No newline at end of file
+        ]
\ No newline at end of file
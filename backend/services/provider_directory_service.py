@@ -0,0 +1,275 @@
+import asyncio
+import copy
+import os
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple
+from db.supabase import supabase
+from utils.metrics import record_cache
+from utils.provider_catalog import CATEGORY_PROVIDERS, TASK_TYPE_PROVIDERS, IMPLEMENTATION_TASK_PROVIDERS
+
+US_STATES = {
+    "alabama": "AL", "alaska": "AK", "arizona": "AZ", "arkansas": "AR", "california": "CA",
+    "colorado": "CO", "connecticut": "CT", "delaware": "DE", "florida": "FL", "georgia": "GA",
+    "hawaii": "HI", "idaho": "ID", "illinois": "IL", "indiana": "IN", "iowa": "IA",
+    "kansas": "KS", "kentucky": "KY", "louisiana": "LA", "maine": "ME", "maryland": "MD",
+    "massachusetts": "MA", "michigan": "MI", "minnesota": "MN", "mississippi": "MS", "missouri": "MO",
+    "montana": "MT", "nebraska": "NE", "nevada": "NV", "new hampshire": "NH", "new jersey": "NJ",
+    "new mexico": "NM", "new york": "NY", "north carolina": "NC", "north dakota": "ND", "ohio": "OH",
+    "oklahoma": "OK", "oregon": "OR", "pennsylvania": "PA", "rhode island": "RI", "south carolina": "SC",
+    "south dakota": "SD", "tennessee": "TN", "texas": "TX", "utah": "UT", "vermont": "VT",
+    "virginia": "VA", "washington": "WA", "west virginia": "WV", "wisconsin": "WI", "wyoming": "WY",
+    "district of columbia": "DC"
+}
+STATE_CODES = set(US_STATES.values())
+
+# Locations that mean "anywhere" and should not narrow a lookup
+GENERIC_LOCATIONS = {"", "united states", "usa", "us", "nationwide", "national", "remote", "online"}
+
+# Seconds a key with nothing persisted is not looked up in the database again
+LEARNED_MISS_TTL = float(os.getenv("PROVIDER_DIRECTORY_MISS_TTL", "300"))
+
+
+def parse_location(location: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Split a free-text location into a (state, city) pair"""
+
+    if not location:
+        return None, None
+
+    text = location.strip().lower()
+    if text in GENERIC_LOCATIONS:
+        return None, None
+
+    parts = [part.strip() for part in re.split(r",", text) if part.strip()]
+    parts = [part for part in parts if part not in GENERIC_LOCATIONS]
+    if not parts:
+        return None, None
+
+    state = None
+    city = None
+    for part in reversed(parts):
+        if part.upper() in STATE_CODES:
+            state = part.upper()
+            break
+        if part in US_STATES:
+            state = US_STATES[part]
+            break
+
+    remaining = [part for part in parts if not state or (part.upper() != state and US_STATES.get(part) != state)]
+    if remaining:
+        city = remaining[0]
+
+    return state, city
+
+
+class ProviderDirectory:
+    """Indexed provider store shared by every provider lookup path"""
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self.by_category: Dict[str, List[int]] = defaultdict(list)
+        self.by_subcategory: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        # (category, subcategory, state, city) keys that already hold generated providers
+        self.learned_keys = set()
+        # Keys with no persisted providers -> when that was last checked
+        self.missing_keys: Dict[Tuple[str, Optional[str], Optional[str], Optional[str]], float] = {}
+        self.loaded = False
+
+    def lookup(self, category: str, subcategory: Optional[str] = None, location: Optional[str] = None, is_local: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Find providers for a category, preferring entries learned for the location"""
+
+        self._ensure_loaded()
+
+        category = self._normalize(category)
+        if subcategory:
+            candidates = self.by_subcategory.get((category, self._normalize(subcategory)), [])
+        else:
+            candidates = self.by_category.get(category, [])
+
+        state, city = parse_location(location)
+        located = []
+        generic = []
+        for index in candidates:
+            record = self.records[index]
+            if is_local is not None and record["is_local"] != is_local:
+                continue
+            if record["source"] == "llm":
+                # Generated for one location: offered only to lookups for that same location
+                if (state or city) and record["state"] == state and record["city"] == city:
+                    located.append(record)
+            elif record["state"] is None:
+                generic.append(record)
+            elif record["state"] == state and (record["city"] is None or city is None or record["city"] == city):
+                located.append(record)
+
+        return [copy.deepcopy(record["provider"]) for record in located + generic]
+
+    async def lookup_learned(self, category: str, location: Optional[str] = None, subcategory: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Find providers previously generated for exactly this category and location"""
+
+        self._ensure_loaded()
+
+        key = self._learned_key(category, subcategory, location)
+        checked_at = self.missing_keys.get(key)
+        if key not in self.learned_keys and (checked_at is None or time.monotonic() - checked_at > LEARNED_MISS_TTL):
+            # Another worker may already have generated and persisted them
+            await self._load_persisted(key)
+        record_cache("provider_directory", key in self.learned_keys)
+        if key not in self.learned_keys:
+            return []
+
+        print(f"📇 Provider directory hit: {category} in {location or 'any location'}")
+        state, city = key[2], key[3]
+        return [
+            copy.deepcopy(record["provider"])
+            for record in (self.records[index] for index in self.by_category.get(key[0], []))
+            if record["source"] == "llm"
+            and record["subcategory"] == key[1]
+            and record["state"] == state
+            and record["city"] == city
+        ]
+
+    async def remember(self, category: str, providers: List[Dict[str, Any]], location: Optional[str] = None, subcategory: Optional[str] = None):
+        """Index generated providers and persist them to the service_providers table"""
+
+        self._ensure_loaded()
+
+        key = self._learned_key(category, subcategory, location)
+        if key in self.learned_keys:
+            return
+
+        state, city = key[2], key[3]
+        rows = []
+        for provider in providers:
+            if not isinstance(provider, dict) or not provider.get("name"):
+                continue
+            self._add(provider, key[0], key[1], state, city, location, "llm")
+            rows.append(self._to_row(provider, key[0], key[1], state, city, location))
+
+        self.learned_keys.add(key)
+        self.missing_keys.pop(key, None)
+
+        if not rows:
+            return
+        try:
+            await asyncio.to_thread(lambda: supabase.from_("service_providers").insert(rows).execute())
+            print(f"💾 Persisted {len(rows)} generated providers for {category} in {location or 'any location'}")
+        except Exception as e:
+            print(f"⚠️ Failed to persist generated providers: {e}")
+
+    def _ensure_loaded(self):
+        """Seed the index from the curated catalog once per process"""
+
+        if self.loaded:
+            return
+
+        for catalog in (CATEGORY_PROVIDERS, TASK_TYPE_PROVIDERS, IMPLEMENTATION_TASK_PROVIDERS):
+            for category, providers in catalog.items():
+                for provider in providers:
+                    self._add(provider, category, None, None, None, None, "curated")
+
+        self.loaded = True
+        print(f"📇 Provider directory loaded with {len(self.records)} curated providers")
+
+    async def _load_persisted(self, key: Tuple[str, Optional[str], Optional[str], Optional[str]]):
+        """Pull providers persisted for a key by any worker into the index"""
+
+        category, subcategory, state, city = key
+        try:
+            query = supabase.from_("service_providers").select("*").eq("category", category).eq("source", "llm")
+            query = query.eq("subcategory", subcategory) if subcategory else query.is_("subcategory", "null")
+            query = query.eq("state", state) if state else query.is_("state", "null")
+            query = query.eq("city", city) if city else query.is_("city", "null")
+            response = await asyncio.to_thread(query.execute)
+        except Exception as e:
+            print(f"⚠️ Failed to load persisted providers for {category}: {e}")
+            return
+
+        if key in self.learned_keys:
+            # Indexed by a concurrent lookup or remember() while the query ran
+            return
+        if not response.data:
+            self.missing_keys[key] = time.monotonic()
+            return
+
+        self.missing_keys.pop(key, None)
+        for row in response.data:
+            self._add(self._from_row(row), category, subcategory, state, city, row.get("location"), "llm")
+        self.learned_keys.add(key)
+
+    def _add(self, provider: Dict[str, Any], category: str, subcategory: Optional[str], state: Optional[str], city: Optional[str], location: Optional[str], source: str):
+        """Append a provider record and update every index"""
+
+        record = {
+            "provider": copy.deepcopy(provider),
+            "category": category,
+            "subcategory": subcategory,
+            "state": state,
+            "city": city,
+            "location": location,
+            "is_local": bool(provider.get("local", False)),
+            "source": source
+        }
+        index = len(self.records)
+        self.records.append(record)
+        self.by_category[category].append(index)
+        if subcategory:
+            self.by_subcategory[(category, subcategory)].append(index)
+
+    def _learned_key(self, category: str, subcategory: Optional[str], location: Optional[str]) -> Tuple[str, Optional[str], Optional[str], Optional[str]]:
+        """Build the (category, subcategory, state, city) key for generated providers"""
+
+        state, city = parse_location(location)
+        return self._normalize(category), self._normalize(subcategory) if subcategory else None, state, city
+
+    def _normalize(self, value: str) -> str:
+        """Normalize category names to the snake_case keys used by the catalog"""
+
+        return re.sub(r"[\s\-]+", "_", value.strip().lower())
+
+    def _to_row(self, provider: Dict[str, Any], category: str, subcategory: Optional[str], state: Optional[str], city: Optional[str], location: Optional[str]) -> Dict[str, Any]:
+        """Map a provider dict onto the service_providers columns"""
+
+        price = provider.get("estimated_cost") or provider.get("pricing")
+        contact = provider.get("contact_method") or provider.get("contact_info")
+        rating_match = re.search(r"\d+(\.\d+)?", str(provider.get("rating", "")))
+        rating = float(rating_match.group()) if rating_match else None
+
+        return {
+            "provider_name": str(provider.get("name"))[:255],
+            "provider_type": str(provider.get("type", "Service Provider"))[:100],
+            "category": category,
+            "subcategory": subcategory,
+            "is_local": bool(provider.get("local", False)),
+            "description": provider.get("description"),
+            "contact_info": {"contact": contact} if contact else {},
+            "rating": rating if rating is not None and 0 <= rating <= 5 else None,
+            "price_range": str(price)[:50] if price else None,
+            "location": location,
+            "website": provider.get("website"),
+            "state": state,
+            "city": city,
+            "source": "llm",
+            "metadata": provider
+        }
+
+    def _from_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild a provider dict from a service_providers row"""
+
+        if row.get("metadata"):
+            return row["metadata"]
+
+        return {
+            "name": row.get("provider_name"),
+            "type": row.get("provider_type"),
+            "local": row.get("is_local", False),
+            "description": row.get("description"),
+            "estimated_cost": row.get("price_range"),
+            "contact_method": (row.get("contact_info") or {}).get("contact"),
+            "website": row.get("website")
+        }
+
+
+# Global instance
+provider_directory = ProviderDirectory()
@@ -1,11 +1,11 @@
-from openai import AsyncOpenAI
-import os
+from utils.openai_client import get_openai_client
 import json
 from datetime import datetime
 from typing import Dict, List, Optional
 from services.angel_service import conduct_web_search
+from services.provider_directory_service import provider_directory
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_openai_client()
 
 # Provider categories and templates
 PROVIDER_CATEGORIES = {
@@ -34,6 +34,11 @@ PROVIDER_CATEGORIES = {
 async def generate_provider_table(task_type: str, industry: str, location: str, business_context: Dict = None) -> List[Dict]:
     """Generate a provider table for a specific task with local and national providers"""
     
+    # Providers already generated for this task type and location never hit the LLM again
+    learned_providers = await provider_directory.lookup_learned(task_type, location)
+    if learned_providers:
+        return learned_providers
+    
     try:
         # Conduct research for providers
         current_year = datetime.now().year
@@ -89,6 +94,7 @@ async def generate_provider_table(task_type: str, industry: str, location: str,
         # Try to parse JSON response
         try:
             providers = json.loads(provider_data)
+            await provider_directory.remember(task_type, providers, location)
             return providers
         except json.JSONDecodeError:
             # If JSON parsing fails, return default providers
@@ -101,109 +107,11 @@ async def generate_provider_table(task_type: str, industry: str, location: str,
 def get_default_providers(task_type: str, industry: str, location: str) -> List[Dict]:
     """Fallback provider recommendations when AI generation fails"""
     
-    default_providers = {
-        "legal_formation": [
-            {
-                "name": "LegalZoom",
-                "type": "Online Service",
-                "local": False,
-                "description": "Online legal document preparation and business formation services",
-                "key_considerations": "Cost-effective, standardized process, good for simple formations",
-                "contact_info": "www.legalzoom.com",
-                "pricing": "$149-$349 depending on state and services",
-                "rating": "4.5/5 stars"
-            },
-            {
-                "name": "Local Business Attorney",
-                "type": "Legal Professional",
-                "local": True,
-                "description": "Personalized legal advice and business formation assistance",
-                "key_considerations": "Industry-specific expertise, personalized service, higher cost",
-                "contact_info": "Search local business attorneys in your area",
-                "pricing": "$200-$500 per hour",
-                "rating": "Varies by attorney"
-            },
-            {
-                "name": "SCORE Business Mentor",
-                "type": "Free Consultation",
-                "local": True,
-                "description": "Volunteer business mentors offering free guidance",
-                "key_considerations": "Free service, experienced mentors, limited availability",
-                "contact_info": "www.score.org",
-                "pricing": "Free",
-                "rating": "Highly recommended"
-            }
-        ],
-        "banking": [
-            {
-                "name": "Chase Business",
-                "type": "Traditional Bank",
-                "local": True,
-                "description": "Full-service business banking with extensive branch network",
-                "key_considerations": "Convenient locations, comprehensive services, monthly fees",
-                "contact_info": "www.chase.com/business",
-                "pricing": "$15-$95 monthly depending on account type",
-                "rating": "4.2/5 stars"
-            },
-            {
-                "name": "Capital One Spark",
-                "type": "Online Banking",
-                "local": False,
-                "description": "Digital-first business banking with no monthly fees",
-                "key_considerations": "No monthly fees, online-only, good for tech-savvy businesses",
-                "contact_info": "www.capitalone.com/spark",
-                "pricing": "No monthly fees",
-                "rating": "4.3/5 stars"
-            },
-            {
-                "name": "Local Credit Union",
-                "type": "Credit Union",
-                "local": True,
-                "description": "Community-focused banking with personalized service",
-                "key_considerations": "Lower fees, community focus, limited services",
-                "contact_info": "Search local credit unions",
-                "pricing": "Varies, typically lower than banks",
-                "rating": "High customer satisfaction"
-            }
-        ],
-        "accounting": [
-            {
-                "name": "QuickBooks",
-                "type": "Software Platform",
-                "local": False,
-                "description": "Industry-leading accounting and bookkeeping software",
-                "key_considerations": "Comprehensive features, learning curve, integrates with many tools",
-                "contact_info": "www.quickbooks.intuit.com",
-                "pricing": "$15-$200/month depending on plan",
-                "rating": "4.4/5 stars"
-            },
-            {
-                "name": "Local CPA Firm",
-                "type": "Professional Service",
-                "local": True,
-                "description": "Certified public accountants offering bookkeeping and tax services",
-                "key_considerations": "Expert guidance, compliance assurance, ongoing support",
-                "contact_info": "Search local CPA firms",
-                "pricing": "$100-$300/hour",
-                "rating": "Professional expertise"
-            },
-            {
-                "name": "Wave",
-                "type": "Software Platform",
-                "local": False,
-                "description": "Free accounting software for small businesses",
-                "key_considerations": "Free basic features, good for simple businesses, limited support",
-                "contact_info": "www.waveapps.com",
-                "pricing": "Free basic plan",
-                "rating": "4.2/5 stars"
-            }
-        ]
-    }
+    default_providers = provider_directory.lookup(task_type, location=location)
     
     # Return appropriate providers based on task type
-    task_key = task_type.lower().replace(" ", "_")
-    if task_key in default_providers:
-        return default_providers[task_key]
+    if default_providers:
+        return default_providers
     else:
         # Generic fallback
         return [
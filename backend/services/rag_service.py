@@ -1,13 +1,13 @@
-from openai import AsyncOpenAI
-import os
+from utils.openai_client import get_openai_client
 import json
 import re
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 import asyncio
-from services.angel_service import conduct_web_search
+from services.retrieval_service import research_retriever, search_source
+from utils.metrics import record_cache
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_openai_client()
 
 class RAGResearchEngine:
     """Retrieval Augmentation Generation engine for comprehensive research"""
@@ -52,7 +52,9 @@ class RAGResearchEngine:
             cached_result = self.cache[cache_key]
             if (datetime.now() - cached_result['timestamp']).seconds < self.cache_ttl:
                 print(f"📋 Using cached research for: {query[:50]}...")
+                record_cache("rag_research", True)
                 return cached_result['data']
+        record_cache("rag_research", False)
         
         # Enhance query with business context
         enhanced_query = self._enhance_query(query, business_context)
@@ -201,7 +203,7 @@ class RAGResearchEngine:
         
         try:
             search_query = f"site:{source} {query}"
-            result = await conduct_web_search(search_query)
+            result = await search_source(source, query, category)
             
             return {
                 "source": source,
@@ -265,6 +267,12 @@ class RAGResearchEngine:
                 if result["result"]:
                     research_data.append(f"Source: {result['source']} ({category})\n{result['result']}")
         
+        # Ground the analysis in curated reference documents when any are relevant
+        await research_retriever.ensure_loaded()
+        reference_documents = research_retriever.retrieve_text(original_query, kind="document")
+        if reference_documents:
+            research_data.append(f"Source: Founderport reference library\n{reference_documents}")
+        
         if not research_data:
             return "No research data available for analysis."
         
@@ -442,7 +450,9 @@ class RAGServiceProviderEngine:
         if cache_key in self.cache:
             cache_entry = self.cache[cache_key]
             if (datetime.now() - cache_entry['timestamp']).seconds < self.cache_ttl:
+                record_cache("rag_providers", True)
                 return cache_entry['data']
+        record_cache("rag_providers", False)
         
         # Determine relevant sources for the service type
         relevant_sources = self.provider_sources.get(service_type, self.provider_sources["general"])
@@ -490,7 +500,7 @@ class RAGServiceProviderEngine:
         
         try:
             search_query = f"site:{source} {query}"
-            result = await conduct_web_search(search_query)
+            result = await search_source(source, query, service_type)
             
             return {
                 "source": source,
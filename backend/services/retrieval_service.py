@@ -0,0 +1,289 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional
+from db.supabase import supabase
+from utils.metrics import record_cache
+from services.angel_service import conduct_web_search
+from utils.retrieval import BM25Index
+
+# Fraction of the best possible BM25 score a chunk needs to be served instead of a live search
+MIN_RELEVANCE = float(os.getenv("RETRIEVAL_MIN_RELEVANCE", "0.35"))
+# Most recent research rows pulled into the index at startup
+PRELOAD_LIMIT = int(os.getenv("RETRIEVAL_PRELOAD_LIMIT", "5000"))
+# How often to pick up rows persisted by other workers
+REFRESH_INTERVAL = int(os.getenv("RETRIEVAL_REFRESH_INTERVAL", "300"))
+# Research older than this is dropped from the index and no longer loaded
+MAX_RESEARCH_AGE_DAYS = float(os.getenv("RETRIEVAL_MAX_AGE_DAYS", "30"))
+# Most research results kept indexed; the oldest are evicted past this
+MAX_RESEARCH = int(os.getenv("RETRIEVAL_MAX_RESEARCH", str(PRELOAD_LIMIT)))
+# Optional sentence-transformers model used to rerank BM25 candidates
+EMBEDDING_MODEL = os.getenv("RETRIEVAL_EMBEDDING_MODEL")
+
+
+class ResearchRetriever:
+    """BM25 retrieval over rag_documents and persisted research_sources"""
+
+    def __init__(self):
+        self.index = BM25Index()
+        self.loaded = False
+        self.last_refresh = 0.0
+        # created_at of the newest research_sources row loaded, as written by the database
+        self.last_loaded_at: Optional[str] = None
+        # Indexed research key -> created_at, oldest first, for age and size eviction
+        self.research_keys: "OrderedDict[str, datetime]" = OrderedDict()
+        self.embedder = None
+        self.embedding_cache: Dict[str, Any] = {}
+        # Loads and stores run in worker threads; index writes go through one at a time
+        self.lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stored": 0,
+            "evicted": 0,
+            "retrieval_ms_total": 0.0,
+            "retrievals": 0
+        }
+
+    def retrieve(self, query: str, k: int = 5, source: Optional[str] = None, category: Optional[str] = None, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the most relevant indexed chunks for a query (await ensure_loaded first)"""
+
+        started = time.perf_counter()
+        filters = {}
+        if source:
+            filters["source"] = source
+        if category:
+            filters["category"] = category
+        if kind:
+            filters["kind"] = kind
+
+        candidates = self.index.search(query, k=k * 4 if EMBEDDING_MODEL else k, filters=filters or None)
+        bound = self.index.max_possible_score(query)
+        for candidate in candidates:
+            candidate["relevance"] = round(candidate["score"] / bound, 3) if bound else 0.0
+
+        results = self._rerank(query, candidates)[:k]
+
+        self.stats["retrievals"] += 1
+        self.stats["retrieval_ms_total"] += (time.perf_counter() - started) * 1000
+        return results
+
+    def retrieve_text(self, query: str, source: Optional[str] = None, category: Optional[str] = None, kind: Optional[str] = None, k: int = 3) -> Optional[str]:
+        """Return retrieved research as prompt-ready text, or None when nothing is relevant enough"""
+
+        results = [r for r in self.retrieve(query, k=k, source=source, category=category, kind=kind) if r["relevance"] >= MIN_RELEVANCE]
+        record_cache("research_retrieval", bool(results))
+        if not results:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return "\n\n".join(result["text"] for result in results)
+
+    def store_research(self, query: str, content: str, source: str, category: str, source_type: str = "web_search"):
+        """Index a research result and persist it to research_sources"""
+
+        self._ensure_loaded()
+
+        metadata = {"source": source, "category": category, "query": query, "kind": "research"}
+        key = None
+        created_at = None
+        try:
+            response = supabase.from_("research_sources").insert({
+                "query": query[:500],
+                "source_type": source_type,
+                "source_url": source,
+                "content": content,
+                "metadata": metadata
+            }).execute()
+            if response.data:
+                key = f"research:{response.data[0]['id']}"
+                created_at = _parse_timestamp(response.data[0].get("created_at"))
+        except Exception as e:
+            print(f"⚠️ Failed to persist research for {source}: {e}")
+
+        if key is None:
+            key = f"research:{hashlib.sha1((source + query + content).encode()).hexdigest()}"
+
+        with self.lock:
+            self._add_research(key, content, metadata, created_at)
+        self.stats["stored"] += 1
+
+    def add_document(self, document_name: str, document_type: str, content: str, metadata: Optional[Dict[str, Any]] = None):
+        """Persist a curated document to rag_documents and index it"""
+
+        self._ensure_loaded()
+
+        metadata = {**(metadata or {}), "category": document_type}
+        response = supabase.from_("rag_documents").insert({
+            "document_name": document_name,
+            "document_type": document_type,
+            "content": content,
+            "metadata": metadata
+        }).execute()
+
+        document_id = response.data[0]["id"] if response.data else document_name
+        with self.lock:
+            self.index.add(content, {**metadata, "source": document_name, "kind": "document"}, key=f"document:{document_id}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size, hit rate and average retrieval latency"""
+
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "indexed_chunks": len(self.index),
+            "hits": self.stats["hits"],
+            "misses": self.stats["misses"],
+            "stored": self.stats["stored"],
+            "indexed_research": len(self.research_keys),
+            "evicted": self.stats["evicted"],
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "avg_retrieval_ms": round(self.stats["retrieval_ms_total"] / self.stats["retrievals"], 3) if self.stats["retrievals"] else 0.0,
+            "embeddings": bool(EMBEDDING_MODEL)
+        }
+
+    def _refresh_due(self) -> bool:
+        return not self.loaded or time.monotonic() - self.last_refresh >= REFRESH_INTERVAL
+
+    async def ensure_loaded(self):
+        """Load documents on first use and pick up new research periodically, off the event loop"""
+
+        if self._refresh_due():
+            await asyncio.to_thread(self._ensure_loaded)
+
+    def _ensure_loaded(self):
+        # Blocking Supabase queries: async callers go through ensure_loaded
+        with self.lock:
+            if self._refresh_due():
+                self._load()
+
+    def _load(self):
+        now = time.monotonic()
+
+        first_load = not self.loaded
+        self.loaded = True
+        self.last_refresh = now
+        cutoff = datetime.now(timezone.utc) - timedelta(days=MAX_RESEARCH_AGE_DAYS)
+        self._evict_older_than(cutoff)
+
+        if first_load:
+            try:
+                documents = supabase.from_("rag_documents").select("id, document_name, document_type, content, metadata").execute()
+                for row in documents.data or []:
+                    metadata = {**(row.get("metadata") or {}), "category": row.get("document_type"), "source": row.get("document_name"), "kind": "document"}
+                    self.index.add(row["content"], metadata, key=f"document:{row['id']}")
+            except Exception as e:
+                print(f"⚠️ Failed to load rag_documents: {e}")
+
+        try:
+            query = supabase.from_("research_sources").select("id, query, source_url, content, metadata, created_at")
+            # The watermark is a database timestamp, so worker clock skew cannot skip rows; gte plus
+            # the index's key dedup picks up rows written in the same instant as the last one loaded
+            query = query.gte("created_at", max(self.last_loaded_at or "", cutoff.isoformat()))
+            research = query.order("created_at", desc=True).limit(PRELOAD_LIMIT).execute()
+            rows = research.data or []
+            # Newest first from the query; index oldest first so eviction order follows age
+            for row in reversed(rows):
+                row_metadata = row.get("metadata") or {}
+                metadata = {
+                    "source": row.get("source_url") or row_metadata.get("source"),
+                    "category": row_metadata.get("category"),
+                    "query": row.get("query"),
+                    "kind": "research"
+                }
+                self._add_research(f"research:{row['id']}", row["content"], metadata, _parse_timestamp(row.get("created_at")))
+            if rows and rows[0].get("created_at"):
+                self.last_loaded_at = rows[0]["created_at"]
+        except Exception as e:
+            print(f"⚠️ Failed to load research_sources: {e}")
+
+        if first_load:
+            print(f"📚 Retrieval index loaded with {len(self.index)} chunks")
+
+    def _add_research(self, key: str, content: str, metadata: Dict[str, Any], created_at: Optional[datetime]):
+        """Index a research result and evict the oldest past MAX_RESEARCH (hold self.lock)"""
+
+        if not self.index.add(content, metadata, key=key):
+            return
+        self.research_keys[key] = created_at or datetime.now(timezone.utc)
+        while len(self.research_keys) > MAX_RESEARCH:
+            oldest, _ = self.research_keys.popitem(last=False)
+            self.index.remove(oldest)
+            self.stats["evicted"] += 1
+
+    def _evict_older_than(self, cutoff: datetime):
+        """Drop indexed research created before cutoff (hold self.lock)"""
+
+        while self.research_keys:
+            key, created_at = next(iter(self.research_keys.items()))
+            if created_at >= cutoff:
+                break
+            del self.research_keys[key]
+            self.index.remove(key)
+            self.stats["evicted"] += 1
+
+    def _rerank(self, query: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Blend BM25 relevance with embedding similarity when a local model is configured"""
+
+        embedder = self._get_embedder()
+        if not embedder or not candidates:
+            return candidates
+
+        query_vector = embedder.encode(query, normalize_embeddings=True)
+        for candidate in candidates:
+            cache_key = hashlib.sha1(candidate["text"].encode()).hexdigest()
+            if cache_key not in self.embedding_cache:
+                self.embedding_cache[cache_key] = embedder.encode(candidate["text"], normalize_embeddings=True)
+            similarity = float((self.embedding_cache[cache_key] * query_vector).sum())
+            candidate["relevance"] = round(0.5 * candidate["relevance"] + 0.5 * max(similarity, 0.0), 3)
+
+        return sorted(candidates, key=lambda candidate: candidate["relevance"], reverse=True)
+
+    def _get_embedder(self):
+        """Load the optional sentence-transformers model once"""
+
+        if not EMBEDDING_MODEL:
+            return None
+        if self.embedder is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self.embedder = SentenceTransformer(EMBEDDING_MODEL)
+            except ImportError:
+                print("⚠️ RETRIEVAL_EMBEDDING_MODEL is set but sentence-transformers is not installed - using BM25 only")
+                self.embedder = False
+        return self.embedder or None
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Postgres timestamptz as returned by PostgREST"""
+
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+# Global instance
+research_retriever = ResearchRetriever()
+
+
+async def search_source(source: str, query: str, category: str) -> Optional[str]:
+    """Answer a source-scoped research query from the index, falling back to a live web search"""
+
+    await research_retriever.ensure_loaded()
+    retrieved = research_retriever.retrieve_text(query, source=source)
+    if retrieved:
+        print(f"📚 Retrieved indexed research for site:{source}")
+        return retrieved
+
+    result = await conduct_web_search(f"site:{source} {query}")
+    if result and "unable to conduct web research" not in result:
+        await asyncio.to_thread(research_retriever.store_research, query, result, source, category)
+    return result
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional
+from services.angel_service import handle_roadmap_generation, ROADMAP_PLACEHOLDER
+from utils.metrics import record_cache
+from utils.llm_scheduler import llm_priority, SPECULATIVE
+
+# Users often read the plan summary for a while before approving it
+ROADMAP_PREFETCH_TTL = int(os.getenv("ROADMAP_PREFETCH_TTL", "1800"))
+ROADMAP_PREFETCH_ENABLED = os.getenv("ROADMAP_PREFETCH_ENABLED", "true").lower() == "true"
+
+# Session fields generate_detailed_roadmap builds its prompt from
+ROADMAP_INPUT_FIELDS = ("business_name", "industry", "location", "business_type")
+
+
+def plan_input_hash(session_data: Dict[str, Any], history: List[Dict[str, Any]]) -> str:
+    """Hash of everything a roadmap is generated from: the business fields and the user's answers"""
+
+    inputs = {
+        "fields": {field: session_data.get(field) for field in ROADMAP_INPUT_FIELDS},
+        "answers": [message.get("content", "") for message in history if message.get("role") == "user"]
+    }
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class RoadmapPrefetcher:
+    """Generates the roadmap while the user reviews the completed plan, so approving it is instant"""
+
+    def __init__(self):
+        # session_id -> entry dict
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.stats = {
+            "scheduled": 0,
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "wasted": 0,
+            "cancelled": 0,
+            "failed": 0
+        }
+
+    def prefetch(self, session_id: str, user_id: str, session_data: Dict[str, Any], history: List[Dict[str, Any]]) -> Optional[str]:
+        """Start generating the roadmap for a plan that just completed; returns the plan hash"""
+
+        self._evict_expired()
+        if not ROADMAP_PREFETCH_ENABLED:
+            return None
+
+        plan_hash = plan_input_hash(session_data, history)
+        entry = self.entries.get(session_id)
+        if entry and entry["plan_hash"] == plan_hash and self._is_usable(entry):
+            return plan_hash
+        self.discard(session_id)
+
+        self.entries[session_id] = {
+            "job": asyncio.create_task(self._generate(user_id, dict(session_data), list(history))),
+            "plan_hash": plan_hash,
+            "created_at": time.monotonic(),
+            "consumed": False
+        }
+        self.stats["scheduled"] += 1
+        print(f"🔮 Prefetching roadmap for session {session_id}")
+        return plan_hash
+
+    async def get_roadmap(self, session_id: str, session_data: Dict[str, Any], history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Roadmap response for the plan as it stands, reusing the speculative one when the inputs match"""
+
+        entry = self.entries.pop(session_id, None)
+        if entry and entry["plan_hash"] != plan_input_hash(session_data, history):
+            # Answers changed since the plan completed
+            self.stats["stale"] += 1
+            self._drop(entry)
+            entry = None
+
+        if entry and self._is_usable(entry):
+            entry["consumed"] = True
+            try:
+                roadmap_response = await asyncio.shield(entry["job"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                roadmap_response = None
+            if roadmap_response and roadmap_response["roadmap_content"] != ROADMAP_PLACEHOLDER:
+                self.stats["hits"] += 1
+                record_cache("roadmap_prefetch", True)
+                print(f"🎯 Roadmap prefetch hit for session {session_id}")
+                return roadmap_response
+        elif entry:
+            self._drop(entry)
+
+        self.stats["misses"] += 1
+        record_cache("roadmap_prefetch", False)
+        return await handle_roadmap_generation(session_data, history)
+
+    def discard(self, session_id: str):
+        """Drop the session's speculative roadmap, e.g. when the user goes back to revise the plan"""
+
+        entry = self.entries.pop(session_id, None)
+        if entry:
+            self._drop(entry)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/waste counters for the roadmap prefetcher"""
+
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "in_flight": sum(1 for entry in self.entries.values() if not entry["job"].done()),
+            "cached": len(self.entries),
+            "enabled": ROADMAP_PREFETCH_ENABLED
+        }
+
+    async def _generate(self, user_id: str, session_data: Dict[str, Any], history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        # Lowest LLM priority: shed first when capacity is short, and a miss regenerates on approve
+        try:
+            with llm_priority(SPECULATIVE, user_id):
+                return await handle_roadmap_generation(session_data, history)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"❌ Roadmap prefetch failed: {e}")
+            raise
+
+    def _is_usable(self, entry: Dict[str, Any]) -> bool:
+        """Check that an entry is fresh and did not fail"""
+
+        if time.monotonic() - entry["created_at"] > ROADMAP_PREFETCH_TTL:
+            return False
+        job = entry["job"]
+        return not (job.done() and (job.cancelled() or job.exception() is not None))
+
+    def _drop(self, entry: Dict[str, Any]):
+        """Record an unused entry as waste, cancelling it if still running"""
+
+        if entry["consumed"]:
+            return
+        self.stats["wasted"] += 1
+        if not entry["job"].done():
+            entry["job"].cancel()
+            self.stats["cancelled"] += 1
+
+    def _evict_expired(self):
+        """Remove entries older than the prefetch TTL"""
+
+        now = time.monotonic()
+        for session_id, entry in list(self.entries.items()):
+            if now - entry["created_at"] > ROADMAP_PREFETCH_TTL:
+                self.discard(session_id)
+
+
+# Global instance
+roadmap_prefetcher = RoadmapPrefetcher()
@@ -0,0 +1,134 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+from utils.openai_client import get_openai_client
+from services.roadmap_store import roadmap_store, make_section, RoadmapNotFound
+
+client = get_openai_client()
+
+# Section rewrites need the roadmap's voice, not the whole Angel conversation prompt
+SECTION_SYSTEM_PROMPT = """You rewrite one section of a startup launch roadmap.
+Return only the body of the section, without its heading, as plain text with "- " bullets.
+Keep the detail level of the original, stay consistent with the other sections listed in the context,
+and make every task specific, actionable and tailored to the business and its location.
+Include timelines, who does the work (Angel or the founder), local resources and success metrics where they apply."""
+
+
+def build_context_digest(session: Dict[str, Any], sections: List[Dict[str, Any]], target_id: str) -> str:
+    """Business facts and a one-line outline of the other sections, instead of the full roadmap"""
+
+    lines = [
+        f"Business: {session.get('business_name') or 'Your Business'}",
+        f"Industry: {session.get('industry') or 'general business'}",
+        f"Location: {session.get('location') or 'United States'}",
+        f"Business type: {session.get('business_type') or 'startup'}",
+        "Other roadmap sections:"
+    ]
+    for section in sections:
+        if section["id"] in (target_id, "intro"):
+            continue
+        tasks = [line.strip("-*• ").strip() for line in section["content"].splitlines()[1:] if line.strip().startswith(("-", "*", "•"))]
+        outline = "; ".join(task[:60] for task in tasks[:3])
+        lines.append(f"- {section['title']}" + (f": {outline}" if outline else ""))
+    return "\n".join(lines)
+
+
+def find_section(sections: List[Dict[str, Any]], section_id: Optional[str], section_title: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Match by stored id first, then by title for clients that only know the heading"""
+
+    for section in sections:
+        if section["id"] == section_id:
+            return section
+    wanted = (section_title or section_id or "").strip().lower()
+    for section in sections:
+        if wanted and (section["title"].lower() == wanted or wanted in section["title"].lower()):
+            return section
+    return None
+
+
+async def regenerate_section_body(title: str, body: str, digest: str, instructions: Optional[str] = None) -> str:
+    """Ask the model for a new body for one section"""
+
+    prompt = f"""Context:
+{digest}
+
+Section: {title}
+Current content:
+{body.strip()}
+
+Rewrite this section with more detailed, actionable steps."""
+    if instructions:
+        prompt += f"\nThe founder asked for: {instructions}"
+
+    response = await client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": SECTION_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,
+        # Room to roughly double the section, never more than the old fixed budget
+        max_tokens=max(500, min(2000, len(body) // 2))
+    )
+    return response.choices[0].message.content.strip()
+
+
+def splice_section(section: Dict[str, Any], new_body: str) -> Dict[str, Any]:
+    """Keep the section's heading line and trailing spacing, replace everything else"""
+
+    content = section["content"]
+    heading = content.partition("\n")[0] if section["id"] != "intro" else ""
+    trailing = content[len(content.rstrip("\n")):]
+    rebuilt = (f"{heading}\n" if heading else "") + new_body.strip("\n") + (trailing or "\n")
+    return make_section(section["id"], section["title"], rebuilt)
+
+
+async def regenerate_sections(session: Dict[str, Any], user_id: str, section_ids: List[str],
+                              instructions: Optional[str] = None) -> Dict[str, Any]:
+    """Regenerate stored sections concurrently and save them as one new roadmap version"""
+
+    roadmap = await roadmap_store.get_current(session["id"])
+    if not roadmap:
+        raise RoadmapNotFound(f"No roadmap for session {session['id']}")
+    sections = roadmap["phases"]
+
+    targets = []
+    for section_id in dict.fromkeys(section_ids):
+        section = find_section(sections, section_id)
+        if section is None:
+            raise RoadmapNotFound(f"Roadmap section {section_id} not found")
+        targets.append(section)
+
+    bodies = await asyncio.gather(
+        *(
+            regenerate_section_body(
+                section["title"],
+                section["content"].partition("\n")[2] if section["id"] != "intro" else section["content"],
+                build_context_digest(session, sections, section["id"]),
+                instructions
+            )
+            for section in targets
+        ),
+        return_exceptions=True
+    )
+
+    replaced: Dict[str, Dict[str, Any]] = {}
+    failed: Dict[str, str] = {}
+    for section, body in zip(targets, bodies):
+        if isinstance(body, BaseException):
+            print(f"❌ Regenerating roadmap section {section['id']} failed: {body}")
+            failed[section["id"]] = str(body)
+        else:
+            replaced[section["id"]] = splice_section(section, body)
+
+    if replaced:
+        spliced = [replaced.get(section["id"], section) for section in sections]
+        roadmap = await roadmap_store.save_sections(
+            session["id"], user_id, spliced, f"regenerate:{','.join(replaced)}"[:50]
+        )
+
+    return {
+        "version": roadmap["version"],
+        "sections": list(replaced.values()),
+        "failed": failed,
+        "content": roadmap["content"]
+    }
@@ -0,0 +1,291 @@
+import hashlib
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional
+from db.supabase import supabase
+from db.errors import is_missing_function, is_serialization_failure, is_unique_violation
+from utils.logger import get_logger
+from utils.metrics import SUPABASE_LATENCY
+from utils.tracing import traced
+from utils.circuit_breaker import guarded, supabase_breaker
+
+logger = get_logger(__name__)
+
+# Every Nth version stores all sections, so rebuilding a version never replays more than N deltas
+SNAPSHOT_EVERY = int(os.getenv("ROADMAP_SNAPSHOT_EVERY", "10"))
+
+# "Phase 1: Legal Formation", "## **Stage 2 — Product Development**", "**Phase 3 - Marketing**"
+SECTION_HEADING = re.compile(r"^\s*(?:#{1,6}\s*)?\**\s*(Phase|Stage)\s+(\d+)\b[^\n]*$", re.IGNORECASE)
+TASK_LINE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.+?)\s*$")
+
+
+class RoadmapNotFound(Exception):
+    """The session has no stored roadmap, or not the requested version"""
+
+
+class RoadmapVersionConflict(Exception):
+    """Another write created the same version first; reload and retry"""
+
+
+def _section_hash(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+
+
+def make_section(section_id: str, title: str, content: str) -> Dict[str, Any]:
+    return {"id": section_id, "title": title, "content": content, "hash": _section_hash(content)}
+
+
+def parse_roadmap_sections(content: str) -> List[Dict[str, Any]]:
+    """Split roadmap text into phase/stage sections; joining their content gives back the original text"""
+
+    sections: List[Dict[str, Any]] = []
+    current_id, current_title, lines = "intro", "Introduction", []
+    for line in content.splitlines(keepends=True):
+        match = SECTION_HEADING.match(line)
+        if match:
+            if lines:
+                sections.append(make_section(current_id, current_title, "".join(lines)))
+            current_id = f"{match.group(1).lower()}-{int(match.group(2))}"
+            current_title = re.sub(r"[#*]", "", line).strip()
+            lines = []
+        lines.append(line)
+    if lines or not sections:
+        sections.append(make_section(current_id, current_title, "".join(lines)))
+
+    # Ids must stay unique even if the model repeats a heading
+    seen: Dict[str, int] = {}
+    for section in sections:
+        count = seen.get(section["id"], 0)
+        seen[section["id"]] = count + 1
+        if count:
+            section["id"] = f"{section['id']}-{count + 1}"
+    return sections
+
+
+def extract_tasks(sections: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Bulleted and numbered lines of each section, addressable as '<section id>.<n>'"""
+
+    tasks = []
+    for section in sections:
+        number = 0
+        for line in section["content"].splitlines()[1:]:
+            match = TASK_LINE.match(line)
+            if match:
+                number += 1
+                tasks.append({"id": f"{section['id']}.{number}", "section_id": section["id"], "text": match.group(1)})
+    return tasks
+
+
+def render_roadmap(sections: Iterable[Dict[str, Any]]) -> str:
+    return "".join(section["content"] for section in sections)
+
+
+class RoadmapStore:
+    """Current roadmap per session on the roadmaps table, with history kept as section deltas in roadmap_versions"""
+
+    def __init__(self):
+        # Cleared when the save_roadmap_version function is missing (schema not migrated yet)
+        self.rpc_available = True
+
+    @traced(histogram=SUPABASE_LATENCY)
+    @guarded(supabase_breaker)
+    async def get_current(self, session_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The session's current roadmap row (one indexed lookup), or None"""
+
+        query = supabase.from_("roadmaps") \
+            .select("id, session_id, user_id, version, content, phases, tasks, status, updated_at") \
+            .eq("session_id", session_id)
+        if user_id:
+            query = query.eq("user_id", user_id)
+        response = query.limit(1).execute()
+        return response.data[0] if response.data else None
+
+    async def save(self, session_id: str, user_id: str, content: str, reason: str = "edit") -> Dict[str, Any]:
+        """Store new roadmap content as the next version, recording only the sections that changed"""
+
+        return await self.save_sections(session_id, user_id, parse_roadmap_sections(content), reason)
+
+    @traced(histogram=SUPABASE_LATENCY)
+    async def save_sections(self, session_id: str, user_id: str, sections: List[Dict[str, Any]], reason: str) -> Dict[str, Any]:
+        current = await self.get_current(session_id)
+        if current and [section["hash"] for section in current["phases"]] == [section["hash"] for section in sections]:
+            # Nothing changed: no new version
+            return current
+
+        version = current["version"] + 1 if current else 1
+        snapshot = (version - 1) % SNAPSHOT_EVERY == 0
+        known = {} if snapshot or not current else {section["id"]: section["hash"] for section in current["phases"]}
+        changed = {
+            section["id"]: {"title": section["title"], "content": section["content"]}
+            for section in sections if known.get(section["id"]) != section["hash"]
+        }
+        row = {
+            "session_id": session_id,
+            "user_id": user_id,
+            "content": render_roadmap(sections),
+            "phases": sections,
+            "tasks": extract_tasks(sections),
+            "version": version
+        }
+
+        version_row = {
+            "changed": changed,
+            "section_order": [section["id"] for section in sections],
+            "is_snapshot": snapshot,
+            "reason": reason
+        }
+        saved = self._write(current, row, version_row)
+
+        logger.info("Saved roadmap version %s (%s, %d sections changed)", version, reason, len(changed), extra={"session_id": session_id})
+        return saved
+
+    @guarded(supabase_breaker)
+    def _write(self, current: Optional[Dict[str, Any]], row: Dict[str, Any], version_row: Dict[str, Any]) -> Dict[str, Any]:
+        """Move the roadmap to row["version"] and record its version row, both or neither"""
+
+        if self.rpc_available:
+            try:
+                return supabase.rpc("save_roadmap_version", {
+                    "p_session_id": row["session_id"],
+                    "p_expected_version": current["version"] if current else 0,
+                    "p_roadmap": row,
+                    "p_version": version_row
+                }).execute().data[0]
+            except Exception as e:
+                if is_serialization_failure(e):
+                    raise RoadmapVersionConflict(row["session_id"])
+                if not is_missing_function(e):
+                    raise
+                logger.warning("save_roadmap_version RPC not available - writing roadmap versions without a transaction")
+                self.rpc_available = False
+
+        if not current:
+            saved = supabase.from_("roadmaps").insert(row).execute().data[0]
+            try:
+                self._insert_version(saved["id"], row["version"], version_row)
+            except Exception:
+                supabase.from_("roadmaps").delete().eq("id", saved["id"]).execute()
+                raise
+            return saved
+
+        # The version row is written first: its primary key rejects a concurrent writer of the same version.
+        # It is removed again if the roadmap update fails, so a retry can write the same version
+        self._insert_version(current["id"], row["version"], version_row)
+        try:
+            updated = supabase.from_("roadmaps") \
+                .update(row) \
+                .eq("id", current["id"]) \
+                .eq("version", current["version"]) \
+                .execute()
+            if not updated.data:
+                raise RoadmapVersionConflict(row["session_id"])
+        except Exception:
+            supabase.from_("roadmap_versions") \
+                .delete() \
+                .eq("roadmap_id", current["id"]) \
+                .eq("version", row["version"]) \
+                .execute()
+            raise
+        return updated.data[0]
+
+    def _insert_version(self, roadmap_id: str, version: int, version_row: Dict[str, Any]):
+        try:
+            supabase.from_("roadmap_versions").insert({"roadmap_id": roadmap_id, "version": version, **version_row}).execute()
+        except Exception as e:
+            if is_unique_violation(e):
+                raise RoadmapVersionConflict(roadmap_id)
+            raise
+
+    @traced(histogram=SUPABASE_LATENCY)
+    async def get_history(self, session_id: str) -> Dict[str, Any]:
+        """Version list without section content"""
+
+        current = await self.get_current(session_id)
+        if not current:
+            return {"current_version": None, "versions": []}
+        rows = self._list_versions(current["id"])
+        return {
+            "current_version": current["version"],
+            "last_modified": current.get("updated_at"),
+            "versions": [
+                {
+                    "version": row["version"],
+                    "reason": row["reason"],
+                    "changed_sections": list(row["changed"].keys()),
+                    "section_count": len(row["section_order"]),
+                    "created_at": row["created_at"]
+                }
+                for row in rows
+            ]
+        }
+
+    @guarded(supabase_breaker)
+    def _list_versions(self, roadmap_id: str) -> List[Dict[str, Any]]:
+        return supabase.from_("roadmap_versions") \
+            .select("version, reason, section_order, changed, created_at") \
+            .eq("roadmap_id", roadmap_id) \
+            .order("version", desc=True) \
+            .execute().data
+
+    @traced(histogram=SUPABASE_LATENCY)
+    @guarded(supabase_breaker)
+    async def get_version_sections(self, roadmap_id: str, version: int) -> List[Dict[str, Any]]:
+        """Rebuild a version from its nearest snapshot and the deltas after it"""
+
+        base = version - (version - 1) % SNAPSHOT_EVERY
+        rows = supabase.from_("roadmap_versions") \
+            .select("version, changed, section_order") \
+            .eq("roadmap_id", roadmap_id) \
+            .gte("version", base) \
+            .lte("version", version) \
+            .order("version") \
+            .execute().data
+        if not rows or rows[-1]["version"] != version:
+            raise RoadmapNotFound(f"Roadmap version {version} not found")
+
+        state: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            state.update(row["changed"])
+        missing = [section_id for section_id in rows[-1]["section_order"] if section_id not in state]
+        if missing:
+            # The snapshot the deltas build on was never written
+            raise RoadmapNotFound(f"Roadmap version {version} cannot be rebuilt: sections {', '.join(missing)} missing")
+        return [
+            make_section(section_id, state[section_id]["title"], state[section_id]["content"])
+            for section_id in rows[-1]["section_order"]
+        ]
+
+    async def revert(self, session_id: str, user_id: str, version: int) -> Dict[str, Any]:
+        """Make an earlier version current again; stored as a new version holding only the sections that differ"""
+
+        current = await self.get_current(session_id)
+        if not current:
+            raise RoadmapNotFound(f"No roadmap for session {session_id}")
+        if version == current["version"]:
+            return current
+        sections = await self.get_version_sections(current["id"], version)
+        return await self.save_sections(session_id, user_id, sections, f"revert:{version}")
+
+    def for_client(self, roadmap: Dict[str, Any], known_hashes: Iterable[str] = ()) -> Dict[str, Any]:
+        """Roadmap payload that leaves out the content of sections the client already has"""
+
+        known = set(known_hashes)
+        sections = [
+            {"id": section["id"], "title": section["title"], "hash": section["hash"], "unchanged": True}
+            if section["hash"] in known else
+            {"id": section["id"], "title": section["title"], "hash": section["hash"], "content": section["content"]}
+            for section in roadmap["phases"]
+        ]
+        payload = {
+            "version": roadmap["version"],
+            "sections": sections,
+            "tasks": roadmap.get("tasks") or [],
+            "updated_at": roadmap.get("updated_at")
+        }
+        if not known:
+            payload["content"] = roadmap["content"]
+        return payload
+
+
+# Global instance
+roadmap_store = RoadmapStore()
@@ -1,12 +1,16 @@
-from openai import AsyncOpenAI
+from utils.openai_client import get_openai_client
 import os
 import json
 import random
 from datetime import datetime
 from typing import Dict, List, Optional
 from utils.constant import ANGEL_SYSTEM_PROMPT
+from utils.fan_in import fan_in, Component
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_openai_client()
+
+# Seconds the transition payload waits for its slowest part before using that part's fallback
+TRANSITION_DEADLINE = float(os.getenv("IMPLEMENTATION_TRANSITION_DEADLINE", "45"))
 
 # Motivational quotes for business implementation
 MOTIVATIONAL_QUOTES = [
@@ -230,7 +234,15 @@ async def generate_implementation_insights(business_context: Dict, roadmap_conte
         return response.choices[0].message.content
     except Exception as e:
         print(f"Error generating implementation insights: {e}")
-        return f"Based on your {business_type} in the {industry} industry, implementation will require careful attention to {industry}-specific requirements and {location} regulations. Focus on building strong operational foundations and establishing clear processes for growth."
+        return fallback_implementation_insights(business_context)
+
+def fallback_implementation_insights(business_context: Dict) -> str:
+    """Generic insights used when the model call fails or runs out of time"""
+    
+    industry = business_context.get('industry', 'general business')
+    location = business_context.get('location', 'United States')
+    business_type = business_context.get('business_type', 'startup')
+    return f"Based on your {business_type} in the {industry} industry, implementation will require careful attention to {industry}-specific requirements and {location} regulations. Focus on building strong operational foundations and establishing clear processes for growth."
 
 async def prepare_implementation_transition(session_data: Dict, roadmap_content: str) -> Dict:
     """Prepare comprehensive implementation transition data"""
@@ -243,21 +255,32 @@ async def prepare_implementation_transition(session_data: Dict, roadmap_content:
     }
     
     try:
-        # Get motivational quote
-        motivational_quote = await get_motivational_quote(business_context)
-        
-        # Get service provider preview
-        service_providers = await get_service_provider_preview(business_context)
-        
-        # Generate implementation insights
-        implementation_insights = await generate_implementation_insights(business_context, roadmap_content)
+        # Independent parts, assembled concurrently; a part that fails or is late gets its fallback
+        parts = await fan_in("implementation_transition", {
+            "motivational_quote": Component(
+                lambda: get_motivational_quote(business_context),
+                timeout=2,
+                fallback=MOTIVATIONAL_QUOTES[0]
+            ),
+            "service_providers": Component(
+                lambda: get_service_provider_preview(business_context),
+                timeout=5,
+                fallback=lambda: SERVICE_PROVIDER_CATEGORIES['legal'][:2]
+            ),
+            "implementation_insights": Component(
+                lambda: generate_implementation_insights(business_context, roadmap_content),
+                fallback=lambda: fallback_implementation_insights(business_context)
+            )
+        }, deadline=TRANSITION_DEADLINE)
         
         return {
             "success": True,
-            "motivational_quote": motivational_quote,
-            "service_providers": service_providers,
-            "implementation_insights": implementation_insights,
-            "business_context": business_context
+            "motivational_quote": parts["motivational_quote"],
+            "service_providers": parts["service_providers"],
+            "implementation_insights": parts["implementation_insights"],
+            "business_context": business_context,
+            "component_latency_ms": parts.latency_ms,
+            "degraded_components": list(parts.degraded)
         }
     except Exception as e:
         print(f"Error preparing implementation transition: {e}")
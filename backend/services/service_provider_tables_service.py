@@ -1,12 +1,13 @@
-from openai import AsyncOpenAI
-import os
+from utils.openai_client import get_openai_client
+from utils.circuit_breaker import openai_breaker
 import json
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from services.rag_service import research_service_providers_rag
 from services.specialized_agents_service import agents_manager
+from services.provider_directory_service import provider_directory
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_openai_client()
 
 class ServiceProviderTableGenerator:
     """Generate comprehensive service provider tables with local providers"""
@@ -141,202 +142,9 @@ class ServiceProviderTableGenerator:
     def _get_predefined_providers(self, category: str, category_info: Dict[str, Any], business_context: Dict[str, Any], location: str = None) -> List[Dict[str, Any]]:
         """Get predefined providers for faster response"""
         
-        predefined_providers = {
-            "legal": [
-                {
-                    "name": "Local Business Attorney",
-                    "type": "Local Professional",
-                    "local": True,
-                    "description": "Specializes in business formation, contracts, and compliance for startups and small businesses.",
-                    "key_considerations": "Experience with your industry, local regulations knowledge, reasonable rates",
-                    "estimated_cost": "$200-$400/hour",
-                    "contact_method": "Local bar association directory",
-                    "specialties": "Business formation, contracts, compliance"
-                },
-                {
-                    "name": "LegalZoom",
-                    "type": "Online Service",
-                    "local": False,
-                    "description": "Online legal services for business formation, document preparation, and compliance.",
-                    "key_considerations": "Cost-effective, standardized processes, limited customization",
-                    "estimated_cost": "$99-$399 per service",
-                    "contact_method": "Website: legalzoom.com",
-                    "specialties": "Business formation, document preparation"
-                },
-                {
-                    "name": "Rocket Lawyer",
-                    "type": "Online Service",
-                    "local": False,
-                    "description": "Online legal platform with document templates and attorney consultations.",
-                    "key_considerations": "Subscription model, document library, attorney network",
-                    "estimated_cost": "$39.99/month",
-                    "contact_method": "Website: rocketlawyer.com",
-                    "specialties": "Document templates, legal consultations"
-                }
-            ],
-            "financial": [
-                {
-                    "name": "Local CPA Firm",
-                    "type": "Local Professional",
-                    "local": True,
-                    "description": "Certified Public Accountant specializing in small business tax and accounting.",
-                    "key_considerations": "Industry experience, local tax knowledge, ongoing support",
-                    "estimated_cost": "$150-$300/hour",
-                    "contact_method": "Local CPA directory",
-                    "specialties": "Tax preparation, bookkeeping, financial planning"
-                },
-                {
-                    "name": "QuickBooks",
-                    "type": "Online Service",
-                    "local": False,
-                    "description": "Cloud-based accounting software with integrated tax services.",
-                    "key_considerations": "User-friendly, integrations, scalability",
-                    "estimated_cost": "$15-$200/month",
-                    "contact_method": "Website: quickbooks.intuit.com",
-                    "specialties": "Accounting software, tax services"
-                },
-                {
-                    "name": "Xero",
-                    "type": "Online Service",
-                    "local": False,
-                    "description": "Cloud accounting platform with third-party integrations.",
-                    "key_considerations": "Modern interface, extensive integrations, mobile access",
-                    "estimated_cost": "$13-$70/month",
-                    "contact_method": "Website: xero.com",
-                    "specialties": "Cloud accounting, integrations"
-                }
-            ],
-            "marketing": [
-                {
-                    "name": "Local Marketing Agency",
-                    "type": "Local Professional",
-                    "local": True,
-                    "description": "Full-service marketing agency specializing in digital marketing and branding.",
-                    "key_considerations": "Local market knowledge, personalized service, ongoing support",
-                    "estimated_cost": "$2,000-$10,000/month",
-                    "contact_method": "Local business directory",
-                    "specialties": "Digital marketing, branding, social media"
-                },
-                {
-                    "name": "HubSpot",
-                    "type": "Online Service",
-                    "local": False,
-                    "description": "All-in-one marketing, sales, and service platform.",
-                    "key_considerations": "Comprehensive platform, automation, analytics",
-                    "estimated_cost": "$45-$3,200/month",
-                    "contact_method": "Website: hubspot.com",
-                    "specialties": "Marketing automation, CRM, analytics"
-                },
-                {
-                    "name": "Google Ads",
-                    "type": "Online Service",
-                    "local": False,
-                    "description": "Pay-per-click advertising platform for search and display ads.",
-                    "key_considerations": "Large reach, targeting options, performance tracking",
-                    "estimated_cost": "Pay-per-click model",
-                    "contact_method": "Website: ads.google.com",
-                    "specialties": "Search advertising, display advertising"
-                }
-            ],
-            "operations": [
-                {
-                    "name": "Local Equipment Supplier",
-                    "type": "Local Professional",
-                    "local": True,
-                    "description": "Local supplier for business equipment, furniture, and supplies.",
-                    "key_considerations": "Local delivery, service support, relationship building",
-                    "estimated_cost": "Varies by equipment",
-                    "contact_method": "Local business directory",
-                    "specialties": "Equipment sales, installation, maintenance"
-                },
-                {
-                    "name": "Amazon Business",
-                    "type": "Online Service",
-                    "local": False,
-                    "description": "B2B marketplace for business supplies and equipment.",
-                    "key_considerations": "Wide selection, bulk pricing, fast delivery",
-                    "estimated_cost": "Varies by product",
-                    "contact_method": "Website: business.amazon.com",
-                    "specialties": "Business supplies, equipment, bulk purchasing"
-                },
-                {
-                    "name": "Office Depot",
-                    "type": "Mixed",
-                    "local": True,
-                    "description": "Office supplies and business services with local stores.",
-                    "key_considerations": "Local presence, business services, bulk discounts",
-                    "estimated_cost": "Varies by service",
-                    "contact_method": "Local store or website",
-                    "specialties": "Office supplies, printing, business services"
-                }
-            ],
-            "technology": [
-                {
-                    "name": "Local IT Consultant",
-                    "type": "Local Professional",
-                    "local": True,
-                    "description": "Local technology consultant for IT setup, maintenance, and support.",
-                    "key_considerations": "Local support, personalized service, ongoing relationship",
-                    "estimated_cost": "$75-$200/hour",
-                    "contact_method": "Local IT directory",
-                    "specialties": "IT setup, maintenance, support"
-                },
-                {
-                    "name": "Microsoft 365",
-                    "type": "Online Service",
-                    "local": False,
-                    "description": "Cloud-based productivity suite with business applications.",
-                    "key_considerations": "Comprehensive suite, cloud storage, collaboration tools",
-                    "estimated_cost": "$6-$22/user/month",
-                    "contact_method": "Website: microsoft.com/microsoft-365",
-                    "specialties": "Productivity suite, cloud storage, collaboration"
-                },
-                {
-                    "name": "Google Workspace",
-                    "type": "Online Service",
-                    "local": False,
-                    "description": "Cloud-based productivity and collaboration platform.",
-                    "key_considerations": "Gmail integration, collaboration tools, cloud storage",
-                    "estimated_cost": "$6-$18/user/month",
-                    "contact_method": "Website: workspace.google.com",
-                    "specialties": "Email, collaboration, cloud storage"
-                }
-            ],
-            "consulting": [
-                {
-                    "name": "Local Business Consultant",
-                    "type": "Local Professional",
-                    "local": True,
-                    "description": "Local business consultant specializing in strategy and operations.",
-                    "key_considerations": "Local market knowledge, personalized service, ongoing support",
-                    "estimated_cost": "$100-$300/hour",
-                    "contact_method": "Local business directory",
-                    "specialties": "Business strategy, operations, growth planning"
-                },
-                {
-                    "name": "SCORE",
-                    "type": "Non-profit",
-                    "local": True,
-                    "description": "Free business mentoring and education from retired executives.",
-                    "key_considerations": "Free service, experienced mentors, local chapters",
-                    "estimated_cost": "Free",
-                    "contact_method": "Website: score.org",
-                    "specialties": "Business mentoring, education, networking"
-                },
-                {
-                    "name": "Small Business Development Center",
-                    "type": "Government",
-                    "local": True,
-                    "description": "Government-funded business consulting and training services.",
-                    "key_considerations": "Free/low-cost, government-backed, comprehensive services",
-                    "estimated_cost": "Free to low-cost",
-                    "contact_method": "Local SBDC office",
-                    "specialties": "Business planning, training, funding assistance"
-                }
-            ]
-        }
+        predefined_providers = provider_directory.lookup(category, location=location)
         
-        return predefined_providers.get(category, [
+        return predefined_providers or [
             {
                 "name": "Provider Name",
                 "type": "Service Provider",
@@ -347,11 +155,15 @@ class ServiceProviderTableGenerator:
                 "contact_method": "Website or phone",
                 "specialties": "General services"
             }
-        ])
+        ]
     
     async def _create_structured_providers(self, category: str, category_info: Dict[str, Any], business_context: Dict[str, Any], location: str, rag_results: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Create structured provider data"""
         
+        learned_providers = await provider_directory.lookup_learned(category, location or business_context.get('location'))
+        if learned_providers:
+            return learned_providers
+        
         # Generate providers using AI with RAG research
         provider_prompt = f"""
         Generate a comprehensive list of service providers for {category_info['name']} based on the following context:
@@ -422,6 +234,7 @@ class ServiceProviderTableGenerator:
                 }
                 structured_providers.append(structured_provider)
             
+            await provider_directory.remember(category, structured_providers, location or business_context.get('location'))
             return structured_providers
             
         except Exception as e:
@@ -549,6 +362,10 @@ class ServiceProviderTableGenerator:
     async def _generate_comprehensive_table(self, provider_tables: Dict[str, Any], task_context: str, business_context: Dict[str, Any]) -> str:
         """Generate a comprehensive service provider table"""
         
+        # OpenAI is failing right now - tabulate the predefined providers directly
+        if openai_breaker("gpt-4o").is_open:
+            return self._render_provider_table(provider_tables)
+        
         # Create comprehensive table using AI
         table_prompt = f"""
         Create a comprehensive service provider table for the following task:
@@ -581,7 +398,29 @@ class ServiceProviderTableGenerator:
             
             return response.choices[0].message.content
         except Exception as e:
-            return f"Comprehensive table generation failed: {str(e)}"
+            print(f"❌ Comprehensive table generation failed: {e} - using predefined providers")
+            return self._render_provider_table(provider_tables)
+    
+    def _render_provider_table(self, provider_tables: Dict[str, Any]) -> str:
+        """Markdown provider table built from the category data, without AI"""
+        
+        sections = []
+        for table in provider_tables.values():
+            providers = table.get("providers") or []
+            if not providers:
+                continue
+            rows = [
+                "| Provider | Type | Local | Description | Estimated Cost | Contact | Specialties |",
+                "|----------|------|-------|-------------|----------------|---------|-------------|"
+            ]
+            for provider in providers:
+                rows.append(
+                    f"| {provider.get('name', '')} | {provider.get('type', '')} | {'Yes' if provider.get('local') else 'No'} "
+                    f"| {provider.get('description', '')} | {provider.get('estimated_cost', '')} "
+                    f"| {provider.get('contact_method', '')} | {provider.get('specialties', '')} |"
+                )
+            sections.append(f"### {table.get('category_name', 'Service Providers')}\n\n" + "\n".join(rows))
+        return "\n\n".join(sections)
     
     async def get_task_specific_providers(self, task_id: str, task_description: str, business_context: Dict[str, Any], location: str = None) -> Dict[str, Any]:
         """Get providers specific to a particular implementation task"""
@@ -618,6 +457,13 @@ class ServiceProviderTableGenerator:
     async def _enhance_table_with_agent_guidance(self, provider_table: Dict[str, Any], agent_guidance: Dict[str, Any], task_description: str) -> Dict[str, Any]:
         """Enhance provider table with agent guidance"""
         
+        if openai_breaker("gpt-4o").is_open:
+            return {
+                "original_table": provider_table,
+                "enhanced_table": provider_table.get("comprehensive_table", ""),
+                "agent_insights": agent_guidance
+            }
+        
         enhancement_prompt = f"""
         Enhance the following service provider table with expert guidance:
         
@@ -0,0 +1,120 @@
+import asyncio
+import contextvars
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from utils.logger import get_logger
+from utils.metrics import WS_CONNECTIONS, WS_EVENTS
+
+logger = get_logger(__name__)
+
+# Events buffered per connection; a client this far behind loses events until it catches up
+CHANNEL_QUEUE_SIZE = int(os.getenv("SESSION_CHANNEL_QUEUE_SIZE", "1000"))
+
+_channel_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("channel_session", default=None)
+
+
+def bind_session_channel(session_id: str):
+    """Route events published from the current task (research, tokens) to this session's subscribers"""
+
+    _channel_session.set(session_id)
+
+
+class ChannelSubscriber:
+    """One WebSocket connection's outbound queue"""
+
+    def __init__(self, session_id: str, user_id: str):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=CHANNEL_QUEUE_SIZE)
+        self.dropped = 0
+
+    def offer(self, message: Dict[str, Any]) -> bool:
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+
+class SessionChannelHub:
+    """Per-session fan-out of chat events to the WebSocket connections open on this worker"""
+
+    def __init__(self):
+        self.subscribers: Dict[str, Set[ChannelSubscriber]] = {}
+        self.stats = {"connections": 0, "published": 0, "dropped": 0}
+
+    def subscribe(self, session_id: str, user_id: str) -> ChannelSubscriber:
+        subscriber = ChannelSubscriber(session_id, user_id)
+        self.subscribers.setdefault(session_id, set()).add(subscriber)
+        self.stats["connections"] += 1
+        WS_CONNECTIONS.set(self.connection_count())
+        return subscriber
+
+    def unsubscribe(self, subscriber: ChannelSubscriber):
+        subscribers = self.subscribers.get(subscriber.session_id)
+        if subscribers:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.subscribers[subscriber.session_id]
+        WS_CONNECTIONS.set(self.connection_count())
+
+    def has_subscribers(self, session_id: Optional[str] = None) -> bool:
+        return bool(self.subscribers.get(session_id or _channel_session.get()))
+
+    def publish(self, session_id: Optional[str], event: str, data: Optional[Dict[str, Any]] = None):
+        """Queue an event for every connection watching the session; never blocks the publisher"""
+
+        session_id = session_id or _channel_session.get()
+        subscribers = self.subscribers.get(session_id) if session_id else None
+        if not subscribers:
+            return
+
+        message = self._message(session_id, event, data)
+        for subscriber in list(subscribers):
+            if not subscriber.offer(message):
+                self.stats["dropped"] += 1
+
+    def send(self, subscriber: ChannelSubscriber, event: str, data: Optional[Dict[str, Any]] = None):
+        """Queue an event for one connection only (handshake, pong, errors for its own messages)"""
+
+        if not subscriber.offer(self._message(subscriber.session_id, event, data)):
+            self.stats["dropped"] += 1
+
+    def _message(self, session_id: str, event: str, data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        self.stats["published"] += 1
+        WS_EVENTS.inc(event=event)
+        return {"type": event, "session_id": session_id, "data": data or {}, "ts": time.time()}
+
+    def emit(self, event: str, **data):
+        """Publish to the session bound to the current task, if anyone is listening"""
+
+        self.publish(None, event, data)
+
+    def token_sink(self) -> Optional[Callable[[str], Awaitable[None]]]:
+        """Callback streaming completion tokens to the bound session, or None when nobody is connected"""
+
+        session_id = _channel_session.get()
+        if not self.has_subscribers(session_id):
+            return None
+
+        async def send(text: str):
+            self.publish(session_id, "token", {"text": text})
+        return send
+
+    def publish_phase(self, session_id: str, previous: Optional[str], current: Optional[str], transition: Optional[str] = None):
+        """Tell connected clients the session moved to another phase"""
+
+        if previous != current or transition:
+            self.publish(session_id, "phase_transition", {"from": previous, "to": current, "transition_phase": transition})
+
+    def connection_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self.subscribers.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "open_connections": self.connection_count(), "sessions": len(self.subscribers)}
+
+
+# Global instance
+session_channels = SessionChannelHub()
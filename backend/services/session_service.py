@@ -1,5 +1,29 @@
+from typing import Any, Dict, Optional
 from db.supabase import supabase
+from services.chat_service import chat_turn_writer
+from utils.metrics import SUPABASE_LATENCY
+from utils.tracing import traced
+from utils.circuit_breaker import guarded, supabase_breaker
+from utils.pagination import seek, page
+from utils.progress import progress_from_session
 
+# What the session sidebar renders; the JSONB context, roadmap and implementation data stay behind
+SESSION_LIST_COLUMNS = "id, title, current_phase, asked_q, answered_count, created_at, updated_at"
+SESSION_SUMMARY_COLUMNS = (
+    "id, title, current_phase, asked_q, answered_count, business_name, industry, location, "
+    "message_count, last_message_at, created_at, updated_at"
+)
+
+# Columns a stored progress record is seeded from when the session has none yet
+SESSION_PROGRESS_COLUMNS = "current_phase, asked_q, answered_count"
+
+# Cleared once the chat_session_summaries view turns out to be missing (schema not migrated)
+_summary_view_available = True
+# Cleared once chat_sessions turns out to have no progress column (schema not migrated)
+_progress_column_available = True
+
+@traced(histogram=SUPABASE_LATENCY)
+@guarded(supabase_breaker)
 async def create_session(user_id: str, title: str):
     response = supabase \
         .from_("chat_sessions") \
@@ -17,11 +41,86 @@ async def create_session(user_id: str, title: str):
     else:
         raise Exception("Failed to create session")
 
-async def list_sessions(user_id: str):
-    response = supabase.from_("chat_sessions").select("*").eq("user_id", user_id).order("updated_at", desc=True).execute()
-    return response.data
+@traced(histogram=SUPABASE_LATENCY)
+@guarded(supabase_breaker)
+async def list_sessions(user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """The user's sessions, most recently updated first; paged by (updated_at, id) when a limit is given"""
+    query = seek(
+        supabase.from_("chat_sessions").select(SESSION_LIST_COLUMNS).eq("user_id", user_id),
+        cursor, column="updated_at", forward=False
+    ).order("updated_at", desc=True).order("id", desc=True)
+    if not limit:
+        return {"sessions": query.execute().data, "next_cursor": None}
+    sessions, next_cursor = page(query.limit(limit + 1).execute().data, limit, column="updated_at")
+    return {"sessions": sessions, "next_cursor": next_cursor}
+
+@traced(histogram=SUPABASE_LATENCY)
+@guarded(supabase_breaker)
+async def get_session_summary(session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """Phase, progress, business basics and message count without the session's JSONB payloads"""
+    global _summary_view_available
+    await chat_turn_writer.wait_for_session(session_id)
+    if _summary_view_available:
+        try:
+            response = supabase.from_("chat_session_summaries") \
+                .select(SESSION_SUMMARY_COLUMNS) \
+                .eq("id", session_id) \
+                .eq("user_id", user_id) \
+                .limit(1) \
+                .execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            if "chat_session_summaries" not in str(e):
+                raise
+            # Schema not migrated yet - assemble the summary from the tables
+            print("⚠️ chat_session_summaries view not available - building session summaries from tables")
+            _summary_view_available = False
+
+    response = supabase.from_("chat_sessions") \
+        .select(f"{SESSION_LIST_COLUMNS}, business_context") \
+        .eq("id", session_id) \
+        .eq("user_id", user_id) \
+        .limit(1) \
+        .execute()
+    if not response.data:
+        return None
+    summary = response.data[0]
+    context = summary.pop("business_context", None) or {}
+    for key in ("business_name", "industry", "location"):
+        summary[key] = context.get(key)
+
+    last_message = supabase.from_("chat_history") \
+        .select("created_at", count="exact") \
+        .eq("session_id", session_id) \
+        .order("created_at", desc=True) \
+        .limit(1) \
+        .execute()
+    summary["message_count"] = last_message.count or 0
+    summary["last_message_at"] = last_message.data[0]["created_at"] if last_message.data else None
+    return summary
+
+@traced(histogram=SUPABASE_LATENCY)
+@guarded(supabase_breaker)
+async def get_session_progress(session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """The session's precomputed progress record (see utils.progress), one primary-key read"""
+    global _progress_column_available
+    await chat_turn_writer.wait_for_session(session_id)
+    columns = f"{SESSION_PROGRESS_COLUMNS}, progress" if _progress_column_available else SESSION_PROGRESS_COLUMNS
+    try:
+        response = supabase.from_("chat_sessions").select(columns).eq("id", session_id).eq("user_id", user_id).limit(1).execute()
+    except Exception as e:
+        if not _progress_column_available or "progress" not in str(e):
+            raise
+        # Schema not migrated yet - seed the record from the phase and question on every read
+        print("⚠️ chat_sessions.progress column not available - deriving progress from the session phase")
+        _progress_column_available = False
+        response = supabase.from_("chat_sessions").select(SESSION_PROGRESS_COLUMNS).eq("id", session_id).eq("user_id", user_id).limit(1).execute()
+    return progress_from_session(response.data[0]) if response.data else None
 
+@traced(histogram=SUPABASE_LATENCY)
+@guarded(supabase_breaker)
 async def get_session(session_id: str, user_id: str):
+    await chat_turn_writer.wait_for_session(session_id)
     response = supabase.from_("chat_sessions").select("*").eq("id", session_id).eq("user_id", user_id).single().execute()
     
     if response.data:
@@ -34,6 +133,8 @@ async def get_session(session_id: str, user_id: str):
     else:
         raise Exception("Session not found")
 
+@traced(histogram=SUPABASE_LATENCY)
+@guarded(supabase_breaker)
 async def patch_session(session_id: str, updates: dict):
     response = supabase.from_("chat_sessions").update(updates).eq("id", session_id).execute()
     return response.data[0]
\ No newline at end of file
@@ -1,11 +1,10 @@
-from openai import AsyncOpenAI
-import os
+from utils.openai_client import get_openai_client
 import json
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-from services.angel_service import conduct_web_search
+from services.retrieval_service import search_source
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_openai_client()
 
 class SpecializedAgent:
     """Base class for specialized agents"""
@@ -24,8 +23,7 @@ class SpecializedAgent:
             # Use multiple research sources
             research_results = []
             for source in self.research_sources:
-                search_query = f"site:{source} {enhanced_query}"
-                result = await conduct_web_search(search_query)
+                result = await search_source(source, enhanced_query, self.name)
                 if result and "unable to conduct web research" not in result:
                     research_results.append(f"Source: {source}\n{result}")
             
@@ -1,14 +1,11 @@
-import os
 import re
 import json
 from typing import Dict, Any, Optional
-import PyPDF2
-import docx
-from docx import Document
 import tempfile
-from openai import AsyncOpenAI
+from utils.openai_client import get_openai_client
+from utils.circuit_breaker import openai_breaker
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_openai_client()
 
 async def process_uploaded_plan(file_path: str, file_extension: str) -> str:
     """
@@ -34,6 +31,8 @@ async def process_uploaded_plan(file_path: str, file_extension: str) -> str:
 async def extract_pdf_text(file_path: str) -> str:
     """Extract text from PDF file"""
     try:
+        # Imported on first upload; the parsers are slow to import and most requests never need them
+        import PyPDF2
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
             text = ""
@@ -49,6 +48,7 @@ async def extract_pdf_text(file_path: str) -> str:
 async def extract_docx_text(file_path: str) -> str:
     """Extract text from DOCX file"""
     try:
+        from docx import Document
         doc = Document(file_path)
         text = ""
         
@@ -87,6 +87,10 @@ async def extract_business_info_from_plan(content: str) -> Dict[str, Any]:
     """
     Extract structured business information from plan content using AI
     """
+    if openai_breaker("gpt-4o").is_open:
+        print("⚡ OpenAI circuit open - extracting business info with keyword fallback")
+        return create_fallback_business_info(content)
+
     try:
         prompt = f"""
         Analyze this business plan document and extract the following information in JSON format:
@@ -19,6 +19,7 @@ CREATE TABLE IF NOT EXISTS chat_sessions (
     business_context JSONB DEFAULT '{}',
     roadmap_data JSONB DEFAULT NULL,
     implementation_data JSONB DEFAULT NULL,
+    progress JSONB DEFAULT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -109,6 +110,14 @@ CREATE TABLE IF NOT EXISTS service_providers (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Shared provider directory: generated providers are not tied to one session
+ALTER TABLE service_providers ALTER COLUMN session_id DROP NOT NULL;
+ALTER TABLE service_providers ALTER COLUMN user_id DROP NOT NULL;
+ALTER TABLE service_providers ADD COLUMN IF NOT EXISTS state VARCHAR(2) DEFAULT NULL;
+ALTER TABLE service_providers ADD COLUMN IF NOT EXISTS city VARCHAR(100) DEFAULT NULL;
+ALTER TABLE service_providers ADD COLUMN IF NOT EXISTS source VARCHAR(20) NOT NULL DEFAULT 'llm' CHECK (source IN ('curated', 'llm', 'manual'));
+ALTER TABLE service_providers ADD COLUMN IF NOT EXISTS metadata JSONB DEFAULT '{}';
+
 -- =============================================
 -- RESEARCH & RAG TABLES
 -- =============================================
@@ -127,6 +136,10 @@ CREATE TABLE IF NOT EXISTS research_sources (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Research shared through the retrieval index is not tied to a single session
+ALTER TABLE research_sources ALTER COLUMN session_id DROP NOT NULL;
+ALTER TABLE research_sources ALTER COLUMN user_id DROP NOT NULL;
+
 -- RAG Documents Table
 CREATE TABLE IF NOT EXISTS rag_documents (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -194,11 +207,16 @@ CREATE TABLE IF NOT EXISTS user_activity (
 CREATE INDEX IF NOT EXISTS idx_chat_sessions_user_id ON chat_sessions(user_id);
 CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated_at ON chat_sessions(updated_at DESC);
 CREATE INDEX IF NOT EXISTS idx_chat_sessions_current_phase ON chat_sessions(current_phase);
+-- Session listing: keyset pages on (updated_at, id) per user
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_user_updated ON chat_sessions(user_id, updated_at DESC, id DESC);
 
 -- Chat History Indexes
 CREATE INDEX IF NOT EXISTS idx_chat_history_session_id ON chat_history(session_id);
 CREATE INDEX IF NOT EXISTS idx_chat_history_created_at ON chat_history(created_at);
 CREATE INDEX IF NOT EXISTS idx_chat_history_phase ON chat_history(phase);
+-- History pages seek on (created_at, id) within a session, optionally within one phase
+CREATE INDEX IF NOT EXISTS idx_chat_history_session_created ON chat_history(session_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_chat_history_session_phase_created ON chat_history(session_id, phase, created_at, id);
 
 -- Business Plans Indexes
 CREATE INDEX IF NOT EXISTS idx_business_plans_session_id ON business_plans(session_id);
@@ -218,10 +236,12 @@ CREATE INDEX IF NOT EXISTS idx_implementation_tasks_due_date ON implementation_t
 CREATE INDEX IF NOT EXISTS idx_service_providers_session_id ON service_providers(session_id);
 CREATE INDEX IF NOT EXISTS idx_service_providers_category ON service_providers(category);
 CREATE INDEX IF NOT EXISTS idx_service_providers_is_local ON service_providers(is_local);
+CREATE INDEX IF NOT EXISTS idx_service_providers_directory ON service_providers(category, subcategory, state, city, is_local);
 
 -- Research Sources Indexes
 CREATE INDEX IF NOT EXISTS idx_research_sources_session_id ON research_sources(session_id);
 CREATE INDEX IF NOT EXISTS idx_research_sources_source_type ON research_sources(source_type);
+CREATE INDEX IF NOT EXISTS idx_research_sources_created_at ON research_sources(created_at);
 
 -- RAG Documents Indexes
 CREATE INDEX IF NOT EXISTS idx_rag_documents_document_type ON rag_documents(document_type);
@@ -255,6 +275,159 @@ CREATE TRIGGER update_implementation_tasks_updated_at BEFORE UPDATE ON implement
 CREATE TRIGGER update_rag_documents_updated_at BEFORE UPDATE ON rag_documents FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 CREATE TRIGGER update_user_preferences_updated_at BEFORE UPDATE ON user_preferences FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- =============================================
+-- CHAT TURN WRITES
+-- =============================================
+
+-- Persist a chat turn's messages and session update in one transaction.
+-- Message ids are generated by the client, so retrying a turn is idempotent.
+CREATE OR REPLACE FUNCTION save_chat_turn(p_session_id UUID, p_messages JSONB, p_session_updates JSONB)
+RETURNS VOID AS $$
+DECLARE
+    v_assignments TEXT;
+BEGIN
+    INSERT INTO chat_history (id, session_id, user_id, role, content, phase, created_at)
+    SELECT (m->>'id')::UUID, p_session_id, (m->>'user_id')::UUID, m->>'role', m->>'content', m->>'phase', (m->>'created_at')::TIMESTAMPTZ
+    FROM jsonb_array_elements(COALESCE(p_messages, '[]'::JSONB)) AS m
+    ON CONFLICT (id) DO NOTHING;
+
+    IF p_session_updates IS NOT NULL AND p_session_updates <> '{}'::JSONB THEN
+        SELECT string_agg(format('%I = r.%I', key, key), ', ')
+        INTO v_assignments
+        FROM jsonb_object_keys(p_session_updates) AS key;
+
+        EXECUTE format(
+            'UPDATE chat_sessions AS s SET %s FROM jsonb_populate_record(NULL::chat_sessions, $1) AS r WHERE s.id = $2',
+            v_assignments
+        ) USING p_session_updates, p_session_id;
+    END IF;
+END;
+$$ language 'plpgsql';
+
+-- =============================================
+-- CHAT TURN COORDINATION
+-- =============================================
+
+-- One in-flight chat turn per session across API workers (server-side only, no client policies)
+CREATE TABLE IF NOT EXISTS chat_turn_locks (
+    session_id UUID PRIMARY KEY REFERENCES chat_sessions(id) ON DELETE CASCADE,
+    owner TEXT NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Take the session's lease if it is free, expired or already ours
+CREATE OR REPLACE FUNCTION try_acquire_chat_turn_lock(p_session_id UUID, p_owner TEXT, p_ttl_seconds INTEGER)
+RETURNS BOOLEAN AS $$
+BEGIN
+    INSERT INTO chat_turn_locks (session_id, owner, expires_at)
+    VALUES (p_session_id, p_owner, NOW() + make_interval(secs => p_ttl_seconds))
+    ON CONFLICT (session_id) DO UPDATE
+        SET owner = EXCLUDED.owner, expires_at = EXCLUDED.expires_at
+        WHERE chat_turn_locks.expires_at < NOW() OR chat_turn_locks.owner = EXCLUDED.owner;
+    RETURN FOUND;
+END;
+$$ language 'plpgsql';
+
+-- Responses of finished turns, replayed to retried or double-submitted requests
+CREATE TABLE IF NOT EXISTS chat_turn_results (
+    session_id UUID REFERENCES chat_sessions(id) ON DELETE CASCADE,
+    idempotency_key TEXT NOT NULL,
+    response JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (session_id, idempotency_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_chat_turn_results_created_at ON chat_turn_results(created_at);
+
+-- =============================================
+-- ROADMAP VERSIONS
+-- =============================================
+
+-- roadmaps holds each session's current roadmap: content, parsed sections (phases) and tasks
+ALTER TABLE roadmaps ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_roadmaps_session_unique ON roadmaps(session_id);
+
+-- Earlier versions as section deltas: only sections that changed since the previous version,
+-- plus a full snapshot every ROADMAP_SNAPSHOT_EVERY versions
+CREATE TABLE IF NOT EXISTS roadmap_versions (
+    roadmap_id UUID NOT NULL REFERENCES roadmaps(id) ON DELETE CASCADE,
+    version INTEGER NOT NULL,
+    changed JSONB NOT NULL DEFAULT '{}',
+    section_order JSONB NOT NULL DEFAULT '[]',
+    is_snapshot BOOLEAN NOT NULL DEFAULT FALSE,
+    reason VARCHAR(50) NOT NULL DEFAULT 'edit',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (roadmap_id, version)
+);
+
+-- Advance a session's roadmap from p_expected_version (0: no roadmap yet) and record the version row in one
+-- transaction. Raises serialization_failure when another write got there first, leaving neither row behind.
+-- The roadmap update is the version check, so a version row left by an older partial write is overwritten
+CREATE OR REPLACE FUNCTION save_roadmap_version(p_session_id UUID, p_expected_version INTEGER, p_roadmap JSONB, p_version JSONB)
+RETURNS SETOF roadmaps AS $$
+DECLARE
+    v_roadmap roadmaps;
+BEGIN
+    IF p_expected_version = 0 THEN
+        INSERT INTO roadmaps (session_id, user_id, content, phases, tasks, version)
+        VALUES (p_session_id, (p_roadmap->>'user_id')::UUID, p_roadmap->>'content', p_roadmap->'phases', p_roadmap->'tasks', 1)
+        ON CONFLICT (session_id) DO NOTHING
+        RETURNING * INTO v_roadmap;
+    ELSE
+        UPDATE roadmaps
+        SET user_id = (p_roadmap->>'user_id')::UUID, content = p_roadmap->>'content', phases = p_roadmap->'phases',
+            tasks = p_roadmap->'tasks', version = p_expected_version + 1
+        WHERE session_id = p_session_id AND version = p_expected_version
+        RETURNING * INTO v_roadmap;
+    END IF;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'roadmap for session % is no longer at version %', p_session_id, p_expected_version
+            USING ERRCODE = 'serialization_failure';
+    END IF;
+
+    INSERT INTO roadmap_versions (roadmap_id, version, changed, section_order, is_snapshot, reason)
+    VALUES (v_roadmap.id, v_roadmap.version, p_version->'changed', p_version->'section_order',
+            (p_version->>'is_snapshot')::BOOLEAN, p_version->>'reason')
+    ON CONFLICT (roadmap_id, version) DO UPDATE
+        SET changed = EXCLUDED.changed, section_order = EXCLUDED.section_order, is_snapshot = EXCLUDED.is_snapshot,
+            reason = EXCLUDED.reason, created_at = NOW();
+
+    RETURN NEXT v_roadmap;
+END;
+$$ language 'plpgsql';
+
+-- =============================================
+-- SESSION PROGRESS
+-- =============================================
+
+-- Progress record (phase indicator, per-section counts, completed implementation tasks) advanced on
+-- every answered question and completed task; NULL until the session's first update after migrating
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS progress JSONB DEFAULT NULL;
+
+-- =============================================
+-- SESSION SUMMARIES
+-- =============================================
+
+-- Lightweight per-session view: no JSONB payloads, message count from idx_chat_history_session_created.
+-- security_invoker keeps the chat_sessions / chat_history RLS policies in force for API users.
+CREATE OR REPLACE VIEW chat_session_summaries WITH (security_invoker = true) AS
+SELECT
+    s.id,
+    s.user_id,
+    s.title,
+    s.current_phase,
+    s.asked_q,
+    s.answered_count,
+    s.business_context->>'business_name' AS business_name,
+    s.business_context->>'industry' AS industry,
+    s.business_context->>'location' AS location,
+    (SELECT COUNT(*) FROM chat_history h WHERE h.session_id = s.id) AS message_count,
+    (SELECT MAX(h.created_at) FROM chat_history h WHERE h.session_id = s.id) AS last_message_at,
+    s.created_at,
+    s.updated_at
+FROM chat_sessions s;
+
 -- =============================================
 -- ROW LEVEL SECURITY (RLS) POLICIES
 -- =============================================
@@ -271,6 +444,9 @@ ALTER TABLE rag_documents ENABLE ROW LEVEL SECURITY;
 ALTER TABLE agent_interactions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_preferences ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_activity ENABLE ROW LEVEL SECURITY;
+ALTER TABLE chat_turn_locks ENABLE ROW LEVEL SECURITY;
+ALTER TABLE chat_turn_results ENABLE ROW LEVEL SECURITY;
+ALTER TABLE roadmap_versions ENABLE ROW LEVEL SECURITY;
 
 -- RLS Policies for chat_sessions
 CREATE POLICY "Users can view their own sessions" ON chat_sessions FOR SELECT USING (auth.uid() = user_id);
@@ -0,0 +1,248 @@
+import asyncio
+import functools
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Optional
+from utils.logger import get_logger
+from utils.metrics import CIRCUIT_STATE, CIRCUIT_TRANSITIONS, CIRCUIT_REJECTED
+
+logger = get_logger(__name__)
+
+CIRCUIT_BREAKERS_ENABLED = os.getenv("CIRCUIT_BREAKERS_ENABLED", "true").lower() == "true"
+# Consecutive outage errors that open a circuit
+FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+# Or this share of failures among the last CIRCUIT_WINDOW calls (once at least half the window is filled)
+FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+WINDOW_SIZE = int(os.getenv("CIRCUIT_WINDOW", "20"))
+# Seconds an open circuit rejects calls before letting a probe through
+COOLDOWN_SECONDS = float(os.getenv("CIRCUIT_COOLDOWN", "30"))
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpen(Exception):
+    """A dependency's circuit is open; the call was rejected without being attempted"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit {name} is open")
+        self.name = name
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated outage errors -> half-open single probe -> closed on success"""
+
+    def __init__(self, name: str, is_outage: Optional[Callable[[BaseException], bool]] = None):
+        self.name = name
+        self.is_outage = is_outage
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.outcomes: Deque[bool] = deque(maxlen=WINDOW_SIZE)
+        self.probe_in_flight = False
+        CIRCUIT_STATE.set(STATE_VALUES[CLOSED], breaker=name)
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls would be rejected, so callers can skip straight to a fallback"""
+
+        return CIRCUIT_BREAKERS_ENABLED and self.state == OPEN and time.monotonic() - self.opened_at < COOLDOWN_SECONDS
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpen unless a call may go ahead; True when the call is the half-open probe
+
+        Pass the returned flag to record() or release_probe() so only the probe's outcome decides
+        whether a half-open circuit closes or reopens.
+        """
+
+        if not CIRCUIT_BREAKERS_ENABLED or self.state == CLOSED:
+            return False
+        if self.state == OPEN:
+            remaining = COOLDOWN_SECONDS - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                self._reject(remaining)
+            self._transition(HALF_OPEN)
+        if self.probe_in_flight:
+            self._reject(1)
+        self.probe_in_flight = True
+        return True
+
+    def record(self, error: Optional[BaseException] = None, probe: bool = False):
+        """Count a finished call; errors that are not outages (bad requests, not-found) count as successes"""
+
+        if isinstance(error, CircuitOpen):
+            # Rejected before reaching the dependency, so it says nothing about its health
+            self.release_probe(probe)
+            return
+        failed = error is not None and self._counts_as_outage(error)
+        self.outcomes.append(failed)
+        self.consecutive_failures = self.consecutive_failures + 1 if failed else 0
+
+        # Only the probe closes or reopens the circuit; calls that started before it opened do not
+        if probe:
+            self.probe_in_flight = False
+            if failed:
+                self._open()
+            else:
+                self._transition(CLOSED)
+        elif failed and self.state == CLOSED and (self.consecutive_failures >= FAILURE_THRESHOLD or self._failure_rate() >= FAILURE_RATE):
+            self._open()
+
+    def release_probe(self, probe: bool = True):
+        """A probe ended without an outcome (cancelled); let the next caller probe instead"""
+
+        if probe:
+            self.probe_in_flight = False
+
+    def _counts_as_outage(self, error: BaseException) -> bool:
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+            return True
+        return bool(self.is_outage and self.is_outage(error))
+
+    def _failure_rate(self) -> float:
+        if len(self.outcomes) < max(1, WINDOW_SIZE // 2):
+            return 0.0
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def _open(self):
+        self.opened_at = time.monotonic()
+        self._transition(OPEN)
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning("Circuit %s: %s -> %s", self.name, self.state, state)
+        self.state = state
+        if state == CLOSED:
+            self.outcomes.clear()
+        CIRCUIT_STATE.set(STATE_VALUES[state], breaker=self.name)
+        CIRCUIT_TRANSITIONS.inc(breaker=self.name, state=state)
+
+    def _reject(self, retry_after: float):
+        CIRCUIT_REJECTED.inc(breaker=self.name)
+        raise CircuitOpen(self.name, retry_after)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_rate": round(self._failure_rate(), 3),
+            "open_for_seconds": round(time.monotonic() - self.opened_at, 1) if self.state == OPEN else 0
+        }
+
+
+class CircuitBreakerRegistry:
+    """Named breakers, created on first use with their dependency's notion of an outage"""
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str, is_outage: Optional[Callable[[BaseException], bool]] = None) -> CircuitBreaker:
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = self.breakers[name] = CircuitBreaker(name, is_outage)
+        return breaker
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: breaker.get_stats() for name, breaker in self.breakers.items()}
+
+
+# Global instance
+circuit_breakers = CircuitBreakerRegistry()
+
+
+def _openai_outage(error: BaseException) -> bool:
+    import openai
+    return isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError, openai.RateLimitError))
+
+
+def openai_breaker(model: Optional[str]) -> CircuitBreaker:
+    """Breaker for one OpenAI model; timeouts, connection errors, 5xx and 429s count as outages"""
+
+    return circuit_breakers.get(f"openai:{model or 'default'}", is_outage=_openai_outage)
+
+
+# PostgREST connection errors, and Postgres SQLSTATE classes for connection, resource, operator
+# (statement timeout, shutdown) and system failures; constraint and syntax errors are the caller's
+SUPABASE_OUTAGE_CODES = ("PGRST0", "PGRST5", "08", "53", "57", "58", "XX")
+
+
+def _supabase_outage(error: BaseException) -> bool:
+    import httpx
+    from postgrest.exceptions import APIError
+    if isinstance(error, (httpx.TransportError, ConnectionError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    if isinstance(error, APIError):
+        # postgrest raises APIError for every non-2xx response. A body that is not a PostgREST error
+        # (a gateway page) carries the HTTP status as an int code instead
+        if error.code is None:
+            return True
+        if isinstance(error.code, int) or (str(error.code).isdigit() and len(str(error.code)) == 3):
+            return int(error.code) >= 500
+        return str(error.code).upper().startswith(SUPABASE_OUTAGE_CODES)
+    return False
+
+
+def supabase_breaker() -> CircuitBreaker:
+    """Breaker for the Supabase data layer; transport errors, 5xx and database outage codes count as outages"""
+
+    return circuit_breakers.get("supabase", is_outage=_supabase_outage)
+
+
+# Set while a guarded call runs: a guarded call made inside it is part of the same outcome, and
+# going through the breaker again would reject it while the outer call holds the half-open probe
+_guarded_call: ContextVar[bool] = ContextVar("guarded_call", default=False)
+
+
+def guarded(breaker_factory: Callable[[], CircuitBreaker]):
+    """Decorator failing a sync or async call fast while its dependency's circuit is open"""
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _guarded_call.get():
+                    return await func(*args, **kwargs)
+                breaker = breaker_factory()
+                probe = breaker.before_call()
+                token = _guarded_call.set(True)
+                try:
+                    result = await func(*args, **kwargs)
+                except asyncio.CancelledError:
+                    breaker.release_probe(probe)
+                    raise
+                except Exception as e:
+                    breaker.record(e, probe)
+                    raise
+                finally:
+                    _guarded_call.reset(token)
+                breaker.record(probe=probe)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _guarded_call.get():
+                return func(*args, **kwargs)
+            breaker = breaker_factory()
+            probe = breaker.before_call()
+            token = _guarded_call.set(True)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                breaker.record(e, probe)
+                raise
+            finally:
+                _guarded_call.reset(token)
+            breaker.record(probe=probe)
+            return result
+        return wrapper
+
+    return decorator
@@ -0,0 +1,197 @@
+import functools
+import hashlib
+import os
+import re
+from typing import Dict, List, Any, Optional
+from utils.metrics import record_cache
+
+# Token budget for the history portion of each call site's prompt
+TOKEN_BUDGETS = {
+    "chat": int(os.getenv("MEMORY_BUDGET_CHAT", "2500")),
+    "draft": int(os.getenv("MEMORY_BUDGET_DRAFT", "1200")),
+    "artifact": int(os.getenv("MEMORY_BUDGET_ARTIFACT", "6000")),
+    "plan": int(os.getenv("MEMORY_BUDGET_PLAN", "12000"))
+}
+# Share of a budget reserved for verbatim recent turns; the rest holds the rolling summary
+RECENT_SHARE = 0.5
+# Longest answer kept in a summary slot
+MAX_SLOT_TOKENS = 150
+
+TAG_PATTERN = re.compile(r"\[\[Q:([A-Z_]+\.\d+)\]\]")
+COMMAND_WORDS = {"support", "draft", "draft more", "scrapping", "scraping", "accept", "modify", "kickstart", "who do i contact?"}
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding():
+    """The gpt-4o tokenizer, loaded on first use rather than at import (it reads a large BPE file)"""
+
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with the gpt-4o tokenizer, estimating when tiktoken is not installed"""
+
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to max_tokens, keeping the beginning"""
+
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens]) + "…"
+    return text[:max_tokens * 4] + "…"
+
+
+def _fingerprint(message: Dict[str, Any]) -> str:
+    return hashlib.sha1(f"{message.get('role')}:{message.get('content')}".encode()).hexdigest()
+
+
+class ConversationMemory:
+    """Rolling answer-slot summary plus token-budgeted recent turns for each session"""
+
+    def __init__(self, max_sessions: int = 1000):
+        self.max_sessions = max_sessions
+        # session_id -> {"processed", "fingerprint", "slots", "pending_tag"}
+        self.states: Dict[str, Dict[str, Any]] = {}
+
+    def build_messages(self, history: List[Dict[str, Any]], budget: str = "chat", session_id: Optional[str] = None) -> List[Dict[str, str]]:
+        """Return chat messages for a prompt: a summary of earlier answers followed by the recent turns that fit"""
+
+        total_budget = TOKEN_BUDGETS.get(budget, TOKEN_BUDGETS["chat"])
+        recent = self.recent_messages(history, budget, max_tokens=int(total_budget * RECENT_SHARE))
+        used = sum(count_tokens(message["content"]) for message in recent)
+
+        summary = self.summary(history, session_id, before_index=len(history) - len(recent), max_tokens=total_budget - used)
+        if not summary:
+            return recent
+        return [{"role": "system", "content": summary}] + recent
+
+    def build_transcript(self, history: List[Dict[str, Any]], budget: str = "artifact", session_id: Optional[str] = None) -> str:
+        """Render build_messages as a plain-text transcript for artifact prompts"""
+
+        return "\n".join(
+            f"{message['role'].upper()}: {message['content']}"
+            for message in self.build_messages(history, budget, session_id)
+        )
+
+    def recent_messages(self, history: List[Dict[str, Any]], budget: str = "chat", max_tokens: Optional[int] = None) -> List[Dict[str, str]]:
+        """Newest turns that fit the budget; the newest message is always kept, truncated if needed"""
+
+        if max_tokens is None:
+            max_tokens = TOKEN_BUDGETS.get(budget, TOKEN_BUDGETS["chat"])
+
+        recent = []
+        used = 0
+        for message in reversed(history):
+            content = message.get("content")
+            if not content:
+                continue
+            tokens = count_tokens(content)
+            if used + tokens > max_tokens:
+                if not recent:
+                    recent.append({"role": message["role"], "content": truncate_to_tokens(content, max_tokens)})
+                break
+            recent.append({"role": message["role"], "content": content})
+            used += tokens
+
+        return list(reversed(recent))
+
+    def answer_slots(self, history: List[Dict[str, Any]], session_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Latest user answer for each question tag, as {tag: {"answer", "index"}}"""
+
+        return self._update(history, session_id)["slots"]
+
+    def previous_answers(self, history: List[Dict[str, Any]], session_id: Optional[str] = None, limit: int = 5, max_chars: int = 200) -> List[str]:
+        """Most recent distinct answers, oldest first"""
+
+        slots = sorted(self.answer_slots(history, session_id).values(), key=lambda slot: slot["index"])
+        return [slot["answer"][:max_chars] for slot in slots[-limit:]]
+
+    def summary(self, history: List[Dict[str, Any]], session_id: Optional[str] = None, before_index: Optional[int] = None, max_tokens: Optional[int] = None) -> str:
+        """Compact summary of answers given before before_index, newest answers kept when over budget"""
+
+        if before_index is None:
+            before_index = len(history)
+        if max_tokens is None:
+            max_tokens = TOKEN_BUDGETS["chat"]
+
+        header = "Summary of the user's earlier answers (question tag: answer):"
+        slots = [
+            (tag, slot) for tag, slot in self.answer_slots(history, session_id).items()
+            if slot["index"] < before_index
+        ]
+        if not slots:
+            return ""
+
+        lines = []
+        used = count_tokens(header)
+        for tag, slot in sorted(slots, key=lambda item: item[1]["index"], reverse=True):
+            line = f"- {tag}: {truncate_to_tokens(slot['answer'], MAX_SLOT_TOKENS)}"
+            tokens = count_tokens(line)
+            if used + tokens > max_tokens:
+                break
+            lines.append(line)
+            used += tokens
+
+        if not lines:
+            return ""
+        return header + "\n" + "\n".join(reversed(lines))
+
+    def forget(self, session_id: str):
+        """Drop the cached state for a session"""
+
+        self.states.pop(session_id, None)
+
+    def _update(self, history: List[Dict[str, Any]], session_id: Optional[str]) -> Dict[str, Any]:
+        """Fold messages added since the last call into the session's answer slots"""
+
+        state = self.states.get(session_id) if session_id else None
+        if state is not None:
+            processed = state["processed"]
+            # History is append-only; anything else means the cache no longer matches
+            if processed > len(history) or (processed and _fingerprint(history[processed - 1]) != state["fingerprint"]):
+                state = None
+
+        if session_id:
+            record_cache("conversation_memory", state is not None)
+        if state is None:
+            state = {"processed": 0, "fingerprint": None, "slots": {}, "pending_tag": None}
+
+        for index in range(state["processed"], len(history)):
+            message = history[index]
+            content = (message.get("content") or "").strip()
+            if message.get("role") == "assistant":
+                tags = TAG_PATTERN.findall(content)
+                if tags:
+                    state["pending_tag"] = tags[-1]
+            elif message.get("role") == "user" and state["pending_tag"]:
+                if content and content.lower() not in COMMAND_WORDS:
+                    # A modified answer replaces the earlier one for the same question
+                    state["slots"].pop(state["pending_tag"], None)
+                    state["slots"][state["pending_tag"]] = {"answer": content, "index": index}
+
+        state["processed"] = len(history)
+        state["fingerprint"] = _fingerprint(history[-1]) if history else None
+
+        if session_id:
+            if session_id not in self.states and len(self.states) >= self.max_sessions:
+                self.states.pop(next(iter(self.states)))
+            self.states[session_id] = state
+
+        return state
+
+
+# Global instance
+conversation_memory = ConversationMemory()
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+from utils.logger import get_logger
+from utils.metrics import FAN_IN_COMPONENT_LATENCY
+from utils.tracing import span
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Component:
+    """One independent piece of an aggregated response"""
+
+    run: Callable[[], Awaitable[Any]]
+    # Seconds this component may take; None = bounded only by the fan-in deadline
+    timeout: Optional[float] = None
+    # Used when the component fails or misses its deadline; a callable is called for a fresh value
+    fallback: Any = None
+
+
+@dataclass
+class FanInResult:
+    values: Dict[str, Any]
+    latency_ms: Dict[str, float]
+    # Component -> "timeout" or the exception type, for components that fell back
+    degraded: Dict[str, str] = field(default_factory=dict)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.values[key]
+
+    @property
+    def complete(self) -> bool:
+        return not self.degraded
+
+
+async def fan_in(name: str, components: Dict[str, Component], deadline: Optional[float] = None) -> FanInResult:
+    """Run components concurrently and assemble whatever finished in time
+
+    Each component gets its own timeout, capped by the overall deadline; failures and timeouts are
+    replaced by the component's fallback instead of failing the aggregate. Child tasks never outlive
+    the call: if the caller is cancelled, they are cancelled too.
+    """
+
+    started = time.perf_counter()
+    finished_at: Dict[str, float] = {}
+
+    async def run(key: str, component: Component) -> Any:
+        with span(f"{name}.{key}"):
+            try:
+                return await asyncio.wait_for(component.run(), component.timeout)
+            finally:
+                finished_at[key] = time.perf_counter()
+
+    tasks = {key: asyncio.create_task(run(key, component)) for key, component in components.items()}
+    try:
+        if tasks:
+            _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+            for task in pending:
+                task.cancel()
+            # Let stragglers finish cancelling before their fallbacks are used
+            await asyncio.gather(*pending, return_exceptions=True)
+    except asyncio.CancelledError:
+        for task in tasks.values():
+            task.cancel()
+        raise
+
+    result = FanInResult(values={}, latency_ms={})
+    for key, task in tasks.items():
+        component = components[key]
+        elapsed = finished_at.get(key, time.perf_counter()) - started
+        outcome = "ok"
+        if task.cancelled():
+            outcome = "timeout"
+        elif task.exception() is not None:
+            error = task.exception()
+            outcome = "timeout" if isinstance(error, asyncio.TimeoutError) else type(error).__name__
+
+        if outcome == "ok":
+            result.values[key] = task.result()
+        else:
+            result.values[key] = component.fallback() if callable(component.fallback) else component.fallback
+            result.degraded[key] = outcome
+            logger.warning("%s: component %s fell back (%s)", name, key, outcome)
+
+        result.latency_ms[key] = round(elapsed * 1000, 1)
+        FAN_IN_COMPONENT_LATENCY.observe(elapsed, aggregate=name, component=key, outcome="ok" if outcome == "ok" else "fallback")
+    return result
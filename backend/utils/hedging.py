@@ -0,0 +1,108 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from utils.logger import get_logger
+from utils.metrics import HEDGE_REQUESTS, HEDGED_LATENCY, HEDGE_DELAY
+
+logger = get_logger(__name__)
+
+# Opt-in: send a second identical completion when the first is slower than usual
+HEDGING_ENABLED = os.getenv("OPENAI_HEDGING", "false").lower() == "true"
+# Hedge after this percentile of the call site's recent latencies
+HEDGE_PERCENTILE = float(os.getenv("OPENAI_HEDGE_PERCENTILE", "0.95"))
+# Never hedge sooner than this, however fast the call site has been
+HEDGE_MIN_DELAY = float(os.getenv("OPENAI_HEDGE_MIN_DELAY", "1.0"))
+# Extra calls allowed, as a share of hedgeable calls
+HEDGE_BUDGET = float(os.getenv("OPENAI_HEDGE_BUDGET", "0.05"))
+# Latencies kept per call site, and how many are needed before hedging starts
+HEDGE_WINDOW = int(os.getenv("OPENAI_HEDGE_WINDOW", "200"))
+HEDGE_MIN_SAMPLES = int(os.getenv("OPENAI_HEDGE_MIN_SAMPLES", "20"))
+
+
+class Hedger:
+    """Races a backup request against a slow first one, within a global budget of extra calls"""
+
+    def __init__(self):
+        self.latencies: Dict[str, Deque[float]] = {}
+        # Earned at HEDGE_BUDGET per call, spent at one per hedge; the cap bounds a burst of hedges
+        self.tokens = 1.0
+        self.stats = {"calls": 0, "hedged": 0, "hedge_won": 0, "skipped_budget": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return HEDGING_ENABLED
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None until the call site has enough history"""
+
+        window = self.latencies.get(key)
+        if not window or len(window) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(window)
+        return max(HEDGE_MIN_DELAY, ordered[min(len(ordered) - 1, int(len(ordered) * HEDGE_PERCENTILE))])
+
+    async def run(self, key: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the first successful attempt; the loser is cancelled"""
+
+        self.stats["calls"] += 1
+        self.tokens = min(5.0, self.tokens + HEDGE_BUDGET)
+        started = time.perf_counter()
+        delay = self.hedge_delay(key)
+        primary = asyncio.ensure_future(attempt())
+        backup = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or self.tokens < 1:
+                if not done:
+                    self.stats["skipped_budget"] += 1
+                    HEDGE_REQUESTS.inc(call_site=key, outcome="skipped_budget")
+                result = await primary
+                self._observe(key, started)
+                return result
+
+            self.tokens -= 1
+            self.stats["hedged"] += 1
+            HEDGE_REQUESTS.inc(call_site=key, outcome="hedged")
+            logger.info("Hedging %s after %.2fs", key, delay)
+            backup = asyncio.ensure_future(attempt())
+            pending = {primary, backup}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if not task.cancelled() and task.exception() is None), None)
+                if winner is not None:
+                    if winner is backup:
+                        self.stats["hedge_won"] += 1
+                        HEDGE_REQUESTS.inc(call_site=key, outcome="hedge_won")
+                    self._observe(key, started)
+                    return winner.result()
+            # Both attempts failed: surface the primary's error
+            return primary.result()
+        finally:
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def _observe(self, key: str, started: float):
+        """Record the latency the caller saw and refresh the call site's hedge threshold"""
+
+        elapsed = time.perf_counter() - started
+        self.latencies.setdefault(key, deque(maxlen=HEDGE_WINDOW)).append(elapsed)
+        HEDGED_LATENCY.observe(elapsed, call_site=key)
+        delay = self.hedge_delay(key)
+        if delay is not None:
+            HEDGE_DELAY.set(round(delay, 3), call_site=key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        calls = self.stats["calls"]
+        return {
+            **self.stats,
+            "enabled": HEDGING_ENABLED,
+            "extra_call_ratio": round(self.stats["hedged"] / calls, 4) if calls else 0.0,
+            "delays": {key: self.hedge_delay(key) for key in self.latencies}
+        }
+
+
+# Global instance
+openai_hedger = Hedger()
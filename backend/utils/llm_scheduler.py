@@ -0,0 +1,238 @@
+import asyncio
+import contextvars
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, List, Optional
+from utils.logger import get_logger
+from utils.metrics import LLM_QUEUE_WAIT, LLM_QUEUED, LLM_INFLIGHT, LLM_SHED
+
+logger = get_logger(__name__)
+
+# Priority classes, highest first
+INTERACTIVE = 0
+BACKGROUND = 1
+SPECULATIVE = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background", SPECULATIVE: "speculative"}
+
+LLM_SCHEDULER_ENABLED = os.getenv("LLM_SCHEDULER_ENABLED", "true").lower() == "true"
+# Concurrent completions per model in this worker, e.g. "gpt-4o=24,gpt-4o-mini=48"
+MODEL_CONCURRENCY = {
+    model.strip(): int(limit)
+    for model, limit in (
+        item.split("=") for item in os.getenv("LLM_MODEL_CONCURRENCY", "gpt-4o=24,gpt-4o-mini=48").split(",") if "=" in item
+    )
+}
+DEFAULT_CONCURRENCY = int(os.getenv("LLM_DEFAULT_CONCURRENCY", "16"))
+# Longest a call may queue for a slot before it is shed, per priority class
+QUEUE_BUDGET_SECONDS = {
+    INTERACTIVE: float(os.getenv("LLM_QUEUE_BUDGET_INTERACTIVE", "10")),
+    BACKGROUND: float(os.getenv("LLM_QUEUE_BUDGET_BACKGROUND", "45")),
+    SPECULATIVE: float(os.getenv("LLM_QUEUE_BUDGET_SPECULATIVE", "1"))
+}
+# Model whose queue decides request admission (the chat and artifact model)
+ADMISSION_MODEL = os.getenv("LLM_ADMISSION_MODEL", "gpt-4o")
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+_user: contextvars.ContextVar[str] = contextvars.ContextVar("llm_user", default="anonymous")
+
+
+class LLMOverloaded(Exception):
+    """LLM work was shed because its queue wait would exceed the priority's budget"""
+
+    def __init__(self, priority: int, retry_after: int):
+        super().__init__(f"LLM capacity exhausted for {PRIORITY_NAMES[priority]} work")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+def bind_llm_context(priority: Optional[int] = None, user_id: Optional[str] = None):
+    """Set the priority class and fair-queuing user for LLM calls made from the current task"""
+
+    if priority is not None:
+        _priority.set(priority)
+    if user_id:
+        _user.set(str(user_id))
+
+
+@contextmanager
+def llm_priority(priority: int, user_id: Optional[str] = None):
+    """Run a block's LLM calls under another priority class (and optionally user)"""
+
+    priority_token = _priority.set(priority)
+    user_token = _user.set(str(user_id)) if user_id else None
+    try:
+        yield
+    finally:
+        _priority.reset(priority_token)
+        if user_token is not None:
+            _user.reset(user_token)
+
+
+class ModelPool:
+    """Bounded concurrency for one model, granted by priority and round-robin across users"""
+
+    def __init__(self, model: str, limit: int):
+        self.model = model
+        self.limit = limit
+        self.active = 0
+        # priority -> user -> waiters, users kept in round-robin order
+        self.queues: List["OrderedDict[str, Deque[asyncio.Future]]"] = [OrderedDict() for _ in PRIORITY_NAMES]
+        # Moving average of how long a call holds a slot
+        self.service_seconds = 3.0
+
+    def queued_in(self, priority: int) -> int:
+        return sum(len(waiters) for waiters in self.queues[priority].values())
+
+    def queued(self, up_to_priority: int = SPECULATIVE) -> int:
+        """Waiters at this priority class or above"""
+
+        return sum(self.queued_in(priority) for priority in range(up_to_priority + 1))
+
+    def estimated_wait(self, priority: int) -> float:
+        """Expected queue time for a new call of this priority"""
+
+        ahead = self.queued(priority)
+        if self.active < self.limit and ahead == 0:
+            return 0.0
+        return (ahead + 1) / self.limit * self.service_seconds
+
+    def enqueue(self, priority: int, user: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.queues[priority].setdefault(user, deque()).append(future)
+        self._publish_depth(priority)
+        return future
+
+    def withdraw(self, priority: int, user: str, future: asyncio.Future):
+        waiters = self.queues[priority].get(user)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            if not waiters:
+                del self.queues[priority][user]
+            self._publish_depth(priority)
+
+    def release(self, held_seconds: float):
+        self.active -= 1
+        self.service_seconds = 0.9 * self.service_seconds + 0.1 * held_seconds
+        self.dispatch()
+
+    def dispatch(self):
+        """Hand free slots to the oldest waiter of the next user in the highest non-empty class"""
+
+        for priority, users in enumerate(self.queues):
+            while users and self.active < self.limit:
+                user, waiters = next(iter(users.items()))
+                future = waiters.popleft()
+                if waiters:
+                    users.move_to_end(user)
+                else:
+                    del users[user]
+                if future.done():
+                    continue
+                self.active += 1
+                future.set_result(None)
+            self._publish_depth(priority)
+        LLM_INFLIGHT.set(self.active, model=self.model)
+
+    def _publish_depth(self, priority: int):
+        LLM_QUEUED.set(self.queued_in(priority), model=self.model, priority=PRIORITY_NAMES[priority])
+
+
+class LLMScheduler:
+    """Admission control for outbound LLM calls: priority classes, per-user fairness, per-model pools"""
+
+    def __init__(self):
+        self.pools: Dict[str, ModelPool] = {}
+        self.stats = {"granted": 0, "queued": 0, "shed_admission": 0, "shed_queue": 0}
+
+    def pool(self, model: Optional[str]) -> ModelPool:
+        model = model or "default"
+        if model not in self.pools:
+            self.pools[model] = ModelPool(model, MODEL_CONCURRENCY.get(model, DEFAULT_CONCURRENCY))
+        return self.pools[model]
+
+    def retry_after(self, seconds: float) -> int:
+        return max(1, min(60, math.ceil(seconds)))
+
+    def check_admission(self, priority: int, model: str = ADMISSION_MODEL):
+        """Shed a request up front when its LLM work would wait longer than the class budget"""
+
+        if not LLM_SCHEDULER_ENABLED:
+            return
+        estimate = self.pool(model).estimated_wait(priority)
+        if estimate > QUEUE_BUDGET_SECONDS[priority]:
+            self.stats["shed_admission"] += 1
+            LLM_SHED.inc(priority=PRIORITY_NAMES[priority], stage="admission")
+            logger.warning("Shedding %s request: estimated LLM queue wait %.1fs", PRIORITY_NAMES[priority], estimate)
+            raise LLMOverloaded(priority, self.retry_after(estimate))
+
+    @asynccontextmanager
+    async def slot(self, model: Optional[str]):
+        """Hold one of the model's concurrency slots for the duration of a call"""
+
+        if not LLM_SCHEDULER_ENABLED:
+            yield
+            return
+
+        pool = self.pool(model)
+        priority, user = _priority.get(), _user.get()
+        name = PRIORITY_NAMES[priority]
+        started = time.perf_counter()
+
+        if pool.active < pool.limit and pool.queued() == 0:
+            pool.active += 1
+            LLM_INFLIGHT.set(pool.active, model=pool.model)
+        else:
+            budget = QUEUE_BUDGET_SECONDS[priority]
+            if pool.estimated_wait(priority) > budget:
+                self._shed(priority, pool, "queue")
+            self.stats["queued"] += 1
+            future = pool.enqueue(priority, user)
+            try:
+                await asyncio.wait_for(asyncio.shield(future), budget)
+            except asyncio.TimeoutError:
+                pool.withdraw(priority, user, future)
+                if not future.done():
+                    future.cancel()
+                    self._shed(priority, pool, "queue")
+            except asyncio.CancelledError:
+                pool.withdraw(priority, user, future)
+                if future.done() and not future.cancelled():
+                    # Granted while being cancelled: pass the slot on
+                    pool.release(0.0)
+                future.cancel()
+                raise
+
+        waited = time.perf_counter() - started
+        LLM_QUEUE_WAIT.observe(waited, model=pool.model, priority=name)
+        self.stats["granted"] += 1
+        held_from = time.perf_counter()
+        try:
+            yield
+        finally:
+            pool.release(time.perf_counter() - held_from)
+
+    def _shed(self, priority: int, pool: ModelPool, stage: str):
+        self.stats["shed_queue"] += 1
+        LLM_SHED.inc(priority=PRIORITY_NAMES[priority], stage=stage)
+        raise LLMOverloaded(priority, self.retry_after(pool.estimated_wait(priority)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pools": {
+                model: {
+                    "limit": pool.limit,
+                    "active": pool.active,
+                    "queued": {name: pool.queued_in(priority) for priority, name in PRIORITY_NAMES.items()},
+                    "service_seconds": round(pool.service_seconds, 2)
+                }
+                for model, pool in self.pools.items()
+            }
+        }
+
+
+# Global instance
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as StackCounter, deque
+from typing import Any, Deque, Dict, List, Optional
+from utils.logger import get_logger
+from utils.metrics import LOOP_STALLS, LOOP_STALL_DURATION
+
+logger = get_logger(__name__)
+
+LOOP_WATCHDOG_ENABLED = os.getenv("LOOP_WATCHDOG_ENABLED", "true").lower() == "true"
+# A loop that misses its heartbeat by more than this is stalled and gets its stack captured
+STALL_THRESHOLD_MS = float(os.getenv("LOOP_STALL_THRESHOLD_MS", "250"))
+HEARTBEAT_INTERVAL = float(os.getenv("LOOP_HEARTBEAT_INTERVAL", "0.05"))
+# Stalls kept for GET /debug/stalls
+STALL_HISTORY = int(os.getenv("LOOP_STALL_HISTORY", "50"))
+# The profiler endpoint is off unless explicitly enabled, and then serves loopback clients only
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def collapse_stack(frame) -> str:
+    """Root-to-leaf frames joined with ';', the folded format flame graph tools read"""
+
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class LoopWatchdog:
+    """Thread that watches an event-loop heartbeat and captures the loop thread's stack when it stalls"""
+
+    def __init__(self):
+        self.loop_thread_id: Optional[int] = None
+        self.heartbeat = time.monotonic()
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=STALL_HISTORY)
+        self.thread: Optional[threading.Thread] = None
+        self.stopped = threading.Event()
+        self.stats = {"stalls": 0, "longest_stall_ms": 0.0}
+
+    async def start(self):
+        """Begin watching the running loop; call once from app startup"""
+
+        if not LOOP_WATCHDOG_ENABLED or self.thread is not None:
+            return
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.beat_task = asyncio.create_task(self._beat())
+        self.thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    async def _beat(self):
+        while True:
+            self.heartbeat = time.monotonic()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    def _watch(self):
+        threshold = STALL_THRESHOLD_MS / 1000
+        stall = None
+        while not self.stopped.wait(HEARTBEAT_INTERVAL / 2):
+            beat = self.heartbeat
+            overdue = time.monotonic() - beat - HEARTBEAT_INTERVAL
+            if stall is None:
+                if overdue > threshold:
+                    # Captured while the blocking code is still on the stack
+                    frame = sys._current_frames().get(self.loop_thread_id)
+                    stall = {
+                        "heartbeat": beat,
+                        "started_at": time.time() - overdue,
+                        "stack": traceback.format_stack(frame) if frame else [],
+                        "collapsed": collapse_stack(frame) if frame else ""
+                    }
+            elif self.heartbeat != stall["heartbeat"]:
+                self._record(stall, (self.heartbeat - stall["heartbeat"] - HEARTBEAT_INTERVAL) * 1000)
+                stall = None
+
+    def _record(self, stall: Dict[str, Any], duration_ms: float):
+        duration_ms = round(max(duration_ms, STALL_THRESHOLD_MS), 1)
+        entry = {
+            "started_at": stall["started_at"],
+            "duration_ms": duration_ms,
+            "stack": "".join(stall["stack"][-25:]),
+            "collapsed": stall["collapsed"]
+        }
+        self.stalls.append(entry)
+        self.stats["stalls"] += 1
+        self.stats["longest_stall_ms"] = max(self.stats["longest_stall_ms"], duration_ms)
+        LOOP_STALLS.inc()
+        LOOP_STALL_DURATION.observe(duration_ms / 1000)
+        logger.warning("Event loop blocked for %.0fms", duration_ms, extra={"latency_ms": duration_ms, "stack": entry["stack"]})
+
+    def get_stalls(self) -> List[Dict[str, Any]]:
+        return list(self.stalls)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "enabled": LOOP_WATCHDOG_ENABLED, "threshold_ms": STALL_THRESHOLD_MS}
+
+
+class SamplingProfiler:
+    """Samples thread stacks from a background thread and folds them into collapsed-stack counts"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self.lock.locked()
+
+    def sample(self, seconds: float, interval: float, thread_id: Optional[int] = None) -> StackCounter:
+        """Blocking: sample for `seconds` every `interval`; all threads but this one when thread_id is None"""
+
+        own = threading.get_ident()
+        stacks: StackCounter = StackCounter()
+        with self.lock:
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == own or (thread_id is not None and ident != thread_id):
+                        continue
+                    stacks[collapse_stack(frame)] += 1
+                time.sleep(interval)
+        return stacks
+
+    async def profile(self, seconds: float, interval: float = 0.005, loop_only: bool = True) -> str:
+        """Profile without blocking the loop; returns 'frame;frame;frame count' lines, hottest first"""
+
+        seconds = min(seconds, PROFILER_MAX_SECONDS)
+        thread_id = threading.get_ident() if loop_only else None
+        stacks = await asyncio.to_thread(self.sample, seconds, interval, thread_id)
+        return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+
+
+# Global instances
+loop_watchdog = LoopWatchdog()
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,164 @@
+import asyncio
+import bisect
+import os
+import threading
+import time
+from typing import Dict, List, Tuple, Optional
+
+# Default latency buckets in seconds, from fast DB calls to slow completions
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+LOOP_LAG_INTERVAL = float(os.getenv("METRICS_LOOP_LAG_INTERVAL", "0.5"))
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(key) + sorted((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.values: Dict[LabelKey, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(_label_key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, **labels):
+        with self.lock:
+            self.values[_label_key(labels)] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., sum, count]
+        self.values: Dict[LabelKey, List[float]] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.setdefault(key, [0] * (len(self.buckets) + 2))
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, {'le': str(bound)})} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, {'le': '+Inf'})} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {round(series[-2], 6)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route, method, status and chat phase")
+OPENAI_LATENCY = Histogram("openai_request_duration_seconds", "OpenAI chat completion latency by model and call site")
+OPENAI_TOKENS = Histogram("openai_tokens", "OpenAI tokens per call by model, call site and kind", TOKEN_BUCKETS)
+OPENAI_ERRORS = Counter("openai_errors_total", "OpenAI chat completion errors by model, call site and error type")
+SUPABASE_LATENCY = Histogram("supabase_call_duration_seconds", "Supabase data-layer call latency by operation")
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result (hit or miss)")
+CACHE_HIT_RATIO = Gauge("cache_hit_ratio", "Hit ratio per cache since process start")
+WEB_SEARCH_THROTTLED = Counter("web_search_throttled_total", "Web searches rejected by the throttle")
+EVENT_LOOP_LAG = Histogram("event_loop_lag_seconds", "Delay of a scheduled event-loop wakeup beyond its interval", (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+EVENT_LOOP_LAG_CURRENT = Gauge("event_loop_lag_current_seconds", "Most recent event-loop lag sample")
+CHAT_DUPLICATES = Counter("chat_duplicate_submits_total", "Duplicate /chat submits answered with an earlier turn's result, by source")
+CHAT_LOCK_WAIT = Histogram("chat_turn_lock_wait_seconds", "Time a chat turn waited for its session's turn lock")
+LLM_QUEUE_WAIT = Histogram("llm_queue_wait_seconds", "Time an OpenAI call queued for a model slot, by model and priority class")
+LLM_QUEUED = Gauge("llm_queued_calls", "OpenAI calls waiting for a model slot, by model and priority class")
+LLM_INFLIGHT = Gauge("llm_inflight_calls", "OpenAI calls holding a model slot, by model")
+LLM_SHED = Counter("llm_shed_total", "LLM work rejected by admission control, by priority class and stage")
+CIRCUIT_STATE = Gauge("circuit_breaker_state", "Circuit breaker state per dependency (0 closed, 1 half-open, 2 open)")
+CIRCUIT_TRANSITIONS = Counter("circuit_breaker_transitions_total", "Circuit breaker state changes by breaker and new state")
+CIRCUIT_REJECTED = Counter("circuit_breaker_rejected_total", "Calls failed fast by an open circuit, by breaker")
+HEDGED_LATENCY = Histogram("openai_hedged_call_duration_seconds", "Caller-visible latency of hedgeable OpenAI calls (first attempt to finish), by call site")
+HEDGE_REQUESTS = Counter("openai_hedge_requests_total", "Hedging decisions by call site and outcome (hedged, hedge_won, skipped_budget)")
+HEDGE_DELAY = Gauge("openai_hedge_delay_seconds", "Current hedge threshold per call site")
+LOOP_STALLS = Counter("event_loop_stalls_total", "Event-loop stalls over the watchdog threshold")
+LOOP_STALL_DURATION = Histogram("event_loop_stall_duration_seconds", "Duration of event-loop stalls caught by the watchdog")
+FAN_IN_COMPONENT_LATENCY = Histogram("fan_in_component_duration_seconds", "Latency of each component of a concurrently assembled response")
+WS_CONNECTIONS = Gauge("session_channel_connections", "Open session WebSocket connections")
+WS_EVENTS = Counter("session_channel_events_total", "Events pushed to session WebSocket subscribers")
+RESPONSE_BYTES = Counter("http_response_bytes_total", "Response body bytes before (identity) and after compression")
+
+REGISTRY = [
+    REQUEST_LATENCY, OPENAI_LATENCY, OPENAI_TOKENS, OPENAI_ERRORS, SUPABASE_LATENCY,
+    CACHE_REQUESTS, CACHE_HIT_RATIO, WEB_SEARCH_THROTTLED, EVENT_LOOP_LAG, EVENT_LOOP_LAG_CURRENT,
+    CHAT_DUPLICATES, CHAT_LOCK_WAIT, LLM_QUEUE_WAIT, LLM_QUEUED, LLM_INFLIGHT, LLM_SHED,
+    CIRCUIT_STATE, CIRCUIT_TRANSITIONS, CIRCUIT_REJECTED, HEDGED_LATENCY, HEDGE_REQUESTS, HEDGE_DELAY,
+    LOOP_STALLS, LOOP_STALL_DURATION, FAN_IN_COMPONENT_LATENCY, WS_CONNECTIONS, WS_EVENTS,
+    RESPONSE_BYTES
+]
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup; hit ratios are derived when metrics are rendered"""
+
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of every registered metric"""
+
+    caches = {dict(key)["cache"] for key in CACHE_REQUESTS.values}
+    for cache in caches:
+        hits = CACHE_REQUESTS.get(cache=cache, result="hit")
+        total = hits + CACHE_REQUESTS.get(cache=cache, result="miss")
+        CACHE_HIT_RATIO.set(round(hits / total, 4) if total else 0.0, cache=cache)
+
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+async def monitor_event_loop_lag():
+    """Sample how late the loop wakes a sleeping task; long stalls mean blocking work on the loop"""
+
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lag = max(0.0, time.perf_counter() - started - LOOP_LAG_INTERVAL)
+        EVENT_LOOP_LAG.observe(lag)
+        EVENT_LOOP_LAG_CURRENT.set(round(lag, 6))
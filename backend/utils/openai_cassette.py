@@ -0,0 +1,174 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+# off: live calls only; record: live calls written to the cassette;
+# replay: answer from the cassette, a miss is an error; replay_or_record: replay hits, record misses
+CASSETTE_MODE = os.getenv("OPENAI_CASSETTE_MODE", "off")
+CASSETTE_PATH = os.getenv("OPENAI_CASSETTE_PATH", "cassettes/openai.jsonl.gz")
+# Replay delay: "0" for none, a number of milliseconds, or "recorded" for the original latency
+REPLAY_LATENCY = os.getenv("OPENAI_REPLAY_LATENCY", "0")
+
+# Request fields that change nothing about the completion
+IGNORED_FIELDS = {"stream", "timeout", "user", "extra_headers", "extra_query", "extra_body"}
+# Prompt fragments that differ between runs of the same conversation
+VOLATILE_PATTERNS = [
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE), "<uuid>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?([+-]\d{2}:?\d{2}|Z)?"), "<timestamp>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}\b"), "<date>"),
+    (re.compile(r"\b\d{1,2}:\d{2}(:\d{2})?\b"), "<time>"),
+    (re.compile(r"\b20\d{2}\b"), "<year>"),
+    (re.compile(r"\s+"), " ")
+]
+
+
+class CassetteMiss(Exception):
+    """Raised in replay mode when no recorded response matches a request"""
+
+
+def _normalize_text(text: str) -> str:
+    for pattern, replacement in VOLATILE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def normalize_request(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a chat.completions.create call to the parts that determine the response"""
+
+    normalized = {key: value for key, value in kwargs.items() if key not in IGNORED_FIELDS and key != "messages"}
+    normalized["messages"] = [
+        {
+            "role": message.get("role"),
+            "content": _normalize_text(message["content"]) if isinstance(message.get("content"), str) else message.get("content")
+        }
+        for message in kwargs.get("messages", [])
+    ]
+    return normalized
+
+
+def request_key(kwargs: Dict[str, Any]) -> str:
+    """Stable hash of the normalized request"""
+
+    payload = json.dumps(normalize_request(kwargs), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Gzipped JSONL store of OpenAI request/response pairs keyed by normalized prompt hash"""
+
+    def __init__(self, path: str = CASSETTE_PATH, mode: str = CASSETTE_MODE, replay_latency: str = REPLAY_LATENCY):
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        # key -> recorded interactions, replayed in order and then cycled
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self.positions: Dict[str, int] = {}
+        self.loaded = False
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode in ("replay", "replay_or_record")
+
+    @property
+    def recording(self) -> bool:
+        return self.mode in ("record", "replay_or_record")
+
+    def configure(self, mode: str, path: Optional[str] = None, replay_latency: Optional[str] = None):
+        """Switch mode or cassette at runtime (benchmarks); reloads on next use"""
+
+        self.mode = mode
+        if path is not None and path != self.path:
+            self.path = path
+            self.loaded = False
+        if replay_latency is not None:
+            self.replay_latency = replay_latency
+        self.positions.clear()
+
+    def _ensure_loaded(self):
+        if self.loaded:
+            return
+        with self.lock:
+            if self.loaded:
+                return
+            self.entries = {}
+            if os.path.exists(self.path):
+                # Appends write one gzip member per interaction; gzip reads them back as one stream
+                with gzip.open(self.path, "rt", encoding="utf-8") as cassette:
+                    for line in cassette:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self.entries.setdefault(entry["key"], []).append(entry)
+            self.loaded = True
+
+    def lookup(self, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Next recorded interaction for this request, or None"""
+
+        self._ensure_loaded()
+        key = request_key(kwargs)
+        recorded = self.entries.get(key)
+        if not recorded:
+            self.stats["misses"] += 1
+            return None
+
+        position = self.positions.get(key, 0)
+        self.positions[key] = position + 1
+        self.stats["hits"] += 1
+        return recorded[position % len(recorded)]
+
+    async def replay(self, kwargs: Dict[str, Any], call_site: str = "", strict: bool = True):
+        """Recorded response as a ChatCompletion, after the configured replay delay; None on a non-strict miss"""
+
+        from openai.types.chat import ChatCompletion
+
+        entry = self.lookup(kwargs)
+        if entry is None:
+            if not strict:
+                return None
+            raise CassetteMiss(f"No recorded response for {kwargs.get('model')} call from {call_site or 'unknown'}")
+
+        if self.replay_latency == "recorded":
+            await asyncio.sleep(entry.get("latency_ms", 0) / 1000)
+        elif float(self.replay_latency or 0) > 0:
+            await asyncio.sleep(float(self.replay_latency) / 1000)
+        return ChatCompletion.model_validate(entry["response"])
+
+    def record(self, kwargs: Dict[str, Any], response: Any, latency_seconds: float, call_site: str = ""):
+        """Append a live interaction to the cassette"""
+
+        self._ensure_loaded()
+        entry = {
+            "key": request_key(kwargs),
+            "call_site": call_site,
+            "model": kwargs.get("model"),
+            "latency_ms": round(latency_seconds * 1000, 1),
+            "request": normalize_request(kwargs),
+            "response": response.model_dump(mode="json") if hasattr(response, "model_dump") else response
+        }
+        with self.lock:
+            self.entries.setdefault(entry["key"], []).append(entry)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as cassette:
+                cassette.write(json.dumps(entry) + "\n")
+            self.stats["recorded"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "path": self.path,
+            "keys": len(self.entries),
+            "interactions": sum(len(recorded) for recorded in self.entries.values()),
+            **self.stats
+        }
+
+
+# Global instance
+openai_cassette = Cassette()
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, Optional
+from utils.metrics import OPENAI_LATENCY, OPENAI_TOKENS, OPENAI_ERRORS
+from utils.openai_cassette import openai_cassette
+from utils.llm_scheduler import llm_scheduler, LLMOverloaded
+from utils.circuit_breaker import openai_breaker
+from utils.hedging import openai_hedger
+from utils.tracing import span
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+    from openai.types.chat import ChatCompletion
+
+# Per-call timeout, so a degraded API fails (and trips the breaker) instead of hanging for the SDK's 10 minutes
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "120"))
+
+
+class _ChatCompletions:
+    """chat.completions facade that schedules, traces and measures every call, and records or replays cassettes"""
+
+    def __init__(self, owner: "OpenAIClient"):
+        self._owner = owner
+
+    async def create(self, **kwargs):
+        call_site = sys._getframe(1).f_code.co_name
+        # on_delta=async callback streams the reply's text as it arrives; the full response is still returned
+        on_delta = kwargs.pop("on_delta", None)
+        # hedge=True opts a latency-critical call into hedged requests (utils/hedging.py).
+        # A streamed call is not hedged: two racing streams would interleave their tokens.
+        if kwargs.pop("hedge", False) and openai_hedger.enabled and on_delta is None:
+            return await openai_hedger.run(call_site, lambda: self._attempt(kwargs, call_site))
+        return await self._attempt(kwargs, call_site, on_delta)
+
+    async def _attempt(self, kwargs, call_site, on_delta=None):
+        model = kwargs.get("model")
+        # Fail fast while the model's circuit is open; callers' except paths hold the fallbacks
+        breaker = openai_breaker(model)
+        probe = breaker.before_call()
+        try:
+            # Queue for a model slot first, so latency below is OpenAI time only
+            async with llm_scheduler.slot(model):
+                started = time.perf_counter()
+                with span("openai", model=model, call_site=call_site) as record:
+                    try:
+                        response = await self._create(kwargs, call_site, started, on_delta)
+                    except Exception as e:
+                        OPENAI_ERRORS.inc(model=model, call_site=call_site, error=type(e).__name__)
+                        breaker.record(e, probe)
+                        raise
+                    finally:
+                        OPENAI_LATENCY.observe(time.perf_counter() - started, model=model, call_site=call_site)
+                    breaker.record(probe=probe)
+
+                    usage = getattr(response, "usage", None)
+                    if usage is not None:
+                        OPENAI_TOKENS.observe(usage.prompt_tokens, model=model, call_site=call_site, kind="prompt")
+                        OPENAI_TOKENS.observe(usage.completion_tokens, model=model, call_site=call_site, kind="completion")
+                        if record is not None:
+                            record["attributes"]["prompt_tokens"] = usage.prompt_tokens
+                            record["attributes"]["completion_tokens"] = usage.completion_tokens
+                    return response
+        except (LLMOverloaded, asyncio.CancelledError):
+            # Never reached OpenAI: no outcome for the breaker
+            breaker.release_probe(probe)
+            raise
+
+    async def _create(self, kwargs, call_site, started, on_delta=None):
+        if openai_cassette.replaying:
+            # Strict replay raises on a miss; replay_or_record falls through to a live call
+            response = await openai_cassette.replay(kwargs, call_site, strict=openai_cassette.mode == "replay")
+            if response is not None:
+                if on_delta is not None:
+                    await on_delta(response.choices[0].message.content or "")
+                return response
+
+        if on_delta is not None:
+            response = await self._stream(kwargs, on_delta)
+        else:
+            response = await self._owner.raw.chat.completions.create(**kwargs)
+        if openai_cassette.recording:
+            openai_cassette.record(kwargs, response, time.perf_counter() - started, call_site)
+        return response
+
+    async def _stream(self, kwargs, on_delta) -> "ChatCompletion":
+        """Stream a completion through on_delta and assemble the same response a plain call returns"""
+
+        from openai.types.chat import ChatCompletion
+
+        request = {**kwargs, "stream": True, "stream_options": {"include_usage": True}}
+        parts, finish_reason, usage, first = [], None, None, None
+        async for chunk in await self._owner.raw.chat.completions.create(**request):
+            first = first or chunk
+            if chunk.usage is not None:
+                usage = chunk.usage
+            for choice in chunk.choices:
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                if choice.delta.content:
+                    parts.append(choice.delta.content)
+                    await on_delta(choice.delta.content)
+
+        return ChatCompletion(
+            id=first.id if first else "",
+            object="chat.completion",
+            created=first.created if first else int(time.time()),
+            model=first.model if first else kwargs.get("model", ""),
+            choices=[{
+                "index": 0,
+                "finish_reason": finish_reason or "stop",
+                "message": {"role": "assistant", "content": "".join(parts)}
+            }],
+            usage=usage
+        )
+
+
+class _Chat:
+    def __init__(self, owner: "OpenAIClient"):
+        self.completions = _ChatCompletions(owner)
+
+
+class OpenAIClient:
+    """Shared AsyncOpenAI client; every module's completions go through this one entry point"""
+
+    def __init__(self):
+        self._raw: Optional["AsyncOpenAI"] = None
+        self.chat = _Chat(self)
+
+    @property
+    def raw(self) -> "AsyncOpenAI":
+        if self._raw is None:
+            # The SDK is the single most expensive import in the app; load it with the first completion
+            from openai import AsyncOpenAI
+            self._raw = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=OPENAI_TIMEOUT)
+        return self._raw
+
+
+_client = OpenAIClient()
+
+
+def get_openai_client() -> OpenAIClient:
+    return _client
@@ -0,0 +1,47 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def encode_cursor(row: Dict[str, Any], column: str = "created_at") -> str:
+    """Opaque position of a row in (column, id) order"""
+
+    raw = json.dumps([row[column], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """(timestamp, id) from a cursor; both are validated because they end up inside a PostgREST filter"""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+        return str(timestamp), str(uuid.UUID(str(row_id)))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def seek(query, cursor: Optional[str], column: str = "created_at", forward: bool = True):
+    """Keyset condition: rows strictly after (forward) or before the cursor in (column, id) order
+
+    Equivalent to a (column, id) > (value, id) row comparison, which PostgREST cannot express directly;
+    with a (..., column, id) index it is a range scan no matter how deep the page is.
+    """
+
+    if not cursor:
+        return query
+    timestamp, row_id = decode_cursor(cursor)
+    op = "gt" if forward else "lt"
+    return query.or_(f'{column}.{op}."{timestamp}",and({column}.eq."{timestamp}",id.{op}.{row_id})')
+
+
+def page(rows: List[Dict[str, Any]], limit: int, column: str = "created_at") -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Trim a limit + 1 fetch to the page and the cursor for the next one (None on the last page)"""
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1], column)
@@ -1,21 +1,76 @@
-from typing import Optional
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from utils.logger import get_logger
+from utils.conversation_memory import conversation_memory
+
+logger = get_logger(__name__)
 
 def parse_tag(text: str) -> Optional[str]:
-    import re
     match = re.search(r"\[\[Q:([A-Z_]+\.\d{2})]]", text)
     return match.group(1) if match else None
 
 def is_answer_valid(q_tag: str, answer: str) -> bool:
     return answer.strip() and len(answer.strip()) > 3
 
-def smart_trim_history(history_list, max_lines=150):
-    # Flatten the list of dicts to a single string (assuming each item is a dict with 'role' and 'content')
-    joined = "\n".join(
-        f"{msg['role'].upper()}: {msg['content']}" for msg in history_list if 'content' in msg
-    )
-    lines = joined.splitlines()
-    trimmed = "\n".join(lines[-max_lines:])
-    return trimmed
+def smart_trim_history(history_list, budget="plan"):
+    # Every answer survives in the summary even when long replies push older turns out of the budget
+    return conversation_memory.build_transcript(history_list, budget)
+
+# Implementation tasks in the order they are worked through, grouped by implementation phase
+IMPLEMENTATION_TASK_PHASES = {
+    "legal_formation": {
+        "name": "Legal Formation & Compliance",
+        "tasks": [
+            "business_structure_selection",
+            "business_registration",
+            "tax_id_application",
+            "permits_licenses",
+            "insurance_requirements"
+        ]
+    },
+    "financial_setup": {
+        "name": "Financial Planning & Setup",
+        "tasks": [
+            "business_bank_account",
+            "accounting_system",
+            "budget_planning",
+            "funding_strategy",
+            "financial_tracking"
+        ]
+    },
+    "operations_development": {
+        "name": "Product & Operations Development",
+        "tasks": [
+            "supply_chain_setup",
+            "equipment_procurement",
+            "operational_processes",
+            "quality_control",
+            "inventory_management"
+        ]
+    },
+    "marketing_sales": {
+        "name": "Marketing & Sales Strategy",
+        "tasks": [
+            "brand_development",
+            "marketing_strategy",
+            "sales_process",
+            "customer_acquisition",
+            "digital_presence"
+        ]
+    },
+    "launch_scaling": {
+        "name": "Full Launch & Scaling",
+        "tasks": [
+            "go_to_market",
+            "team_building",
+            "performance_monitoring",
+            "growth_strategies",
+            "customer_feedback"
+        ]
+    }
+}
+IMPLEMENTATION_TASKS = [task for phase in IMPLEMENTATION_TASK_PHASES.values() for task in phase["tasks"]]
 
 TOTALS_BY_PHASE = {
     "KYC": 19,  # Updated to 19 questions (removed privacy question)
@@ -24,7 +79,7 @@ TOTALS_BY_PHASE = {
     "ROADMAP": 1,
     "ROADMAP_GENERATED": 1,
     "ROADMAP_TO_IMPLEMENTATION_TRANSITION": 1,
-    "IMPLEMENTATION": 10
+    "IMPLEMENTATION": len(IMPLEMENTATION_TASKS)
 }
 
 def calculate_phase_progress(current_phase: str, answered_count: int, current_tag: str = None) -> dict:
@@ -32,11 +87,6 @@ def calculate_phase_progress(current_phase: str, answered_count: int, current_ta
     Calculate progress within the current phase based on current question tag.
     This fixes the issue where progress was being calculated incorrectly.
     """
-    print(f"🔍 Progress Calculation Debug:")
-    print(f"  - current_phase: {current_phase}")
-    print(f"  - answered_count: {answered_count}")
-    print(f"  - current_tag: {current_tag}")
-    
     phase_order = ["KYC", "BUSINESS_PLAN", "ROADMAP", "ROADMAP_GENERATED", "ROADMAP_TO_IMPLEMENTATION_TRANSITION", "IMPLEMENTATION"]
     
     # Always use the current tag to determine the exact question number
@@ -44,26 +94,22 @@ def calculate_phase_progress(current_phase: str, answered_count: int, current_ta
         try:
             question_num = int(current_tag.split(".")[1])
             current_step = question_num
-            print(f"✅ Using tag-based calculation: tag={current_tag}, question_num={question_num}, current_step={current_step}")
         except (ValueError, IndexError):
             # Fallback to answered_count if tag parsing fails
             current_step = max(1, answered_count)
-            print(f"❌ Tag parsing failed, using answered_count: {current_step}")
+            logger.debug("Tag parsing failed, using answered_count %s", current_step, extra={"phase": current_phase, "tag": current_tag})
     else:
         # Fallback: Use answered_count if no valid tag
         current_step = max(1, answered_count)
-        print(f"⚠️ No valid tag found, using answered_count: {current_step}")
+        logger.debug("No valid tag found, using answered_count %s", current_step, extra={"phase": current_phase, "tag": current_tag})
     
     total_in_phase = TOTALS_BY_PHASE[current_phase]
-    print(f"  - total_in_phase: {total_in_phase}")
     
     # Ensure current_step doesn't exceed total for this phase
     current_step = min(current_step, total_in_phase)
-    print(f"  - final current_step: {current_step}")
     
     # Calculate percentage (1-100%)
     percent = max(1, min(100, round((current_step / total_in_phase) * 100)))
-    print(f"  - calculated percent: {percent}")
     
     result = {
         "phase": current_phase,
@@ -72,7 +118,7 @@ def calculate_phase_progress(current_phase: str, answered_count: int, current_ta
         "percent": percent
     }
     
-    print(f"📊 Final Progress Result: {result}")
+    logger.debug("Phase progress %s", result, extra={"phase": current_phase, "tag": current_tag})
     return result
 
 def calculate_combined_progress(current_phase: str, answered_count: int, current_tag: str = None) -> dict:
@@ -80,18 +126,12 @@ def calculate_combined_progress(current_phase: str, answered_count: int, current
     Calculate combined progress for KYC + Business Plan phases (65 total questions).
     This provides an overall progress view that combines both phases.
     """
-    print(f"🔍 Combined Progress Calculation Debug:")
-    print(f"  - current_phase: {current_phase}")
-    print(f"  - answered_count: {answered_count}")
-    print(f"  - current_tag: {current_tag}")
-    
     # Define combined phase totals
     COMBINED_TOTALS = {
         "KYC": 19,
         "BUSINESS_PLAN": 46,
         "COMBINED_KYC_BP": 65,  # 19 + 46 = 65 total questions
-        "ROADMAP": 1,
-        "IMPLEMENTATION": 10
+        "ROADMAP": 1
     }
     
     # Calculate current step based on phase and question number
@@ -108,29 +148,24 @@ def calculate_combined_progress(current_phase: str, answered_count: int, current
             else:
                 # For other phases, use answered_count as fallback
                 current_step = answered_count
-                
-            print(f"✅ Combined calculation: phase={current_phase}, question_num={question_num}, current_step={current_step}")
         except (ValueError, IndexError):
             # Fallback to answered_count if tag parsing fails
             current_step = answered_count
-            print(f"❌ Tag parsing failed, using answered_count: {current_step}")
+            logger.debug("Tag parsing failed, using answered_count %s", current_step, extra={"phase": current_phase, "tag": current_tag})
     else:
         # Fallback: Use answered_count if no valid tag
         current_step = answered_count
-        print(f"⚠️ No valid tag found, using answered_count: {current_step}")
+        logger.debug("No valid tag found, using answered_count %s", current_step, extra={"phase": current_phase, "tag": current_tag})
     
     # For KYC and Business Plan phases, use combined total (65)
     if current_phase in ["KYC", "BUSINESS_PLAN"]:
         total_combined = COMBINED_TOTALS["COMBINED_KYC_BP"]
-        print(f"  - Using combined total: {total_combined}")
         
         # Ensure current_step doesn't exceed combined total
         current_step = min(current_step, total_combined)
-        print(f"  - final current_step: {current_step}")
         
         # Calculate percentage based on combined total
         percent = max(1, min(100, round((current_step / total_combined) * 100)))
-        print(f"  - calculated percent: {percent}")
         
         # Calculate phase-specific step for display
         if current_phase == "KYC":
@@ -168,5 +203,148 @@ def calculate_combined_progress(current_phase: str, answered_count: int, current
             "combined": False
         }
     
-    print(f"📊 Combined Progress Result: {result}")
+    logger.debug("Combined progress %s", result, extra={"phase": current_phase, "tag": current_tag})
     return result
+
+
+# Workflow sections of the stored progress record, in order: (section, indicator id, label)
+PROGRESS_SECTIONS = [
+    ("KYC", "kyc_section", "KYC Intake Questionnaire"),
+    ("BUSINESS_PLAN", "planning_section", "Business Plan Development"),
+    ("ROADMAP", "roadmap_section", "Launch Roadmap Creation"),
+    ("IMPLEMENTATION", "implementation_section", "Implementation Execution")
+]
+# Section each session phase belongs to
+SECTION_OF_PHASE = {
+    "KYC": "KYC",
+    "BUSINESS_PLAN": "BUSINESS_PLAN",
+    "PLAN_TO_ROADMAP_TRANSITION": "ROADMAP",
+    "ROADMAP": "ROADMAP",
+    "ROADMAP_GENERATED": "ROADMAP",
+    "ROADMAP_TO_IMPLEMENTATION_TRANSITION": "IMPLEMENTATION",
+    "IMPLEMENTATION": "IMPLEMENTATION"
+}
+
+
+def _section_progress(section: str, current_section: str, phase: str, tag: Optional[str], completed_tasks: list) -> Dict[str, Any]:
+    order = [name for name, _, _ in PROGRESS_SECTIONS]
+    if section == "IMPLEMENTATION":
+        total = len(IMPLEMENTATION_TASKS)
+        completed = len(completed_tasks)
+    elif section == "ROADMAP":
+        total = 1
+        completed = 1 if order.index(current_section) > order.index(section) or phase == "ROADMAP_GENERATED" else 0
+    else:
+        total = TOTALS_BY_PHASE[section]
+        if order.index(current_section) > order.index(section):
+            completed = total
+        elif section == current_section and tag and tag.startswith(section + "."):
+            # The question on screen is not answered yet
+            completed = min(total, max(0, int(tag.split(".")[1]) - 1))
+        else:
+            completed = 0
+
+    if completed >= total:
+        status = "completed"
+    elif section == current_section or completed:
+        status = "in_progress"
+    else:
+        status = "pending"
+    return {"completed": completed, "total": total, "percent": round(completed / total * 100), "status": status}
+
+
+def advance_progress(record: Optional[Dict[str, Any]], phase: str, tag: Optional[str], answered_count: int = 0,
+                     completed_task: Optional[str] = None) -> Dict[str, Any]:
+    """Progress record after the session moved to (phase, tag) and/or finished an implementation task
+
+    Computed from the previous record and the event only, so it costs the same on the first turn and the
+    five hundredth. The record is stored with the session and every progress view renders from it.
+    """
+
+    phase = phase if phase in TOTALS_BY_PHASE else "KYC"
+    if tag and not re.match(r"^[A-Z_]+\.\d{2}$", tag):
+        tag = None
+    completed_tasks = list((record or {}).get("completed_tasks") or [])
+    if completed_task in IMPLEMENTATION_TASKS and completed_task not in completed_tasks:
+        completed_tasks.append(completed_task)
+
+    current_section = SECTION_OF_PHASE[phase]
+    sections = {
+        section: _section_progress(section, current_section, phase, tag, completed_tasks)
+        for section, _, _ in PROGRESS_SECTIONS
+    }
+
+    if phase == "IMPLEMENTATION":
+        # Implementation has no question tags; it advances with completed tasks
+        tasks = sections["IMPLEMENTATION"]
+        current = {"phase": phase, "answered": tasks["completed"], "total": tasks["total"], "percent": tasks["percent"]}
+    else:
+        current = calculate_phase_progress(phase, answered_count, tag)
+    overall = None
+    if phase in ("KYC", "BUSINESS_PLAN"):
+        combined = calculate_combined_progress(phase, answered_count, tag)
+        overall = {key: combined[key] for key in ("answered", "total", "percent")}
+    return {
+        "phase": phase,
+        "tag": tag,
+        "current": current,
+        "overall": overall,
+        "sections": sections,
+        "completed_tasks": completed_tasks,
+        # Every section weighs the same in the workflow total
+        "percent": round(sum(section["percent"] for section in sections.values()) / len(sections)),
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+def progress_from_session(session: Dict[str, Any]) -> Dict[str, Any]:
+    """The session's stored progress record, seeded from its phase and question when it has none yet"""
+
+    record = session.get("progress")
+    if isinstance(record, dict) and "sections" in record:
+        return record
+    return advance_progress(None, session.get("current_phase") or "KYC", session.get("asked_q"), session.get("answered_count") or 0)
+
+
+def progress_update(session: Dict[str, Any], completed_task: Optional[str] = None) -> Dict[str, Any]:
+    """Advance the session's record to its current phase and question; returns the session update to persist
+
+    The update is empty when chat_sessions has no progress column yet (schema not migrated): select("*")
+    then returns rows without the key, and the record keeps being seeded from the phase on each read.
+    """
+
+    column_available = "progress" in session
+    session["progress"] = advance_progress(
+        session.get("progress"), session.get("current_phase") or "KYC", session.get("asked_q"),
+        session.get("answered_count") or 0, completed_task
+    )
+    return {"progress": session["progress"]} if column_available else {}
+
+
+def chat_progress(record: Dict[str, Any]) -> Dict[str, Any]:
+    """The chat response's progress field: the phase indicator, plus the KYC + business plan total"""
+
+    progress = dict(record["current"])
+    if record.get("overall"):
+        progress["overall_progress"] = dict(record["overall"])
+    return progress
+
+
+def implementation_progress(record: Dict[str, Any]) -> Dict[str, Any]:
+    completed_tasks = set(record.get("completed_tasks") or [])
+    next_phase, next_task, phases_completed = None, None, 0
+    for phase_key, phase_data in IMPLEMENTATION_TASK_PHASES.items():
+        remaining = [task for task in phase_data["tasks"] if task not in completed_tasks]
+        if not remaining:
+            phases_completed += 1
+        elif next_task is None:
+            next_phase, next_task = phase_key, remaining[0]
+    section = record["sections"]["IMPLEMENTATION"]
+    return {
+        "completed": section["completed"],
+        "total": section["total"],
+        "percent": section["percent"],
+        "phases_completed": phases_completed,
+        "current_phase": next_phase,
+        "next_task": next_task
+    }
@@ -0,0 +1,389 @@
+# Curated service provider catalog used to seed the provider directory.
+# Each table is keyed by the category vocabulary of the service that owns it.
+
+# Provider table categories (ServiceProviderTableGenerator)
+CATEGORY_PROVIDERS = {
+    "legal": [
+        {
+            "name": "Local Business Attorney",
+            "type": "Local Professional",
+            "local": True,
+            "description": "Specializes in business formation, contracts, and compliance for startups and small businesses.",
+            "key_considerations": "Experience with your industry, local regulations knowledge, reasonable rates",
+            "estimated_cost": "$200-$400/hour",
+            "contact_method": "Local bar association directory",
+            "specialties": "Business formation, contracts, compliance"
+        },
+        {
+            "name": "LegalZoom",
+            "type": "Online Service",
+            "local": False,
+            "description": "Online legal services for business formation, document preparation, and compliance.",
+            "key_considerations": "Cost-effective, standardized processes, limited customization",
+            "estimated_cost": "$99-$399 per service",
+            "contact_method": "Website: legalzoom.com",
+            "specialties": "Business formation, document preparation"
+        },
+        {
+            "name": "Rocket Lawyer",
+            "type": "Online Service",
+            "local": False,
+            "description": "Online legal platform with document templates and attorney consultations.",
+            "key_considerations": "Subscription model, document library, attorney network",
+            "estimated_cost": "$39.99/month",
+            "contact_method": "Website: rocketlawyer.com",
+            "specialties": "Document templates, legal consultations"
+        }
+    ],
+    "financial": [
+        {
+            "name": "Local CPA Firm",
+            "type": "Local Professional",
+            "local": True,
+            "description": "Certified Public Accountant specializing in small business tax and accounting.",
+            "key_considerations": "Industry experience, local tax knowledge, ongoing support",
+            "estimated_cost": "$150-$300/hour",
+            "contact_method": "Local CPA directory",
+            "specialties": "Tax preparation, bookkeeping, financial planning"
+        },
+        {
+            "name": "QuickBooks",
+            "type": "Online Service",
+            "local": False,
+            "description": "Cloud-based accounting software with integrated tax services.",
+            "key_considerations": "User-friendly, integrations, scalability",
+            "estimated_cost": "$15-$200/month",
+            "contact_method": "Website: quickbooks.intuit.com",
+            "specialties": "Accounting software, tax services"
+        },
+        {
+            "name": "Xero",
+            "type": "Online Service",
+            "local": False,
+            "description": "Cloud accounting platform with third-party integrations.",
+            "key_considerations": "Modern interface, extensive integrations, mobile access",
+            "estimated_cost": "$13-$70/month",
+            "contact_method": "Website: xero.com",
+            "specialties": "Cloud accounting, integrations"
+        }
+    ],
+    "marketing": [
+        {
+            "name": "Local Marketing Agency",
+            "type": "Local Professional",
+            "local": True,
+            "description": "Full-service marketing agency specializing in digital marketing and branding.",
+            "key_considerations": "Local market knowledge, personalized service, ongoing support",
+            "estimated_cost": "$2,000-$10,000/month",
+            "contact_method": "Local business directory",
+            "specialties": "Digital marketing, branding, social media"
+        },
+        {
+            "name": "HubSpot",
+            "type": "Online Service",
+            "local": False,
+            "description": "All-in-one marketing, sales, and service platform.",
+            "key_considerations": "Comprehensive platform, automation, analytics",
+            "estimated_cost": "$45-$3,200/month",
+            "contact_method": "Website: hubspot.com",
+            "specialties": "Marketing automation, CRM, analytics"
+        },
+        {
+            "name": "Google Ads",
+            "type": "Online Service",
+            "local": False,
+            "description": "Pay-per-click advertising platform for search and display ads.",
+            "key_considerations": "Large reach, targeting options, performance tracking",
+            "estimated_cost": "Pay-per-click model",
+            "contact_method": "Website: ads.google.com",
+            "specialties": "Search advertising, display advertising"
+        }
+    ],
+    "operations": [
+        {
+            "name": "Local Equipment Supplier",
+            "type": "Local Professional",
+            "local": True,
+            "description": "Local supplier for business equipment, furniture, and supplies.",
+            "key_considerations": "Local delivery, service support, relationship building",
+            "estimated_cost": "Varies by equipment",
+            "contact_method": "Local business directory",
+            "specialties": "Equipment sales, installation, maintenance"
+        },
+        {
+            "name": "Amazon Business",
+            "type": "Online Service",
+            "local": False,
+            "description": "B2B marketplace for business supplies and equipment.",
+            "key_considerations": "Wide selection, bulk pricing, fast delivery",
+            "estimated_cost": "Varies by product",
+            "contact_method": "Website: business.amazon.com",
+            "specialties": "Business supplies, equipment, bulk purchasing"
+        },
+        {
+            "name": "Office Depot",
+            "type": "Mixed",
+            "local": True,
+            "description": "Office supplies and business services with local stores.",
+            "key_considerations": "Local presence, business services, bulk discounts",
+            "estimated_cost": "Varies by service",
+            "contact_method": "Local store or website",
+            "specialties": "Office supplies, printing, business services"
+        }
+    ],
+    "technology": [
+        {
+            "name": "Local IT Consultant",
+            "type": "Local Professional",
+            "local": True,
+            "description": "Local technology consultant for IT setup, maintenance, and support.",
+            "key_considerations": "Local support, personalized service, ongoing relationship",
+            "estimated_cost": "$75-$200/hour",
+            "contact_method": "Local IT directory",
+            "specialties": "IT setup, maintenance, support"
+        },
+        {
+            "name": "Microsoft 365",
+            "type": "Online Service",
+            "local": False,
+            "description": "Cloud-based productivity suite with business applications.",
+            "key_considerations": "Comprehensive suite, cloud storage, collaboration tools",
+            "estimated_cost": "$6-$22/user/month",
+            "contact_method": "Website: microsoft.com/microsoft-365",
+            "specialties": "Productivity suite, cloud storage, collaboration"
+        },
+        {
+            "name": "Google Workspace",
+            "type": "Online Service",
+            "local": False,
+            "description": "Cloud-based productivity and collaboration platform.",
+            "key_considerations": "Gmail integration, collaboration tools, cloud storage",
+            "estimated_cost": "$6-$18/user/month",
+            "contact_method": "Website: workspace.google.com",
+            "specialties": "Email, collaboration, cloud storage"
+        }
+    ],
+    "consulting": [
+        {
+            "name": "Local Business Consultant",
+            "type": "Local Professional",
+            "local": True,
+            "description": "Local business consultant specializing in strategy and operations.",
+            "key_considerations": "Local market knowledge, personalized service, ongoing support",
+            "estimated_cost": "$100-$300/hour",
+            "contact_method": "Local business directory",
+            "specialties": "Business strategy, operations, growth planning"
+        },
+        {
+            "name": "SCORE",
+            "type": "Non-profit",
+            "local": True,
+            "description": "Free business mentoring and education from retired executives.",
+            "key_considerations": "Free service, experienced mentors, local chapters",
+            "estimated_cost": "Free",
+            "contact_method": "Website: score.org",
+            "specialties": "Business mentoring, education, networking"
+        },
+        {
+            "name": "Small Business Development Center",
+            "type": "Government",
+            "local": True,
+            "description": "Government-funded business consulting and training services.",
+            "key_considerations": "Free/low-cost, government-backed, comprehensive services",
+            "estimated_cost": "Free to low-cost",
+            "contact_method": "Local SBDC office",
+            "specialties": "Business planning, training, funding assistance"
+        }
+    ]
+}
+
+# Provider router task types (provider_service)
+TASK_TYPE_PROVIDERS = {
+    "legal_formation": [
+        {
+            "name": "LegalZoom",
+            "type": "Online Service",
+            "local": False,
+            "description": "Online legal document preparation and business formation services",
+            "key_considerations": "Cost-effective, standardized process, good for simple formations",
+            "contact_info": "www.legalzoom.com",
+            "pricing": "$149-$349 depending on state and services",
+            "rating": "4.5/5 stars"
+        },
+        {
+            "name": "Local Business Attorney",
+            "type": "Legal Professional",
+            "local": True,
+            "description": "Personalized legal advice and business formation assistance",
+            "key_considerations": "Industry-specific expertise, personalized service, higher cost",
+            "contact_info": "Search local business attorneys in your area",
+            "pricing": "$200-$500 per hour",
+            "rating": "Varies by attorney"
+        },
+        {
+            "name": "SCORE Business Mentor",
+            "type": "Free Consultation",
+            "local": True,
+            "description": "Volunteer business mentors offering free guidance",
+            "key_considerations": "Free service, experienced mentors, limited availability",
+            "contact_info": "www.score.org",
+            "pricing": "Free",
+            "rating": "Highly recommended"
+        }
+    ],
+    "banking": [
+        {
+            "name": "Chase Business",
+            "type": "Traditional Bank",
+            "local": True,
+            "description": "Full-service business banking with extensive branch network",
+            "key_considerations": "Convenient locations, comprehensive services, monthly fees",
+            "contact_info": "www.chase.com/business",
+            "pricing": "$15-$95 monthly depending on account type",
+            "rating": "4.2/5 stars"
+        },
+        {
+            "name": "Capital One Spark",
+            "type": "Online Banking",
+            "local": False,
+            "description": "Digital-first business banking with no monthly fees",
+            "key_considerations": "No monthly fees, online-only, good for tech-savvy businesses",
+            "contact_info": "www.capitalone.com/spark",
+            "pricing": "No monthly fees",
+            "rating": "4.3/5 stars"
+        },
+        {
+            "name": "Local Credit Union",
+            "type": "Credit Union",
+            "local": True,
+            "description": "Community-focused banking with personalized service",
+            "key_considerations": "Lower fees, community focus, limited services",
+            "contact_info": "Search local credit unions",
+            "pricing": "Varies, typically lower than banks",
+            "rating": "High customer satisfaction"
+        }
+    ],
+    "accounting": [
+        {
+            "name": "QuickBooks",
+            "type": "Software Platform",
+            "local": False,
+            "description": "Industry-leading accounting and bookkeeping software",
+            "key_considerations": "Comprehensive features, learning curve, integrates with many tools",
+            "contact_info": "www.quickbooks.intuit.com",
+            "pricing": "$15-$200/month depending on plan",
+            "rating": "4.4/5 stars"
+        },
+        {
+            "name": "Local CPA Firm",
+            "type": "Professional Service",
+            "local": True,
+            "description": "Certified public accountants offering bookkeeping and tax services",
+            "key_considerations": "Expert guidance, compliance assurance, ongoing support",
+            "contact_info": "Search local CPA firms",
+            "pricing": "$100-$300/hour",
+            "rating": "Professional expertise"
+        },
+        {
+            "name": "Wave",
+            "type": "Software Platform",
+            "local": False,
+            "description": "Free accounting software for small businesses",
+            "key_considerations": "Free basic features, good for simple businesses, limited support",
+            "contact_info": "www.waveapps.com",
+            "pricing": "Free basic plan",
+            "rating": "4.2/5 stars"
+        }
+    ]
+}
+
+# Implementation task ids (ImplementationTaskManager)
+IMPLEMENTATION_TASK_PROVIDERS = {
+    "business_structure_selection": [
+        {
+            "name": "Local Business Attorney",
+            "type": "Legal Professional",
+            "local": True,
+            "description": "Local attorney specializing in business formation and legal structure selection",
+            "estimated_cost": "$200-500/hour",
+            "contact_method": "Phone or email consultation",
+            "specialties": "Business formation, legal structure, compliance"
+        },
+        {
+            "name": "Online Legal Services",
+            "type": "Legal Service Provider",
+            "local": False,
+            "description": "Online legal services for business formation and structure selection",
+            "estimated_cost": "$100-300",
+            "contact_method": "Online platform",
+            "specialties": "Business formation, legal documents, compliance"
+        },
+        {
+            "name": "Business Formation Service",
+            "type": "Business Services",
+            "local": True,
+            "description": "Local business formation service for startups and small businesses",
+            "estimated_cost": "$150-400",
+            "contact_method": "Phone or in-person consultation",
+            "specialties": "Business formation, registration, compliance"
+        }
+    ],
+    "business_registration": [
+        {
+            "name": "State Business Registration Service",
+            "type": "Government Service",
+            "local": False,
+            "description": "Official state business registration service",
+            "estimated_cost": "$50-200 (filing fees)",
+            "contact_method": "Online or mail",
+            "specialties": "Business registration, state compliance"
+        },
+        {
+            "name": "Local Business Consultant",
+            "type": "Business Consultant",
+            "local": True,
+            "description": "Local consultant specializing in business registration and setup",
+            "estimated_cost": "$100-300/hour",
+            "contact_method": "Phone or in-person consultation",
+            "specialties": "Business registration, compliance, setup"
+        },
+        {
+            "name": "Online Business Formation Platform",
+            "type": "Online Service",
+            "local": False,
+            "description": "Online platform for business registration and formation",
+            "estimated_cost": "$100-500",
+            "contact_method": "Online platform",
+            "specialties": "Business registration, formation, compliance"
+        }
+    ],
+    "tax_id_application": [
+        {
+            "name": "IRS EIN Application",
+            "type": "Government Service",
+            "local": False,
+            "description": "Free online EIN application through IRS website",
+            "estimated_cost": "Free",
+            "contact_method": "Online application",
+            "specialties": "EIN application, tax ID, business registration"
+        },
+        {
+            "name": "Local Tax Professional",
+            "type": "Tax Professional",
+            "local": True,
+            "description": "Local tax professional for EIN application and tax setup",
+            "estimated_cost": "$100-250",
+            "contact_method": "Phone or in-person consultation",
+            "specialties": "EIN application, tax setup, compliance"
+        },
+        {
+            "name": "Business Tax Service",
+            "type": "Tax Service",
+            "local": True,
+            "description": "Local business tax service for startups and small businesses",
+            "estimated_cost": "$150-300",
+            "contact_method": "Phone or in-person consultation",
+            "specialties": "Tax setup, EIN application, compliance"
+        }
+    ]
+}
@@ -0,0 +1,50 @@
+import re
+from typing import Dict, List, Optional
+from utils.constant import ANGEL_SYSTEM_PROMPT
+
+# Phases whose turns walk a fixed, numbered questionnaire
+QUESTIONNAIRE_PHASES = ("KYC", "BUSINESS_PLAN")
+
+TAGGED_QUESTION = re.compile(r"^\[\[Q:((?:KYC|BUSINESS_PLAN)\.\d{2})\]\]\s*(.+)$", re.MULTILINE)
+# The first business plan questions are written as "**Question N:** ..." instead of carrying a tag
+NUMBERED_QUESTION = re.compile(r"^\*\*Question (\d+):\*\*\s*(.+)$", re.MULTILINE)
+
+
+def _parse_catalog(prompt: str) -> Dict[str, str]:
+    """Question text by tag, read from the questionnaire in the system prompt so the two cannot drift"""
+
+    catalog = {tag: text.strip() for tag, text in TAGGED_QUESTION.findall(prompt)}
+    business_plan = prompt[prompt.find("--- PHASE 2: BUSINESS PLAN ---"):]
+    for number, text in NUMBERED_QUESTION.findall(business_plan):
+        catalog.setdefault(f"BUSINESS_PLAN.{int(number):02d}", text.strip())
+    return dict(sorted(catalog.items(), key=lambda item: (QUESTIONNAIRE_PHASES.index(item[0].split(".")[0]), item[0])))
+
+
+QUESTION_CATALOG = _parse_catalog(ANGEL_SYSTEM_PROMPT)
+
+
+def question_text(tag: str) -> Optional[str]:
+    return QUESTION_CATALOG.get(tag)
+
+
+def next_question_tag(tag: str) -> Optional[str]:
+    """The tag after `tag` in the same phase, or None after the phase's last question"""
+
+    phase, _, number = tag.partition(".")
+    if not number.isdigit():
+        return None
+    following = f"{phase}.{int(number) + 1:02d}"
+    return following if following in QUESTION_CATALOG else None
+
+
+def is_last_question(tag: str) -> bool:
+    return tag in QUESTION_CATALOG and next_question_tag(tag) is None
+
+
+def allowed_question_tags(asked_q: str) -> List[str]:
+    """Tags a turn may end on: the question on screen (re-asked or still waiting for Accept) or the next one"""
+
+    if asked_q not in QUESTION_CATALOG:
+        return []
+    following = next_question_tag(asked_q)
+    return [asked_q, following] if following else [asked_q]
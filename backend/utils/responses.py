@@ -0,0 +1,66 @@
+import hashlib
+import json
+from typing import Any, Iterable, Optional
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize with orjson; types it does not know (pydantic models, sets, ...) go through jsonable_encoder"""
+
+    if orjson is not None:
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: same JSON as JSONResponse, rendered by orjson when it is installed"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison; the compression middleware weakens ETags it re-encodes
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return etag in candidates
+
+
+def _without_keys(content: Any, keys: frozenset) -> Any:
+    if isinstance(content, dict):
+        return {key: _without_keys(value, keys) for key, value in content.items() if key not in keys}
+    if isinstance(content, list):
+        return [_without_keys(value, keys) for value in content]
+    return content
+
+
+def artifact_response(request: Request, content: Any, status_code: int = 200, etag: bool = True, volatile_keys: Iterable[str] = ()) -> Response:
+    """Serialized once, bypassing FastAPI's jsonable_encoder pass, with a content ETag
+
+    A client sending the ETag back in If-None-Match gets a bodyless 304 when the payload is unchanged.
+    Keys in volatile_keys (timestamps, timings) are left out of the ETag, at any depth, so they do
+    not defeat it. Pass etag=False for content regenerated on every request, where it never matches.
+    """
+
+    body = dumps(content)
+    if not etag:
+        return Response(body, status_code=status_code, media_type="application/json")
+
+    volatile_keys = frozenset(volatile_keys)
+    stable = dumps(_without_keys(content, volatile_keys)) if volatile_keys else body
+    validator = f'"{hashlib.blake2b(stable, digest_size=16).hexdigest()}"'
+    # Cacheable by the browser only, and always revalidated
+    headers = {"ETag": validator, "Cache-Control": "private, no-cache"}
+    if status_code == 200 and _etag_matches(request.headers.get("if-none-match"), validator):
+        return Response(status_code=304, headers=headers)
+    return Response(body, status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,178 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Any, Optional, Set
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "how",
+    "in", "is", "it", "its", "of", "on", "or", "that", "the", "their", "this", "to", "was",
+    "were", "what", "when", "which", "will", "with", "you", "your", "site", "com", "www"
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+def chunk_text(text: str, max_words: int = 180, overlap: int = 30) -> List[str]:
+    """Split text into overlapping word windows, keeping paragraphs together where possible"""
+
+    if not text or not text.strip():
+        return []
+
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    chunks = []
+    current: List[str] = []
+
+    for paragraph in paragraphs:
+        words = paragraph.split()
+        if current and len(current) + len(words) > max_words:
+            chunks.append(" ".join(current))
+            current = current[-overlap:] if overlap else []
+        current.extend(words)
+        # A single paragraph longer than the window is split on word boundaries
+        while len(current) > max_words:
+            chunks.append(" ".join(current[:max_words]))
+            current = current[max_words - overlap:] if overlap else current[max_words:]
+
+    if current:
+        chunks.append(" ".join(current))
+
+    return chunks
+
+
+class BM25Index:
+    """Incremental in-memory BM25 index over text chunks"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # Removed chunks leave None in their slot until the next compaction
+        self.chunks: List[Optional[Dict[str, Any]]] = []
+        self.term_freqs: List[Counter] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+        self.total_length = 0
+        self.seen_keys = set()
+        self.key_chunks: Dict[str, List[int]] = {}
+        self.removed = 0
+
+    def __len__(self) -> int:
+        return len(self.chunks) - self.removed
+
+    def add(self, text: str, metadata: Optional[Dict[str, Any]] = None, key: Optional[str] = None) -> int:
+        """Chunk and index a document, skipping keys that were already indexed"""
+
+        if key is not None:
+            if key in self.seen_keys:
+                return 0
+            self.seen_keys.add(key)
+
+        added = 0
+        for chunk in chunk_text(text):
+            tokens = tokenize(chunk)
+            if not tokens:
+                continue
+            index = len(self.chunks)
+            freqs = Counter(tokens)
+            self.chunks.append({"text": chunk, "metadata": dict(metadata or {})})
+            self.term_freqs.append(freqs)
+            self.doc_lengths.append(len(tokens))
+            self.total_length += len(tokens)
+            for term in freqs:
+                self.postings[term].add(index)
+            if key is not None:
+                self.key_chunks.setdefault(key, []).append(index)
+            added += 1
+
+        return added
+
+    def remove(self, key: str) -> int:
+        """Drop the chunks indexed under key; the key may be added again afterwards"""
+
+        self.seen_keys.discard(key)
+        indices = self.key_chunks.pop(key, [])
+        for index in indices:
+            for term in self.term_freqs[index]:
+                posting = self.postings[term]
+                posting.discard(index)
+                if not posting:
+                    del self.postings[term]
+            self.total_length -= self.doc_lengths[index]
+            self.chunks[index] = None
+            self.term_freqs[index] = Counter()
+            self.doc_lengths[index] = 0
+        self.removed += len(indices)
+        if self.removed > len(self):
+            self._compact()
+        return len(indices)
+
+    def _compact(self):
+        """Close the gaps left by removed chunks"""
+
+        positions: Dict[int, int] = {}
+        for index, chunk in enumerate(self.chunks):
+            if chunk is not None:
+                positions[index] = len(positions)
+        self.chunks = [self.chunks[index] for index in positions]
+        self.term_freqs = [self.term_freqs[index] for index in positions]
+        self.doc_lengths = [self.doc_lengths[index] for index in positions]
+        self.postings = defaultdict(set, {
+            term: {positions[index] for index in posting} for term, posting in self.postings.items()
+        })
+        self.key_chunks = {key: [positions[index] for index in indices] for key, indices in self.key_chunks.items()}
+        self.removed = 0
+
+    def search(self, query: str, k: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Return the top-k chunks for a query as {"score", "text", "metadata"} dicts"""
+
+        query_terms = set(tokenize(query))
+        if not query_terms or not len(self):
+            return []
+
+        total_chunks = len(self)
+        average_length = self.total_length / total_chunks
+        scores: Dict[int, float] = defaultdict(float)
+
+        for term in query_terms:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (total_chunks - len(posting) + 0.5) / (len(posting) + 0.5))
+            for index in posting:
+                tf = self.term_freqs[index][term]
+                length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[index] / average_length)
+                scores[index] += idf * tf * (self.k1 + 1) / (tf + length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for index, score in ranked:
+            chunk = self.chunks[index]
+            if filters and any(chunk["metadata"].get(field) != value for field, value in filters.items()):
+                continue
+            results.append({"score": score, "text": chunk["text"], "metadata": chunk["metadata"]})
+            if len(results) >= k:
+                break
+
+        return results
+
+    def max_possible_score(self, query: str) -> float:
+        """Upper bound of a query's score, used to normalise relevance into 0..1
+
+        Every query term counts towards the bound. Terms missing from the index get the rarest
+        possible idf, so a chunk sharing one common word with a longer query stays far below it.
+        """
+
+        query_terms = set(tokenize(query))
+        if not query_terms or not len(self):
+            return 0.0
+
+        total_chunks = len(self)
+        bound = 0.0
+        for term in query_terms:
+            document_frequency = len(self.postings.get(term) or ())
+            bound += math.log(1 + (total_chunks - document_frequency + 0.5) / (document_frequency + 0.5)) * (self.k1 + 1)
+        return bound
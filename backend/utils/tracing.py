@@ -0,0 +1,193 @@
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+# Append finished traces as JSON lines to this file (unset = no export)
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE")
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Trace:
+    """Spans recorded for one request, in OpenTelemetry span field names"""
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Dict[str, Any]] = []
+        self.root = self._new_span(name, None, attributes)
+
+    def _new_span(self, name: str, parent: Optional[Dict[str, Any]], attributes: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": secrets.token_hex(8),
+            "parentSpanId": parent["spanId"] if parent else None,
+            "name": name,
+            "startTimeUnixNano": time.time_ns(),
+            "endTimeUnixNano": None,
+            "attributes": dict(attributes or {}),
+            "status": {"code": "OK"}
+        }
+        self.spans.append(span)
+        return span
+
+    def finish(self):
+        self.root["endTimeUnixNano"] = time.time_ns()
+
+    def breakdown(self) -> Dict[str, float]:
+        """Exclusive milliseconds per span name (time not spent in child spans)"""
+
+        child_time: Dict[str, int] = {}
+        for span in self.spans:
+            if span["parentSpanId"] and span["endTimeUnixNano"] is not None:
+                child_time[span["parentSpanId"]] = child_time.get(span["parentSpanId"], 0) + span["endTimeUnixNano"] - span["startTimeUnixNano"]
+
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            if span is self.root or span["endTimeUnixNano"] is None:
+                continue
+            duration = span["endTimeUnixNano"] - span["startTimeUnixNano"]
+            exclusive = max(0, duration - child_time.get(span["spanId"], 0)) / 1e6
+            totals[span["name"]] = totals.get(span["name"], 0.0) + exclusive
+        return {name: round(duration, 1) for name, duration in totals.items()}
+
+    def duration_ms(self) -> float:
+        end = self.root["endTimeUnixNano"] or time.time_ns()
+        return round((end - self.root["startTimeUnixNano"]) / 1e6, 1)
+
+    def server_timing(self) -> str:
+        """Server-Timing header value with the exclusive time of each span name"""
+
+        entries = [f"total;dur={self.duration_ms()}"]
+        for name, duration in self.breakdown().items():
+            metric = "".join(char if char.isalnum() or char in "_-" else "_" for char in name)
+            entries.append(f"{metric};dur={duration}")
+        return ", ".join(entries)
+
+
+def start_trace(name: str, **attributes) -> Trace:
+    """Begin a trace for the current request context"""
+
+    trace = Trace(name, attributes)
+    _current_trace.set(trace)
+    _current_span.set(trace.root)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def set_attribute(key: str, value: Any):
+    """Attach an attribute to the active span, if any"""
+
+    span = _current_span.get()
+    if span is not None:
+        span["attributes"][key] = value
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a child span of the active span; a no-op outside a trace"""
+
+    trace = _current_trace.get()
+    if trace is None or not TRACING_ENABLED:
+        yield None
+        return
+
+    record = trace._new_span(name, _current_span.get(), attributes)
+    token = _current_span.set(record)
+    try:
+        yield record
+    except BaseException as e:
+        record["status"] = {"code": "ERROR", "message": str(e)[:200]}
+        raise
+    finally:
+        record["endTimeUnixNano"] = time.time_ns()
+        _current_span.reset(token)
+
+
+def traced(name: Optional[str] = None, histogram=None):
+    """Decorator recording a span around a sync or async function
+
+    When a histogram is given, the call duration is also observed with an operation label.
+    """
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    with span(span_name):
+                        return await func(*args, **kwargs)
+                finally:
+                    if histogram is not None:
+                        histogram.observe(time.perf_counter() - started, operation=span_name)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                with span(span_name):
+                    return func(*args, **kwargs)
+            finally:
+                if histogram is not None:
+                    histogram.observe(time.perf_counter() - started, operation=span_name)
+        return wrapper
+
+    return decorator
+
+
+class FileExporter:
+    """Writes finished traces as JSON lines from a background thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.queue: queue.Queue = queue.Queue(maxsize=1000)
+        self.thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def export(self, trace: Trace):
+        try:
+            self.queue.put_nowait({"traceId": trace.trace_id, "spans": trace.spans})
+        except queue.Full:
+            pass
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join(timeout=2)
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as output:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                output.write(json.dumps(item, default=str) + "\n")
+                output.flush()
+
+
+_exporter = FileExporter(TRACE_EXPORT_FILE) if TRACE_EXPORT_FILE else None
+
+
+def end_trace(trace: Trace):
+    """Close a trace and hand it to the file exporter when configured"""
+
+    trace.finish()
+    if _exporter is not None:
+        _exporter.export(trace)